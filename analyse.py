@@ -12,6 +12,7 @@ from pathlib import Path
 import PyPDF2
 import fitz  # PyMuPDF
 import pandas as pd
+import numpy as np
 from typing import Dict, List, Any
 import math
 
@@ -43,52 +44,87 @@ class CADAnalyzer:
         print(f"Analyzing PDF: {file_path}")
         
         try:
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                text = ""
-                for page in pdf_reader.pages:
-                    text += page.extract_text()
-                
-                # Zoek naar oppervlakte patronen
-                oppervlakte = self._extract_area(text)
-                
-                # Zoek naar bouwjaar
-                bouwjaar = self._extract_year(text)
-                
-                # Detecteer type werk
-                project_type = self._detect_project_type(text)
-                
-                # Tel kamer-aanduidingen
-                kamers = self._count_rooms(text)
-                
-                self.results = {
-                    'oppervlakte_m2': oppervlakte,
-                    'aantal_kamers': kamers,
-                    'bouwjaar': bouwjaar,
-                    'project_type': project_type,
-                    'detecties': ['pdf_geanalyseerd'],
-                    'bestand': os.path.basename(file_path)
-                }
-                
+            text = self._pdf_text(file_path)
+            
+            # Zoek naar oppervlakte patronen
+            oppervlakte = self._extract_area(text)
+            
+            # Zoek naar bouwjaar
+            bouwjaar = self._extract_year(text)
+            
+            # Detecteer type werk
+            project_type = self._detect_project_type(text)
+            
+            # Tel kamer-aanduidingen
+            kamers = self._count_rooms(text)
+            
+            self.results = {
+                'oppervlakte_m2': oppervlakte,
+                'aantal_kamers': kamers,
+                'bouwjaar': bouwjaar,
+                'project_type': project_type,
+                'detecties': ['pdf_geanalyseerd'],
+                'bestand': os.path.basename(file_path)
+            }
+            
         except Exception as e:
             print(f"PDF analyse fout: {e}")
             self.results['error'] = str(e)
         
         return self.results
     
+    def _pdf_text(self, file_path: str) -> str:
+        """Tekstlaag van alle pagina's; PyMuPDF (snel), PyPDF2 als terugval"""
+        try:
+            with fitz.open(file_path) as doc:
+                return "\n".join(page.get_text() for page in doc)
+        except Exception as e:
+            print(f"PyMuPDF tekstextractie fout, terugval op PyPDF2: {e}")
+        
+        with open(file_path, 'rb') as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            return "\n".join(page.extract_text() or "" for page in pdf_reader.pages)
+    
     def _analyze_cad(self, file_path: str) -> Dict[str, Any]:
         """Analyseer CAD bestanden (DWG, DXF)"""
         print(f"Analyzing CAD: {file_path}")
         
-        # Voor nu basis detectie - zou uitgebreid kunnen worden met ezdxf
-        self.results = {
-            'oppervlakte_m2': 0,
-            'aantal_kamers': 0,
-            'bouwjaar': None,
-            'project_type': 'cad_bestand',
-            'detecties': ['cad_detectie_vereist_extra_tools'],
-            'bestand': os.path.basename(file_path)
-        }
+        if not file_path.lower().endswith('.dxf'):
+            # DWG moet eerst naar DXF worden omgezet
+            self.results = {
+                'oppervlakte_m2': 0,
+                'aantal_kamers': 0,
+                'bouwjaar': None,
+                'project_type': 'cad_bestand',
+                'detecties': ['dwg_omzetten_naar_dxf'],
+                'bestand': os.path.basename(file_path)
+            }
+            return self.results
+        
+        try:
+            from src.utils.dxf_reader import DXFReader
+            
+            drawing = DXFReader().read(file_path)
+            elements = drawing.elements
+            text = "\n".join(drawing.texts)
+            
+            # Vloeroppervlak uit gesloten contouren op ruimte/vloer lagen (mm² naar m²)
+            rooms = elements.type_mask("room")
+            floors = rooms if rooms.any() else elements.type_mask("floor")
+            oppervlakte = float(np.nansum(elements.area[floors])) / 1e6
+            
+            self.results = {
+                'oppervlakte_m2': round(oppervlakte, 2) if oppervlakte else self._extract_area(text),
+                'aantal_kamers': int(rooms.sum()) or self._count_rooms(text),
+                'bouwjaar': self._extract_year(text),
+                'project_type': self._detect_project_type(text),
+                'detecties': ['dxf_geanalyseerd'] + sorted(drawing.layer_quantities().keys()),
+                'bestand': os.path.basename(file_path)
+            }
+            
+        except Exception as e:
+            print(f"CAD analyse fout: {e}")
+            self.results['error'] = str(e)
         
         return self.results
     
@@ -1,45 +1,29 @@
 # src/analyzers/cost_analyzer.py
 import logging
 import asyncio
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple, Iterable
 from datetime import datetime
 from decimal import Decimal, ROUND_HALF_UP
 
 from pydantic import BaseModel, Field
 import numpy as np
 
-from ..core.document_processor import DocumentType
+from ..models.document_type import DocumentType
 from ..core.ai_orchestrator import AIOrchestrator
+from ..database.price_index import STABUPriceIndex
+from ..utils.table_extractor import TableExtractor
+from .cost_engine import CostEngine, CostInputs, CostResult, CostItem, CostBreakdown
+from .monte_carlo import MonteCarloSimulator, MonteCarloResult
+from .price_indexation import PriceIndexation, CategoryIndexation, ProjectPhase, EscalationResult
+from .pricing_context import PriceAdjustment
+from .productivity_norms import NormsEngine
+from .scenarios import Scenario, ScenarioEngine, ScenarioResult
 
 logger = logging.getLogger(__name__)
 
 
-class CostItem(BaseModel):
-    """Individueel kosten item"""
-    item_code: str
-    description: str
-    unit: str
-    quantity: float
-    unit_price: Decimal
-    total_price: Decimal
-    category: str  # materiaal, arbeid, machine, overhead
-    subcategory: Optional[str] = None
-    source: Optional[str] = None  # STABU, eigen, leverancier
-    confidence: float = Field(ge=0.0, le=1.0)
-    notes: List[str] = Field(default_factory=list)
-
-
-class CostBreakdown(BaseModel):
-    """Gedetailleerde kosten breakdown"""
-    material_costs: List[CostItem]
-    labor_costs: List[CostItem]
-    equipment_costs: List[CostItem]
-    overhead_costs: List[CostItem]
-    subtotals: Dict[str, Decimal]
-    vat_percentage: Decimal = Field(default=Decimal('0.21'))
-    vat_amount: Decimal
-    total_excl_vat: Decimal
-    total_incl_vat: Decimal
+# Trekkingen voor de bandbreedte in analyze(); simulate_costs() voor een volledige simulatie
+ANALYSIS_SIMULATION_DRAWS = 5_000
 
 
 class CostAnalysisResult(BaseModel):
@@ -76,33 +60,30 @@ class CostAnalysisResult(BaseModel):
 class CostAnalyzer:
     """Analyseert en berekent kosten voor bouwprojecten"""
     
-    def __init__(self, ai_orchestrator: AIOrchestrator):
+    def __init__(
+        self,
+        ai_orchestrator: AIOrchestrator,
+        supabase_client: Optional[Any] = None,
+        price_index: Optional[STABUPriceIndex] = None,
+        price_adjustments: Optional[List[PriceAdjustment]] = None,
+        price_indexation: Optional[PriceIndexation] = None,
+        table_extractor: Optional[TableExtractor] = None,
+        simulator: Optional[MonteCarloSimulator] = None,
+        analysis_draws: int = ANALYSIS_SIMULATION_DRAWS,
+        norms: Optional[NormsEngine] = None
+    ):
         self.ai_orchestrator = ai_orchestrator
         
-        # STABU 2024 eenheidsprijzen (vereenvoudigd)
-        self.stabu_prices = {
-            # Grondwerk (Hoofdstuk 2)
-            "2.1": {"description": "Grondverzet per m3", "unit": "m3", "price": Decimal('25.00')},
-            "2.2": {"description": "Ophoging zand", "unit": "m3", "price": Decimal('45.00')},
-            
-            # Betonwerk (Hoofdstuk 3)
-            "3.1": {"description": "Fundering C20/25", "unit": "m3", "price": Decimal('145.00')},
-            "3.2": {"description": "Vloer C25/30", "unit": "m3", "price": Decimal('165.00')},
-            
-            # Metselwerk (Hoofdstuk 4)
-            "4.1": {"description": "Gevelsteen 10x20x50", "unit": "m2", "price": Decimal('85.00')},
-            "4.2": {"description": "Binnenwand blokken", "unit": "m2", "price": Decimal('45.00')},
-            
-            # Houtwerk (Hoofdstuk 5)
-            "5.1": {"description": "Draagbalk gelamineerd", "unit": "m", "price": Decimal('125.00')},
-            "5.2": {"description": "Vloerbalk Vuren", "unit": "m", "price": Decimal('35.00')},
-            
-            # Dakwerk (Hoofdstuk 6)
-            "6.1": {"description": "Dakpannen", "unit": "m2", "price": Decimal('75.00')},
-            "6.2": {"description": "Isolatie dak", "unit": "m2", "price": Decimal('65.00')},
-        }
+        # Staten en begrotingen (PDF/image) naar posten; pas bij gebruik aangemaakt
+        self._table_extractor = table_extractor
+        
+        # STABU prijzen: in-memory index, eenmalig (en daarna incrementeel) uit Supabase
+        self.price_index = price_index or STABUPriceIndex(supabase_client)
         
-        # Arbeidskosten per uur (2024)
+        # Prijsindexen per categorie (CBS/BDB reeksen uit PRICE_INDEX_DIR)
+        self.price_indexation = price_indexation or PriceIndexation()
+        
+        # Arbeidskosten per uur (prijspeil price_indexation.base_date)
         self.labor_rates = {
             "metselaar": Decimal('55.00'),
             "timmerman": Decimal('52.00'),
@@ -111,7 +92,7 @@ class CostAnalyzer:
             "algemeen_bouwarbeider": Decimal('42.00'),
         }
         
-        # Machinekosten per dag
+        # Machinekosten per dag (prijspeil price_indexation.base_date)
         self.equipment_rates = {
             "kraan_25t": Decimal('850.00'),
             "graafmachine": Decimal('450.00'),
@@ -119,13 +100,34 @@ class CostAnalyzer:
             "hoogwerker": Decimal('185.00'),
         }
         
+        # Prijsfactoren (context, regionale index, indexering) per berekening gecompileerd
+        adjustments = list(price_adjustments or [])
+        if self.price_indexation.series:
+            adjustments.append(CategoryIndexation(self.price_indexation, self.price_index))
+        self.cost_engine = CostEngine(
+            self.price_index,
+            self.labor_rates,
+            self.equipment_rates,
+            adjustments=adjustments,
+            norms=norms,  # standaard normen uit NORMS_FILE of de ingebouwde tabel
+            indexation=self.price_indexation
+        )
+        self.scenario_engine = ScenarioEngine(self.cost_engine)
+        
+        # Monte Carlo bandbreedte; in analyze() met weinig trekkingen (context
+        # "cost_simulation_draws", 0 = uit), buiten de event loop
+        self.simulator = simulator or MonteCarloSimulator()
+        self.analysis_draws = analysis_draws
+        
         logger.info("CostAnalyzer initialized")
     
     async def analyze(
         self,
         drawing_analysis: Optional[Dict] = None,
         report_analysis: Optional[Dict] = None,
-        context: Optional[Dict[str, Any]] = None
+        context: Optional[Dict[str, Any]] = None,
+        model_elements: Optional[Iterable[Dict]] = None,
+        table_files: Optional[List[str]] = None
     ) -> CostAnalysisResult:
         """
         Analyseer kosten op basis van tekening en rapport analyses
@@ -134,6 +136,11 @@ class CostAnalyzer:
             drawing_analysis: Resultaat van DrawingAnalyzer
             report_analysis: Resultaat van ReportAnalyzer
             context: Project context (locatie, complexiteit, etc.)
+            model_elements: Optioneel bouwdelen uit een BIM model
+                (bijv. IFCReader.iter_cost_elements) of posten uit een staat of
+                begroting (ExtractedTable.to_cost_elements) met exacte hoeveelheden
+            table_files: Optioneel staten of begrotingen (PDF/image) waarvan de
+                posten met hun eigen eenheid en prijs worden meegenomen
             
         Returns:
             Gedetailleerde kosten analyse
@@ -141,29 +148,20 @@ class CostAnalyzer:
         logger.info("Starting cost analysis")
         
         try:
-            # Extract elementen uit analyses
-            elements = await self._extract_elements(drawing_analysis, report_analysis)
-            
-            # Classificeer elementen volgens STABU
-            classified_elements = await self._classify_elements(elements, context)
-            
-            # Bereken hoeveelheden
-            quantities = await self._calculate_quantities(classified_elements)
-            
-            # Bepaal eenheidsprijzen
-            unit_prices = await self._determine_prices(classified_elements, context)
-            
-            # Bereken kosten breakdown
-            breakdown = await self._calculate_breakdown(quantities, unit_prices, context)
+            # Elementen extraheren, classificeren en als arrays voorbereiden
+            inputs = await self.prepare_inputs(
+                drawing_analysis, report_analysis, context, model_elements, table_files
+            )
             
-            # Voeg overhead toe
-            breakdown = await self._add_overhead(breakdown, context)
+            # Berekening in hele centen
+            costing = self.cost_engine.price(inputs, context)
             
-            # Bereken totaal
-            total_costs = self._calculate_totals(breakdown)
+            # CostItems alleen voor de output
+            breakdown = costing.to_breakdown()
+            total_costs = costing.totals()
             
             # Risico analyse
-            risk_assessment = await self._assess_risks(breakdown, context)
+            risk_assessment = await self._assess_risks(breakdown, context, costing)
             
             # Besparingsmogelijkheden
             saving_opportunities = await self._find_savings(breakdown, context)
@@ -173,6 +171,10 @@ class CostAnalyzer:
             
             # Valideer resultaten
             validation_warnings = self._validate_calculation(breakdown)
+            if inputs.rejected:
+                validation_warnings.append(
+                    f"{len(inputs.rejected)} posten niet meegenomen: eenheid wijkt af van de STABU code"
+                )
             
             # Bereken confidence
             confidence_score = self._calculate_confidence(
@@ -211,7 +213,8 @@ class CostAnalyzer:
     async def _extract_elements(
         self,
         drawing_analysis: Optional[Dict],
-        report_analysis: Optional[Dict]
+        report_analysis: Optional[Dict],
+        model_elements: Optional[Iterable[Dict]] = None
     ) -> List[Dict]:
         """Extraheer bouwelementen uit analyses"""
         elements = []
@@ -226,6 +229,7 @@ class CostAnalyzer:
                         "dimensions": elem.get("dimensions"),
                         "material": elem.get("material"),
                         "quantity": elem.get("quantity", 1),
+                        "unit_quantities": (elem.get("metadata") or {}).get("unit_quantities"),
                         "metadata": elem.get("metadata", {})
                     })
         
@@ -241,6 +245,10 @@ class CostAnalyzer:
                         "recommendation": finding.get("recommendation")
                     })
         
+        # Bouwdelen uit een BIM model (worden gestreamd, al in het juiste formaat)
+        if model_elements is not None:
+            elements.extend(model_elements)
+        
         logger.info(f"Extracted {len(elements)} elements for cost analysis")
         return elements
     
@@ -289,10 +297,15 @@ class CostAnalyzer:
         if not element_type:
             return "99.9"
         
+        # Zoekindex over de volledige catalogus (omschrijving, synoniemen, fuzzy)
+        stabu_code = self.price_index.best_code(element_type, material)
+        if stabu_code:
+            return stabu_code
+        
         element_lower = element_type.lower()
         material_lower = (material or "").lower()
         
-        # Simpele mapping (in productie: uitgebreide database)
+        # Terugval op trefwoorden als de catalogus geen match geeft
         if any(word in element_lower for word in ["wall", "muur", "wand"]):
             if "load" in element_lower or "drag" in element_lower:
                 return "3.1"  # Draagmuur
@@ -322,421 +335,176 @@ class CostAnalyzer:
         
         return "99.9"  # Overig
     
-    async def _calculate_quantities(self, elements: List[Dict]) -> Dict[str, float]:
-        """Bereken hoeveelheden per STABU code"""
-        quantities = {}
+    async def extract_table_elements(self, file_path: str) -> List[Dict]:
+        """
+        Posten uit alle tabellen van een staat of begroting
         
-        for element in elements:
-            stabu_code = element.get("stabu_code")
-            if not stabu_code:
-                continue
-            
-            # Extract hoeveelheid uit dimensies
-            quantity = self._extract_quantity(element)
-            
-            if stabu_code not in quantities:
-                quantities[stabu_code] = 0
+        Args:
+            file_path: Pad naar PDF of image
             
-            quantities[stabu_code] += quantity
+        Returns:
+            Elementen voor prepare_inputs, met eenheid en prijs van de rij
+        """
+        if self._table_extractor is None:
+            self._table_extractor = TableExtractor()
         
-        return quantities
-    
-    def _extract_quantity(self, element: Dict) -> float:
-        """Extraheer hoeveelheid uit element data"""
-        # Check op expliciete hoeveelheid
-        explicit_qty = element.get("quantity")
-        if explicit_qty and isinstance(explicit_qty, (int, float)):
-            return float(explicit_qty)
-        
-        # Bereken uit dimensies
-        dimensions = element.get("dimensions")
-        if not dimensions:
-            return 1.0  # Standaard
-        
-        # Gebaseerd op beschikbare dimensies
-        if "area" in dimensions:
-            return float(dimensions["area"])
-        elif "volume" in dimensions:
-            return float(dimensions["volume"])
-        elif "length" in dimensions:
-            return float(dimensions["length"])
-        elif "width" in dimensions and "height" in dimensions:
-            return float(dimensions["width"]) * float(dimensions["height"])
-        
-        return 1.0
+        tables = await self._table_extractor.extract_file(file_path)
+        elements = [element for table in tables for element in table.to_cost_elements()]
+        logger.info(f"Extracted {len(elements)} cost rows from {len(tables)} tables in {file_path}")
+        return elements
     
-    async def _determine_prices(
+    async def search_stabu(
         self,
-        elements: List[Dict],
-        context: Optional[Dict[str, Any]]
-    ) -> Dict[str, Dict[str, Decimal]]:
-        """Bepaal eenheidsprijzen per STABU code"""
-        prices = {}
+        query: str,
+        limit: int = 20,
+        category: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Zoek STABU codes voor calculatoren (typeahead), zonder database query per zoekvraag
         
-        for element in elements:
-            stabu_code = element.get("stabu_code")
-            if not stabu_code or stabu_code in prices:
-                continue
-            
-            # Haal basisprijs uit STABU database
-            base_price = self._get_stabu_price(stabu_code, element)
-            
-            # Pas aan op basis van context
-            adjusted_price = self._adjust_price(base_price, element, context)
+        Args:
+            query: Zoektekst of begin van een STABU code
+            limit: Maximaal aantal resultaten
+            category: Alleen deze categorie
             
-            prices[stabu_code] = {
-                "unit_price": adjusted_price,
-                "unit": self._get_unit_for_stabu(stabu_code),
-                "description": element.get("element_type", "Unknown element"),
-                "category": self._get_category_for_stabu(stabu_code)
-            }
-        
-        return prices
-    
-    def _get_stabu_price(self, stabu_code: str, element: Dict) -> Decimal:
-        """Haal STABU eenheidsprijs op"""
-        # Zoek exacte match
-        if stabu_code in self.stabu_prices:
-            return Decimal(str(self.stabu_prices[stabu_code]["price"]))
-        
-        # Zoek op hoofdstuk
-        chapter = stabu_code.split(".")[0] if "." in stabu_code else stabu_code
-        for code, data in self.stabu_prices.items():
-            if code.startswith(chapter + "."):
-                return Decimal(str(data["price"]))
-        
-        # Standaard prijs gebaseerd op element type
-        element_type = element.get("element_type", "").lower()
-        
-        if any(word in element_type for word in ["concrete", "beton"]):
-            return Decimal('150.00')
-        elif any(word in element_type for word in ["brick", "steen"]):
-            return Decimal('85.00')
-        elif any(word in element_type for word in ["wood", "hout"]):
-            return Decimal('65.00')
-        elif any(word in element_type for word in ["metal", "staal"]):
-            return Decimal('125.00')
-        
-        return Decimal('100.00')  # Standaard
-    
-    def _adjust_price(
-        self,
-        base_price: Decimal,
-        element: Dict,
-        context: Optional[Dict[str, Any]]
-    ) -> Decimal:
-        """Pas prijs aan op basis van context"""
-        adjusted_price = base_price
-        
-        # Complexiteitsfactor
-        complexity = context.get("complexity", "medium")
-        complexity_factors = {
-            "low": Decimal('0.9'),
-            "medium": Decimal('1.0'),
-            "high": Decimal('1.15'),
-            "very_high": Decimal('1.3')
-        }
-        adjusted_price *= complexity_factors.get(complexity, Decimal('1.0'))
-        
-        # Locatie factor
-        location = context.get("location", "randstad")
-        location_factors = {
-            "randstad": Decimal('1.1'),
-            "noord": Decimal('0.95'),
-            "oost": Decimal('0.9'),
-            "zuid": Decimal('0.95'),
-            "west": Decimal('1.0')
-        }
-        adjusted_price *= location_factors.get(location, Decimal('1.0'))
-        
-        # Project grootte korting
-        project_size = context.get("project_size", "medium")
-        size_discounts = {
-            "small": Decimal('1.05'),  # 5% toeslag voor klein
-            "medium": Decimal('1.0'),
-            "large": Decimal('0.95'),   # 5% korting voor groot
-            "very_large": Decimal('0.9') # 10% korting voor zeer groot
-        }
-        adjusted_price *= size_discounts.get(project_size, Decimal('1.0'))
-        
-        # Afronden naar 2 decimalen
-        return adjusted_price.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-    
-    def _get_unit_for_stabu(self, stabu_code: str) -> str:
-        """Bepaal eenheid voor STABU code"""
-        if stabu_code in self.stabu_prices:
-            return self.stabu_prices[stabu_code]["unit"]
-        
-        # Standaard eenheden per hoofdstuk
-        chapter = stabu_code.split(".")[0] if "." in stabu_code else stabu_code
-        
-        if chapter in ["2", "3"]:  # Grondwerk, Betonwerk
-            return "m3"
-        elif chapter in ["4", "6", "8"]:  # Metselwerk, Dakwerk, Isolatie
-            return "m2"
-        elif chapter == "5":  # Houtwerk
-            return "m"
-        else:
-            return "stuk"
-    
-    def _get_category_for_stabu(self, stabu_code: str) -> str:
-        """Bepaal categorie voor STABU code"""
-        chapter = stabu_code.split(".")[0] if "." in stabu_code else stabu_code
-        
-        material_chapters = ["3", "4", "5", "7", "8"]  # Materialen
-        labor_chapters = ["2", "9"]  # Grondwerk, Afwerking
-        
-        if chapter in material_chapters:
-            return "material"
-        elif chapter in labor_chapters:
-            return "labor"
-        else:
-            return "other"
+        Returns:
+            Catalogusregels met prijs en score
+        """
+        await self.price_index.ensure_fresh()
+        return self.price_index.search(query, limit=limit, category=category)
     
-    async def _calculate_breakdown(
+    async def prepare_inputs(
         self,
-        quantities: Dict[str, float],
-        prices: Dict[str, Dict[str, Decimal]],
-        context: Optional[Dict[str, Any]]
-    ) -> CostBreakdown:
-        """Bereken gedetailleerde kosten breakdown"""
-        material_items = []
-        labor_items = []
-        equipment_items = []
-        
-        # Bereken kosten per STABU code
-        for stabu_code, quantity in quantities.items():
-            if stabu_code not in prices:
-                continue
-            
-            price_info = prices[stabu_code]
-            unit_price = price_info["unit_price"]
-            total_price = unit_price * Decimal(str(quantity))
-            
-            cost_item = CostItem(
-                item_code=stabu_code,
-                description=price_info["description"],
-                unit=price_info["unit"],
-                quantity=quantity,
-                unit_price=unit_price,
-                total_price=total_price,
-                category=price_info["category"],
-                source="STABU",
-                confidence=0.8,
-                notes=["Automatically calculated from STABU prices"]
-            )
-            
-            # Voeg toe aan juiste categorie
-            if price_info["category"] == "material":
-                material_items.append(cost_item)
-            elif price_info["category"] == "labor":
-                labor_items.append(cost_item)
-            else:
-                material_items.append(cost_item)  # Standaard naar material
+        drawing_analysis: Optional[Dict] = None,
+        report_analysis: Optional[Dict] = None,
+        context: Optional[Dict[str, Any]] = None,
+        model_elements: Optional[Iterable[Dict]] = None,
+        table_files: Optional[List[str]] = None
+    ) -> CostInputs:
+        """
+        Extraheer en classificeer elementen en zet ze om naar CostInputs
         
-        # Voeg specifieke arbeidskosten toe
-        labor_items.extend(await self._calculate_labor_costs(quantities, context))
+        Het resultaat kan voor meerdere berekeningen (scenario's) hergebruikt worden.
+        """
+        # Extract elementen uit analyses
+        elements = await self._extract_elements(drawing_analysis, report_analysis, model_elements)
         
-        # Voeg machinekosten toe
-        equipment_items.extend(await self._calculate_equipment_costs(quantities, context))
+        # Posten uit staten en begrotingen
+        for file_path in table_files or []:
+            elements.extend(await self.extract_table_elements(file_path))
         
-        # Bereken subtotalen
-        subtotals = {
-            "materials": sum(item.total_price for item in material_items),
-            "labor": sum(item.total_price for item in labor_items),
-            "equipment": sum(item.total_price for item in equipment_items)
-        }
+        # Classificeer elementen volgens STABU
+        classified_elements = await self._classify_elements(elements, context)
         
-        # Creëer breakdown object
-        breakdown = CostBreakdown(
-            material_costs=material_items,
-            labor_costs=labor_items,
-            equipment_costs=equipment_items,
-            overhead_costs=[],  # Wordt later toegevoegd
-            subtotals=subtotals,
-            vat_amount=Decimal('0'),  # Wordt later berekend
-            total_excl_vat=sum(subtotals.values()),
-            total_incl_vat=sum(subtotals.values())
-        )
+        # Eén (incrementele) verversing per interval, daarna alleen lokale lookups
+        await self.price_index.ensure_fresh()
         
-        return breakdown
+        return self.cost_engine.prepare(classified_elements, (context or {}).get("price_date"))
     
-    async def _calculate_labor_costs(
+    async def compare_scenarios(
         self,
-        quantities: Dict[str, float],
-        context: Optional[Dict[str, Any]]
-    ) -> List[CostItem]:
-        """Bereken arbeidskosten"""
-        labor_items = []
-        
-        # Schat arbeidsuren gebaseerd op hoeveelheden
-        total_quantity = sum(quantities.values())
-        
-        # Regel van duim: 1 uur arbeid per €100 materiaal
-        estimated_hours = float(total_quantity) * 0.01
+        scenarios: List[Scenario],
+        drawing_analysis: Optional[Dict] = None,
+        report_analysis: Optional[Dict] = None,
+        context: Optional[Dict[str, Any]] = None,
+        model_elements: Optional[Iterable[Dict]] = None,
+        inputs: Optional[CostInputs] = None,
+        include_breakdown: bool = False,
+        table_files: Optional[List[str]] = None
+    ) -> List[ScenarioResult]:
+        """
+        Vergelijk varianten (locatie, complexiteit, opslagen, tarieven, materialen) naast elkaar
         
-        # Verdeel over verschillende beroepen
-        labor_distribution = {
-            "metselaar": Decimal('0.3'),
-            "timmerman": Decimal('0.25'),
-            "algemeen_bouwarbeider": Decimal('0.45')
-        }
+        Elementen worden één keer geëxtraheerd en geclassificeerd; per variant
+        worden alleen de prijsstappen herberekend.
         
-        for profession, percentage in labor_distribution.items():
-            hours = estimated_hours * float(percentage)
-            rate = self.labor_rates.get(profession, Decimal('50.00'))
-            total = rate * Decimal(str(hours))
+        Args:
+            scenarios: Varianten met afwijkende parameters
+            drawing_analysis: Resultaat van DrawingAnalyzer
+            report_analysis: Resultaat van ReportAnalyzer
+            context: Project context van de basisberekening
+            model_elements: Optioneel bouwdelen uit een model of staat
+            inputs: Eerder voorbereide CostInputs (slaat extractie over)
+            include_breakdown: Volledige breakdown per variant meegeven
+            table_files: Optioneel staten of begrotingen (PDF/image)
             
-            labor_items.append(CostItem(
-                item_code=f"LABOR_{profession.upper()}",
-                description=f"{profession.title()} uren",
-                unit="uur",
-                quantity=hours,
-                unit_price=rate,
-                total_price=total,
-                category="labor",
-                source="tarieventabel",
-                confidence=0.7,
-                notes=["Geschat op basis van materiaalkosten"]
-            ))
-        
-        return labor_items
+        Returns:
+            Basis gevolgd door de varianten
+        """
+        if inputs is None:
+            inputs = await self.prepare_inputs(
+                drawing_analysis, report_analysis, context, model_elements, table_files
+            )
+        
+        return self.scenario_engine.compare(inputs, scenarios, context, include_breakdown)
     
-    async def _calculate_equipment_costs(
+    async def simulate_costs(
         self,
-        quantities: Dict[str, float],
-        context: Optional[Dict[str, Any]]
-    ) -> List[CostItem]:
-        """Bereken machinekosten"""
-        equipment_items = []
-        
-        # Schat equipment dagen gebaseerd op project grootte
-        total_quantity = sum(quantities.values())
-        
-        if total_quantity > 1000:
-            # Groot project
-            equipment_needs = [
-                ("kraan_25t", 10),
-                ("graafmachine", 15),
-                ("hoogwerker", 20)
-            ]
-        elif total_quantity > 100:
-            # Middelgroot project
-            equipment_needs = [
-                ("kraan_25t", 5),
-                ("graafmachine", 8),
-                ("hoogwerker", 10)
-            ]
-        else:
-            # Klein project
-            equipment_needs = [
-                ("graafmachine", 3),
-                ("hoogwerker", 5)
-            ]
-        
-        for equipment_type, days in equipment_needs:
-            rate = self.equipment_rates.get(equipment_type, Decimal('300.00'))
-            total = rate * Decimal(str(days))
+        inputs: CostInputs,
+        context: Optional[Dict[str, Any]] = None,
+        uncertainty: Optional[Dict[str, Dict[str, Tuple[float, float, float]]]] = None,
+        draws: Optional[int] = None
+    ) -> MonteCarloResult:
+        """
+        Monte Carlo bandbreedte (P10/P50/P90) voor een voorbereide berekening
+        
+        Args:
+            inputs: Resultaat van prepare_inputs()
+            context: Project context
+            uncertainty: Afwijkende spreiding per STABU code (quantity/price)
+            draws: Aantal trekkingen
             
-            equipment_items.append(CostItem(
-                item_code=f"EQP_{equipment_type.upper()}",
-                description=equipment_type.replace('_', ' ').title(),
-                unit="dag",
-                quantity=days,
-                unit_price=rate,
-                total_price=total,
-                category="equipment",
-                source="verhuurtarieven",
-                confidence=0.6,
-                notes=["Geschat op basis van projectomvang"]
-            ))
-        
-        return equipment_items
+        Returns:
+            MonteCarloResult
+        """
+        costing = self.cost_engine.price(inputs, context)
+        return await self._simulate(costing, uncertainty, draws)
     
-    async def _add_overhead(
+    async def _simulate(
         self,
-        breakdown: CostBreakdown,
-        context: Optional[Dict[str, Any]]
-    ) -> CostBreakdown:
-        """Voeg overhead kosten toe"""
-        total_excl_overhead = breakdown.total_excl_vat
-        
-        # Overhead percentages
-        overhead_items = []
-        
-        # Projectmanagement (8-12%)
-        pm_percentage = Decimal('0.10')
-        pm_amount = total_excl_overhead * pm_percentage
-        overhead_items.append(CostItem(
-            item_code="OVERHEAD_PM",
-            description="Projectmanagement",
-            unit="%",
-            quantity=float(pm_percentage * 100),
-            unit_price=pm_amount / Decimal('100'),
-            total_price=pm_amount,
-            category="overhead",
-            source="standaard",
-            confidence=0.8
-        ))
-        
-        # Algemeen bedrijfskosten (5-8%)
-        oh_percentage = Decimal('0.06')
-        oh_amount = total_excl_overhead * oh_percentage
-        overhead_items.append(CostItem(
-            item_code="OVERHEAD_OH",
-            description="Algemene bedrijfskosten",
-            unit="%",
-            quantity=float(oh_percentage * 100),
-            unit_price=oh_amount / Decimal('100'),
-            total_price=oh_amount,
-            category="overhead",
-            source="standaard",
-            confidence=0.8
-        ))
-        
-        # Winstmarge (8-15%)
-        profit_percentage = Decimal('0.10')
-        profit_amount = total_excl_overhead * profit_percentage
-        overhead_items.append(CostItem(
-            item_code="OVERHEAD_PROFIT",
-            description="Winstmarge",
-            unit="%",
-            quantity=float(profit_percentage * 100),
-            unit_price=profit_amount / Decimal('100'),
-            total_price=profit_amount,
-            category="overhead",
-            source="standaard",
-            confidence=0.7
-        ))
-        
-        # Update breakdown
-        breakdown.overhead_costs = overhead_items
-        
-        # Update totaal
-        total_overhead = sum(item.total_price for item in overhead_items)
-        breakdown.total_excl_vat += total_overhead
-        breakdown.total_incl_vat = breakdown.total_excl_vat
-        
-        # Update subtotals
-        breakdown.subtotals["overhead"] = total_overhead
-        
-        return breakdown
+        costing: CostResult,
+        uncertainty: Optional[Dict[str, Dict[str, Tuple[float, float, float]]]] = None,
+        draws: Optional[int] = None
+    ) -> MonteCarloResult:
+        """Draai de simulatie in een thread, zodat de event loop vrij blijft"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None,
+            lambda: self.simulator.simulate(costing, uncertainty, draws)
+        )
     
-    def _calculate_totals(self, breakdown: CostBreakdown) -> Dict[str, Decimal]:
-        """Bereken eindtotalen met BTW"""
-        total_excl_vat = breakdown.total_excl_vat
-        vat_amount = total_excl_vat * breakdown.vat_percentage
-        total_incl_vat = total_excl_vat + vat_amount
-        
-        # Update breakdown
-        breakdown.vat_amount = vat_amount
-        breakdown.total_incl_vat = total_incl_vat
-        
-        return {
-            "total_excl_vat": total_excl_vat,
-            "vat_amount": vat_amount,
-            "total_incl_vat": total_incl_vat
+    async def escalate_phases(
+        self,
+        inputs: CostInputs,
+        phases: List[ProjectPhase],
+        context: Optional[Dict[str, Any]] = None
+    ) -> EscalationResult:
+        """
+        Reken een calculatie door naar het prijspeil van de uitvoering per fase
+        
+        De calculatie wordt één keer geprijsd op price_date uit de context;
+        daarna gebeurt de escalatie volledig op de in-memory indexreeksen.
+        
+        Args:
+            inputs: Resultaat van prepare_inputs()
+            phases: Projectfasen met start- en einddatum en optioneel STABU code prefixes
+            context: Project context (price_date = prijspeil van de calculatie)
+        
+        Returns:
+            EscalationResult per fase en totaal
+        """
+        context = context or {}
+        costing = self.cost_engine.price(inputs, context)
+        categories = {
+            code: (self.price_index.info(code) or {}).get("category")
+            for code in inputs.codes
         }
+        return self.price_indexation.escalate(
+            costing,
+            phases,
+            base_date=context.get("price_date"),
+            categories=categories
+        )
     
     def _calculate_cost_per_m2(
         self,
@@ -779,9 +547,10 @@ class CostAnalyzer:
     async def _assess_risks(
         self,
         breakdown: CostBreakdown,
-        context: Optional[Dict[str, Any]]
+        context: Optional[Dict[str, Any]],
+        costing: Optional[CostResult] = None
     ) -> Dict[str, Any]:
-        """Beoordeel kosten risico's"""
+        """Beoordeel kosten risico's (met Monte Carlo bandbreedte als de berekening beschikbaar is)"""
         risks = {
             "high_cost_items": [],
             "price_volatility": [],
@@ -825,6 +594,23 @@ class CostAnalyzer:
         elif len(risks["high_cost_items"]) > 3:
             risks["overall_risk_level"] = "medium-high"
         
+        # Kansverdeling van het totaal: P10/P50/P90 en bijdrage per categorie
+        draws = (context or {}).get("cost_simulation_draws", self.analysis_draws)
+        if costing is not None and draws:
+            try:
+                simulation = await self._simulate(costing, (context or {}).get("cost_uncertainty"), draws)
+                risks["cost_range"] = simulation.dict()
+                
+                # Risiconiveau op basis van de spreiding (P90 t.o.v. P50)
+                spread = float(simulation.p90 / simulation.p50) - 1 if simulation.p50 else 0.0
+                risks["cost_spread_percentage"] = round(spread * 100, 1)
+                if spread > 0.15:
+                    risks["overall_risk_level"] = "high"
+                elif spread > 0.08 and risks["overall_risk_level"] == "medium":
+                    risks["overall_risk_level"] = "medium-high"
+            except Exception as e:
+                logger.warning(f"Cost simulation failed: {e}")
+        
         return risks
     
     async def _find_savings(
@@ -968,13 +754,22 @@ class CostAnalyzer:
     
     def _list_assumptions(self, context: Optional[Dict[str, Any]]) -> List[str]:
         """Lijst aannames op"""
+        price_date = (context or {}).get("price_date")
+        peildatum = str(price_date)[:10] if price_date else datetime.now().date().isoformat()
         assumptions = [
-            "STABU 2024 prijzen gebruikt voor eenheidsprijzen",
+            f"STABU eenheidsprijzen geldig op peildatum {peildatum}",
             "BTW percentage: 21%",
-            "Kosten gebaseerd op Nederlandse marktprijzen 2024",
-            "Arbeidskosten inclusief sociale lasten"
+            f"Kosten gebaseerd op Nederlandse marktprijzen, prijspeil {peildatum}",
+            "Arbeidskosten inclusief sociale lasten",
+            "Arbeidsuren en materieeldagen volgens productiviteitsnormen per STABU code"
         ]
         
+        if self.price_indexation.series:
+            assumptions.append(
+                f"Prijzen en tarieven geïndexeerd naar de peildatum "
+                f"({', '.join(sorted(self.price_indexation.series))})"
+            )
+        
         if context:
             if context.get("complexity"):
                 assumptions.append(f"Complexiteitsfactor: {context['complexity']}")
@@ -989,7 +784,9 @@ class CostAnalyzer:
         report_analysis: Optional[Dict]
     ) -> List[str]:
         """Lijst databronnen op"""
-        sources = ["STABU 2024 eenheidsprijzen", "Interne tarieventabellen"]
+        sources = ["STABU eenheidsprijzen", "Interne tarieventabellen"]
+        if self.price_indexation.series:
+            sources.append("Prijsindexreeksen (CBS/BDB)")
         
         if drawing_analysis:
             sources.append(f"Tekening analyse: {drawing_analysis.get('drawing_type', 'unknown')}")
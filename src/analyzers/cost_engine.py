@@ -0,0 +1,673 @@
+import logging
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, List, Optional, Any, Iterable, Tuple
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+from .pricing_context import PricingContext, PriceAdjustment, apply_rate
+from .productivity_norms import NormsEngine
+
+logger = logging.getLogger(__name__)
+
+
+class CostItem(BaseModel):
+    """Individueel kosten item"""
+    item_code: str
+    description: str
+    unit: str
+    quantity: float
+    unit_price: Decimal
+    total_price: Decimal
+    category: str  # materiaal, arbeid, machine, overhead
+    subcategory: Optional[str] = None
+    source: Optional[str] = None  # STABU, eigen, leverancier
+    confidence: float = Field(ge=0.0, le=1.0)
+    notes: List[str] = Field(default_factory=list)
+
+
+class CostBreakdown(BaseModel):
+    """Gedetailleerde kosten breakdown"""
+    material_costs: List[CostItem]
+    labor_costs: List[CostItem]
+    equipment_costs: List[CostItem]
+    overhead_costs: List[CostItem]
+    subtotals: Dict[str, Decimal]
+    vat_percentage: Decimal = Field(default=Decimal('0.21'))
+    vat_amount: Decimal
+    total_excl_vat: Decimal
+    total_incl_vat: Decimal
+
+
+# Opslagen over het totaal excl. overhead: (code, omschrijving, percentage, confidence)
+OVERHEAD_RATES = [
+    ("OVERHEAD_PM", "Projectmanagement", Decimal('0.10'), 0.8),        # 8-12%
+    ("OVERHEAD_OH", "Algemene bedrijfskosten", Decimal('0.06'), 0.8),  # 5-8%
+    ("OVERHEAD_PROFIT", "Winstmarge", Decimal('0.10'), 0.7),           # 8-15%
+]
+
+VAT_RATE = Decimal('0.21')
+
+# Categorie per STABU code (index in de arrays)
+CATEGORIES = ("material", "labor", "other")
+
+
+def to_cents(amount: Decimal) -> int:
+    """Bedrag naar hele centen (half naar boven)"""
+    return int((Decimal(amount) * 100).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
+
+def from_cents(cents: int) -> Decimal:
+    return Decimal(int(cents)).scaleb(-2)
+
+
+class CostInputs:
+    """
+    Elementen als arrays, eenmalig opgebouwd per set elementen.
+    
+    Per element de index van de STABU code en de hoeveelheid; per code de
+    omschrijving, eenheid, categorie en basisprijs in centen. Herprijzen
+    (andere context, what-if) gebruikt alleen deze arrays. De hoeveelheden per
+    eenheid (unit_quantities) per element blijven bewaard voor substituties
+    naar een code met een andere eenheid.
+    
+    Posten met een eigen prijs (staat of begroting) krijgen een eigen regel
+    per code, eenheid en prijs; die prijs is all-in en wordt niet door de
+    prijscontext of de productiviteitsnormen aangepast.
+    """
+    
+    def __init__(
+        self,
+        codes: List[str],
+        code_index: np.ndarray,
+        quantities: np.ndarray,
+        descriptions: List[str],
+        units: List[str],
+        categories: np.ndarray,
+        base_cents: np.ndarray,
+        unit_quantities: Optional[List[Optional[Dict[str, float]]]] = None,
+        table_priced: Optional[np.ndarray] = None,
+        rejected: Optional[List[Dict[str, Any]]] = None
+    ):
+        self.codes = codes
+        self.code_index = code_index      # (n,) int64, per element
+        self.quantities = quantities      # (n,) float64, per element
+        self.descriptions = descriptions  # per code
+        self.units = units                # per code
+        self.categories = categories      # (k,) int8 index in CATEGORIES, per code
+        self.base_cents = base_cents      # (k,) int64, per code
+        self.unit_quantities = unit_quantities or [None] * len(code_index)  # per element
+        self.table_priced = (                                                # (k,) bool, per code
+            table_priced if table_priced is not None else np.zeros(len(codes), dtype=bool)
+        )
+        self.rejected = rejected or []    # elementen zonder hoeveelheid in de eenheid van de code
+        
+        # Hoeveelheid per code
+        self.code_quantities = np.bincount(code_index, weights=quantities, minlength=len(codes))
+    
+    def __len__(self) -> int:
+        return len(self.code_index)
+
+
+class CostResult:
+    """Uitkomst van één prijsberekening; CostItems worden pas bij de output gebouwd"""
+    
+    def __init__(
+        self,
+        inputs: CostInputs,
+        unit_cents: np.ndarray,
+        total_cents: np.ndarray,
+        labor: List[Tuple[str, float, int, int]],
+        equipment: List[Tuple[str, int, int, int]],
+        overhead: List[Tuple[str, str, Decimal, float, int]],
+        vat_rate: Decimal = VAT_RATE,
+        schedule: Optional[Dict[str, Dict[str, Any]]] = None,
+        hours_per_code: Optional[np.ndarray] = None
+    ):
+        self.inputs = inputs
+        self.unit_cents = unit_cents    # per code
+        self.total_cents = total_cents  # per code
+        self.labor = labor              # (beroep, uren, tarief, totaal)
+        self.equipment = equipment      # (machine, dagen, tarief, totaal)
+        self.overhead = overhead        # (code, omschrijving, percentage, confidence, totaal)
+        self.vat_rate = vat_rate
+        self.schedule = schedule or {}  # beroep → uren, ploeggrootte, duur in werkdagen
+        self.hours_per_code = hours_per_code if hours_per_code is not None else np.zeros(len(inputs.codes))
+        
+        per_category = np.zeros(len(CATEGORIES), dtype=np.int64)
+        np.add.at(per_category, inputs.categories, total_cents)
+        
+        # Categorie "other" telt mee als materiaal
+        self.subtotal_cents = {
+            "materials": int(per_category[0] + per_category[2]),
+            "labor": int(per_category[1]) + sum(item[3] for item in labor),
+            "equipment": sum(item[3] for item in equipment),
+            "overhead": sum(item[4] for item in overhead)
+        }
+        self.total_excl_vat_cents = sum(self.subtotal_cents.values())
+        self.vat_cents = int(apply_rate(np.array([self.total_excl_vat_cents]), vat_rate)[0])
+        self.total_incl_vat_cents = self.total_excl_vat_cents + self.vat_cents
+    
+    def totals(self) -> Dict[str, Decimal]:
+        return {
+            "total_excl_vat": from_cents(self.total_excl_vat_cents),
+            "vat_amount": from_cents(self.vat_cents),
+            "total_incl_vat": from_cents(self.total_incl_vat_cents)
+        }
+    
+    def to_breakdown(self) -> CostBreakdown:
+        """Bouw de CostBreakdown (met CostItems) voor de output"""
+        inputs = self.inputs
+        material_items, labor_items = [], []
+        
+        for k, code in enumerate(inputs.codes):
+            category = CATEGORIES[inputs.categories[k]]
+            table_priced = bool(inputs.table_priced[k])
+            item = CostItem(
+                item_code=code,
+                description=inputs.descriptions[k],
+                unit=inputs.units[k],
+                quantity=float(inputs.code_quantities[k]),
+                unit_price=from_cents(self.unit_cents[k]),
+                total_price=from_cents(self.total_cents[k]),
+                category=category,
+                source="tabel" if table_priced else "STABU",
+                confidence=0.9 if table_priced else 0.8,
+                notes=["Prijs uit staat of begroting" if table_priced else "Automatically calculated from STABU prices"]
+            )
+            (labor_items if category == "labor" else material_items).append(item)
+        
+        for profession, hours, rate, total in self.labor:
+            crew = self.schedule.get(profession)
+            notes = ["Berekend met productiviteitsnormen per STABU code"]
+            if crew:
+                notes.append(f"Ploeg van {crew['crew_size']}, {crew['duration_days']} werkdagen")
+            labor_items.append(CostItem(
+                item_code=f"LABOR_{profession.upper()}",
+                description=f"{profession.title()} uren",
+                unit="uur",
+                quantity=hours,
+                unit_price=from_cents(rate),
+                total_price=from_cents(total),
+                category="labor",
+                source="tarieventabel",
+                confidence=0.7,
+                notes=notes
+            ))
+        
+        equipment_items = [
+            CostItem(
+                item_code=f"EQP_{equipment_type.upper()}",
+                description=equipment_type.replace('_', ' ').title(),
+                unit="dag",
+                quantity=days,
+                unit_price=from_cents(rate),
+                total_price=from_cents(total),
+                category="equipment",
+                source="verhuurtarieven",
+                confidence=0.6,
+                notes=["Berekend met materieelnormen per STABU code"]
+            )
+            for equipment_type, days, rate, total in self.equipment
+        ]
+        
+        overhead_items = [
+            CostItem(
+                item_code=code,
+                description=description,
+                unit="%",
+                quantity=float(percentage * 100),
+                unit_price=from_cents(total) / Decimal('100'),
+                total_price=from_cents(total),
+                category="overhead",
+                source="standaard",
+                confidence=confidence
+            )
+            for code, description, percentage, confidence, total in self.overhead
+        ]
+        
+        totals = self.totals()
+        return CostBreakdown(
+            material_costs=material_items,
+            labor_costs=labor_items,
+            equipment_costs=equipment_items,
+            overhead_costs=overhead_items,
+            subtotals={key: from_cents(value) for key, value in self.subtotal_cents.items()},
+            vat_percentage=self.vat_rate,
+            vat_amount=totals["vat_amount"],
+            total_excl_vat=totals["total_excl_vat"],
+            total_incl_vat=totals["total_incl_vat"]
+        )
+
+
+class CostEngine:
+    """
+    Gevectoriseerde kostenberekening.
+    
+    prepare() zet de elementen één keer om naar arrays (code index,
+    hoeveelheid) en zoekt per unieke code de basisprijs op; price() rekent
+    daarna in hele centen met bincount/array bewerkingen. Zo kost herprijzen
+    met een andere context alleen array operaties over de unieke codes.
+    """
+    
+    def __init__(
+        self,
+        price_index: Any,
+        labor_rates: Dict[str, Decimal],
+        equipment_rates: Dict[str, Decimal],
+        adjustments: Optional[List[PriceAdjustment]] = None,
+        max_pricing_contexts: int = 64,
+        norms: Optional[NormsEngine] = None,
+        indexation: Optional[Any] = None
+    ):
+        self.price_index = price_index
+        self.labor_rates = labor_rates
+        self.equipment_rates = equipment_rates
+        
+        # Extra prijsfactoren (regionale index, indexering naar peildatum)
+        self.adjustments = list(adjustments or [])
+        self.max_pricing_contexts = max_pricing_contexts
+        self._pricing_contexts: Dict[Tuple, PricingContext] = {}
+        
+        # Arbeid en materieel uit productiviteitsnormen
+        self.norms = norms or NormsEngine()
+        
+        # Indexering van uur- en dagtarieven naar de peildatum (PriceIndexation)
+        self.indexation = indexation
+    
+    def compute(
+        self,
+        elements: Iterable[Dict],
+        context: Optional[Dict[str, Any]] = None
+    ) -> CostResult:
+        """Prepare en price in één stap"""
+        return self.price(self.prepare(elements, (context or {}).get("price_date")), context)
+    
+    def prepare(self, elements: Iterable[Dict], price_date: Optional[datetime] = None) -> CostInputs:
+        """
+        Zet geclassificeerde elementen om naar arrays
+        
+        Elementen met een eigen eenheid (unit, bijv. uit een staat) worden
+        alleen in de eenheid van de STABU code meegenomen; zonder hoeveelheid
+        in die eenheid komen ze in CostInputs.rejected. Elementen met een
+        eigen prijs (unit_price of total_price) worden tegen die prijs en in
+        hun eigen eenheid gerekend.
+        
+        Args:
+            elements: Elementen met stabu_code (uit CostAnalyzer._classify_elements)
+            price_date: Peildatum voor de STABU prijzen
+        
+        Returns:
+            CostInputs voor price()
+        """
+        code_ids: Dict[Any, int] = {}
+        code_units: Dict[str, str] = {}
+        codes: List[str] = []
+        first_elements: List[Dict] = []
+        units: List[str] = []
+        table_cents: List[Optional[int]] = []
+        code_index: List[int] = []
+        quantities: List[float] = []
+        unit_quantities: List[Optional[Dict[str, float]]] = []
+        rejected: List[Dict[str, Any]] = []
+        
+        for element in elements:
+            stabu_code = element.get("stabu_code")
+            if not stabu_code:
+                continue
+            
+            code_unit = code_units.get(stabu_code)
+            if code_unit is None:
+                code_unit = code_units[stabu_code] = self.unit_for(stabu_code)
+            
+            row_price = self.row_price(element, code_unit)
+            if row_price is not None:
+                unit, quantity, cents = row_price
+                key = (stabu_code, unit, cents)
+            else:
+                unit, cents, key = code_unit, None, stabu_code
+                quantity = self.extract_quantity(element, code_unit)
+                if quantity is None:
+                    rejected.append({
+                        "stabu_code": stabu_code,
+                        "description": element.get("description") or element.get("element_type"),
+                        "unit": element.get("unit"),
+                        "expected_unit": code_unit,
+                        "metadata": element.get("metadata") or {}
+                    })
+                    continue
+            
+            index = code_ids.get(key)
+            if index is None:
+                index = code_ids[key] = len(codes)
+                codes.append(stabu_code)
+                first_elements.append(element)
+                units.append(unit)
+                table_cents.append(cents)
+            
+            code_index.append(index)
+            quantities.append(quantity)
+            unit_quantities.append(element.get("unit_quantities") or None)
+        
+        if rejected:
+            logger.warning(f"Skipped {len(rejected)} elements without a quantity in the unit of their STABU code")
+        
+        return CostInputs(
+            codes=codes,
+            code_index=np.asarray(code_index, dtype=np.int64),
+            quantities=np.asarray(quantities, dtype=np.float64),
+            descriptions=[element.get("element_type") or "Unknown element" for element in first_elements],
+            units=units,
+            categories=np.asarray([CATEGORIES.index(self.category_for(code)) for code in codes], dtype=np.int8),
+            base_cents=np.asarray(
+                [
+                    cents if cents is not None else to_cents(self.base_price(code, element, price_date))
+                    for code, element, cents in zip(codes, first_elements, table_cents)
+                ],
+                dtype=np.int64
+            ),
+            unit_quantities=unit_quantities,
+            table_priced=np.asarray([cents is not None for cents in table_cents], dtype=bool),
+            rejected=rejected
+        )
+    
+    def price(
+        self,
+        inputs: CostInputs,
+        context: Optional[Any] = None,
+        labor_rates: Optional[Dict[str, Decimal]] = None,
+        equipment_rates: Optional[Dict[str, Decimal]] = None,
+        overhead_rates: Optional[Dict[str, Any]] = None,
+        crew_sizes: Optional[Dict[str, int]] = None
+    ) -> CostResult:
+        """
+        Bereken de kosten voor voorbereide elementen
+        
+        Args:
+            inputs: Resultaat van prepare()
+            context: Project context (complexity, location, project_size, price_date, ...)
+                of een al gecompileerde PricingContext
+            labor_rates: Afwijkende uurtarieven per beroep (aanvulling op de standaard;
+                standaardtarieven worden naar price_date geïndexeerd, deze niet)
+            equipment_rates: Afwijkende dagtarieven per machine
+            overhead_rates: Afwijkende opslagpercentages per overhead code (0.10 = 10%)
+            crew_sizes: Afwijkende ploeggroottes per beroep
+        
+        Returns:
+            CostResult met bedragen in centen
+        """
+        pricing = context if isinstance(context, PricingContext) else self.pricing_context(context)
+        
+        # Eenheidsprijs per code: basisprijs × contextfactoren, afgerond op centen
+        # (prijzen uit een staat of begroting blijven zoals ze zijn)
+        unit_cents = np.where(inputs.table_priced, inputs.base_cents, pricing.apply(inputs.codes, inputs.base_cents))
+        total_cents = np.floor(inputs.code_quantities * unit_cents + 0.5).astype(np.int64)
+        
+        # Uren en machinedagen per code uit productiviteitsnormen (in de eenheid van de code);
+        # tabelprijzen zijn all-in en krijgen geen extra uren
+        norm_quantities = np.where(inputs.table_priced, 0.0, inputs.code_quantities)
+        estimate = self.norms.estimate(inputs.codes, inputs.units, norm_quantities, crew_sizes)
+        
+        default_labor_rates, default_equipment_rates = self.labor_rates, self.equipment_rates
+        price_date = pricing.context.get("price_date")
+        if self.indexation is not None and price_date is not None:
+            default_labor_rates = self.indexation.index_rates(self.labor_rates, "labor", price_date)
+            default_equipment_rates = self.indexation.index_rates(self.equipment_rates, "equipment", price_date)
+        
+        labor_rates = {**default_labor_rates, **(labor_rates or {})}
+        labor = []
+        for trade in estimate["labor"]:
+            rate = to_cents(labor_rates.get(trade["trade"], Decimal('50.00')))
+            total = int(np.floor(trade["hours"] * rate + 0.5))
+            labor.append((trade["trade"], trade["hours"], rate, total))
+        
+        equipment_rates = {**default_equipment_rates, **(equipment_rates or {})}
+        equipment = []
+        for need in estimate["equipment"]:
+            rate = to_cents(equipment_rates.get(need["equipment_type"], Decimal('300.00')))
+            equipment.append((need["equipment_type"], need["days"], rate, rate * need["days"]))
+        
+        direct_cents = (
+            int(total_cents.sum()) +
+            sum(item[3] for item in labor) +
+            sum(item[3] for item in equipment)
+        )
+        overhead_rates = overhead_rates or {}
+        overhead = []
+        for code, description, percentage, confidence in OVERHEAD_RATES:
+            percentage = Decimal(str(overhead_rates.get(code, percentage)))
+            amount = int(apply_rate(np.array([direct_cents]), percentage)[0])
+            overhead.append((code, description, percentage, confidence, amount))
+        
+        schedule = {trade["trade"]: trade for trade in estimate["labor"]}
+        return CostResult(
+            inputs, unit_cents, total_cents, labor, equipment, overhead,
+            schedule=schedule,
+            hours_per_code=estimate["hours_per_code"]
+        )
+    
+    def substitute(
+        self,
+        inputs: CostInputs,
+        substitutions: Dict[str, str],
+        price_date: Optional[datetime] = None
+    ) -> CostInputs:
+        """
+        Vervang STABU codes (materiaalsubstitutie) zonder de elementen opnieuw te verwerken
+        
+        De code index wordt omgenummerd en voor nieuwe codes worden eenheid,
+        categorie en basisprijs opgezocht. Bij dezelfde eenheid blijven de
+        hoeveelheden gelijk; heeft de nieuwe code een andere eenheid (m3 → m),
+        dan komt de hoeveelheid uit de unit_quantities van de elementen.
+        Vervangen posten met een tabelprijs worden tegen de catalogusprijs
+        van de nieuwe code gerekend.
+        
+        Args:
+            inputs: Resultaat van prepare()
+            substitutions: {oude code: nieuwe code}
+            price_date: Peildatum voor de STABU prijzen
+        
+        Returns:
+            Nieuwe CostInputs
+        
+        Raises:
+            ValueError: Als een element geen hoeveelheid in de nieuwe eenheid heeft
+        """
+        substitutions = {old: new for old, new in substitutions.items() if old != new and old in inputs.codes}
+        if not substitutions:
+            return inputs
+        
+        code_ids: Dict[Any, int] = {}
+        codes, descriptions, units, categories, base_cents, table_priced = [], [], [], [], [], []
+        remap = np.empty(len(inputs.codes), dtype=np.int64)
+        quantities = inputs.quantities
+        
+        for k, code in enumerate(inputs.codes):
+            target = substitutions.get(code, code)
+            kept_table_price = target == code and inputs.table_priced[k]
+            key = (code, inputs.units[k], int(inputs.base_cents[k])) if kept_table_price else target
+            index = code_ids.get(key)
+            if index is None:
+                index = code_ids[key] = len(descriptions)
+                codes.append(target)
+                table_priced.append(kept_table_price)
+                if target == code:
+                    descriptions.append(inputs.descriptions[k])
+                    units.append(inputs.units[k])
+                    categories.append(inputs.categories[k])
+                    base_cents.append(inputs.base_cents[k])
+                else:
+                    info = self.price_index.info(target) or {}
+                    description = info.get("description") or inputs.descriptions[k]
+                    descriptions.append(description)
+                    units.append(self.unit_for(target))
+                    categories.append(CATEGORIES.index(self.category_for(target)))
+                    base_cents.append(to_cents(self.base_price(target, {"element_type": description}, price_date)))
+            remap[k] = index
+            
+            if units[index] != inputs.units[k]:
+                if quantities is inputs.quantities:
+                    quantities = inputs.quantities.copy()
+                quantities[inputs.code_index == k] = self._convert_quantities(inputs, k, target, units[index])
+        
+        return CostInputs(
+            codes=codes,
+            code_index=remap[inputs.code_index],
+            quantities=quantities,
+            descriptions=descriptions,
+            units=units,
+            categories=np.asarray(categories, dtype=np.int8),
+            base_cents=np.asarray(base_cents, dtype=np.int64),
+            unit_quantities=inputs.unit_quantities,
+            table_priced=np.asarray(table_priced, dtype=bool),
+            rejected=inputs.rejected
+        )
+    
+    def _convert_quantities(self, inputs: CostInputs, k: int, target: str, unit: str) -> np.ndarray:
+        """Hoeveelheden van de elementen van code k in de eenheid van de vervangende code"""
+        converted = []
+        for row in np.flatnonzero(inputs.code_index == k):
+            unit_quantities = inputs.unit_quantities[row] or {}
+            if unit not in unit_quantities:
+                raise ValueError(
+                    f"Cannot substitute {inputs.codes[k]} ({inputs.units[k]}) with {target} ({unit}): "
+                    f"element has no quantity in {unit}"
+                )
+            converted.append(float(unit_quantities[unit]))
+        return np.asarray(converted, dtype=np.float64)
+    
+    def pricing_context(self, context: Optional[Dict[str, Any]] = None) -> PricingContext:
+        """Gecompileerde prijscontext; gelijke contexten delen factoren en memo's"""
+        key = PricingContext.cache_key(context, self.adjustments)
+        pricing = self._pricing_contexts.get(key)
+        if pricing is None:
+            if len(self._pricing_contexts) >= self.max_pricing_contexts:
+                self._pricing_contexts.pop(next(iter(self._pricing_contexts)))
+            pricing = self._pricing_contexts[key] = PricingContext(context, self.adjustments)
+        return pricing
+    
+    def base_price(self, stabu_code: str, element: Dict, price_date: Optional[datetime] = None) -> Decimal:
+        """STABU eenheidsprijs (exacte code, anders bovenliggende code, anders op element type)"""
+        match = self.price_index.lookup(stabu_code, price_date)
+        if match is not None:
+            return match[1]
+        
+        element_type = (element.get("element_type") or "").lower()
+        
+        if any(word in element_type for word in ["concrete", "beton"]):
+            return Decimal('150.00')
+        elif any(word in element_type for word in ["brick", "steen"]):
+            return Decimal('85.00')
+        elif any(word in element_type for word in ["wood", "hout"]):
+            return Decimal('65.00')
+        elif any(word in element_type for word in ["metal", "staal"]):
+            return Decimal('125.00')
+        
+        return Decimal('100.00')  # Standaard
+    
+    def unit_for(self, stabu_code: str) -> str:
+        """Eenheid voor een STABU code"""
+        info = self.price_index.info(stabu_code)
+        if info is not None:
+            return info["unit"]
+        
+        # Standaard eenheden per hoofdstuk
+        chapter = stabu_code.split(".")[0] if "." in stabu_code else stabu_code
+        
+        if chapter in ["2", "3"]:  # Grondwerk, Betonwerk
+            return "m3"
+        elif chapter in ["4", "6", "8"]:  # Metselwerk, Dakwerk, Isolatie
+            return "m2"
+        elif chapter == "5":  # Houtwerk
+            return "m"
+        else:
+            return "stuk"
+    
+    def category_for(self, stabu_code: str) -> str:
+        """Kostencategorie voor een STABU code"""
+        chapter = stabu_code.split(".")[0] if "." in stabu_code else stabu_code
+        
+        material_chapters = ["3", "4", "5", "7", "8"]  # Materialen
+        labor_chapters = ["2", "9"]  # Grondwerk, Afwerking
+        
+        if chapter in material_chapters:
+            return "material"
+        elif chapter in labor_chapters:
+            return "labor"
+        else:
+            return "other"
+    
+    def row_price(self, element: Dict, code_unit: str) -> Optional[Tuple[str, float, int]]:
+        """
+        Eigen prijs van een element (regel uit een staat of begroting)
+        
+        Args:
+            element: Element met unit_price en/of total_price
+            code_unit: Eenheid van de STABU code, voor regels zonder eenheid
+        
+        Returns:
+            (eenheid, hoeveelheid, eenheidsprijs in centen), of None zonder eigen prijs
+        """
+        unit_price, total_price = element.get("unit_price"), element.get("total_price")
+        if unit_price is None and total_price is None:
+            return None
+        
+        quantity = element.get("quantity")
+        if not isinstance(quantity, (int, float)):
+            # Stelpost of vaste post: alleen een bedrag
+            if total_price is None:
+                return None
+            return "post", 1.0, to_cents(Decimal(str(total_price)))
+        
+        unit = element.get("unit") or code_unit
+        if unit_price is not None:
+            return unit, float(quantity), to_cents(Decimal(str(unit_price)))
+        if quantity:
+            return unit, float(quantity), to_cents(Decimal(str(total_price)) / Decimal(str(quantity)))
+        return None
+    
+    def extract_quantity(self, element: Dict, unit: Optional[str] = None) -> Optional[float]:
+        """
+        Hoeveelheid van een element, bij voorkeur in de eenheid van de STABU code
+        
+        Returns:
+            Hoeveelheid, of None als het element een eigen eenheid (unit) heeft
+            die afwijkt en er geen hoeveelheid in de eenheid van de code is
+        """
+        # Exacte hoeveelheden uit een model in de eenheid van de STABU code
+        unit_quantities = element.get("unit_quantities")
+        if unit_quantities and unit in unit_quantities:
+            return float(unit_quantities[unit])
+        
+        # Hoeveelheid in een andere eenheid niet als die van de code rekenen
+        element_unit = element.get("unit")
+        if element_unit and unit and element_unit != unit:
+            return None
+        
+        # Check op expliciete hoeveelheid
+        explicit_qty = element.get("quantity")
+        if explicit_qty and isinstance(explicit_qty, (int, float)):
+            return float(explicit_qty)
+        
+        # Bereken uit dimensies
+        dimensions = element.get("dimensions")
+        if not dimensions:
+            return 1.0  # Standaard
+        
+        if "area" in dimensions:
+            return float(dimensions["area"])
+        elif "volume" in dimensions:
+            return float(dimensions["volume"])
+        elif "length" in dimensions:
+            return float(dimensions["length"])
+        elif "width" in dimensions and "height" in dimensions:
+            return float(dimensions["width"]) * float(dimensions["height"])
+        
+        return 1.0
+
+
+# Factory functie
+def get_cost_engine(price_index: Any, **kwargs: Any) -> CostEngine:
+    """Factory om CostEngine instantie te maken"""
+    return CostEngine(price_index, **kwargs)
@@ -10,9 +10,20 @@ import numpy as np
 from PIL import Image
 import pdf2image
 
-from ..core.document_processor import DocumentType
+from ..models.document_type import DocumentType
 from ..core.ai_orchestrator import AIOrchestrator
 from ..models.vision_client import VisionClient
+from ..models.element_store import ElementStore, SHAPE_SEGMENT, SHAPE_CIRCLE
+from ..utils.line_geometry import merge_collinear_segments
+from ..utils.tiling import TiledDetector
+from ..utils.image_preprocessing import ImagePreprocessor, PreprocessingProfile
+from ..utils.pdf_vector import PDFVectorExtractor, VectorPage
+from ..utils.dxf_reader import DXFReader
+from ..utils.ifc_reader import IFCReader
+from ..utils.page_triage import PageTriage, PageClassification, DRAWING_TYPES, UNKNOWN_LABEL
+from ..utils.scale_engine import ScaleEngine, ScaleCalibration
+from ..utils.revision_diff import RevisionDiff, RevisionStore, RevisionRecord
+from ..utils.ocr_engine import get_ocr_engine
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +36,7 @@ class DrawingElement(BaseModel):
     material: Optional[str] = None
     layer: Optional[str] = None
     confidence: float = Field(ge=0.0, le=1.0)
+    metadata: Dict[str, Any] = Field(default_factory=dict)  # STABU informatie
 
 
 class DrawingMetadata(BaseModel):
@@ -36,6 +48,9 @@ class DrawingMetadata(BaseModel):
     author: Optional[str] = None
     title: Optional[str] = None
     software: Optional[str] = None
+    preprocessing: Optional[Dict[str, Any]] = None  # gekozen voorbewerkingsprofiel
+    calibration: Optional[Dict[str, Any]] = None  # pixel → mm kalibratie (ScaleCalibration)
+    revision: Optional[Dict[str, Any]] = None  # incrementele analyse t.o.v. de vorige revisie
 
 
 class DrawingAnalysisResult(BaseModel):
@@ -56,6 +71,39 @@ class DrawingAnalyzer:
         self.ai_orchestrator = ai_orchestrator
         self.vision_client = VisionClient()
         
+        # Grote tekeningen (A0/A1) worden in tegels geanalyseerd, met dezelfde
+        # samenvoegtoleranties als de ongetegelde lijndetectie
+        merge_tolerances = self.vision_client.merge_tolerances()
+        self.tiler = TiledDetector(**merge_tolerances)
+        
+        # Voorbewerkingsprofiel (vector, light, scan) wordt per pagina gekozen
+        self.preprocessor = ImagePreprocessor()
+        
+        # Vector PDF's worden direct uitgelezen, raster alleen als terugval
+        self.vector_extractor = PDFVectorExtractor(dpi=150)
+        
+        # DXF bestanden worden native ingelezen (exacte hoeveelheden, geen rendering)
+        self.dxf_reader = DXFReader()
+        
+        # IFC (BIM) modellen bevatten hoeveelheden expliciet: deterministische take-off
+        self.ifc_reader = IFCReader()
+        
+        # Goedkope triage per pagina: lege pagina's en tekstpagina's niet door CV/vision
+        self.page_triage = PageTriage()
+        
+        # Schaal en pixel → mm kalibratie, gecachet per tekeningreeks en bladformaat
+        self.scale_engine = ScaleEngine(dpi=150)
+        
+        # Revisies: alleen gewijzigde tegels opnieuw analyseren t.o.v. de vorige revisie
+        self.revision_diff = RevisionDiff(TiledDetector(tile_size=512, overlap=48, **merge_tolerances))
+        self.revision_store = RevisionStore()
+        
+        # Gedeelde OCR pool voor gescande tekstpagina's
+        self.ocr_engine = get_ocr_engine()
+        
+        # Pagina's gelijktijdig analyseren: LLM aanroepen worden dan gebundeld (LLMBatcher)
+        self.page_concurrency = 4
+        
         # Configuratie voor verschillende tekening types
         self.drawing_configs = {
             "floor_plan": {
@@ -102,30 +150,32 @@ class DrawingAnalyzer:
         logger.info(f"Starting drawing analysis: {file_path}")
         
         try:
-            # Converteer naar image indien nodig
-            image_paths = await self._convert_to_images(file_path)
-            
-            if not image_paths:
-                raise ValueError(f"Could not convert {file_path} to images")
-            
-            # Analyseer elke pagina/image
-            all_results = []
-            for i, image_path in enumerate(image_paths):
-                page_result = await self._analyze_image(image_path, i + 1, context)
-                all_results.append(page_result)
+            # IFC: hoeveelheden uit het model, geen vision of LLM nodig
+            if self.ifc_reader.supports(file_path):
+                return self._analyze_ifc_model(file_path)
+            
+            # DXF: geometrie en hoeveelheden direct uit het bestand
+            if self.dxf_reader.supports(file_path):
+                all_results = [await self._analyze_cad_drawing(file_path, context)]
+                image_paths = []
+            else:
+                all_results, image_paths = await self._analyze_pages(file_path, context)
             
             # Consolideer resultaten van alle pagina's
             consolidated_result = self._consolidate_results(all_results)
             
             # Detecteer tekening type
-            drawing_type = await self._detect_drawing_type(image_paths[0], consolidated_result)
+            drawing_type = await self._detect_drawing_type(
+                image_paths[0] if image_paths else file_path,
+                consolidated_result
+            )
+            
+            # Bereken totalen (kolomgebaseerd, voor het opbouwen van modellen)
+            totals = self._calculate_totals(consolidated_result["elements"], consolidated_result["calibrations"])
             
             # Structureer volgens STABU
             structured_elements = await self._structure_for_stabu(consolidated_result, drawing_type)
             
-            # Bereken totalen
-            totals = self._calculate_totals(structured_elements)
-            
             # Genereer kosten schatting
             cost_estimate = await self._estimate_costs(structured_elements, context)
             
@@ -135,7 +185,9 @@ class DrawingAnalyzer:
                 "elements": [elem.dict() for elem in structured_elements],
                 "totals": totals,
                 "cost_estimate": cost_estimate,
-                "page_count": len(image_paths),
+                "page_count": len(all_results),
+                "page_types": consolidated_result.get("page_types", []),
+                "text_pages": consolidated_result.get("text_pages", []),
                 "warnings": consolidated_result["warnings"],
                 "suggestions": consolidated_result["suggestions"],
                 "confidence": consolidated_result["confidence"]
@@ -148,15 +200,282 @@ class DrawingAnalyzer:
             logger.error(f"Error analyzing drawing {file_path}: {e}")
             raise
     
-    async def _convert_to_images(self, file_path: str) -> List[str]:
-        """Converteer tekening bestand naar images voor analyse"""
+    def _analyze_ifc_model(self, file_path: str) -> Dict[str, Any]:
+        """
+        Hoeveelheden take-off uit een IFC model
+        
+        Bouwdelen komen met exacte lengte (m), oppervlakte (m²) en volume (m³)
+        uit de quantity sets. De hoeveelheid per STABU eenheid staat in
+        metadata["unit_quantities"] zodat CostAnalyzer de juiste maat kiest.
+        """
+        model_elements = self.ifc_reader.read(file_path)
+        
+        elements = []
+        element_counts: Dict[str, int] = {}
+        for model_element in model_elements:
+            dimensions = {
+                key: value for key, value in (
+                    ("length", model_element.length),
+                    ("area", model_element.area),
+                    ("volume", model_element.volume)
+                )
+                if value is not None
+            }
+            elements.append(DrawingElement(
+                element_type=model_element.element_type,
+                location={},
+                dimensions=dimensions or None,
+                quantity=1,
+                material=model_element.material,
+                confidence=0.95 if dimensions else 0.6,
+                metadata={
+                    "source": "ifc",
+                    "global_id": model_element.global_id,
+                    "ifc_type": model_element.ifc_type,
+                    "name": model_element.name,
+                    "storey": model_element.storey,
+                    "unit_quantities": model_element.unit_quantities()
+                }
+            ))
+            element_counts[model_element.element_type] = element_counts.get(model_element.element_type, 0) + 1
+        
+        warnings = []
+        missing = sum(1 for element in elements if not element.dimensions)
+        if missing:
+            warnings.append(f"{missing} elements have no quantity sets - export the model with base quantities")
+        
+        logger.info(f"IFC take-off complete: {len(elements)} elements found")
+        return {
+            "drawing_type": "bim_model",
+            "metadata": DrawingMetadata(drawing_type="bim_model", units="m").dict(),
+            "elements": [element.dict() for element in elements],
+            "totals": {
+                "total_elements": len(elements),
+                "total_area": sum(e.area for e in model_elements if e.area is not None),
+                "total_volume": sum(e.volume for e in model_elements if e.volume is not None),
+                "element_counts": element_counts
+            },
+            "cost_estimate": {},  # Kosten volgen uit CostAnalyzer op basis van de exacte hoeveelheden
+            "page_count": 1,
+            "warnings": warnings,
+            "suggestions": [],
+            "confidence": 0.95 if elements and not missing else 0.7
+        }
+    
+    async def _analyze_pages(
+        self,
+        file_path: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> tuple:
+        """
+        Analyseer alle pagina's: vectorgeometrie waar mogelijk, anders via het rasterpad
+        
+        Vóór de zware analyse wordt elke pagina goedkoop getriageerd. Lege pagina's
+        vervallen, tekstpagina's (notities, legenda's, staten) gaan naar tekst
+        extractie en alleen tekeningpagina's (en twijfelgevallen, label unknown)
+        worden gerasterd en geanalyseerd.
+        
+        Returns:
+            Tuple van (resultaten per pagina, gebruikte image paden)
+        """
+        # Vector PDF's: lees geometrie direct uit het bestand
+        vector_pages = []
+        if self.vector_extractor.supports(file_path):
+            vector_pages = self.vector_extractor.extract(file_path)
+        
+        # Triage: vector pagina's op aantallen, overige PDF pagina's op een thumbnail
+        triage = []
+        if vector_pages:
+            triage = [
+                self.page_triage.classify_vector_page(page) if page is not None else None
+                for page in vector_pages
+            ]
+            scan_pages = [i for i, page in enumerate(vector_pages) if page is None]
+            if scan_pages:
+                scan_triage = self.page_triage.classify_pdf(file_path, scan_pages)
+                if len(scan_triage) == len(scan_pages):
+                    for i, classification in zip(scan_pages, scan_triage):
+                        triage[i] = classification
+                else:
+                    triage = []
+        elif Path(file_path).suffix.lower() == '.pdf':
+            triage = self.page_triage.classify_pdf(file_path)
+        
+        if not triage:
+            return await self._analyze_images_with_triage(file_path, context)
+        
+        # Alleen tekeningpagina's zonder vectorgeometrie worden gerasterd
+        raster_pages = [
+            i for i, classification in enumerate(triage)
+            if classification.is_drawing and (not vector_pages or vector_pages[i] is None)
+        ]
+        image_paths = []
+        if raster_pages:
+            image_paths = await self._convert_to_images(file_path, raster_pages)
+            if len(image_paths) != len(raster_pages):
+                raise ValueError(f"Could not convert {file_path} to images")
+        
+        raster_images = dict(zip(raster_pages, image_paths))
+        semaphore = asyncio.Semaphore(self.page_concurrency)
+        
+        async def analyze_page(i: int, classification: PageClassification) -> Optional[Dict[str, Any]]:
+            vector_page = vector_pages[i] if vector_pages else None
+            
+            if classification.label == "blank":
+                logger.info(f"Skipping blank page {i + 1}")
+                return None
+            
+            async with semaphore:
+                if classification.label == "text":
+                    page_result = await self._analyze_text_page(
+                        file_path, i + 1, vector_page.texts if vector_page is not None else None
+                    )
+                elif vector_page is not None:
+                    page_result = await self._analyze_vector_page(vector_page, file_path, context)
+                else:
+                    page_result = await self._analyze_image(raster_images[i], i + 1, context, file_path)
+            
+            page_result["page_type"] = classification.dict()
+            return page_result
+        
+        # Analyseer de pagina's gelijktijdig volgens hun classificatie; volgorde blijft behouden
+        page_results = await asyncio.gather(
+            *(analyze_page(i, classification) for i, classification in enumerate(triage))
+        )
+        all_results = [result for result in page_results if result is not None]
+        
+        return all_results, image_paths
+    
+    async def _analyze_images_with_triage(
+        self,
+        file_path: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> tuple:
+        """Rasterpad voor losse afbeeldingen (of als thumbnails niet lukten): triage per image"""
+        image_paths = await self._convert_to_images(file_path)
+        
+        if not image_paths:
+            raise ValueError(f"Could not convert {file_path} to images")
+        
+        all_results = []
+        drawing_paths = []
+        for i, image_path in enumerate(image_paths):
+            image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+            if image is None:
+                classification = PageClassification(page_number=i + 1, label=UNKNOWN_LABEL, confidence=0.0)
+            else:
+                classification = self.page_triage.classify_image(image, i + 1)
+            
+            if classification.label == "blank":
+                logger.info(f"Skipping blank page {i + 1}")
+                continue
+            elif classification.label == "text":
+                page_result = await self._analyze_text_page(image_path, i + 1)
+            else:
+                page_result = await self._analyze_image(image_path, i + 1, context, file_path)
+                drawing_paths.append(image_path)
+            
+            page_result["page_type"] = classification.dict()
+            all_results.append(page_result)
+        
+        return all_results, drawing_paths
+    
+    async def _analyze_text_page(
+        self,
+        file_path: str,
+        page_number: int,
+        texts: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Tekstpagina (notities, legenda, staat): tekst lezen en via de LLM structureren
+        
+        Args:
+            file_path: PDF of image van de pagina
+            page_number: Paginanummer (1-based)
+            texts: Tekst die al uit de vector PDF gelezen is
+        
+        Returns:
+            Paginaresultaat zonder bouwelementen, met de geëxtraheerde tekst
+        """
+        result = {
+            "page_number": page_number,
+            "metadata": DrawingMetadata(drawing_type="text", units="mm"),
+            "elements": ElementStore.empty(),
+            "scale": None,
+            "warnings": [],
+            "suggestions": [],
+            "confidence": 0.0,
+            "text_content": None
+        }
+        
+        try:
+            text = "\n".join(texts) if texts else await self._read_page_text(file_path, page_number)
+            if not text.strip():
+                return result
+            
+            response = await self.ai_orchestrator._extract_text(
+                {
+                    "analysis_type": "text_extraction",
+                    "input_data": text[:20000],
+                    "context": {"response_format": "json"}
+                }
+            )
+            
+            result["text_content"] = {
+                "page_number": page_number,
+                "text": text,
+                "extracted_data": response.get("extracted_data")
+            }
+            result["confidence"] = response.get("confidence", 0.0)
+            
+        except Exception as e:
+            logger.warning(f"Text extraction failed for page {page_number} of {file_path}: {e}")
+            result["warnings"].append(f"Text extraction failed on page {page_number}")
+        
+        return result
+    
+    async def _read_page_text(self, file_path: str, page_number: int) -> str:
+        """Lees de tekstlaag van een PDF pagina, anders OCR"""
+        if Path(file_path).suffix.lower() == '.pdf':
+            text = self.vector_extractor.page_text(file_path, page_number - 1)
+            if text.strip():
+                return text
+            
+            images = pdf2image.convert_from_path(
+                file_path, dpi=200, first_page=page_number, last_page=page_number
+            )
+            return "\n".join(await self.ocr_engine.recognize_many(images))
+        
+        return await self.ocr_engine.recognize_async(file_path)
+    
+    async def _convert_to_images(self, file_path: str, pages: Optional[List[int]] = None) -> List[str]:
+        """
+        Converteer tekening bestand naar images voor analyse
+        
+        Args:
+            file_path: Pad naar het tekening bestand
+            pages: Optioneel alleen deze PDF pagina's (0-based) converteren
+        """
         file_ext = Path(file_path).suffix.lower()
         image_paths = []
         
+        if file_ext == '.dwg':
+            # DWG is een gesloten binair formaat: eerst naar DXF omzetten (bijv. met
+            # ODA File Converter). Buiten de try, zodat de fout de aanroeper bereikt
+            # in plaats van het bestand als afbeelding door te geven
+            raise ValueError("DWG is not supported, convert the drawing to DXF first")
+        
         try:
             if file_ext == '.pdf':
                 # Converteer PDF naar images
-                images = pdf2image.convert_from_path(file_path, dpi=150)
+                if pages is None:
+                    images = pdf2image.convert_from_path(file_path, dpi=150)
+                else:
+                    images = []
+                    for page in pages:
+                        images.extend(pdf2image.convert_from_path(
+                            file_path, dpi=150, first_page=page + 1, last_page=page + 1
+                        ))
                 
                 for i, image in enumerate(images):
                     with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as tmp:
@@ -165,10 +484,12 @@ class DrawingAnalyzer:
                 
                 logger.info(f"Converted PDF to {len(image_paths)} images")
                 
-            elif file_ext in ['.dwg', '.dxf']:
-                # Voor CAD files: gebruik externe conversie
-                # In productie: gebruik ODA File Converter of Teigha
-                raise NotImplementedError(f"CAD file conversion for {file_ext} not yet implemented")
+            elif file_ext == '.dxf':
+                # DXF wordt native ingelezen en getekend (voor vision analyse)
+                drawing = self.dxf_reader.read(file_path)
+                with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp:
+                    cv2.imwrite(tmp.name, drawing.render())
+                    image_paths.append(tmp.name)
                 
             elif file_ext in ['.jpg', '.jpeg', '.png', '.tiff', '.bmp']:
                 # Al een image, kopieer naar temp file
@@ -191,40 +512,65 @@ class DrawingAnalyzer:
         self,
         image_path: str,
         page_number: int,
-        context: Optional[Dict[str, Any]] = None
+        context: Optional[Dict[str, Any]] = None,
+        source_path: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Analyseer een enkele image"""
+        """Analyseer een enkele image (source_path: oorspronkelijk bestand, voor de schaal cache)"""
         try:
             # Laad image
             image = cv2.imread(image_path)
             if image is None:
                 raise ValueError(f"Could not load image: {image_path}")
             
-            # Voorverwerking
-            processed_image = self._preprocess_image(image)
+            # Nieuwe revisie van een eerder geanalyseerd blad: alleen de wijzigingen
+            revision_key = self._revision_key(source_path or image_path, page_number, image, context)
+            if revision_key:
+                record = self.revision_store.get(revision_key)
+                if record is not None:
+                    revision_result = await self._analyze_revision(
+                        image, page_number, context, source_path or image_path, record, revision_key
+                    )
+                    if revision_result is not None:
+                        return revision_result
             
-            # Vision AI analyse
-            vision_analysis = await self.vision_client.analyze_drawing(image_path)
+            # Vision AI analyse (kolomgebaseerd)
+            vision_analysis = await self.vision_client.analyze_drawing_columnar(image_path, detect_scale=False)
             
-            # Traditionele computer vision
-            cv_results = self._computer_vision_analysis(processed_image)
+            # Traditionele computer vision (grote tekeningen per tegel)
+            profile = self.preprocessor.select_profile(image)
+            if self.tiler.should_tile(image):
+                cv_results = await self._tiled_computer_vision_analysis(image, profile)
+            else:
+                processed_image = self._preprocess_image(image, profile)
+                cv_results = self._computer_vision_analysis(processed_image)
             
             # Combineer resultaten
             combined_elements = self._combine_analysis_results(vision_analysis, cv_results)
+            combined_elements.with_page(page_number)
             
             # Extract metadata
-            metadata = await self._extract_metadata(image_path, vision_analysis)
+            metadata = await self._extract_metadata(image_path, self._summarize_analysis(vision_analysis))
+            metadata.preprocessing = profile.dict()
+            
+            # Detecteer schaal (titelblok OCR alleen als de reeks nog niet gekalibreerd is)
+            calibration = await self._detect_scale(
+                source_path or image_path,
+                page_number,
+                (image.shape[1], image.shape[0]),
+                context,
+                image=image
+            )
+            scale = self._apply_calibration(metadata, calibration)
             
-            # Detecteer schaal
-            scale = await self._detect_scale(image_path, combined_elements)
-            if scale:
-                metadata.scale = scale
+            if revision_key:
+                self._store_revision(revision_key, image, combined_elements, metadata, source_path or image_path)
             
             return {
                 "page_number": page_number,
                 "metadata": metadata,
                 "elements": combined_elements,
                 "scale": scale,
+                "calibration": calibration,
                 "warnings": self._generate_warnings(combined_elements, metadata),
                 "suggestions": self._generate_suggestions(combined_elements, context),
                 "confidence": self._calculate_confidence(combined_elements, metadata)
@@ -235,97 +581,348 @@ class DrawingAnalyzer:
             return {
                 "page_number": page_number,
                 "metadata": DrawingMetadata(drawing_type="unknown", units="mm"),
-                "elements": [],
+                "elements": ElementStore.empty(),
                 "scale": None,
                 "warnings": [f"Analysis error: {str(e)}"],
                 "suggestions": [],
                 "confidence": 0.0
             }
     
-    def _preprocess_image(self, image: np.ndarray) -> np.ndarray:
-        """Voorverwerk image voor betere analyse"""
+    async def _analyze_revision(
+        self,
+        image: np.ndarray,
+        page_number: int,
+        context: Optional[Dict[str, Any]],
+        source_path: str,
+        record: RevisionRecord,
+        revision_key: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Incrementele analyse van een nieuwe revisie
+        
+        Het blad wordt uitgelijnd op de vorige revisie; alleen gewijzigde tegels
+        gaan door voorbewerking en detectie, de overige elementen komen uit de
+        vorige revisie. Geen vision of LLM aanroepen.
+        
+        Returns:
+            Paginaresultaat, of None als een volledige analyse nodig is
+        """
         try:
-            # Converteer naar grijswaarden
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            change = self.revision_diff.compare(image, record)
+            if not self.revision_diff.is_incremental(change):
+                return None
+            
+            profile = self.preprocessor.select_profile(image)
+            
+            def preprocess(tile: np.ndarray) -> np.ndarray:
+                return self._preprocess_image(tile, profile)
+            
+            async def detect(processed_tile: np.ndarray) -> Dict[str, ElementStore]:
+                return self._detect_primitives(processed_tile)
+            
+            primitives = {}
+            if change.changed_tiles:
+                primitives = await self.revision_diff.detect(image, change, preprocess, detect)
+                if primitives is None:
+                    # Nieuw element groter dan een tegel: alleen een volledige analyse vindt het
+                    return None
+            detected = self._classify_primitives(primitives)
+            
+            elements = self.revision_diff.patch(record.elements, change, detected)
+            elements.with_page(page_number)
+            
+            # Metadata (titelblok, software, etc.) blijft gelijk binnen de reeks
+            metadata = DrawingMetadata(**record.metadata)
+            metadata.preprocessing = profile.dict()
+            metadata.revision = {"base": record.source, **change.summary()}
+            
+            calibration = await self._detect_scale(
+                source_path,
+                page_number,
+                (image.shape[1], image.shape[0]),
+                context,
+                image=image
+            )
+            scale = self._apply_calibration(metadata, calibration)
             
-            # Verwijder ruis
-            denoised = cv2.fastNlMeansDenoising(gray, h=10)
+            self._store_revision(revision_key, image, elements, metadata, source_path, change.plan.coarse)
             
-            # Verhoog contrast
-            clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-            enhanced = clahe.apply(denoised)
+            return {
+                "page_number": page_number,
+                "metadata": metadata,
+                "elements": elements,
+                "scale": scale,
+                "calibration": calibration,
+                "warnings": self._generate_warnings(elements, metadata),
+                "suggestions": self._generate_suggestions(elements, context),
+                "confidence": self._calculate_confidence(elements, metadata)
+            }
             
-            # Binariseer (voor lijn detectie)
-            _, binary = cv2.threshold(enhanced, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        except Exception as e:
+            logger.warning(f"Incremental revision analysis failed, running full analysis: {e}")
+            return None
+    
+    def _revision_key(
+        self,
+        source_path: str,
+        page_number: int,
+        image: np.ndarray,
+        context: Optional[Dict[str, Any]] = None
+    ) -> Optional[str]:
+        """
+        Sleutel voor de revisie cache, None als revisie modus uit staat
+        
+        Alleen binnen een project: zonder project_id zouden bladen met dezelfde
+        bestandsnaam uit verschillende projecten elkaar als vorige revisie zien.
+        """
+        context = context or {}
+        project_id = context.get("project_id")
+        if not project_id or not context.get("revision_diff", True):
+            return None
+        
+        return self.scale_engine.series_key(
+            source_path,
+            page_number,
+            (image.shape[1], image.shape[0]),
+            context.get("drawing_series"),
+            project_id
+        )
+    
+    def _store_revision(
+        self,
+        revision_key: str,
+        image: np.ndarray,
+        elements: ElementStore,
+        metadata: DrawingMetadata,
+        source_path: str,
+        reference: Optional[np.ndarray] = None
+    ):
+        """Bewaar deze revisie als referentie voor de volgende"""
+        if reference is None:
+            reference = self.revision_diff.plan(image).coarse
+        
+        self.revision_store.put(revision_key, RevisionRecord(
+            reference=reference,
+            image_shape=image.shape[:2],
+            elements=elements,
+            metadata=metadata.dict(exclude={"revision"}),
+            source=Path(source_path).name
+        ))
+    
+    async def _analyze_vector_page(
+        self,
+        vector_page: VectorPage,
+        file_path: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Analyseer een PDF pagina op basis van de vectorgeometrie (zonder rasteren)"""
+        page_number = vector_page.page_number
+        try:
+            primitives = vector_page.primitives
+            
+            # Zelfde classificatie als het rasterpad; tekst is al gelezen en getypeerd
+            elements = self._classify_primitives({
+                "lines": primitives["lines"],
+                "rectangles": primitives["rectangles"],
+                "circles": primitives["circles"]
+            })
+            
+            # Geometrie is exact, alleen de classificatie is een heuristiek
+            np.maximum(elements.confidence, 0.9, out=elements.confidence)
+            
+            text_regions = primitives["text_regions"]
+            dimensions = text_regions.take(text_regions.type_mask("dimension"))
+            dimensions.confidence[:] = 0.95
+            
+            combined_elements = ElementStore.concat([elements, dimensions])
+            combined_elements.with_page(page_number)
+            
+            # Extract metadata (titelblok tekst is direct beschikbaar)
+            summary = {
+                "source": "vector",
+                "page_size": (vector_page.width, vector_page.height),
+                "element_count": len(combined_elements),
+                "element_counts": combined_elements.type_counts(),
+                "texts": vector_page.texts[:200]
+            }
+            metadata = await self._extract_metadata(file_path, summary)
+            metadata.preprocessing = {"name": "vector_pdf"}
+            
+            # Schaal uit titelblok, schaalbalk en maatvoering (tekst en lijnen zijn exact)
+            calibration = await self._detect_scale(
+                file_path,
+                page_number,
+                (vector_page.width, vector_page.height),
+                context,
+                texts=vector_page.texts,
+                text_regions=text_regions,
+                lines=primitives["lines"]
+            )
+            scale = self._apply_calibration(metadata, calibration)
+            
+            return {
+                "page_number": page_number,
+                "metadata": metadata,
+                "elements": combined_elements,
+                "scale": scale,
+                "calibration": calibration,
+                "warnings": self._generate_warnings(combined_elements, metadata),
+                "suggestions": self._generate_suggestions(combined_elements, context),
+                "confidence": self._calculate_confidence(combined_elements, metadata)
+            }
+            
+        except Exception as e:
+            logger.error(f"Error analyzing vector page {page_number} of {file_path}: {e}")
+            return {
+                "page_number": page_number,
+                "metadata": DrawingMetadata(drawing_type="unknown", units="mm"),
+                "elements": ElementStore.empty(),
+                "scale": None,
+                "warnings": [f"Analysis error: {str(e)}"],
+                "suggestions": [],
+                "confidence": 0.0
+            }
+    
+    async def _analyze_cad_drawing(
+        self,
+        file_path: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Analyseer een DXF tekening op basis van de exacte geometrie per laag"""
+        try:
+            drawing = self.dxf_reader.read(file_path)
+            
+            # Types komen uit de laagnamen, tekst en maatvoering uit de entiteiten
+            elements = drawing.elements
+            elements.with_page(1)
+            
+            summary = {
+                "source": "dxf",
+                "header": drawing.header,
+                "element_count": len(elements),
+                "element_counts": elements.type_counts(),
+                "layers": drawing.layer_quantities(),
+                "texts": drawing.texts[:200]
+            }
+            metadata = await self._extract_metadata(file_path, summary)
+            metadata.units = "mm"  # alle geometrie is naar mm omgerekend
+            metadata.software = metadata.software or drawing.header.get("$ACADVER")
+            metadata.preprocessing = {"name": "dxf", "units_to_mm": drawing.units_to_mm}
+            
+            # CAD coördinaten zijn al in mm: de kalibratie is exact
+            calibration = ScaleCalibration(
+                mm_per_pixel=1.0,
+                scale=metadata.scale,
+                method="cad_units",
+                confidence=1.0
+            )
+            metadata.calibration = calibration.dict()
+            
+            return {
+                "page_number": 1,
+                "metadata": metadata,
+                "elements": elements,
+                "scale": metadata.scale,
+                "calibration": calibration,
+                "warnings": self._generate_warnings(elements, metadata),
+                "suggestions": self._generate_suggestions(elements, context),
+                "confidence": self._calculate_confidence(elements, metadata)
+            }
             
-            return binary
+        except Exception as e:
+            logger.error(f"Error analyzing DXF drawing {file_path}: {e}")
+            return {
+                "page_number": 1,
+                "metadata": DrawingMetadata(drawing_type="unknown", units="mm"),
+                "elements": ElementStore.empty(),
+                "scale": None,
+                "warnings": [f"Analysis error: {str(e)}"],
+                "suggestions": [],
+                "confidence": 0.0
+            }
+    
+    def _preprocess_image(self, image: np.ndarray, profile: Optional[PreprocessingProfile] = None) -> np.ndarray:
+        """Voorverwerk image voor betere analyse (profiel wordt gemeten als het ontbreekt)"""
+        try:
+            return self.preprocessor.apply(image, profile)
             
         except Exception as e:
             logger.warning(f"Image preprocessing failed: {e}")
             return image
     
-    def _computer_vision_analysis(self, image: np.ndarray) -> List[DrawingElement]:
+    def _computer_vision_analysis(self, image: np.ndarray) -> ElementStore:
         """Traditionele computer vision analyse voor tekeningen"""
-        elements = []
-        
         try:
-            # Detecteer lijnen (muren, deuren, etc.)
-            lines = self._detect_lines(image)
-            for line in lines:
-                element = DrawingElement(
-                    element_type="line",
-                    location=line["location"],
-                    dimensions=line.get("dimensions"),
-                    confidence=0.7
-                )
-                elements.append(element)
-            
-            # Detecteer rechthoeken (ramen, deuren, ruimtes)
-            rectangles = self._detect_rectangles(image)
-            for rect in rectangles:
-                element_type = self._classify_rectangle(rect)
-                element = DrawingElement(
-                    element_type=element_type,
-                    location=rect["location"],
-                    dimensions=rect.get("dimensions"),
-                    confidence=0.8
-                )
-                elements.append(element)
-            
-            # Detecteer cirkels (kolommen, gaten)
-            circles = self._detect_circles(image)
-            for circle in circles:
-                element = DrawingElement(
-                    element_type="column",
-                    location=circle["location"],
-                    dimensions=circle.get("dimensions"),
-                    confidence=0.6
-                )
-                elements.append(element)
-            
-            # Detecteer tekst (maten, notities)
-            text_regions = self._detect_text_regions(image)
-            for text in text_regions:
-                if self._is_dimension_text(text):
-                    element = DrawingElement(
-                        element_type="dimension",
-                        location=text["location"],
-                        dimensions=text.get("value"),
-                        confidence=0.9
-                    )
-                    elements.append(element)
+            elements = self._classify_primitives(self._detect_primitives(image))
             
             logger.info(f"CV analysis found {len(elements)} elements")
             return elements
             
         except Exception as e:
             logger.error(f"Computer vision analysis failed: {e}")
-            return []
+            return ElementStore.empty()
     
-    def _detect_lines(self, image: np.ndarray) -> List[Dict]:
-        """Detecteer lijnen in de tekening"""
-        lines = []
+    async def _tiled_computer_vision_analysis(
+        self,
+        image: np.ndarray,
+        profile: Optional[PreprocessingProfile] = None
+    ) -> ElementStore:
+        """Computer vision analyse per tegel voor grote tekeningen"""
+        try:
+            if profile is None:
+                profile = self.preprocessor.select_profile(image)
+            
+            def preprocess(tile: np.ndarray) -> np.ndarray:
+                return self._preprocess_image(tile, profile)
+            
+            async def detect(processed_tile: np.ndarray) -> Dict[str, ElementStore]:
+                return self._detect_primitives(processed_tile)
+            
+            primitives = await self.tiler.detect(image, preprocess, detect)
+            elements = self._classify_primitives(primitives)
+            
+            logger.info(f"Tiled CV analysis found {len(elements)} elements")
+            return elements
+            
+        except Exception as e:
+            logger.error(f"Tiled computer vision analysis failed: {e}")
+            return ElementStore.empty()
+    
+    def _detect_primitives(self, image: np.ndarray) -> Dict[str, ElementStore]:
+        """Detecteer lijnen, rechthoeken, cirkels en tekst in een voorbewerkt beeld"""
+        return {
+            "lines": self._detect_lines(image),
+            "rectangles": self._detect_rectangles(image),
+            "circles": self._detect_circles(image),
+            "text_regions": self._detect_text_regions(image)
+        }
+    
+    def _classify_primitives(self, primitives: Dict[str, ElementStore]) -> ElementStore:
+        """Classificeer gedetecteerde primitieven als tekeningelementen"""
+        # Lijnen (muren, deuren, etc.)
+        lines = primitives.get("lines", ElementStore.empty())
+        lines.confidence[:] = 0.7
+        
+        # Rechthoeken (ramen, deuren, ruimtes)
+        rectangles = primitives.get("rectangles", ElementStore.empty())
+        self._classify_rectangles(rectangles)
+        rectangles.confidence[:] = 0.8
         
+        # Cirkels (kolommen, gaten)
+        circles = primitives.get("circles", ElementStore.empty())
+        circles.set_type(np.ones(len(circles), dtype=bool), "column")
+        circles.confidence[:] = 0.6
+        
+        # Tekst (maten, notities)
+        text_regions = primitives.get("text_regions", ElementStore.empty())
+        dimensions = text_regions.take(self._is_dimension_text(text_regions))
+        dimensions.set_type(np.ones(len(dimensions), dtype=bool), "dimension")
+        dimensions.confidence[:] = 0.9
+        
+        return ElementStore.concat([lines, rectangles, circles, dimensions])
+    
+    def _detect_lines(self, image: np.ndarray) -> ElementStore:
+        """Detecteer lijnen in de tekening"""
         try:
             # Gebruik Hough Line Transform
             edges = cv2.Canny(image, 50, 150, apertureSize=3)
@@ -338,31 +935,25 @@ class DrawingAnalyzer:
                 maxLineGap=10
             )
             
-            if hough_lines is not None:
-                for line in hough_lines:
-                    x1, y1, x2, y2 = line[0]
-                    length = np.sqrt((x2 - x1)**2 + (y2 - y1)**2)
-                    
-                    lines.append({
-                        "location": {"x1": x1, "y1": y1, "x2": x2, "y2": y2},
-                        "dimensions": {"length": length},
-                        "type": "wall" if length > 100 else "detail"
-                    })
+            if hough_lines is None:
+                return ElementStore.empty()
             
-            return lines
+            # Voeg onderbroken en dubbel gedetecteerde segmenten samen
+            segments = merge_collinear_segments(hough_lines.reshape(-1, 4), **self.tiler.merge_tolerances)
+            
+            return ElementStore.from_segments(segments, "line")
             
         except Exception as e:
             logger.warning(f"Line detection failed: {e}")
-            return []
+            return ElementStore.empty()
     
-    def _detect_rectangles(self, image: np.ndarray) -> List[Dict]:
+    def _detect_rectangles(self, image: np.ndarray) -> ElementStore:
         """Detecteer rechthoeken in de tekening"""
-        rectangles = []
-        
         try:
             # Zoek contouren
             contours, _ = cv2.findContours(image, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
             
+            boxes = []
             for contour in contours:
                 # Benader contour met rechthoek
                 epsilon = 0.02 * cv2.arcLength(contour, True)
@@ -370,27 +961,31 @@ class DrawingAnalyzer:
                 
                 if len(approx) == 4:
                     # Rechthoek gevonden
-                    x, y, w, h = cv2.boundingRect(approx)
-                    area = w * h
-                    
-                    # Filter te kleine gebieden
-                    if area > 100:
-                        rectangles.append({
-                            "location": {"x": x, "y": y, "width": w, "height": h},
-                            "dimensions": {"width": w, "height": h, "area": area},
-                            "aspect_ratio": w / h if h > 0 else 0
-                        })
-            
-            return rectangles
+                    boxes.append(cv2.boundingRect(approx))
+            
+            if not boxes:
+                return ElementStore.empty()
+            
+            bbox = np.asarray(boxes, dtype=np.float64)
+            w, h = bbox[:, 2], bbox[:, 3]
+            area = w * h
+            
+            # Filter te kleine gebieden
+            keep = area > 100
+            
+            return ElementStore.from_columns(
+                "opening",
+                bbox[keep],
+                area=area[keep],
+                aspect_ratio=np.divide(w, h, out=np.zeros_like(w), where=h > 0)[keep]
+            )
             
         except Exception as e:
             logger.warning(f"Rectangle detection failed: {e}")
-            return []
+            return ElementStore.empty()
     
-    def _detect_circles(self, image: np.ndarray) -> List[Dict]:
+    def _detect_circles(self, image: np.ndarray) -> ElementStore:
         """Detecteer cirkels in de tekening"""
-        circles = []
-        
         try:
             # Gebruik Hough Circle Transform
             detected_circles = cv2.HoughCircles(
@@ -404,70 +999,70 @@ class DrawingAnalyzer:
                 maxRadius=100
             )
             
-            if detected_circles is not None:
-                detected_circles = np.uint16(np.around(detected_circles))
-                
-                for circle in detected_circles[0, :]:
-                    x, y, radius = circle[0], circle[1], circle[2]
-                    circles.append({
-                        "location": {"x": x, "y": y, "radius": radius},
-                        "dimensions": {"diameter": radius * 2, "area": np.pi * radius ** 2}
-                    })
+            if detected_circles is None:
+                return ElementStore.empty()
             
-            return circles
+            circles = np.around(detected_circles[0]).astype(np.float64)
+            x, y, radius = circles[:, 0], circles[:, 1], circles[:, 2]
+            
+            return ElementStore.from_columns(
+                "column",
+                np.column_stack([x - radius, y - radius, radius * 2, radius * 2]),
+                shape=SHAPE_CIRCLE,
+                radius=radius,
+                area=np.pi * radius ** 2
+            )
             
         except Exception as e:
             logger.warning(f"Circle detection failed: {e}")
-            return []
+            return ElementStore.empty()
     
-    def _detect_text_regions(self, image: np.ndarray) -> List[Dict]:
+    def _detect_text_regions(self, image: np.ndarray) -> ElementStore:
         """Detecteer tekst regio's"""
         # In productie: gebruik Tesseract OCR
         # Voor nu: simpele contour-gebaseerde detectie
-        text_regions = []
-        
         try:
             # Zoek kleine, compacte contouren die mogelijk tekst zijn
             contours, _ = cv2.findContours(image, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            if not contours:
+                return ElementStore.empty()
             
-            for contour in contours:
-                x, y, w, h = cv2.boundingRect(contour)
-                
-                # Filter op tekst-achtige vormen
-                if 10 < w < 200 and 5 < h < 50 and w > h * 0.5:
-                    text_regions.append({
-                        "location": {"x": x, "y": y, "width": w, "height": h},
-                        "area": w * h,
-                        "aspect_ratio": w / h
-                    })
+            bbox = np.asarray([cv2.boundingRect(c) for c in contours], dtype=np.float64)
+            w, h = bbox[:, 2], bbox[:, 3]
             
-            return text_regions
+            # Filter op tekst-achtige vormen
+            keep = (w > 10) & (w < 200) & (h > 5) & (h < 50) & (w > h * 0.5)
+            w, h = w[keep], h[keep]
+            
+            # Tekst oppervlak telt niet mee in de totalen; alleen de aspect ratio
+            return ElementStore.from_columns(
+                "annotation",
+                bbox[keep],
+                aspect_ratio=w / h
+            )
             
         except Exception as e:
             logger.warning(f"Text region detection failed: {e}")
-            return []
+            return ElementStore.empty()
     
-    def _is_dimension_text(self, text_region: Dict) -> bool:
-        """Check of tekst regio een maat aanduiding is"""
+    def _is_dimension_text(self, text_regions: ElementStore) -> np.ndarray:
+        """Check welke tekst regio's een maat aanduiding zijn"""
         # In productie: gebruik OCR om tekst te lezen
         # Voor nu: simpele heuristiek op basis van aspect ratio en locatie
-        aspect_ratio = text_region.get("aspect_ratio", 0)
-        return 2.0 < aspect_ratio < 10.0
-    
-    def _classify_rectangle(self, rectangle: Dict) -> str:
-        """Classificeer een rechthoek als muur, raam, deur, etc."""
-        aspect_ratio = rectangle.get("aspect_ratio", 1.0)
-        area = rectangle.get("dimensions", {}).get("area", 0)
-        
-        if aspect_ratio > 5.0:
-            return "wall"  # Lange, dunne rechthoek
-        elif 0.8 < aspect_ratio < 1.2:
-            if area > 5000:
-                return "room"
-            else:
-                return "column"
-        else:
-            return "opening"
+        aspect_ratio = text_regions.aspect_ratio
+        return (2.0 < aspect_ratio) & (aspect_ratio < 10.0)
+    
+    def _classify_rectangles(self, rectangles: ElementStore):
+        """Classificeer rechthoeken als muur, raam, deur, etc."""
+        aspect_ratio = rectangles.aspect_ratio
+        area = np.nan_to_num(rectangles.area)
+        
+        square = (0.8 < aspect_ratio) & (aspect_ratio < 1.2)
+        
+        rectangles.set_type(np.ones(len(rectangles), dtype=bool), "opening")
+        rectangles.set_type(square & (area > 5000), "room")
+        rectangles.set_type(square & (area <= 5000), "column")
+        rectangles.set_type(aspect_ratio > 5.0, "wall")  # Lange, dunne rechthoek
     
     async def _extract_metadata(self, image_path: str, vision_analysis: Dict) -> DrawingMetadata:
         """Extract metadata uit de tekening"""
@@ -514,88 +1109,177 @@ class DrawingAnalyzer:
             logger.warning(f"Metadata extraction failed: {e}")
             return DrawingMetadata(drawing_type="unknown", units="mm")
     
-    async def _detect_scale(self, image_path: str, elements: List[DrawingElement]) -> Optional[str]:
-        """Detecteer de schaal van de tekening"""
+    async def _detect_scale(
+        self,
+        file_path: str,
+        page_number: int,
+        page_size: tuple,
+        context: Optional[Dict[str, Any]] = None,
+        **sources: Any
+    ) -> Optional[ScaleCalibration]:
+        """
+        Detecteer de schaal en de pixel → mm kalibratie van een pagina
+        
+        Args:
+            file_path: Oorspronkelijk bestand (tekeningreeks voor de cache)
+            page_number: Paginanummer (1-based)
+            page_size: (breedte, hoogte) in pixels
+            context: "project_id" (cache per project), optioneel "drawing_series" om revisies expliciet te koppelen
+            **sources: texts, text_regions, lines en/of image (zie ScaleEngine.calibrate)
+        """
         try:
-            # Zoek naar schaal indicator in tekening
-            # In productie: gebruik AI om schaalbalk te herkennen
-            # Voor nu: standaard schaal voor bouwtekeningen
-            return "1:100"
+            context = context or {}
+            calibration = self.scale_engine.calibrate(
+                file_path,
+                page_number,
+                page_size,
+                series=context.get("drawing_series"),
+                project_id=context.get("project_id"),
+                **sources
+            )
+            if calibration:
+                logger.info(
+                    f"Page {page_number} scale {calibration.scale} via {calibration.method} "
+                    f"({calibration.mm_per_pixel:.3f} mm/px)"
+                )
+            return calibration
             
         except Exception as e:
             logger.warning(f"Scale detection failed: {e}")
             return None
     
+    def _apply_calibration(
+        self,
+        metadata: DrawingMetadata,
+        calibration: Optional[ScaleCalibration]
+    ) -> Optional[str]:
+        """Neem schaal en kalibratie op in de metadata, geeft de schaal terug"""
+        if calibration is None:
+            return metadata.scale
+        
+        metadata.scale = calibration.scale or metadata.scale
+        metadata.calibration = calibration.dict()
+        return metadata.scale
+    
     def _combine_analysis_results(
         self,
         vision_analysis: Dict,
-        cv_results: List[DrawingElement]
-    ) -> List[DrawingElement]:
+        cv_results: ElementStore
+    ) -> ElementStore:
         """Combineer Vision AI en Computer Vision resultaten"""
-        combined = []
-        
-        # Voeg vision elements toe
-        vision_elements = vision_analysis.get("elements", [])
-        for elem in vision_elements:
-            drawing_elem = DrawingElement(
-                element_type=elem.get("type", "unknown"),
-                location=elem.get("location", {}),
-                dimensions=elem.get("dimensions"),
-                material=elem.get("material"),
-                confidence=elem.get("confidence", 0.5)
-            )
-            combined.append(drawing_elem)
+        vision_elements = vision_analysis.get("elements")
+        if not isinstance(vision_elements, ElementStore):
+            vision_elements = ElementStore.empty()
+        
+        # Zoek voor elk CV element het eerste overlappende vision element
+        match = cv_results.first_overlap(vision_elements)
+        is_duplicate = match >= 0
+        
+        # Update confidence van de vision elementen met hun duplicaten
+        np.maximum.at(vision_elements.confidence, match[is_duplicate], cv_results.confidence[is_duplicate])
         
         # Voeg CV elements toe (als ze niet overlappen)
-        for cv_elem in cv_results:
-            # Check voor duplicate
-            is_duplicate = False
-            for vision_elem in combined:
-                if self._elements_overlap(cv_elem, vision_elem):
-                    is_duplicate = True
-                    # Update confidence
-                    vision_elem.confidence = max(vision_elem.confidence, cv_elem.confidence)
-                    break
-            
-            if not is_duplicate:
-                combined.append(cv_elem)
+        return ElementStore.concat([vision_elements, cv_results.take(~is_duplicate)])
+    
+    def _summarize_analysis(self, analysis: Dict) -> Dict[str, Any]:
+        """Compacte samenvatting van een analyse voor gebruik in prompts"""
+        elements = analysis.get("elements")
+        summary = {key: value for key, value in analysis.items() if key != "elements"}
+        if isinstance(elements, ElementStore):
+            summary["element_count"] = len(elements)
+            summary["element_counts"] = elements.type_counts()
+        return summary
+    
+    def _to_drawing_elements(
+        self,
+        elements: ElementStore,
+        calibrations: Optional[Dict[int, float]] = None
+    ) -> List[DrawingElement]:
+        """
+        Bouw DrawingElement modellen uit de store (alleen aan de API grens)
+        
+        Locaties blijven in pixels (voor overlays). Op gekalibreerde pagina's zijn
+        de afmetingen in meters en staan de hoeveelheden per STABU eenheid in
+        metadata["unit_quantities"]; anders blijven ze in pixels.
+        """
+        drawing_elements = []
+        mm_per_pixel = elements.page_factors(calibrations or {})
         
-        return combined
+        for i, record in enumerate(elements.to_records()):
+            x, y, w, h = record["bbox"]
+            
+            if record["shape"] == SHAPE_SEGMENT:
+                x1, y1, x2, y2 = record["points"]
+                location = {"x1": x1, "y1": y1, "x2": x2, "y2": y2}
+                dimensions = {"length": record["length"]}
+            elif record["shape"] == SHAPE_CIRCLE:
+                location = {"x": x + w / 2, "y": y + h / 2, "radius": record["radius"]}
+                dimensions = {"diameter": record["radius"] * 2, "area": record["area"]}
+            else:
+                location = {"x": x, "y": y, "width": w, "height": h}
+                dimensions = None
+                if record["area"] is not None:
+                    dimensions = {"width": w, "height": h, "area": record["area"]}
+            
+            metadata = {"units": "px"}
+            if dimensions and not np.isnan(mm_per_pixel[i]):
+                dimensions, metadata = self._calibrated_dimensions(dimensions, float(mm_per_pixel[i]))
+            
+            drawing_elements.append(DrawingElement(
+                element_type=record["element_type"],
+                location=location,
+                dimensions=dimensions,
+                material=record["material"],
+                layer=record["layer"],
+                confidence=record["confidence"],
+                metadata=metadata
+            ))
+        
+        return drawing_elements
     
-    def _elements_overlap(self, elem1: DrawingElement, elem2: DrawingElement) -> bool:
-        """Check of twee elementen overlappen"""
-        loc1 = elem1.location
-        loc2 = elem2.location
+    def _calibrated_dimensions(self, dimensions: Dict[str, float], mm_per_pixel: float) -> tuple:
+        """Afmetingen van pixels naar meters, plus hoeveelheden per STABU eenheid"""
+        factor = mm_per_pixel / 1000
+        calibrated = {
+            key: (value * factor ** 2 if key == "area" else value * factor)
+            for key, value in dimensions.items()
+            if value is not None
+        }
         
-        if "x" in loc1 and "x" in loc2:
-            # Rechthoekige elementen
-            x1, y1 = loc1.get("x", 0), loc1.get("y", 0)
-            w1, h1 = loc1.get("width", 0), loc1.get("height", 0)
-            x2, y2 = loc2.get("x", 0), loc2.get("y", 0)
-            w2, h2 = loc2.get("width", 0), loc2.get("height", 0)
-            
-            return not (x1 + w1 < x2 or x2 + w2 < x1 or y1 + h1 < y2 or y2 + h2 < y1)
+        unit_quantities = {"stuk": 1.0}
+        if "area" in calibrated:
+            unit_quantities["m2"] = calibrated["area"]
+        if "length" in calibrated:
+            unit_quantities["m"] = calibrated["length"]
+        elif "width" in calibrated and "height" in calibrated:
+            # Langgerekte vlakken (wanden, balken): de lange zijde is de strekkende meter
+            unit_quantities["m"] = max(calibrated["width"], calibrated["height"])
         
-        return False
+        return calibrated, {"units": "m", "unit_quantities": unit_quantities}
     
     def _consolidate_results(self, page_results: List[Dict]) -> Dict[str, Any]:
         """Consolideer resultaten van meerdere pagina's"""
         if not page_results:
             return {
                 "metadata": DrawingMetadata(drawing_type="unknown", units="mm"),
-                "elements": [],
+                "elements": ElementStore.empty(),
                 "warnings": [],
                 "suggestions": [],
-                "confidence": 0.0
+                "confidence": 0.0,
+                "page_types": [],
+                "text_pages": [],
+                "calibrations": {}
             }
         
-        # Neem metadata van eerste pagina
-        consolidated_metadata = page_results[0]["metadata"]
+        # Tekstpagina's leveren geen elementen, alleen geëxtraheerde tekst
+        drawing_pages = [page for page in page_results if page.get("page_type", {}).get("label") != "text"]
+        text_pages = [page["text_content"] for page in page_results if page.get("text_content")]
+        
+        # Neem metadata van eerste tekeningpagina
+        consolidated_metadata = (drawing_pages or page_results)[0]["metadata"]
         
         # Combineer alle elementen
-        all_elements = []
-        for page in page_results:
-            all_elements.extend(page["elements"])
+        all_elements = ElementStore.concat([page["elements"] for page in page_results])
         
         # Combineer waarschuwingen en suggesties
         all_warnings = []
@@ -604,16 +1288,23 @@ class DrawingAnalyzer:
             all_warnings.extend(page.get("warnings", []))
             all_suggestions.extend(page.get("suggestions", []))
         
-        # Bereken gemiddelde confidence
-        total_confidence = sum(page.get("confidence", 0) for page in page_results)
-        avg_confidence = total_confidence / len(page_results)
+        # Bereken gemiddelde confidence over de tekeningpagina's
+        confidence_pages = drawing_pages or page_results
+        total_confidence = sum(page.get("confidence", 0) for page in confidence_pages)
+        avg_confidence = total_confidence / len(confidence_pages)
         
         return {
             "metadata": consolidated_metadata,
             "elements": all_elements,
             "warnings": list(set(all_warnings)),
             "suggestions": list(set(all_suggestions)),
-            "confidence": avg_confidence
+            "confidence": avg_confidence,
+            "page_types": [page["page_type"] for page in page_results if page.get("page_type")],
+            "text_pages": text_pages,
+            "calibrations": {
+                page["page_number"]: page["calibration"].mm_per_pixel
+                for page in page_results if page.get("calibration")
+            }
         }
     
     async def _detect_drawing_type(
@@ -623,8 +1314,8 @@ class DrawingAnalyzer:
     ) -> str:
         """Detecteer het type tekening"""
         try:
-            elements = analysis_result.get("elements", [])
-            element_types = [elem.element_type for elem in elements]
+            elements = analysis_result.get("elements", ElementStore.empty())
+            element_types = elements.type_names()
             
             # Heuristiek voor tekening type detectie
             if any("room" in str(t).lower() for t in element_types):
@@ -636,10 +1327,18 @@ class DrawingAnalyzer:
             elif any("detail" in str(t).lower() or "connection" in str(t).lower() for t in element_types):
                 return "detail"
             
+            # Paginatriage heeft de tekeningsoort al bepaald (meest voorkomend label)
+            labels = [
+                page_type["label"] for page_type in analysis_result.get("page_types", [])
+                if page_type.get("label") in DRAWING_TYPES and page_type.get("confidence", 0) >= 0.5
+            ]
+            if labels:
+                return DRAWING_TYPES[max(set(labels), key=labels.count)]
+            
             # Gebruik AI voor classificatie
             prompt = f"""
             Classify this drawing based on analysis:
-            {analysis_result}
+            {self._summarize_analysis(analysis_result)}
             
             Choose from: floor_plan, elevation, section, detail
             
@@ -665,9 +1364,12 @@ class DrawingAnalyzer:
         drawing_type: str
     ) -> List[DrawingElement]:
         """Structureer elementen volgens STABU classificatie"""
+        elements = self._to_drawing_elements(
+            analysis_result.get("elements", ElementStore.empty()),
+            analysis_result.get("calibrations")
+        )
+        
         try:
-            elements = analysis_result.get("elements", [])
-            
             prompt = f"""
             Classify these drawing elements according to STABU standards:
             
@@ -694,47 +1396,41 @@ class DrawingAnalyzer:
             structured_data = response.get("extracted_data", [])
             
             # Update elements with STABU info
-            structured_elements = []
-            for i, elem in enumerate(elements):
-                if i < len(structured_data):
-                    stabu_info = structured_data[i]
-                    elem.material = stabu_info.get("recommended_material", elem.material)
-                    # Add STABU metadata
-                    elem.metadata = {
-                        "stabu_chapter": stabu_info.get("stabu_chapter"),
-                        "stabu_code": stabu_info.get("stabu_code"),
-                        "construction_type": stabu_info.get("construction_type")
-                    }
-                structured_elements.append(elem)
-            
-            return structured_elements
+            for elem, stabu_info in zip(elements, structured_data):
+                elem.material = stabu_info.get("recommended_material", elem.material)
+                # Add STABU metadata (eenheden en hoeveelheden blijven behouden)
+                elem.metadata.update({
+                    "stabu_chapter": stabu_info.get("stabu_chapter"),
+                    "stabu_code": stabu_info.get("stabu_code"),
+                    "construction_type": stabu_info.get("construction_type")
+                })
+            
+            return elements
             
         except Exception as e:
             logger.warning(f"STABU structuring failed: {e}")
-            return analysis_result.get("elements", [])
+            return elements
     
-    def _calculate_totals(self, elements: List[DrawingElement]) -> Dict[str, float]:
-        """Bereken totalen van alle elementen"""
-        totals = {
+    def _calculate_totals(
+        self,
+        elements: ElementStore,
+        calibrations: Optional[Dict[int, float]] = None
+    ) -> Dict[str, float]:
+        """Bereken totalen van alle elementen (total_area_m2 over gekalibreerde pagina's)"""
+        # Tekst regio's hebben een oppervlak maar tellen niet mee als bouwdeel
+        counted = ~elements.type_mask("dimension", "annotation")
+        
+        mm_per_pixel = elements.page_factors(calibrations or {})[counted]
+        area_m2 = elements.area[counted] * (mm_per_pixel / 1000) ** 2
+        
+        return {
             "total_elements": len(elements),
-            "total_area": 0.0,
+            "total_area": float(np.nansum(elements.area[counted], dtype=np.float64)),
+            "total_area_m2": float(np.nansum(area_m2, dtype=np.float64)),
+            "calibrated_elements": int(np.count_nonzero(~np.isnan(mm_per_pixel))),
             "total_volume": 0.0,
-            "element_counts": {}
+            "element_counts": elements.type_counts()
         }
-        
-        for elem in elements:
-            # Tel element types
-            elem_type = elem.element_type
-            totals["element_counts"][elem_type] = totals["element_counts"].get(elem_type, 0) + 1
-            
-            # Bereken area indien beschikbaar
-            if elem.dimensions and "area" in elem.dimensions:
-                totals["total_area"] += elem.dimensions["area"]
-            elif elem.dimensions and "width" in elem.dimensions and "height" in elem.dimensions:
-                area = elem.dimensions["width"] * elem.dimensions["height"]
-                totals["total_area"] += area
-        
-        return totals
     
     async def _estimate_costs(
         self,
@@ -783,7 +1479,7 @@ class DrawingAnalyzer:
             logger.warning(f"Cost estimation failed: {e}")
             return {"error": str(e), "total": 0}
     
-    def _generate_warnings(self, elements: List[DrawingElement], metadata: DrawingMetadata) -> List[str]:
+    def _generate_warnings(self, elements: ElementStore, metadata: DrawingMetadata) -> List[str]:
         """Genereer waarschuwingen op basis van analyse"""
         warnings = []
         
@@ -791,6 +1487,11 @@ class DrawingAnalyzer:
         if not metadata.scale:
             warnings.append("No scale detected - measurements may be inaccurate")
         
+        if not metadata.calibration:
+            warnings.append("No pixel to mm calibration - quantities are in pixels")
+        elif metadata.calibration.get("method") == "cache":
+            warnings.append("Scale reused from an earlier revision of this drawing series")
+        
         if len(elements) < 5:
             warnings.append("Very few elements detected - check drawing quality")
         
@@ -802,14 +1503,14 @@ class DrawingAnalyzer:
     
     def _generate_suggestions(
         self,
-        elements: List[DrawingElement],
+        elements: ElementStore,
         context: Optional[Dict[str, Any]] = None
     ) -> List[str]:
         """Genereer suggesties voor verbetering"""
         suggestions = []
         
         # Suggesties gebaseerd op element types
-        element_types = set(elem.element_type for elem in elements)
+        element_types = elements.type_names()
         
         if "wall" in element_types and "insulation" not in str(element_types):
             suggestions.append("Consider adding insulation specifications")
@@ -824,7 +1525,7 @@ class DrawingAnalyzer:
     
     def _calculate_confidence(
         self,
-        elements: List[DrawingElement],
+        elements: ElementStore,
         metadata: DrawingMetadata
     ) -> float:
         """Bereken confidence score voor de analyse"""
@@ -0,0 +1,282 @@
+import logging
+from decimal import Decimal
+from typing import Dict, List, Optional, Any, Tuple
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+from .cost_engine import CostResult, CATEGORIES, from_cents
+
+logger = logging.getLogger(__name__)
+
+
+# Standaard spreiding (driehoeksverdeling: laag, meest waarschijnlijk, hoog) als factor op de raming
+QUANTITY_SPREAD = {
+    "material": (0.95, 1.0, 1.12),  # hoeveelheden uit tekeningen vallen vaker hoger uit
+    "labor": (0.95, 1.0, 1.10),
+    "other": (0.90, 1.0, 1.20),
+}
+
+PRICE_SPREAD = {
+    "material": (0.93, 1.0, 1.15),
+    "labor": (0.95, 1.0, 1.10),
+    "other": (0.90, 1.0, 1.20),
+}
+
+PRODUCTIVITY_SPREAD = (0.90, 1.0, 1.35)   # factor op arbeidsuren
+EQUIPMENT_SPREAD = (0.90, 1.0, 1.25)      # factor op machinedagen
+MARKET_SPREAD = (0.97, 1.0, 1.08)         # gedeelde marktschok op alle materiaalprijzen
+
+# Groepen voor de variantiebijdrage (zelfde indeling als CostBreakdown.subtotals)
+CONTRIBUTION_GROUPS = ("materials", "labor", "equipment")
+
+# Maximaal aantal getrokken waarden per batch (trekkingen × posten), begrenst geheugen
+MAX_BATCH_CELLS = 4_000_000
+
+# Vooraf getrokken waarden per post waaruit de simulatie herbemonstert
+SAMPLE_TABLE_SIZE = 4096
+
+# Geheugenbudget voor de vooraf getrokken tabellen; bij veel posten wordt de tabel
+# kleiner, en onder MIN_SAMPLE_TABLE_SIZE wordt per batch direct getrokken
+MAX_TABLE_BYTES = 64 * 1024 * 1024
+MIN_SAMPLE_TABLE_SIZE = 256
+
+# Gelijktijdig levende float64 tabellen per post (hoeveelheid, prijs, post, uren)
+TABLE_ARRAYS = 4
+
+
+class MonteCarloResult(BaseModel):
+    """Kansverdeling van de totale kosten (excl. BTW)"""
+    draws: int
+    base_total: Decimal
+    mean: Decimal
+    std: Decimal
+    p10: Decimal
+    p50: Decimal
+    p90: Decimal
+    probability_within_base: float = Field(ge=0.0, le=1.0)  # kans dat het totaal ≤ raming blijft
+    category_contributions: Dict[str, float]  # aandeel in de variantie, som = 1
+    top_lines: List[Dict[str, Any]] = Field(default_factory=list)
+
+
+class MonteCarloSimulator:
+    """
+    Monte Carlo simulatie van kostenrisico op een CostResult.
+    
+    Per post worden hoeveelheid en eenheidsprijs, voor arbeid de
+    productiviteit en voor machines de inzetduur getrokken uit
+    driehoeksverdelingen. Trekkingen gebeuren in numpy batches
+    (trekkingen × posten); percentielen en variantiebijdragen worden over
+    alle batches samengevoegd. Het geheugen blijft begrensd door
+    MAX_BATCH_CELLS per batch en max_table_bytes voor de vooraf getrokken
+    tabellen.
+    """
+    
+    def __init__(
+        self,
+        draws: int = 100_000,
+        seed: Optional[int] = None,
+        quantity_spread: Optional[Dict[str, Tuple[float, float, float]]] = None,
+        price_spread: Optional[Dict[str, Tuple[float, float, float]]] = None,
+        productivity_spread: Tuple[float, float, float] = PRODUCTIVITY_SPREAD,
+        equipment_spread: Tuple[float, float, float] = EQUIPMENT_SPREAD,
+        market_spread: Tuple[float, float, float] = MARKET_SPREAD,
+        max_table_bytes: int = MAX_TABLE_BYTES
+    ):
+        self.draws = draws
+        self.seed = seed
+        self.quantity_spread = {**QUANTITY_SPREAD, **(quantity_spread or {})}
+        self.price_spread = {**PRICE_SPREAD, **(price_spread or {})}
+        self.productivity_spread = productivity_spread
+        self.equipment_spread = equipment_spread
+        self.market_spread = market_spread
+        self.max_table_bytes = max_table_bytes
+    
+    def simulate(
+        self,
+        costing: CostResult,
+        uncertainty: Optional[Dict[str, Dict[str, Tuple[float, float, float]]]] = None,
+        draws: Optional[int] = None,
+        top: int = 10
+    ) -> MonteCarloResult:
+        """
+        Simuleer de totale kosten
+        
+        Args:
+            costing: Resultaat van CostEngine.price()
+            uncertainty: Afwijkende spreiding per STABU code,
+                bijv. {"21.11": {"quantity": (0.9, 1.0, 1.3), "price": (...)}}
+            draws: Aantal trekkingen (standaard self.draws)
+            top: Aantal posten met de grootste variantiebijdrage in het resultaat
+        
+        Returns:
+            MonteCarloResult met P10/P50/P90 en bijdragen per categorie
+        """
+        draws = draws or self.draws
+        rng = np.random.default_rng(self.seed)
+        inputs = costing.inputs
+        uncertainty = uncertainty or {}
+        
+        line_totals = costing.total_cents.astype(np.float64) / 100
+        categories = np.asarray(inputs.categories, dtype=np.int64)
+        quantity_params = self._line_params(inputs.codes, categories, self.quantity_spread, uncertainty, "quantity")
+        price_params = self._line_params(inputs.codes, categories, self.price_spread, uncertainty, "price")
+        
+        base_hours = float(costing.hours_per_code.sum()) or 1.0
+        labor_base = sum(item[3] for item in costing.labor) / 100
+        equipment_base = sum(item[3] for item in costing.equipment) / 100
+        overhead_rate = float(sum(item[2] for item in costing.overhead))
+        
+        lines = len(line_totals)
+        batch_size = max(1, min(draws, MAX_BATCH_CELLS // max(lines, 1)))
+        
+        # Per post een tabel van vooraf getrokken (hoeveelheid, prijs) paren; de
+        # simulatie trekt daarna alleen indices (één integer per post per trekking)
+        # in plaats van twee driehoeksverdelingen. Past dat niet in het budget,
+        # dan wordt per batch direct getrokken.
+        table_size = self.table_size(lines)
+        if table_size:
+            size = (lines, table_size)
+            quantity_table = rng.triangular(*(param[:, None] for param in quantity_params), size=size)
+            price_table = rng.triangular(*(param[:, None] for param in price_params), size=size)
+            line_table = (line_totals[:, None] * quantity_table * price_table).ravel()
+            hours_table = (costing.hours_per_code[:, None] * quantity_table).ravel()
+            del quantity_table, price_table
+            offsets = np.arange(lines, dtype=np.int64) * table_size
+        
+        # Posten → groepen (materiaal incl. overig, arbeid) als matrix voor één matmul per batch
+        membership = np.zeros((lines, 2))
+        membership[:, 0] = categories != CATEGORIES.index("labor")
+        membership[:, 1] = categories == CATEGORIES.index("labor")
+        
+        totals = np.empty(draws)
+        category_totals = np.empty((draws, len(CONTRIBUTION_GROUPS)))
+        line_sum = np.zeros(lines)
+        line_total_sum = np.zeros(lines)
+        
+        for start in range(0, draws, batch_size):
+            size = min(batch_size, draws - start)
+            
+            if table_size:
+                index = rng.integers(0, table_size, size=(size, lines))
+                index += offsets
+                sampled_lines = line_table[index]
+                sampled_hours = hours_table[index].sum(axis=1)
+            else:
+                quantity = rng.triangular(*(param[None, :] for param in quantity_params), size=(size, lines))
+                sampled_lines = line_totals * quantity * rng.triangular(
+                    *(param[None, :] for param in price_params), size=(size, lines)
+                )
+                sampled_hours = quantity @ costing.hours_per_code
+            
+            groups = sampled_lines @ membership
+            
+            # Gedeelde marktschok op alle materiaalprijzen
+            groups[:, 0] *= rng.triangular(*self.market_spread, size=size)
+            
+            # Arbeidsuren schalen met de getrokken hoeveelheden (gewogen naar normuren) en de productiviteit
+            hours_scale = sampled_hours / base_hours
+            productivity = rng.triangular(*self.productivity_spread, size=size)
+            labor = labor_base * hours_scale * productivity
+            equipment = equipment_base * rng.triangular(*self.equipment_spread, size=size)
+            
+            total = (groups.sum(axis=1) + labor + equipment) * (1 + overhead_rate)
+            
+            # Overhead wordt naar rato over de groepen verdeeld
+            totals[start:start + size] = total
+            category_totals[start:start + size, 0] = groups[:, 0]
+            category_totals[start:start + size, 1] = groups[:, 1] + labor
+            category_totals[start:start + size, 2] = equipment
+            category_totals[start:start + size] *= 1 + overhead_rate
+            
+            line_sum += sampled_lines.sum(axis=0)
+            line_total_sum += total @ sampled_lines
+        
+        return self._result(costing, totals, category_totals, line_sum, line_total_sum, top)
+    
+    def table_size(self, lines: int) -> int:
+        """
+        Grootte van de vooraf getrokken tabel per post binnen het geheugenbudget
+        
+        Returns:
+            Aantal waarden per post, of 0 als direct per batch getrokken wordt
+        """
+        fitting = self.max_table_bytes // max(lines * TABLE_ARRAYS * 8, 1)
+        size = min(SAMPLE_TABLE_SIZE, int(fitting))
+        return size if size >= MIN_SAMPLE_TABLE_SIZE else 0
+    
+    def _line_params(
+        self,
+        codes: List[str],
+        categories: np.ndarray,
+        spread: Dict[str, Tuple[float, float, float]],
+        uncertainty: Dict[str, Dict[str, Tuple[float, float, float]]],
+        field: str
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(laag, modus, hoog) arrays per post"""
+        params = np.array([spread[CATEGORIES[category]] for category in categories], dtype=np.float64).reshape(-1, 3)
+        for index, code in enumerate(codes):
+            override = uncertainty.get(code, {}).get(field)
+            if override:
+                params[index] = override
+        # triangular vereist laag < hoog
+        params[:, 2] = np.maximum(params[:, 2], params[:, 0] + 1e-9)
+        return params[:, 0], params[:, 1], params[:, 2]
+    
+    def _result(
+        self,
+        costing: CostResult,
+        totals: np.ndarray,
+        category_totals: np.ndarray,
+        line_sum: np.ndarray,
+        line_total_sum: np.ndarray,
+        top: int
+    ) -> MonteCarloResult:
+        draws = len(totals)
+        mean = float(totals.mean())
+        variance = float(totals.var())
+        p10, p50, p90 = np.percentile(totals, [10, 50, 90])
+        base_total = from_cents(costing.total_excl_vat_cents)
+        
+        # Bijdrage aan de variantie: cov(categorie, totaal) / var(totaal)
+        contributions = {}
+        centered = totals - mean
+        for index, name in enumerate(CONTRIBUTION_GROUPS):
+            column = category_totals[:, index]
+            share = float(np.dot(column - column.mean(), centered) / draws / variance) if variance > 0 else 0.0
+            contributions[name] = round(share, 4)
+        
+        top_lines = []
+        if variance > 0 and len(line_sum):
+            overhead_factor = 1 + float(sum(item[2] for item in costing.overhead))
+            line_cov = (line_total_sum / draws - (line_sum / draws) * mean) * overhead_factor
+            shares = line_cov / variance
+            for index in np.argsort(-shares)[:top]:
+                top_lines.append({
+                    "item_code": costing.inputs.codes[index],
+                    "description": costing.inputs.descriptions[index],
+                    "variance_share": round(float(shares[index]), 4)
+                })
+        
+        return MonteCarloResult(
+            draws=draws,
+            base_total=base_total,
+            mean=self._money(mean),
+            std=self._money(np.sqrt(variance)),
+            p10=self._money(p10),
+            p50=self._money(p50),
+            p90=self._money(p90),
+            probability_within_base=float((totals <= float(base_total)).mean()),
+            category_contributions=contributions,
+            top_lines=top_lines
+        )
+    
+    @staticmethod
+    def _money(value: float) -> Decimal:
+        return Decimal(str(round(float(value), 2)))
+
+
+# Factory functie
+def get_monte_carlo_simulator(**kwargs: Any) -> MonteCarloSimulator:
+    """Factory om MonteCarloSimulator instantie te maken"""
+    return MonteCarloSimulator(**kwargs)
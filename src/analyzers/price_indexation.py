@@ -0,0 +1,547 @@
+import csv
+import json
+import logging
+import os
+import re
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Iterable, Tuple
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+from ..database.price_index import split_code
+from .cost_engine import CostResult, from_cents
+from .pricing_context import PriceAdjustment, FACTOR_PRECISION, ONE
+
+logger = logging.getLogger(__name__)
+
+
+# Prijspeil van de startwaarden (DEFAULT_STABU_PRICES) en de standaard uur- en dagtarieven
+DEFAULT_PRICE_BASE_DATE = date(2024, 1, 1)
+
+# Reeks voor codes zonder eigen reeks, en reeksen voor arbeid en materieel
+DEFAULT_SERIES = "bouwkosten"
+LABOR_SERIES = "arbeid"
+EQUIPMENT_SERIES = "materieel"
+RATE_SERIES = {"labor": LABOR_SERIES, "equipment": EQUIPMENT_SERIES}
+
+# STABU categorie of code prefix → indexreeks (aanvulling op een reeks met dezelfde naam)
+DEFAULT_CATEGORY_SERIES = {
+    "grondwerk": "grond_weg_waterbouw",
+    "betonwerk": "beton",
+    "metselwerk": "metselwerk",
+    "houtwerk": "hout",
+    "dakwerk": "dakbedekking",
+}
+
+DAYS_PER_YEAR = 365.25
+
+# CBS perioden: 2024MM03 (maand), 2024KW02 (kwartaal), 2024JJ00 (jaar); ook 2024-03, 2024-Q2 en 2024
+CBS_PERIOD = re.compile(r"^(\d{4})(MM|KW|JJ)(\d{1,2})$")
+SHORT_PERIOD = re.compile(r"^(\d{4})(?:-?(Q)(\d)|-(\d{1,2}))?$", re.IGNORECASE)
+
+
+def parse_period(value: Any) -> date:
+    """
+    Ingangsdatum van een datum of periode
+    
+    Args:
+        value: date/datetime, ISO datum of een periode (CBS '2024MM03',
+            '2024KW2', '2024JJ00', of '2024-03', '2024-Q2', '2024')
+    
+    Returns:
+        Eerste dag van de periode
+    """
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    
+    text = str(value).strip()
+    match = CBS_PERIOD.match(text.upper())
+    if match:
+        year, kind, number = int(match.group(1)), match.group(2), int(match.group(3))
+        if kind == "MM":
+            return date(year, number, 1)
+        if kind == "KW":
+            return date(year, 3 * number - 2, 1)
+        return date(year, 1, 1)
+    
+    match = SHORT_PERIOD.match(text)
+    if match:
+        year = int(match.group(1))
+        if match.group(3):
+            return date(year, 3 * int(match.group(3)) - 2, 1)
+        return date(year, int(match.group(4) or 1), 1)
+    
+    return datetime.fromisoformat(text.replace("Z", "+00:00")).date()
+
+
+class IndexSeries:
+    """
+    Eén indexreeks (bijv. CBS inputprijsindex of BDB index) als gesorteerde arrays.
+    
+    Een indexcijfer geldt vanaf zijn ingangsdatum tot het volgende punt.
+    Voor datums na het laatste punt wordt doorgerekend met forecast_rate
+    per jaar; zonder opgegeven rate is dat de stijging over de laatste
+    twaalf maanden van de reeks.
+    """
+    
+    __slots__ = ("name", "days", "values", "forecast_rate")
+    
+    def __init__(self, name: str, points: Iterable[Tuple[Any, Any]], forecast_rate: Optional[float] = None):
+        ordered = {}
+        for when, value in points:
+            ordered[parse_period(when).toordinal()] = float(value)
+        if not ordered:
+            raise ValueError(f"Index series '{name}' has no points")
+        
+        self.name = name
+        self.days = np.array(sorted(ordered), dtype=np.int64)
+        self.values = np.array([ordered[day] for day in self.days], dtype=np.float64)
+        self.forecast_rate = forecast_rate if forecast_rate is not None else self._trend()
+    
+    def __len__(self) -> int:
+        return len(self.days)
+    
+    @property
+    def last_date(self) -> date:
+        return date.fromordinal(int(self.days[-1]))
+    
+    def _trend(self) -> float:
+        """Jaarlijkse stijging over de laatste twaalf maanden (0 bij een te korte reeks)"""
+        year_before = self.days[-1] - 365
+        if self.days[0] > year_before:
+            return 0.0
+        previous = self.values[np.searchsorted(self.days, year_before, side="right") - 1]
+        return float(self.values[-1] / previous - 1) if previous > 0 else 0.0
+    
+    def values_at(self, days: np.ndarray) -> np.ndarray:
+        """Indexcijfers op datums (ordinals), gevectoriseerd met searchsorted"""
+        days = np.asarray(days, dtype=np.int64)
+        position = np.searchsorted(self.days, days, side="right") - 1
+        # Voor het eerste punt geldt het eerste indexcijfer
+        values = self.values[np.maximum(position, 0)]
+        
+        beyond = days > self.days[-1]
+        if self.forecast_rate and beyond.any():
+            years = (days[beyond] - self.days[-1]) / DAYS_PER_YEAR
+            values = values.copy()
+            values[beyond] *= (1 + self.forecast_rate) ** years
+        return values
+    
+    def value_at(self, when: Any) -> float:
+        """Indexcijfer op een datum"""
+        return float(self.values_at(np.array([parse_period(when).toordinal()]))[0])
+
+
+class PhaseEscalation(BaseModel):
+    """Escalatie van één projectfase"""
+    name: str
+    start: date
+    end: date
+    base_amount: Decimal          # op prijspeil van de calculatie, excl. BTW
+    escalated_amount: Decimal
+    escalation: Decimal
+    escalation_percentage: float
+
+
+class EscalationResult(BaseModel):
+    """Meerjarige doorrekening van een calculatie over de projectfasen"""
+    base_date: date
+    phases: List[PhaseEscalation]
+    base_total: Decimal
+    escalated_total: Decimal
+    escalation: Decimal
+    escalation_percentage: float
+    series: Dict[str, str] = Field(default_factory=dict)  # groep → gebruikte reeks
+
+
+class ProjectPhase(BaseModel):
+    """
+    Projectfase voor escalatie.
+    
+    codes: STABU code prefixes die in deze fase worden uitgevoerd (bijv.
+    ['2', '3'] voor grond- en betonwerk); overige posten worden naar
+    share (standaard naar rato van de duur) over de fasen verdeeld.
+    """
+    name: str
+    start: date
+    end: date
+    codes: List[str] = Field(default_factory=list)
+    share: Optional[float] = Field(default=None, ge=0.0)
+
+
+class PriceIndexation:
+    """
+    Prijsindexen per categorie in de tijd.
+    
+    Reeksen (CBS/BDB) worden uit lokale bestanden geladen en als arrays in
+    het geheugen gehouden; indexcijfers worden met searchsorted opgezocht.
+    Factoren tussen twee datums worden per (reeks, van, tot) onthouden, zodat
+    herhaald prijzen en meerjarige doorrekening geen database nodig heeft.
+    """
+    
+    def __init__(
+        self,
+        series: Optional[Dict[str, Iterable[Tuple[Any, Any]]]] = None,
+        category_series: Optional[Dict[str, str]] = None,
+        forecast_rates: Optional[Dict[str, float]] = None,
+        default_series: str = DEFAULT_SERIES,
+        base_date: Any = DEFAULT_PRICE_BASE_DATE,
+        directory: Optional[str] = None
+    ):
+        self.series: Dict[str, IndexSeries] = {}
+        self.category_series = {**DEFAULT_CATEGORY_SERIES, **(category_series or {})}
+        self.forecast_rates = dict(forecast_rates or {})
+        self.default_series = default_series
+        self.base_date = parse_period(base_date)  # prijspeil van startwaarden en tarieven
+        
+        self._factors: Dict[Tuple[str, int, int], Decimal] = {}
+        self._resolved: Dict[Tuple[str, str], Optional[str]] = {}
+        
+        for name, points in (series or {}).items():
+            self.add_series(name, points)
+        
+        directory = directory or os.getenv("PRICE_INDEX_DIR")
+        if directory and os.path.isdir(directory):
+            self.load_directory(directory)
+    
+    def __len__(self) -> int:
+        return len(self.series)
+    
+    # === LADEN ===
+    
+    def add_series(self, name: str, points: Iterable[Tuple[Any, Any]]):
+        """Voeg een reeks toe of vervang die"""
+        self.series[name] = IndexSeries(name, points, self.forecast_rates.get(name, self.forecast_rates.get("*")))
+        self._factors = {}
+        self._resolved = {}
+    
+    def load_rows(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """
+        Laad reeksen uit rijen in lang formaat
+        
+        Args:
+            rows: Dicts met series, date (of period/perioden) en value
+        
+        Returns:
+            Aantal geladen reeksen
+        """
+        points: Dict[str, List[Tuple[Any, Any]]] = {}
+        for row in rows:
+            row = {str(key).strip().lower(): value for key, value in row.items()}
+            when = row.get("date") or row.get("period") or row.get("perioden")
+            value = row.get("value")
+            if not row.get("series") or not when or value in (None, ""):
+                continue
+            points.setdefault(str(row["series"]).strip(), []).append((when, _number(value)))
+        
+        for name, series_points in points.items():
+            self.add_series(name, series_points)
+        return len(points)
+    
+    def load_file(self, path: str) -> int:
+        """
+        Laad reeksen uit een JSON of CSV bestand
+        
+        JSON: {reeks: {periode: waarde}}, {reeks: [[periode, waarde], ...]} of
+        een lijst rijen. CSV: lang (series;date;value) of breed (eerste kolom
+        de periode, daarna één kolom per reeks, zoals een CBS export).
+        """
+        file_path = Path(path)
+        if file_path.suffix.lower() == ".json":
+            data = json.loads(file_path.read_text(encoding="utf-8"))
+            if isinstance(data, list):
+                return self.load_rows(data)
+            for name, points in data.items():
+                self.add_series(name, points.items() if isinstance(points, dict) else points)
+            return len(data)
+        
+        with open(file_path, newline="", encoding="utf-8-sig") as file:
+            header = file.readline()
+            file.seek(0)
+            rows = list(csv.DictReader(file, delimiter=";" if ";" in header else ","))
+        if not rows:
+            return 0
+        
+        columns = list(rows[0])
+        if "series" in (column.strip().lower() for column in columns):
+            return self.load_rows(rows)
+        
+        # Breed formaat: één reeks per kolom
+        period_column = columns[0]
+        for name in columns[1:]:
+            points = [(row[period_column], _number(row[name])) for row in rows if row.get(name) not in (None, "")]
+            if points:
+                self.add_series(name.strip(), points)
+        return len(columns) - 1
+    
+    def load_directory(self, directory: str) -> int:
+        """Laad alle .csv en .json bestanden uit een directory"""
+        count = 0
+        for path in sorted(Path(directory).iterdir()):
+            if path.suffix.lower() not in (".csv", ".json"):
+                continue
+            try:
+                count += self.load_file(str(path))
+            except Exception as e:
+                logger.warning(f"Skipping price index file {path.name}: {e}")
+        logger.info(f"Price indices loaded from {directory}: {count} series")
+        return count
+    
+    # === OPVRAGEN ===
+    
+    def series_for(self, stabu_code: str, category: Optional[str] = None) -> Optional[str]:
+        """
+        Reeks voor een code: meest specifieke code prefix in category_series,
+        dan de categorie (mapping of reeks met die naam), dan de standaardreeks
+        """
+        key = (stabu_code, category or "")
+        if key in self._resolved:
+            return self._resolved[key]
+        
+        candidates = []
+        segments = split_code(stabu_code)
+        for length in range(len(segments), 0, -1):
+            candidates.append(self.category_series.get(".".join(segments[:length])))
+        if category:
+            candidates.extend([self.category_series.get(category), category])
+        candidates.append(self.default_series)
+        
+        name = next((candidate for candidate in candidates if candidate in self.series), None)
+        self._resolved[key] = name
+        return name
+    
+    def factor(self, series: Optional[str], from_date: Any, to_date: Any) -> Decimal:
+        """
+        Indexfactor index(to_date) / index(from_date) voor een reeks
+        
+        Returns:
+            Factor (1 zonder reeks), begrensde precisie zoals in PricingContext
+        """
+        if series not in self.series or from_date is None or to_date is None:
+            return ONE
+        start = parse_period(from_date).toordinal()
+        end = parse_period(to_date).toordinal()
+        if start == end:
+            return ONE
+        
+        key = (series, start, end)
+        factor = self._factors.get(key)
+        if factor is None:
+            values = self.series[series].values_at(np.array([start, end]))
+            ratio = values[1] / values[0] if values[0] > 0 else 1.0
+            factor = self._factors[key] = Decimal(repr(float(ratio))).quantize(FACTOR_PRECISION)
+        return factor
+    
+    def index_rates(self, rates: Dict[str, Decimal], kind: str, at: Any) -> Dict[str, Decimal]:
+        """
+        Uur- of dagtarieven van prijspeil base_date naar een datum, afgerond op centen
+        
+        Args:
+            rates: Tarieven per beroep of machine
+            kind: "labor" of "equipment"
+            at: Peildatum
+        """
+        factor = self.factor(self.series_for("", RATE_SERIES.get(kind, kind)), self.base_date, at)
+        if factor == ONE:
+            return rates
+        return {name: (rate * factor).quantize(Decimal('0.01')) for name, rate in rates.items()}
+    
+    def escalate(
+        self,
+        costing: CostResult,
+        phases: List[ProjectPhase],
+        base_date: Any = None,
+        categories: Optional[Dict[str, str]] = None
+    ) -> EscalationResult:
+        """
+        Reken een calculatie door naar het prijspeil van de uitvoering per fase
+        
+        Per fase wordt aangenomen dat de kosten gelijkmatig over de looptijd
+        vallen: de factor is het gemiddelde indexcijfer over alle dagen van de
+        fase gedeeld door het indexcijfer op base_date. Posten worden via hun
+        STABU code aan fasen toegewezen; arbeid volgt de normuren per fase,
+        materieel en opslagen de directe kosten.
+        
+        Args:
+            costing: Resultaat van CostEngine.price()
+            phases: Projectfasen met start- en einddatum
+            base_date: Prijspeil van de calculatie (standaard vandaag)
+            categories: STABU categorie per code (voor de reekskeuze)
+        
+        Returns:
+            EscalationResult met basis- en geëscaleerde bedragen per fase
+        """
+        if not phases:
+            raise ValueError("At least one phase is required")
+        base_day = parse_period(base_date or date.today()).toordinal()
+        categories = categories or {}
+        inputs = costing.inputs
+        
+        allocation = self._allocation(inputs.codes, phases)          # posten × fasen
+        line_series = [self.series_for(code, categories.get(code)) for code in inputs.codes]
+        labor_series = self.series_for("", LABOR_SERIES)
+        equipment_series = self.series_for("", EQUIPMENT_SERIES)
+        
+        # Gemiddelde factor per (reeks, fase), eenmaal per reeks gevectoriseerd
+        names = sorted({name for name in line_series + [labor_series, equipment_series] if name})
+        factors = {None: np.ones(len(phases))}
+        for name in names:
+            factors[name] = self._phase_factors(self.series[name], phases, base_day)
+        
+        line_cents = costing.total_cents.astype(np.float64)
+        line_factors = np.array([factors[name] for name in line_series]).reshape(len(line_series), len(phases))
+        lines_base = line_cents @ allocation
+        lines_escalated = (line_cents[:, None] * allocation * line_factors).sum(axis=0)
+        
+        # Arbeid naar normuren per fase, materieel naar directe kosten per fase
+        hours = costing.hours_per_code @ allocation
+        labor_share = hours / hours.sum() if hours.sum() > 0 else self._fallback_shares(phases)
+        labor_base = sum(item[3] for item in costing.labor) * labor_share
+        equipment_share = lines_base / lines_base.sum() if lines_base.sum() > 0 else self._fallback_shares(phases)
+        equipment_base = sum(item[3] for item in costing.equipment) * equipment_share
+        
+        direct_base = lines_base + labor_base + equipment_base
+        direct_escalated = (
+            lines_escalated +
+            labor_base * factors[labor_series] +
+            equipment_base * factors[equipment_series]
+        )
+        
+        # Opslagen zijn een percentage van de directe kosten en escaleren mee
+        overhead_cents = sum(item[4] for item in costing.overhead)
+        direct_total = direct_base.sum()
+        overhead_base = overhead_cents * direct_base / direct_total if direct_total > 0 else np.zeros(len(phases))
+        ratio = np.divide(direct_escalated, direct_base, out=np.ones(len(phases)), where=direct_base > 0)
+        
+        base_cents = np.floor(direct_base + overhead_base + 0.5).astype(np.int64)
+        escalated_cents = np.floor((direct_base + overhead_base) * ratio + 0.5).astype(np.int64)
+        
+        results = []
+        for index, phase in enumerate(phases):
+            base, escalated = int(base_cents[index]), int(escalated_cents[index])
+            results.append(PhaseEscalation(
+                name=phase.name,
+                start=phase.start,
+                end=phase.end,
+                base_amount=from_cents(base),
+                escalated_amount=from_cents(escalated),
+                escalation=from_cents(escalated - base),
+                escalation_percentage=round((escalated - base) / base * 100, 2) if base else 0.0
+            ))
+        
+        base_total, escalated_total = int(base_cents.sum()), int(escalated_cents.sum())
+        return EscalationResult(
+            base_date=date.fromordinal(base_day),
+            phases=results,
+            base_total=from_cents(base_total),
+            escalated_total=from_cents(escalated_total),
+            escalation=from_cents(escalated_total - base_total),
+            escalation_percentage=round((escalated_total - base_total) / base_total * 100, 2) if base_total else 0.0,
+            series={
+                "labor": labor_series or "",
+                "equipment": equipment_series or "",
+                **{code: name for code, name in zip(inputs.codes, line_series) if name}
+            }
+        )
+    
+    def _phase_factors(self, series: IndexSeries, phases: List[ProjectPhase], base_day: int) -> np.ndarray:
+        """Gemiddeld indexcijfer per fase / indexcijfer op de basisdatum"""
+        base_value = series.values_at(np.array([base_day]))[0]
+        if base_value <= 0:
+            return np.ones(len(phases))
+        result = np.empty(len(phases))
+        for index, phase in enumerate(phases):
+            start, end = phase.start.toordinal(), phase.end.toordinal()
+            days = np.arange(start, max(start, end) + 1, dtype=np.int64)
+            result[index] = series.values_at(days).mean() / base_value
+        return result
+    
+    def _allocation(self, codes: List[str], phases: List[ProjectPhase]) -> np.ndarray:
+        """Aandeel van elke post per fase (rijen sommeren tot 1)"""
+        shares = self._fallback_shares(phases)
+        allocation = np.tile(shares, (len(codes), 1))
+        
+        prefixes: Dict[Tuple[str, ...], List[int]] = {}
+        for index, phase in enumerate(phases):
+            for prefix in phase.codes:
+                prefixes.setdefault(split_code(prefix), []).append(index)
+        if not prefixes:
+            return allocation
+        
+        for row, code in enumerate(codes):
+            segments = split_code(code)
+            for length in range(len(segments), 0, -1):
+                matched = prefixes.get(segments[:length])
+                if matched:
+                    # Meerdere fasen met dezelfde prefix: naar rato van de duur
+                    allocation[row] = 0.0
+                    weights = np.array([self._duration(phases[index]) for index in matched], dtype=np.float64)
+                    allocation[row, matched] = weights / weights.sum()
+                    break
+        return allocation
+    
+    def _fallback_shares(self, phases: List[ProjectPhase]) -> np.ndarray:
+        """Verdeling van posten zonder fase: opgegeven share, anders naar rato van de duur"""
+        if any(phase.share is not None for phase in phases):
+            shares = np.array([phase.share or 0.0 for phase in phases], dtype=np.float64)
+        else:
+            shares = np.array([self._duration(phase) for phase in phases], dtype=np.float64)
+        total = shares.sum()
+        return shares / total if total > 0 else np.full(len(phases), 1 / len(phases))
+    
+    @staticmethod
+    def _duration(phase: ProjectPhase) -> int:
+        return max(1, (phase.end - phase.start).days + 1)
+
+
+class CategoryIndexation(PriceAdjustment):
+    """
+    Indexering van STABU prijzen naar de peildatum met een reeks per categorie.
+    
+    Basis is de ingangsdatum van de prijsversie die op de peildatum geldt
+    (interval lookup in de prijsindex); prijzen zonder begindatum hebben
+    het prijspeil van de indexering (base_date). Zo wordt alleen het stuk
+    na de laatste prijsversie geïndexeerd.
+    """
+    
+    name = "category_indexation"
+    context_keys = ("price_date",)
+    
+    def __init__(
+        self,
+        indexation: PriceIndexation,
+        price_index: Any
+    ):
+        self.indexation = indexation
+        self.price_index = price_index
+    
+    def factor(self, stabu_code: str, context: Dict[str, Any]) -> Decimal:
+        price_date = context.get("price_date")
+        if price_date is None or not self.indexation.series:
+            return ONE
+        
+        at = price_date if isinstance(price_date, datetime) else datetime.combine(parse_period(price_date), datetime.min.time())
+        match = self.price_index.lookup_version(stabu_code, at)
+        base_date = match[2] if match is not None and match[2] is not None else self.indexation.base_date
+        
+        info = self.price_index.info(match[0] if match is not None else stabu_code) or {}
+        series = self.indexation.series_for(stabu_code, info.get("category"))
+        return self.indexation.factor(series, base_date, at)
+
+
+def _number(value: Any) -> float:
+    """Getal uit een bestand; accepteert decimale komma ('112,4')"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    return float(str(value).strip().replace(",", "."))
+
+
+# Factory functie
+def get_price_indexation(**kwargs: Any) -> PriceIndexation:
+    """Factory om PriceIndexation instantie te maken"""
+    return PriceIndexation(**kwargs)
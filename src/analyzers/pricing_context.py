@@ -0,0 +1,218 @@
+import logging
+from bisect import bisect_right
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, List, Optional, Any, Iterable, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+# Prijsfactoren uit de projectcontext
+COMPLEXITY_FACTORS = {
+    "low": Decimal('0.9'),
+    "medium": Decimal('1.0'),
+    "high": Decimal('1.15'),
+    "very_high": Decimal('1.3')
+}
+
+LOCATION_FACTORS = {
+    "randstad": Decimal('1.1'),
+    "noord": Decimal('0.95'),
+    "oost": Decimal('0.9'),
+    "zuid": Decimal('0.95'),
+    "west": Decimal('1.0')
+}
+
+SIZE_FACTORS = {
+    "small": Decimal('1.05'),     # 5% toeslag voor klein
+    "medium": Decimal('1.0'),
+    "large": Decimal('0.95'),     # 5% korting voor groot
+    "very_large": Decimal('0.9')  # 10% korting voor zeer groot
+}
+
+ONE = Decimal('1')
+FACTOR_PRECISION = Decimal('1e-9')
+
+
+def apply_rate(cents: Any, rate: Decimal) -> np.ndarray:
+    """
+    Vermenigvuldig centbedragen exact met een decimale factor (half naar boven)
+    
+    De factor wordt een breuk teller/noemer, zodat alles in integers blijft.
+    """
+    numerator, denominator = rate.as_integer_ratio()
+    cents = np.asarray(cents, dtype=np.int64)
+    if cents.size and int(np.abs(cents).max()) * 2 * abs(numerator) >= 2 ** 62:
+        # Zou int64 laten overlopen: reken met Python integers
+        exact = [(int(value) * 2 * numerator + denominator) // (2 * denominator) for value in cents.ravel()]
+        return np.array(exact, dtype=np.int64).reshape(cents.shape)
+    return (cents * (2 * numerator) + denominator) // (2 * denominator)
+
+
+def _chapter_prefixes(stabu_code: str) -> List[str]:
+    """'21.11.10' → ['21.11.10', '21.11', '21'] (meest specifiek eerst)"""
+    parts = stabu_code.split(".")
+    return [".".join(parts[:length]) for length in range(len(parts), 0, -1)]
+
+
+class PriceAdjustment:
+    """
+    Basis voor een extra prijsfactor bovenop complexiteit/locatie/grootte.
+    
+    context_keys bepaalt welke contextvelden de factor beïnvloeden (voor de
+    cache van gecompileerde contexten).
+    """
+    
+    name = "base"
+    context_keys: Tuple[str, ...] = ()
+    
+    def factor(self, stabu_code: str, context: Dict[str, Any]) -> Decimal:
+        return ONE
+
+
+class RegionalIndex(PriceAdjustment):
+    """
+    Regionale prijsindex per STABU hoofdstuk.
+    
+    table: {regio: {hoofdstuk of code prefix: factor}}; de meest specifieke
+    prefix wint, "*" geldt voor alle codes.
+    """
+    
+    name = "regional_index"
+    context_keys = ("region",)
+    
+    def __init__(self, table: Dict[str, Dict[str, Any]]):
+        self.table = {
+            region.lower(): {prefix: Decimal(str(value)) for prefix, value in factors.items()}
+            for region, factors in table.items()
+        }
+    
+    def factor(self, stabu_code: str, context: Dict[str, Any]) -> Decimal:
+        factors = self.table.get(str(context.get("region") or "").lower())
+        if not factors:
+            return ONE
+        for prefix in _chapter_prefixes(stabu_code):
+            if prefix in factors:
+                return factors[prefix]
+        return factors.get("*", ONE)
+
+
+class IndexationTable(PriceAdjustment):
+    """
+    Indexering van prijzen naar een peildatum (bijv. BDB of CBS index).
+    
+    points: (ingangsdatum, indexcijfer); de factor is index(price_date) /
+    index(base_date). Optioneel per hoofdstuk een eigen reeks via chapter.
+    """
+    
+    name = "indexation"
+    context_keys = ("price_date",)
+    
+    def __init__(
+        self,
+        points: Iterable[Tuple[Any, Any]],
+        base_date: Any,
+        chapter: Optional[str] = None
+    ):
+        ordered = sorted((self._date(when), Decimal(str(value))) for when, value in points)
+        self._dates = [when for when, _ in ordered]
+        self._values = [value for _, value in ordered]
+        self.base_date = self._date(base_date)
+        self.chapter = chapter
+        self._base_value = self.value_at(self.base_date)
+    
+    @staticmethod
+    def _date(value: Any) -> date:
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
+        return datetime.fromisoformat(str(value)).date()
+    
+    def value_at(self, when: Any) -> Optional[Decimal]:
+        """Indexcijfer dat geldt op een datum (laatste punt op of voor de datum)"""
+        position = bisect_right(self._dates, self._date(when)) - 1
+        return self._values[position] if position >= 0 else None
+    
+    def factor(self, stabu_code: str, context: Dict[str, Any]) -> Decimal:
+        price_date = context.get("price_date")
+        if price_date is None or not self._base_value:
+            return ONE
+        if self.chapter and stabu_code.split(".")[0] != self.chapter:
+            return ONE
+        value = self.value_at(price_date)
+        return value / self._base_value if value else ONE
+
+
+class PricingContext:
+    """
+    Eenmalig gecompileerde prijscontext voor één berekening.
+    
+    De gecombineerde factor (complexiteit × locatie × grootte) wordt één keer
+    bepaald; extra aanpassingen (regionale index, indexering) per code
+    gememoized, net als de aangepaste eenheidsprijs per (code, basisprijs).
+    """
+    
+    def __init__(
+        self,
+        context: Optional[Dict[str, Any]] = None,
+        adjustments: Optional[List[PriceAdjustment]] = None
+    ):
+        self.context = dict(context or {})
+        self.adjustments = list(adjustments or [])
+        
+        self.factor = (
+            COMPLEXITY_FACTORS.get(self.context.get("complexity", "medium"), ONE) *
+            LOCATION_FACTORS.get(self.context.get("location", "randstad"), ONE) *
+            SIZE_FACTORS.get(self.context.get("project_size", "medium"), ONE)
+        )
+        
+        self._code_factors: Dict[str, Decimal] = {}
+        self._unit_cents: Dict[Tuple[str, int], int] = {}
+    
+    @staticmethod
+    def cache_key(context: Optional[Dict[str, Any]], adjustments: Iterable[PriceAdjustment] = ()) -> Tuple:
+        """Sleutel van de contextvelden die de prijs beïnvloeden"""
+        context = context or {}
+        keys = ["complexity", "location", "project_size"]
+        for adjustment in adjustments:
+            keys.extend(adjustment.context_keys)
+        return tuple((key, str(context.get(key))) for key in sorted(set(keys)))
+    
+    def code_factor(self, stabu_code: str) -> Decimal:
+        """Totale factor voor een code (basis × alle aanpassingen)"""
+        factor = self._code_factors.get(stabu_code)
+        if factor is None:
+            factor = self.factor
+            for adjustment in self.adjustments:
+                factor *= adjustment.factor(stabu_code, self.context)
+            # Begrensde precisie houdt de breuk in apply_rate klein
+            factor = self._code_factors[stabu_code] = factor.quantize(FACTOR_PRECISION)
+        return factor
+    
+    def unit_cents(self, stabu_code: str, base_cents: int) -> int:
+        """Aangepaste eenheidsprijs in centen (gememoized)"""
+        key = (stabu_code, int(base_cents))
+        cents = self._unit_cents.get(key)
+        if cents is None:
+            cents = self._unit_cents[key] = int(apply_rate([base_cents], self.code_factor(stabu_code))[0])
+        return cents
+    
+    def apply(self, codes: List[str], base_cents: np.ndarray) -> np.ndarray:
+        """Aangepaste eenheidsprijzen in centen voor een array basisprijzen"""
+        if not self.adjustments:
+            # Eén factor voor alle codes: volledig gevectoriseerd
+            return apply_rate(base_cents, self.factor)
+        return np.fromiter(
+            (self.unit_cents(code, cents) for code, cents in zip(codes, base_cents)),
+            dtype=np.int64,
+            count=len(codes)
+        )
+
+
+# Factory functie
+def get_pricing_context(context: Optional[Dict[str, Any]] = None, **kwargs: Any) -> PricingContext:
+    """Factory om PricingContext instantie te maken"""
+    return PricingContext(context, **kwargs)
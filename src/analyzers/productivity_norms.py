@@ -0,0 +1,260 @@
+import csv
+import json
+import logging
+import math
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Iterable, Tuple
+
+import numpy as np
+
+from ..database.price_index import split_code
+
+logger = logging.getLogger(__name__)
+
+
+# Standaard normen per STABU hoofdstuk of code (uren en machinedagen per eenheid)
+DEFAULT_NORMS = [
+    # Grondwerk: ca. 60 m3 per dag met graafmachine
+    {"code": "2", "unit": "m3", "trade": "algemeen_bouwarbeider", "hours_per_unit": 0.15,
+     "equipment": {"graafmachine": 1 / 60}},
+    {"code": "2.3", "unit": "m3", "trade": "betonvlechter", "hours_per_unit": 1.8,
+     "equipment": {"graafmachine": 1 / 40}},
+    # Betonwerk: storten ca. 40 m3 per dag met pomp
+    {"code": "3", "unit": "m3", "trade": "betonvlechter", "hours_per_unit": 2.5,
+     "equipment": {"betonpomp": 1 / 40, "kraan_25t": 1 / 80}},
+    # Metselwerk
+    {"code": "4", "unit": "m2", "trade": "metselaar", "hours_per_unit": 1.1,
+     "equipment": {"hoogwerker": 1 / 60}},
+    {"code": "4.2", "unit": "m2", "trade": "metselaar", "hours_per_unit": 0.7},
+    # Houtwerk
+    {"code": "5", "unit": "m", "trade": "timmerman", "hours_per_unit": 0.35,
+     "equipment": {"kraan_25t": 1 / 400}},
+    # Dakwerk
+    {"code": "6", "unit": "m2", "trade": "timmerman", "hours_per_unit": 0.6,
+     "equipment": {"kraan_25t": 1 / 300, "hoogwerker": 1 / 150}},
+    {"code": "6.2", "unit": "m2", "trade": "algemeen_bouwarbeider", "hours_per_unit": 0.25},
+    # Kozijnen en deuren
+    {"code": "7", "unit": "stuk", "trade": "timmerman", "hours_per_unit": 3.0},
+    # Isolatie
+    {"code": "8", "unit": "m2", "trade": "algemeen_bouwarbeider", "hours_per_unit": 0.25},
+    # Afwerking
+    {"code": "9", "unit": "m2", "trade": "algemeen_bouwarbeider", "hours_per_unit": 0.4},
+]
+
+# Standaard ploeggrootte per beroep
+DEFAULT_CREW_SIZES = {
+    "metselaar": 4,
+    "timmerman": 3,
+    "betonvlechter": 4,
+    "kraanmachinist": 1,
+    "algemeen_bouwarbeider": 3,
+}
+
+HOURS_PER_DAY = 8.0
+
+# Norm voor codes zonder (passende) norm
+FALLBACK_NORM = {"code": "*", "unit": None, "trade": "algemeen_bouwarbeider", "hours_per_unit": 0.5}
+
+
+def _number(value: Any) -> float:
+    """Getal uit JSON of CSV; CSV met ; als scheiding gebruikt vaak een decimale komma"""
+    if isinstance(value, str):
+        value = value.strip().replace(",", ".")
+    return float(value)
+
+
+class NormsTable:
+    """
+    Productiviteitsnormen als geïndexeerde tabellen.
+    
+    Elke norm is een rij: beroep (index), uren per eenheid en machinedagen
+    per eenheid (matrix normen × machines). Codes worden via de langste
+    STABU prefix met passende eenheid aan een rij gekoppeld; die koppeling
+    wordt per (code, eenheid) onthouden.
+    
+    Zonder norms worden de normen uit path of NORMS_FILE (JSON of CSV)
+    geladen, anders de standaardnormen.
+    """
+    
+    def __init__(
+        self,
+        norms: Optional[Iterable[Dict[str, Any]]] = None,
+        path: Optional[str] = None
+    ):
+        self.trades: List[str] = []
+        self.equipment_types: List[str] = []
+        self._rows: List[Dict[str, Any]] = []
+        self._by_prefix: Dict[Tuple[str, ...], List[int]] = {}
+        self._resolved: Dict[Tuple[str, Optional[str]], int] = {}
+        
+        self.trade_index = np.zeros(0, dtype=np.int64)
+        self.hours_per_unit = np.zeros(0)
+        self.equipment_per_unit = np.zeros((0, 0))
+        
+        path = path or os.getenv("NORMS_FILE")
+        if norms is None and path:
+            try:
+                self.load_file(path)
+                return
+            except Exception as e:
+                logger.warning(f"Could not load productivity norms from {path}, using defaults: {e}")
+        
+        self.load_rows(list(norms) if norms is not None else DEFAULT_NORMS)
+    
+    def __len__(self) -> int:
+        return len(self._rows)
+    
+    def load_rows(self, rows: Iterable[Dict[str, Any]]):
+        """
+        Laad normen (vervangt bestaande)
+        
+        Args:
+            rows: Dicts met code, unit, trade, hours_per_unit en optioneel
+                equipment ({machine: dagen per eenheid})
+        """
+        self._rows = [FALLBACK_NORM]
+        for row in rows:
+            if not row.get("code") or row.get("hours_per_unit") is None:
+                continue
+            equipment = row.get("equipment") or {}
+            if isinstance(equipment, str):
+                equipment = json.loads(equipment)
+            self._rows.append({
+                "code": str(row["code"]),
+                "unit": row.get("unit") or None,
+                "trade": row.get("trade") or FALLBACK_NORM["trade"],
+                "hours_per_unit": _number(row["hours_per_unit"]),
+                "equipment": {name: _number(days) for name, days in equipment.items()}
+            })
+        
+        self.trades = sorted({row["trade"] for row in self._rows})
+        self.equipment_types = sorted({name for row in self._rows for name in row.get("equipment", {})})
+        
+        trade_ids = {trade: index for index, trade in enumerate(self.trades)}
+        equipment_ids = {name: index for index, name in enumerate(self.equipment_types)}
+        
+        self.trade_index = np.array([trade_ids[row["trade"]] for row in self._rows], dtype=np.int64)
+        self.hours_per_unit = np.array([row["hours_per_unit"] for row in self._rows])
+        self.equipment_per_unit = np.zeros((len(self._rows), len(self.equipment_types)))
+        for index, row in enumerate(self._rows):
+            for name, days in row.get("equipment", {}).items():
+                self.equipment_per_unit[index, equipment_ids[name]] = days
+        
+        self._by_prefix = {}
+        for index, row in enumerate(self._rows[1:], start=1):
+            self._by_prefix.setdefault(split_code(row["code"]), []).append(index)
+        self._resolved = {}
+        
+        logger.info(f"Productivity norms loaded: {len(self._rows) - 1} norms, {len(self.trades)} trades")
+    
+    def load_file(self, path: str):
+        """Laad normen uit een JSON (lijst van dicts) of CSV bestand"""
+        file_path = Path(path)
+        if file_path.suffix.lower() == ".json":
+            rows = json.loads(file_path.read_text(encoding="utf-8"))
+        else:
+            with open(file_path, newline="", encoding="utf-8") as file:
+                header = file.readline()
+                file.seek(0)
+                rows = list(csv.DictReader(file, delimiter=";" if ";" in header else ","))
+        self.load_rows(rows)
+    
+    def resolve(self, stabu_code: str, unit: Optional[str] = None) -> int:
+        """Rij-index van de meest specifieke norm met passende eenheid (0 = terugval)"""
+        key = (stabu_code, unit)
+        index = self._resolved.get(key)
+        if index is None:
+            index = 0
+            segments = split_code(stabu_code)
+            for length in range(len(segments), 0, -1):
+                candidates = [
+                    row for row in self._by_prefix.get(segments[:length], ())
+                    if unit is None or self._rows[row]["unit"] in (None, unit)
+                ]
+                if candidates:
+                    index = candidates[0]
+                    break
+            self._resolved[key] = index
+        return index
+    
+    def rows_for(self, codes: List[str], units: List[str]) -> np.ndarray:
+        return np.fromiter((self.resolve(code, unit) for code, unit in zip(codes, units)), dtype=np.int64, count=len(codes))
+
+
+class NormsEngine:
+    """
+    Arbeid en materieel op basis van productiviteitsnormen.
+    
+    Per STABU code: uren = hoeveelheid × norm, per beroep opgeteld met
+    bincount; machinedagen = hoeveelheden × normmatrix. Ploeggrootte en
+    duur volgen uit de uren per beroep.
+    """
+    
+    def __init__(
+        self,
+        table: Optional[NormsTable] = None,
+        crew_sizes: Optional[Dict[str, int]] = None,
+        hours_per_day: float = HOURS_PER_DAY
+    ):
+        self.table = table or NormsTable()
+        self.crew_sizes = {**DEFAULT_CREW_SIZES, **(crew_sizes or {})}
+        self.hours_per_day = hours_per_day
+    
+    def estimate(
+        self,
+        codes: List[str],
+        units: List[str],
+        quantities: np.ndarray,
+        crew_sizes: Optional[Dict[str, int]] = None
+    ) -> Dict[str, Any]:
+        """
+        Schat arbeidsuren, ploegen, duur en machinedagen
+        
+        Args:
+            codes: STABU codes (uniek)
+            units: Eenheid per code
+            quantities: Hoeveelheid per code
+            crew_sizes: Afwijkende ploeggroottes
+        
+        Returns:
+            {"labor": [{trade, hours, crew_size, duration_days}],
+             "equipment": [{equipment_type, days}],
+             "hours_per_code": array}
+        """
+        crew_sizes = {**self.crew_sizes, **(crew_sizes or {})}
+        table = self.table
+        rows = table.rows_for(codes, units)
+        quantities = np.asarray(quantities, dtype=np.float64)
+        
+        hours_per_code = quantities * table.hours_per_unit[rows]
+        trade_hours = np.bincount(table.trade_index[rows], weights=hours_per_code, minlength=len(table.trades))
+        equipment_days = quantities @ table.equipment_per_unit[rows] if len(rows) else np.zeros(len(table.equipment_types))
+        
+        labor = []
+        for index, trade in enumerate(table.trades):
+            hours = float(trade_hours[index])
+            if hours <= 0:
+                continue
+            crew = max(1, int(crew_sizes.get(trade, 2)))
+            labor.append({
+                "trade": trade,
+                "hours": round(hours, 2),
+                "crew_size": crew,
+                "duration_days": math.ceil(hours / (crew * self.hours_per_day))
+            })
+        
+        # Materieel wordt per hele dag gehuurd
+        equipment = [
+            {"equipment_type": name, "days": math.ceil(float(days) - 1e-9)}
+            for name, days in zip(table.equipment_types, equipment_days)
+            if days > 0
+        ]
+        
+        return {"labor": labor, "equipment": equipment, "hours_per_code": hours_per_code}
+
+
+# Factory functie
+def get_norms_engine(**kwargs: Any) -> NormsEngine:
+    """Factory om NormsEngine instantie te maken"""
+    return NormsEngine(**kwargs)
@@ -7,7 +7,7 @@ import re
 from pydantic import BaseModel, Field
 import pandas as pd
 
-from ..core.document_processor import DocumentType
+from ..models.document_type import DocumentType
 from ..core.ai_orchestrator import AIOrchestrator
 from ..utils.file_handler import FileHandler
 
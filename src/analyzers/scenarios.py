@@ -0,0 +1,135 @@
+import logging
+import weakref
+from decimal import Decimal
+from typing import Dict, List, Optional, Any, Tuple
+
+from pydantic import BaseModel, Field
+
+from .cost_engine import CostEngine, CostInputs, CostResult, CostBreakdown, from_cents
+
+logger = logging.getLogger(__name__)
+
+
+class Scenario(BaseModel):
+    """Eén variant: alleen de parameters die afwijken van de basisberekening"""
+    name: str
+    context: Dict[str, Any] = Field(default_factory=dict)  # bijv. location, complexity, region
+    labor_rates: Dict[str, Decimal] = Field(default_factory=dict)
+    equipment_rates: Dict[str, Decimal] = Field(default_factory=dict)
+    overhead_rates: Dict[str, Decimal] = Field(default_factory=dict)  # OVERHEAD_PM: 0.08
+    substitutions: Dict[str, str] = Field(default_factory=dict)  # STABU code → vervangende code
+    crew_sizes: Dict[str, int] = Field(default_factory=dict)
+
+
+class ScenarioResult(BaseModel):
+    """Uitkomst van een variant naast de basis"""
+    name: str
+    subtotals: Dict[str, Decimal]
+    total_excl_vat: Decimal
+    vat_amount: Decimal
+    total_incl_vat: Decimal
+    difference: Decimal                 # t.o.v. basis, excl. BTW
+    difference_percentage: float
+    breakdown: Optional[CostBreakdown] = None
+
+
+class ScenarioEngine:
+    """
+    What-if berekeningen op één voorbereide basisberekening.
+    
+    De geclassificeerde elementen en hoeveelheden (CostInputs) worden
+    hergebruikt; per variant worden alleen de prijsstappen opnieuw gedaan.
+    Gecompileerde prijscontexten en substituties worden gedeeld tussen
+    varianten met dezelfde waarden.
+    """
+    
+    def __init__(self, cost_engine: CostEngine):
+        self.cost_engine = cost_engine
+        self._substituted = weakref.WeakKeyDictionary()  # CostInputs → {substituties: CostInputs}
+    
+    def compare(
+        self,
+        inputs: CostInputs,
+        scenarios: List[Scenario],
+        base_context: Optional[Dict[str, Any]] = None,
+        include_breakdown: bool = False
+    ) -> List[ScenarioResult]:
+        """
+        Bereken de basis en alle varianten
+        
+        Args:
+            inputs: Voorbereide basis (CostEngine.prepare)
+            scenarios: Varianten met afwijkende parameters
+            base_context: Project context van de basisberekening
+            include_breakdown: Volledige CostBreakdown per variant meegeven
+        
+        Returns:
+            Basis ("base") gevolgd door de varianten, in opgegeven volgorde
+        """
+        base_context = base_context or {}
+        base = self.cost_engine.price(inputs, base_context)
+        base_total = base.total_excl_vat_cents
+        
+        results = [self._result("base", base, base_total, include_breakdown)]
+        for scenario in scenarios:
+            try:
+                costing = self.run(inputs, scenario, base_context)
+                results.append(self._result(scenario.name, costing, base_total, include_breakdown))
+            except Exception as e:
+                logger.error(f"Scenario '{scenario.name}' failed: {e}")
+        
+        return results
+    
+    def run(
+        self,
+        inputs: CostInputs,
+        scenario: Scenario,
+        base_context: Optional[Dict[str, Any]] = None
+    ) -> CostResult:
+        """Bereken één variant"""
+        context = {**(base_context or {}), **scenario.context}
+        
+        if scenario.substitutions:
+            cache = self._substituted.setdefault(inputs, {})
+            key = (tuple(sorted(scenario.substitutions.items())), str(context.get("price_date")))
+            substituted = cache.get(key)
+            if substituted is None:
+                substituted = cache[key] = self.cost_engine.substitute(
+                    inputs, scenario.substitutions, context.get("price_date")
+                )
+            inputs = substituted
+        
+        return self.cost_engine.price(
+            inputs,
+            context,
+            labor_rates=scenario.labor_rates,
+            equipment_rates=scenario.equipment_rates,
+            overhead_rates=scenario.overhead_rates,
+            crew_sizes=scenario.crew_sizes
+        )
+    
+    def _result(
+        self,
+        name: str,
+        costing: CostResult,
+        base_total: int,
+        include_breakdown: bool
+    ) -> ScenarioResult:
+        totals = costing.totals()
+        difference = costing.total_excl_vat_cents - base_total
+        return ScenarioResult(
+            name=name,
+            subtotals={key: from_cents(value) for key, value in costing.subtotal_cents.items()},
+            total_excl_vat=totals["total_excl_vat"],
+            vat_amount=totals["vat_amount"],
+            total_incl_vat=totals["total_incl_vat"],
+            difference=from_cents(difference),
+            difference_percentage=round(difference / base_total * 100, 2) if base_total else 0.0,
+            breakdown=costing.to_breakdown() if include_breakdown else None
+        )
+
+
+# Factory functie
+def get_scenario_engine(cost_engine: CostEngine) -> ScenarioEngine:
+    """Factory om ScenarioEngine instantie te maken"""
+    return ScenarioEngine(cost_engine)
@@ -2,12 +2,23 @@
 Core AI and document processing modules
 """
 
-from .document_processor import DocumentProcessor, get_document_processor
-from .ai_orchestrator import AIOrchestrator, get_ai_orchestrator
-
-__all__ = [
-    "DocumentProcessor",
-    "get_document_processor", 
-    "AIOrchestrator",
-    "get_ai_orchestrator",
-]
+import importlib
+from typing import Any
+
+# Exports worden pas bij gebruik geïmporteerd, zodat losse submodules
+# importeerbaar blijven zonder de afhankelijkheden van de document processor
+_EXPORTS = {
+    "DocumentProcessor": ".document_processor",
+    "get_document_processor": ".document_processor",
+    "AIOrchestrator": ".ai_orchestrator",
+    "get_ai_orchestrator": ".ai_orchestrator",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module, __name__), name)
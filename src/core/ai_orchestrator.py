@@ -6,9 +6,44 @@ import asyncio
 from pydantic import BaseModel, Field
 from ..models.llm_client import LLMClient, LLMProvider
 from ..models.vision_client import VisionClient
+from ..models.llm_batcher import LLMBatcher
 
 logger = logging.getLogger(__name__)
 
+# Instructies voor gebundelde aanroepen (de payload per item volgt in de batch)
+EXTRACTION_INSTRUCTION = """
+Extraheer alle relevante informatie uit het document voor bouwkosten calculatie.
+Structureer de informatie volgens deze categorieën:
+1. Algemene informatie (locatie, type gebouw, jaar)
+2. Constructie elementen (muren, vloeren, daken)
+3. Materialen genoemde materialen)
+4. Afmetingen (oppervlakten, volumes, afmetingen)
+5. Bijzonderheden (speciale eisen, beperkingen)
+6. Data (data, termijnen, voorwaarden)
+
+Geef het antwoord als JSON met de bovenstaande categorieën als keys.
+"""
+
+DRAWING_STRUCTURE_INSTRUCTION = """
+Structureer de tekeninganalyse voor STABU calculatie.
+
+Categoriseer de elementen volgens STABU hoofdstukken:
+1. Voorbereiding en algemeen
+2. Grondwerk
+3. Betonwerk
+4. Metselwerk
+5. Hout- en kunststofbouw
+6. etc.
+
+Voor elk element, geef:
+- Type element
+- Afmetingen
+- Geschatte hoeveelheid
+- Material suggesties
+
+Geef het antwoord als JSON met een lijst "elements".
+"""
+
 
 class AnalysisType(str, Enum):
     DOCUMENT_CLASSIFICATION = "document_classification"
@@ -42,6 +77,9 @@ class AIOrchestrator:
         self.llm_client = LLMClient()
         self.vision_client = VisionClient()
         
+        # Extractie en structurering van meerdere pagina's/documenten in één request
+        self.batcher = LLMBatcher(self.llm_client)
+        
         # Configuration for task routing
         self.task_routing = {
             AnalysisType.DOCUMENT_CLASSIFICATION: {
@@ -144,7 +182,7 @@ class AIOrchestrator:
     
     async def _classify_document(self, request: AIRequest) -> Dict[str, Any]:
         """Classificeer document type"""
-        from ..core.document_processor import DocumentType
+        from ..models.document_type import DocumentType
         
         # Gebruik vision voor beeldbestanden, text voor andere
         if isinstance(request.input_data, str) and request.input_data.endswith(('.png', '.jpg', '.jpeg', '.pdf')):
@@ -197,31 +235,23 @@ class AIOrchestrator:
         }
     
     async def _extract_text(self, request: AIRequest) -> Dict[str, Any]:
-        """Extraheer gestructureerde tekst uit documenten"""
-        prompt = f"""
-        Extraheer alle relevante informatie uit het volgende document voor bouwkosten calculatie.
-        Structureer de informatie volgens deze categorieën:
-        1. Algemene informatie (locatie, type gebouw, jaar)
-        2. Constructie elementen (muren, vloeren, daken)
-        3. Materialen genoemde materialen)
-        4. Afmetingen (oppervlakten, volumes, afmetingen)
-        5. Bijzonderheden (speciale eisen, beperkingen)
-        6. Data (data, termijnen, voorwaarden)
-        
-        Document: {request.input_data}
-        
-        Geef het antwoord als JSON met de bovenstaande categorieën als keys.
         """
+        Extraheer gestructureerde tekst uit documenten
         
-        response = await self.llm_client.complete(
-            prompt=prompt,
-            provider=request.provider_preference or LLMProvider.ANTHROPIC,
-            temperature=0.1,
-            response_format="json"
+        Gelijktijdige aanroepen (pagina's, documenten) worden gebundeld tot
+        één LLM request; het antwoord per document komt terug als extracted_data.
+        """
+        if isinstance(request, dict):
+            request = AIRequest(**request)
+        
+        extracted_data = await self.batcher.submit(
+            request.input_data,
+            EXTRACTION_INSTRUCTION,
+            provider=request.provider_preference or LLMProvider.ANTHROPIC
         )
         
         return {
-            "extracted_data": response,
+            "extracted_data": extracted_data,
             "confidence": 0.85,
             "structure_verified": True
         }
@@ -231,33 +261,14 @@ class AIOrchestrator:
         # Gebruik vision AI voor beeldanalyse
         drawing_analysis = await self.vision_client.analyze_drawing(request.input_data)
         
-        # Gebruik LLM om de vision output te structureren
-        structure_prompt = f"""
-        Structureer de volgende tekeninganalyse voor STABU calculatie:
-        
-        {drawing_analysis}
-        
-        Categoriseer de elementen volgens STABU hoofdstukken:
-        1. Voorbereiding en algemeen
-        2. Grondwerk
-        3. Betonwerk
-        4. Metselwerk
-        5. Hout- en kunststofbouw
-        6. etc.
-        
-        Voor elk element, geef:
-        - Type element
-        - Afmetingen
-        - Geschatte hoeveelheid
-        - Material suggesties
-        """
-        
-        structured_analysis = await self.llm_client.complete(
-            prompt=structure_prompt,
-            provider=request.provider_preference or LLMProvider.GEMINI,
-            temperature=0.1,
-            response_format="json"
+        # Gebruik LLM om de vision output te structureren (gebundeld met andere tekeningen)
+        structured_analysis = await self.batcher.submit(
+            drawing_analysis,
+            DRAWING_STRUCTURE_INSTRUCTION,
+            provider=request.provider_preference or LLMProvider.GEMINI
         )
+        if not isinstance(structured_analysis, dict):
+            structured_analysis = {"elements": structured_analysis}
         
         return {
             "drawing_analysis": drawing_analysis,
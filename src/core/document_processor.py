@@ -1,31 +1,23 @@
 import asyncio
 import logging
-from enum import Enum
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 
 from pydantic import BaseModel, Field
 from .ai_orchestrator import AIOrchestrator
+from ..models.document_type import DocumentType
 from ..analyzers.drawing_analyzer import DrawingAnalyzer
 from ..analyzers.report_analyzer import ReportAnalyzer
 from ..analyzers.permit_analyzer import PermitAnalyzer
 from ..analyzers.cost_analyzer import CostAnalyzer
 from ..database.supabase_client import SupabaseClient
+from ..database.calculation_store import CalculationStore
 from ..utils.file_handler import FileHandler
 
 logger = logging.getLogger(__name__)
 
 
-class DocumentType(str, Enum):
-    DRAWING = "drawing"
-    TAXATION_REPORT = "taxation_report"
-    ASBESTOS_REPORT = "asbestos_report"
-    PERMIT = "permit"
-    ENVIRONMENTAL_PERMIT = "environmental_permit"
-    OTHER = "other"
-
-
 class UploadedDocument(BaseModel):
     id: str
     filename: str
@@ -63,6 +55,7 @@ class DocumentProcessor:
         self.supabase = supabase_client or SupabaseClient()
         self.ai_orchestrator = AIOrchestrator()
         self.file_handler = FileHandler()
+        self.calculation_store = CalculationStore(self.supabase)
         
         # Initialiseer alle analyzers
         self.drawing_analyzer = DrawingAnalyzer(self.ai_orchestrator)
@@ -161,6 +154,10 @@ class DocumentProcessor:
         """Detecteer het type document met AI"""
         filename = Path(file_path).name.lower()
         
+        # Staten en begrotingen zijn ook PDF's, maar gaan via de tabellen naar de calculatie
+        if any(word in filename for word in ['begroting', 'hoeveelhedenstaat', 'prijsstaat', 'staat_van', 'staat van']):
+            return DocumentType.BILL_OF_QUANTITIES
+        
         # Eerst op basis van bestandsnaam
         if any(ext in filename for ext in ['.dwg', '.dxf', '.ifc', '.rvt', '.pdf']):
             # Controleer of het een tekening is
@@ -206,15 +203,19 @@ class DocumentProcessor:
         start_time = datetime.now()
         
         try:
-            # Selecteer de juiste analyzer
-            analyzer = self.analyzer_map.get(document.document_type, self.report_analyzer)
-            
-            # Voer analyse uit
-            analysis_result = await analyzer.analyze(
-                document.file_path,
-                document.document_type,
-                project_context
-            )
+            if document.document_type == DocumentType.BILL_OF_QUANTITIES:
+                # Posten met eigen eenheid en prijs uit de tabellen
+                analysis_result = await self._analyze_bill_of_quantities(document)
+            else:
+                # Selecteer de juiste analyzer
+                analyzer = self.analyzer_map.get(document.document_type, self.report_analyzer)
+                
+                # Voer analyse uit
+                analysis_result = await analyzer.analyze(
+                    document.file_path,
+                    document.document_type,
+                    project_context
+                )
             
             processing_time = (datetime.now() - start_time).total_seconds()
             
@@ -236,6 +237,25 @@ class DocumentProcessor:
             logger.error(f"Error processing {document.filename}: {e}")
             raise
     
+    async def _analyze_bill_of_quantities(self, document: UploadedDocument) -> Dict[str, Any]:
+        """Lees de posten van een staat of begroting voor de calculatie"""
+        cost_elements = await self.cost_analyzer.extract_table_elements(document.file_path)
+        priced = sum(
+            1 for element in cost_elements
+            if element.get("unit_price") is not None or element.get("total_price") is not None
+        )
+        
+        warnings = []
+        if not cost_elements:
+            warnings.append("Geen posten gevonden in de tabellen van dit document")
+        
+        return {
+            "summary": f"{len(cost_elements)} posten uit staat/begroting, waarvan {priced} geprijsd",
+            "data": {"cost_elements": cost_elements},
+            "confidence": 0.9 if cost_elements else 0.0,
+            "warnings": warnings
+        }
+    
     async def _generate_consolidated_calculation(
         self,
         analysis_results: List[DocumentAnalysisResult],
@@ -273,11 +293,11 @@ class DocumentProcessor:
                     analysis_result=result.dict()
                 )
             
-            # Sla de geconsolideerde calculatie op
-            await self.supabase.insert_calculation(
+            # Sla de geconsolideerde calculatie op als nieuwe versie van de laatste
+            # calculatie van het project (alleen nieuwe posten en de delta)
+            await self.calculation_store.save(
                 project_id=project_context.project_id,
-                calculation_data=consolidated_calculation,
-                version="1.0"
+                calculation_data=consolidated_calculation
             )
             
             logger.info(f"Stored results for project {project_context.project_id}")
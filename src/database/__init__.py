@@ -2,9 +2,21 @@
 Database client modules
 """
 
-from .supabase_client import SupabaseClient, get_supabase_client
+import importlib
+from typing import Any
 
-__all__ = [
-    "SupabaseClient",
-    "get_supabase_client",
-]
+# Exports worden pas bij gebruik geïmporteerd, zodat losse submodules
+# importeerbaar blijven zonder de afhankelijkheden van de Supabase client
+_EXPORTS = {
+    "SupabaseClient": ".supabase_client",
+    "get_supabase_client": ".supabase_client",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module, __name__), name)
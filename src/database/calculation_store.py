@@ -0,0 +1,402 @@
+import hashlib
+import json
+import logging
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# Elke zoveelste versie een volledig manifest, zodat reconstructie begrensd blijft
+CHECKPOINT_INTERVAL = 20
+
+# Inhoud van calculations.calculation_data voor een reeks: de calculatie zelf
+# staat in calculation_versions en wordt niet nog eens volledig weggeschreven
+SERIES_STUB = {"storage": "calculation_versions"}
+
+# Velden die een post in een lijst identificeren (stabiel pad bij invoegen/verwijderen)
+ITEM_KEYS = ("item_code", "id", "code", "stabu_code")
+
+
+def canonical_json(value: Any) -> str:
+    """Deterministische JSON (gesorteerde sleutels) voor hashing"""
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def content_hash(value: Any) -> str:
+    return hashlib.sha256(canonical_json(value).encode("utf-8")).hexdigest()
+
+
+def _escape(key: str) -> str:
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+def _join(path: str, key: str) -> str:
+    return f"{path}/{_escape(key)}" if path else _escape(key)
+
+
+def _item_keys(items: List[Dict]) -> List[str]:
+    """Stabiele sleutels voor posten: eerste uniek identificerend veld, anders de positie"""
+    for field in ITEM_KEYS:
+        values = [item.get(field) for item in items]
+        if all(isinstance(value, (str, int)) for value in values) and len(set(values)) == len(values):
+            return [f"{field}={value}" for value in values]
+    return [f"#{index}" for index in range(len(items))]
+
+
+def build_manifest(data: Dict[str, Any]) -> Tuple[Dict[str, Dict], Dict[str, Any]]:
+    """
+    Splits calculatiedata in een manifest en content-addressed posten
+    
+    Objecten in lijsten (kostenposten, elementen) worden los opgeslagen
+    onder hun hash; het manifest bevat per pad een scalar ("v"), de
+    volgorde van een object ("d") of lijst ("l"), of een posthash ("h").
+    
+    Returns:
+        (manifest, {hash: post})
+    """
+    manifest: Dict[str, Dict] = {}
+    items: Dict[str, Any] = {}
+    
+    # Via JSON normaliseren (Decimal, datetime → string), zoals het ook opgeslagen wordt
+    data = json.loads(canonical_json(data))
+    
+    def walk(path: str, value: Any):
+        if isinstance(value, dict):
+            manifest[path] = {"d": list(value)}
+            for key, child in value.items():
+                walk(_join(path, key), child)
+        elif isinstance(value, list) and value and all(isinstance(child, dict) for child in value):
+            keys = _item_keys(value)
+            manifest[path] = {"l": keys}
+            for key, child in zip(keys, value):
+                item_hash = content_hash(child)
+                items[item_hash] = child
+                manifest[_join(path, key)] = {"h": item_hash}
+        else:
+            manifest[path] = {"v": value}
+    
+    walk("", data)
+    return manifest, items
+
+
+def manifest_delta(parent: Dict[str, Dict], manifest: Dict[str, Dict]) -> Dict[str, Any]:
+    """Verschil tussen twee manifesten: gewijzigde/nieuwe paden en verwijderde paden"""
+    return {
+        "set": {path: entry for path, entry in manifest.items() if parent.get(path) != entry},
+        "unset": [path for path in parent if path not in manifest]
+    }
+
+
+def apply_delta(manifest: Dict[str, Dict], delta: Dict[str, Any]) -> Dict[str, Dict]:
+    result = dict(manifest)
+    for path in delta.get("unset", []):
+        result.pop(path, None)
+    result.update(delta.get("set", {}))
+    return result
+
+
+class CalculationStore:
+    """
+    Versiebeheer van calculaties met content-addressed posten en delta's.
+    
+    Een nieuwe versie schrijft alleen de posten die nog niet bestaan
+    (calculation_items: hash, data) en het verschil van het manifest t.o.v.
+    de vorige versie (calculation_versions: id, calculation_id, project_id,
+    version, parent_version, delta of snapshot, content_hash). Elke
+    CHECKPOINT_INTERVAL versies wordt het volledige manifest opgeslagen.
+    Diffs en reconstructie gebeuren in deze service; voor een diff worden
+    alleen de gewijzigde posten opgehaald en voor een manifest alleen de
+    versies vanaf de laatste snapshot.
+    
+    Een reeks hoort bij een rij in calculations (calculation_id = calculations.id).
+    Meerdere workers kunnen tegelijk opslaan: de laatste versie wordt vóór het
+    schrijven opnieuw gelezen en (calculation_id, version) is uniek in de
+    database, zodat een verloren race opnieuw op de nieuwe head wordt gebaseerd.
+    Schema: src/database/sql/calculation_store.sql.
+    """
+    
+    def __init__(
+        self,
+        supabase_client: Any,
+        checkpoint_interval: int = CHECKPOINT_INTERVAL,
+        max_cached_items: int = 50000,
+        max_retries: int = 5
+    ):
+        self.supabase = supabase_client
+        self.checkpoint_interval = checkpoint_interval
+        self.max_cached_items = max_cached_items
+        self.max_retries = max_retries
+        
+        self._items: "OrderedDict[str, Any]" = OrderedDict()
+        self._heads: Dict[str, Tuple[int, Dict[str, Dict], str]] = {}  # calculation_id → (versie, manifest, hash); alleen cache
+    
+    async def save(
+        self,
+        project_id: str,
+        calculation_data: Dict[str, Any],
+        calculation_id: Optional[str] = None,
+        created_by: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Sla een (nieuwe versie van een) calculatie op
+        
+        Args:
+            project_id: Project ID
+            calculation_data: Volledige calculatie
+            calculation_id: Bestaande calculatie; None vervolgt de laatste reeks van
+                het project, of maakt een nieuwe calculations rij aan
+            created_by: Gebruiker
+        
+        Returns:
+            calculation_id, version, version_id, changed (False als de inhoud gelijk was), new_items
+        """
+        manifest, items = build_manifest(calculation_data)
+        manifest_hash = content_hash(manifest)
+        
+        if calculation_id is None:
+            calculation_id = await self.latest_series(project_id)
+        if calculation_id is None:
+            calculation_id = await self.supabase.insert_calculation(
+                project_id=project_id,
+                calculation_data=dict(SERIES_STUB),
+                version="1",
+                created_by=created_by
+            )
+        
+        written = 0
+        for _ in range(self.max_retries):
+            # Head altijd opnieuw lezen; een andere worker kan intussen een versie geschreven hebben
+            head = await self._head(calculation_id)
+            if head is not None and head[2] == manifest_hash:
+                return {
+                    "calculation_id": calculation_id,
+                    "version": head[0],
+                    "version_id": None,
+                    "changed": False,
+                    "new_items": written
+                }
+            
+            parent_version, parent_manifest = (head[0], head[1]) if head else (0, {})
+            version = parent_version + 1
+            
+            # Alleen posten die de vorige versie nog niet had kunnen nieuw zijn;
+            # posten zijn content-addressed, dus opnieuw schrijven bij een retry is onschadelijk
+            known = {entry["h"] for entry in parent_manifest.values() if "h" in entry}
+            new_items = {item_hash: item for item_hash, item in items.items() if item_hash not in known}
+            written += await self.supabase.insert_calculation_items(new_items)
+            for item_hash, item in items.items():
+                self._cache_item(item_hash, item)
+            
+            row = {
+                "id": f"calv_{uuid.uuid4().hex}",
+                "calculation_id": calculation_id,
+                "project_id": project_id,
+                "version": version,
+                "parent_version": parent_version or None,
+                "content_hash": manifest_hash,
+                "item_count": len(items),
+                "created_at": datetime.now().isoformat(),
+                "created_by": created_by,
+                "is_active": True
+            }
+            if head is None or version % self.checkpoint_interval == 0:
+                row["snapshot"] = manifest
+            else:
+                row["delta"] = manifest_delta(parent_manifest, manifest)
+            
+            version_id = await self.supabase.insert_calculation_version(row)
+            if version_id is None:
+                # Versienummer al bezet: race verloren, opnieuw op de nieuwe head
+                logger.info(f"Calculation {calculation_id} v{version} was written concurrently, retrying")
+                self._heads.pop(calculation_id, None)
+                continue
+            
+            self._heads[calculation_id] = (version, manifest, manifest_hash)
+            await self.supabase.update_calculation(calculation_id, {"version": str(version)})
+            
+            logger.info(f"Calculation {calculation_id} v{version} saved ({written} new items)")
+            return {
+                "calculation_id": calculation_id,
+                "version": version,
+                "version_id": version_id,
+                "changed": True,
+                "new_items": written
+            }
+        
+        raise RuntimeError(f"Could not save calculation {calculation_id}: version conflict after {self.max_retries} attempts")
+    
+    async def latest_series(self, project_id: str) -> Optional[str]:
+        """Meest recente actieve calculatie (reeks) van een project"""
+        for row in await self.supabase.get_project_calculations(project_id):
+            if row.get("is_active", True):
+                return row["id"]
+        return None
+    
+    async def load(self, calculation_id: str, version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Reconstrueer een versie (standaard de laatste)"""
+        resolved = await self.manifest(calculation_id, version)
+        if resolved is None:
+            return None
+        
+        manifest = resolved[1]
+        await self._fetch_items([entry["h"] for entry in manifest.values() if "h" in entry])
+        return self._assemble(manifest, "")
+    
+    async def manifest(
+        self,
+        calculation_id: str,
+        version: Optional[int] = None
+    ) -> Optional[Tuple[int, Dict[str, Dict]]]:
+        """Manifest van een versie: laatste snapshot plus de delta's daarna"""
+        if version is None:
+            head = await self._head(calculation_id)
+            return (head[0], head[1]) if head is not None else None
+        
+        # Versies zijn onveranderlijk, dus een gecachte head met hetzelfde nummer is geldig
+        head = self._heads.get(calculation_id)
+        if head is not None and version == head[0]:
+            return head[0], head[1]
+        
+        rows = await self._version_rows(calculation_id, version)
+        if not rows:
+            return None
+        return rows[-1]["version"], self._replay(rows)
+    
+    async def diff(
+        self,
+        calculation_id: str,
+        from_version: int,
+        to_version: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Structureel verschil tussen twee versies
+        
+        Args:
+            calculation_id: Calculatie
+            from_version: Oude versie
+            to_version: Nieuwe versie (standaard de laatste)
+        
+        Returns:
+            added/removed/changed per pad; bij gewijzigde posten ook de gewijzigde velden
+        """
+        old = await self.manifest(calculation_id, from_version)
+        new = await self.manifest(calculation_id, to_version)
+        if old is None or new is None:
+            raise ValueError(f"Unknown calculation version for {calculation_id}")
+        
+        delta = manifest_delta(old[1], new[1])
+        changed_hashes = [
+            entry["h"] for manifest in (old[1], new[1]) for path, entry in manifest.items()
+            if "h" in entry and (path in delta["set"] or path in delta["unset"])
+        ]
+        await self._fetch_items(changed_hashes)
+        
+        result = {"from_version": old[0], "to_version": new[0], "added": [], "removed": [], "changed": []}
+        for path, entry in delta["set"].items():
+            if "d" in entry or "l" in entry:
+                continue  # alleen volgorde/structuur; kinderen staan apart in de delta
+            after = self._value(entry)
+            if path not in old[1]:
+                result["added"].append({"path": path, "value": after})
+                continue
+            before = self._value(old[1][path])
+            change = {"path": path, "before": before, "after": after}
+            if isinstance(before, dict) and isinstance(after, dict):
+                change["fields"] = {
+                    field: {"before": before.get(field), "after": after.get(field)}
+                    for field in set(before) | set(after)
+                    if before.get(field) != after.get(field)
+                }
+            result["changed"].append(change)
+        
+        for path in delta["unset"]:
+            entry = old[1][path]
+            if "d" not in entry and "l" not in entry:
+                result["removed"].append({"path": path, "value": self._value(entry)})
+        
+        return result
+    
+    async def history(self, calculation_id: str) -> List[Dict[str, Any]]:
+        """Versie-overzicht met het aantal gewijzigde paden per versie"""
+        rows = await self.supabase.get_calculation_versions(calculation_id)
+        return [
+            {
+                "version": row["version"],
+                "version_id": row["id"],
+                "created_at": row.get("created_at"),
+                "created_by": row.get("created_by"),
+                "item_count": row.get("item_count"),
+                "snapshot": row.get("snapshot") is not None,
+                "changes": len((row.get("delta") or {}).get("set", {})) + len((row.get("delta") or {}).get("unset", []))
+            }
+            for row in rows
+        ]
+    
+    async def _head(self, calculation_id: str) -> Optional[Tuple[int, Dict[str, Dict], str]]:
+        """Laatste versie uit de database; het manifest komt uit de cache als die nog actueel is"""
+        latest = await self.supabase.get_latest_calculation_version(calculation_id)
+        if latest is None:
+            self._heads.pop(calculation_id, None)
+            return None
+        
+        cached = self._heads.get(calculation_id)
+        if cached is not None and cached[0] == latest["version"]:
+            return cached
+        
+        rows = await self._version_rows(calculation_id, latest["version"])
+        if not rows:
+            return None
+        head = (rows[-1]["version"], self._replay(rows), rows[-1]["content_hash"])
+        self._heads[calculation_id] = head
+        return head
+    
+    async def _version_rows(self, calculation_id: str, version: int) -> List[Dict[str, Any]]:
+        """Versierijen vanaf de laatste snapshot t/m een versie (niet de hele geschiedenis)"""
+        snapshot = await self.supabase.get_latest_snapshot_version(calculation_id, up_to=version)
+        if snapshot is None:
+            return []
+        return await self.supabase.get_calculation_versions(
+            calculation_id, up_to=version, from_version=snapshot
+        )
+    
+    def _replay(self, rows: List[Dict[str, Any]]) -> Dict[str, Dict]:
+        """Manifest uit versierijen: laatste snapshot plus de delta's daarna"""
+        start = max(index for index, row in enumerate(rows) if row.get("snapshot") is not None)
+        manifest = dict(rows[start]["snapshot"])
+        for row in rows[start + 1:]:
+            manifest = apply_delta(manifest, row.get("delta") or {})
+        return manifest
+    
+    async def _fetch_items(self, hashes: List[str]):
+        missing = list({item_hash for item_hash in hashes if item_hash not in self._items})
+        if missing:
+            for item_hash, item in (await self.supabase.get_calculation_items(missing)).items():
+                self._cache_item(item_hash, item)
+    
+    def _cache_item(self, item_hash: str, item: Any):
+        self._items[item_hash] = item
+        self._items.move_to_end(item_hash)
+        while len(self._items) > self.max_cached_items:
+            self._items.popitem(last=False)
+    
+    def _value(self, entry: Dict[str, Any]) -> Any:
+        if "h" in entry:
+            return self._items.get(entry["h"])
+        return entry.get("v")
+    
+    def _assemble(self, manifest: Dict[str, Dict], path: str) -> Any:
+        entry = manifest[path]
+        if "d" in entry:
+            return {key: self._assemble(manifest, _join(path, key)) for key in entry["d"]}
+        if "l" in entry:
+            return [self._value(manifest[_join(path, key)]) for key in entry["l"]]
+        return self._value(entry)
+
+
+# Factory functie
+def get_calculation_store(supabase_client: Any, **kwargs: Any) -> CalculationStore:
+    """Factory om CalculationStore instantie te maken"""
+    return CalculationStore(supabase_client, **kwargs)
@@ -0,0 +1,434 @@
+import asyncio
+import logging
+import math
+import re
+import time
+from bisect import bisect_right, insort
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, List, Optional, Any, Iterable, Tuple
+
+from .supabase_client import STABUPrice
+from .stabu_search import STABUSearchIndex
+
+logger = logging.getLogger(__name__)
+
+
+# Vereenvoudigde STABU 2024 eenheidsprijzen: startwaarden zonder database (ontwikkeling, tests)
+DEFAULT_STABU_PRICES = {
+    # Grondwerk (Hoofdstuk 2)
+    "2.1": {"description": "Grondverzet per m3", "unit": "m3", "price": Decimal('25.00'), "category": "grondwerk"},
+    "2.2": {"description": "Ophoging zand", "unit": "m3", "price": Decimal('45.00'), "category": "grondwerk"},
+    
+    # Betonwerk (Hoofdstuk 3)
+    "3.1": {"description": "Fundering C20/25", "unit": "m3", "price": Decimal('145.00'), "category": "betonwerk"},
+    "3.2": {"description": "Vloer C25/30", "unit": "m3", "price": Decimal('165.00'), "category": "betonwerk"},
+    
+    # Metselwerk (Hoofdstuk 4)
+    "4.1": {"description": "Gevelsteen 10x20x50", "unit": "m2", "price": Decimal('85.00'), "category": "metselwerk"},
+    "4.2": {"description": "Binnenwand blokken", "unit": "m2", "price": Decimal('45.00'), "category": "metselwerk"},
+    
+    # Houtwerk (Hoofdstuk 5)
+    "5.1": {"description": "Draagbalk gelamineerd", "unit": "m", "price": Decimal('125.00'), "category": "houtwerk"},
+    "5.2": {"description": "Vloerbalk Vuren", "unit": "m", "price": Decimal('35.00'), "category": "houtwerk"},
+    
+    # Dakwerk (Hoofdstuk 6)
+    "6.1": {"description": "Dakpannen", "unit": "m2", "price": Decimal('75.00'), "category": "dakwerk"},
+    "6.2": {"description": "Isolatie dak", "unit": "m2", "price": Decimal('65.00'), "category": "dakwerk"},
+}
+
+CODE_SEPARATORS = re.compile(r"[.\-\s]+")
+
+# Element type moet minstens als kern van een samenstelling matchen (zie STABUSearchIndex)
+ELEMENT_MATCH_SIMILARITY = 0.7
+
+# Minimale zoekscore voor automatische element → code mapping
+MIN_MATCH_SCORE = 0.5
+
+
+def split_code(code: str) -> Tuple[str, ...]:
+    """STABU code in segmenten: '21.12.10-a' → ('21', '12', '10', 'a')"""
+    return tuple(part for part in CODE_SEPARATORS.split(code.strip().lower()) if part)
+
+
+def _timestamp(value: Optional[Any], default: float) -> float:
+    """Peildatum (datetime, date of ISO string) als timestamp; een date telt vanaf middernacht"""
+    if value is None:
+        return default
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    elif isinstance(value, date) and not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    return value.timestamp()
+
+
+def _datetime(stamp: float) -> Optional[datetime]:
+    return datetime.fromtimestamp(stamp) if math.isfinite(stamp) else None
+
+
+class _CodePrices:
+    """Alle prijsversies van één code, gesorteerd op valid_from"""
+    
+    __slots__ = ("starts", "ends", "prices", "unit", "description", "category", "subcategory")
+    
+    def __init__(self):
+        self.starts: List[float] = []
+        self.ends: List[float] = []
+        self.prices: List[Decimal] = []
+        self.unit = "stuk"
+        self.description = ""
+        self.category = ""
+        self.subcategory = None
+    
+    def add(self, start: float, end: float, price: Decimal):
+        index = bisect_right(self.starts, start)
+        if index and self.starts[index - 1] == start:
+            # Zelfde versie opnieuw geladen: bijwerken
+            self.ends[index - 1] = end
+            self.prices[index - 1] = price
+            return
+        self.starts.insert(index, start)
+        self.ends.insert(index, end)
+        self.prices.insert(index, price)
+    
+    def remove(self, start: float):
+        index = bisect_right(self.starts, start) - 1
+        if index >= 0 and self.starts[index] == start:
+            del self.starts[index], self.ends[index], self.prices[index]
+    
+    def version_at(self, moment: float) -> int:
+        """Index van de versie die op het moment geldig is, -1 als geen (O(log v))"""
+        index = bisect_right(self.starts, moment) - 1
+        if index < 0 or moment >= self.ends[index]:
+            return -1
+        return index
+    
+    def at(self, moment: float) -> Optional[Decimal]:
+        """Prijs die op het moment geldig is"""
+        index = self.version_at(moment)
+        return self.prices[index] if index >= 0 else None
+
+
+class _TrieNode:
+    __slots__ = ("children", "codes")
+    
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.codes: List[str] = []  # gesorteerde codes in deze subboom
+
+
+class STABUPriceIndex:
+    """
+    In-memory index van de STABU prijzen.
+    
+    De volledige stabu_prices tabel wordt bij de eerste aanroep in één keer
+    geladen: een exacte code map (O(1)), een trie op codesegmenten voor
+    terugval op de dichtstbijzijnde (hoofd)stuk code en per code de
+    geldigheidsintervallen (O(log n) op datum). Verversen gaat incrementeel
+    op updated_at; prijsversies met een toekomstige valid_from worden vooraf
+    geladen en gaan vanzelf gelden. Prijzen opvragen doet geen netwerkaanroepen.
+    """
+    
+    def __init__(
+        self,
+        supabase_client: Optional[Any] = None,
+        refresh_interval: float = 900.0,
+        seed: Optional[Dict[str, Dict[str, Any]]] = None,
+        min_match_score: float = MIN_MATCH_SCORE
+    ):
+        self.supabase_client = supabase_client
+        self.refresh_interval = refresh_interval
+        self.min_match_score = min_match_score
+        
+        self._codes: Dict[str, _CodePrices] = {}
+        self._trie = _TrieNode()
+        self._watermark: Optional[str] = None  # hoogste updated_at die geladen is
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        
+        # Zoekindex over de catalogus, opnieuw opgebouwd als de catalogus wijzigt
+        self._search_index = STABUSearchIndex()
+        self._version = 0
+        self._search_version = -1
+        
+        if seed is None and supabase_client is None:
+            seed = DEFAULT_STABU_PRICES
+        if seed:
+            self.load_mapping(seed)
+    
+    def __len__(self) -> int:
+        return len(self._codes)
+    
+    # === LADEN EN VERVERSEN ===
+    
+    async def ensure_fresh(self):
+        """Laad of ververs de index als die ouder is dan refresh_interval"""
+        if self.supabase_client is None:
+            return
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_interval:
+            return
+        
+        async with self._lock:
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_interval:
+                return
+            await self.refresh()
+    
+    async def refresh(self) -> int:
+        """
+        Haal nieuwe en gewijzigde prijzen op sinds de vorige keer
+        
+        Returns:
+            Aantal verwerkte rijen
+        """
+        try:
+            rows = await self.supabase_client.fetch_stabu_prices(updated_since=self._watermark)
+            if self._watermark is None and rows:
+                # Volledige lading vervangt startwaarden
+                self._codes = {}
+                self._trie = _TrieNode()
+                self._version += 1
+            count = self.load_rows(rows)
+            self._loaded_at = time.monotonic()
+            logger.info(f"STABU price index refreshed: {count} rows, {len(self._codes)} codes")
+            return count
+        
+        except Exception as e:
+            # Bij een storing blijven de geladen prijzen bruikbaar; later opnieuw proberen
+            logger.error(f"STABU price index refresh failed: {e}")
+            if not self._codes:
+                self.load_mapping(DEFAULT_STABU_PRICES)
+            self._loaded_at = time.monotonic()
+            return 0
+    
+    def load_rows(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """Verwerk rijen uit de stabu_prices tabel (inactieve rijen verwijderen een versie)"""
+        count = 0
+        for row in rows:
+            try:
+                price = STABUPrice(**row)
+                start = _timestamp(price.valid_from, -math.inf)
+                
+                if row.get("is_active", True) is False:
+                    entry = self._codes.get(price.code)
+                    if entry is not None:
+                        entry.remove(start)
+                        self._version += 1
+                else:
+                    self._add(
+                        price.code,
+                        start,
+                        _timestamp(price.valid_to, math.inf),
+                        Decimal(str(price.price)),
+                        price.unit,
+                        price.description,
+                        price.category,
+                        price.subcategory
+                    )
+                
+                stamp = row.get("updated_at")
+                if isinstance(stamp, datetime):
+                    stamp = stamp.isoformat()
+                if stamp and (self._watermark is None or stamp > self._watermark):
+                    self._watermark = stamp
+                count += 1
+            
+            except Exception as e:
+                logger.warning(f"Error parsing STABU price {row.get('code')}: {e}")
+        
+        return count
+    
+    def load_mapping(self, mapping: Dict[str, Dict[str, Any]]):
+        """Laad prijzen uit een dict {code: {description, unit, price, ...}} (onbeperkt geldig)"""
+        for code, data in mapping.items():
+            self._add(
+                code,
+                -math.inf,
+                math.inf,
+                Decimal(str(data["price"])),
+                data.get("unit", "stuk"),
+                data.get("description", ""),
+                data.get("category", ""),
+                data.get("subcategory")
+            )
+    
+    def _add(
+        self,
+        code: str,
+        start: float,
+        end: float,
+        price: Decimal,
+        unit: str,
+        description: str,
+        category: str,
+        subcategory: Optional[str] = None
+    ):
+        entry = self._codes.get(code)
+        if entry is None:
+            entry = self._codes[code] = _CodePrices()
+            self._insert_trie(code)
+        
+        entry.add(start, end, price)
+        if start >= entry.starts[-1]:
+            # Omschrijving en eenheid van de nieuwste versie
+            entry.unit, entry.description, entry.category = unit, description, category
+            entry.subcategory = subcategory
+        self._version += 1
+    
+    def _insert_trie(self, code: str):
+        node = self._trie
+        for segment in split_code(code):
+            node = node.children.setdefault(segment, _TrieNode())
+            insort(node.codes, code)
+    
+    # === OPVRAGEN ===
+    
+    def price(self, code: str, at: Optional[datetime] = None) -> Optional[Decimal]:
+        """Prijs van precies deze code op de datum (standaard nu)"""
+        entry = self._codes.get(code)
+        if entry is None:
+            return None
+        return entry.at(_timestamp(at, time.time()))
+    
+    def lookup(self, code: str, at: Optional[datetime] = None) -> Optional[Tuple[str, Decimal]]:
+        """
+        Prijs voor een code, met terugval op de dichtstbijzijnde bovenliggende code
+        
+        Args:
+            code: STABU code (bijv. '21.12.10' of '3.7')
+            at: Peildatum (datetime, date of ISO string), standaard nu
+        
+        Returns:
+            Tuple van (gebruikte code, prijs), of None als ook het hoofdstuk onbekend is
+        """
+        match = self.lookup_version(code, at)
+        return (match[0], match[1]) if match is not None else None
+    
+    def lookup_version(
+        self,
+        code: str,
+        at: Optional[datetime] = None
+    ) -> Optional[Tuple[str, Decimal, Optional[datetime]]]:
+        """
+        Als lookup(), plus de ingangsdatum van de gebruikte prijsversie
+        
+        Returns:
+            Tuple van (gebruikte code, prijs, valid_from), valid_from is None
+            voor prijzen zonder begindatum (startwaarden)
+        """
+        moment = _timestamp(at, time.time())
+        
+        entry = self._codes.get(code)
+        if entry is not None:
+            version = entry.version_at(moment)
+            if version >= 0:
+                return code, entry.prices[version], _datetime(entry.starts[version])
+        
+        # Diepste gemeenschappelijke prefix in de trie, daarna naar boven
+        path = []
+        node = self._trie
+        for segment in split_code(code):
+            node = node.children.get(segment)
+            if node is None:
+                break
+            path.append(node)
+        
+        for node in reversed(path):
+            for candidate in node.codes:
+                entry = self._codes[candidate]
+                version = entry.version_at(moment)
+                if version >= 0:
+                    return candidate, entry.prices[version], _datetime(entry.starts[version])
+        return None
+    
+    def info(self, code: str) -> Optional[Dict[str, Any]]:
+        """Omschrijving, eenheid en categorie van de nieuwste versie"""
+        entry = self._codes.get(code)
+        if entry is None:
+            return None
+        return {"description": entry.description, "unit": entry.unit, "category": entry.category}
+    
+    # === ZOEKEN ===
+    
+    def search(
+        self,
+        query: str,
+        limit: int = 20,
+        category: Optional[str] = None,
+        at: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Zoek in de catalogus op code of omschrijving (lokaal, geschikt voor typeahead)
+        
+        Args:
+            query: Zoektekst of begin van een code
+            limit: Maximaal aantal resultaten
+            category: Alleen deze categorie
+            at: Peildatum voor de getoonde prijs, standaard nu
+        
+        Returns:
+            Catalogusregels met prijs en score, best passend eerst
+        """
+        results = self._search().search(query, limit=limit, category=category)
+        for result in results:
+            price = self.price(result["code"], at)
+            result["price"] = float(price) if price is not None else None
+        return results
+    
+    def best_code(self, element_type: Optional[str], material: Optional[str] = None) -> Optional[str]:
+        """
+        Beste STABU code voor een element op basis van type en materiaal
+        
+        Een regel komt alleen in aanmerking als het element type er direct in
+        voorkomt (exact, synoniem of als kern van een samenstelling: wand in
+        binnenwand, niet vloer in vloerbalk) en, als het materiaal bekend is,
+        ook het materiaal. Anders None, zodat de aanroeper terugvalt op zijn
+        eigen regels.
+        
+        Returns:
+            Code van de best passende catalogusregel, of None zonder match
+        """
+        if not element_type:
+            return None
+        
+        words = element_type.replace("_", " ").split()
+        material_words = (material or "").replace("_", " ").split()
+        weights = [1.0] * len(words) + [0.5] * len(material_words)
+        
+        search = self._search()
+        eligible = search.score(" ".join(words), min_similarity=ELEMENT_MATCH_SIMILARITY) > 0
+        if material_words:
+            eligible &= search.score(" ".join(material_words)) > 0
+        
+        match = search.best_match(
+            " ".join(words + material_words),
+            weights=weights,
+            eligible=eligible,
+            min_score=self.min_match_score
+        )
+        return match["code"] if match else None
+    
+    def catalogue(self) -> List[Dict[str, Any]]:
+        """Alle codes met omschrijving, eenheid en categorie (nieuwste versie)"""
+        return [
+            {
+                "code": code,
+                "description": entry.description,
+                "unit": entry.unit,
+                "category": entry.category,
+                "subcategory": entry.subcategory
+            }
+            for code, entry in self._codes.items()
+            if entry.starts
+        ]
+    
+    def _search(self) -> STABUSearchIndex:
+        if self._search_version != self._version:
+            self._search_index.build(self.catalogue())
+            self._search_version = self._version
+        return self._search_index
+
+
+# Factory functie
+def get_stabu_price_index(**kwargs: Any) -> STABUPriceIndex:
+    """Factory om STABUPriceIndex instantie te maken"""
+    return STABUPriceIndex(**kwargs)
@@ -0,0 +1,28 @@
+-- Tabellen voor CalculationStore (src/database/calculation_store.py)
+
+create table if not exists calculation_items (
+  hash text primary key,
+  data jsonb not null,
+  created_at timestamptz default now()
+);
+
+create table if not exists calculation_versions (
+  id text primary key,
+  calculation_id text not null references calculations (id),
+  project_id text,
+  version integer not null,
+  parent_version integer,
+  snapshot jsonb,
+  delta jsonb,
+  content_hash text not null,
+  item_count integer,
+  created_at timestamptz default now(),
+  created_by text,
+  is_active boolean default true,
+  unique (calculation_id, version)
+);
+
+-- Laatste snapshot vóór een versie opzoeken zonder de delta's te lezen
+create index if not exists calculation_versions_snapshots
+  on calculation_versions (calculation_id, version)
+  where snapshot is not null;
@@ -0,0 +1,335 @@
+import logging
+import re
+import unicodedata
+from bisect import bisect_left
+from typing import Dict, List, Optional, Any, Iterable, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+# Woorden zonder onderscheidend vermogen
+STOPWORDS = {
+    "de", "het", "een", "en", "of", "van", "voor", "met", "in", "op", "aan", "per", "tot", "incl", "excl",
+    "the", "a", "an", "and", "or", "of", "for", "with", "in", "on", "to", "per",
+}
+
+# Engelse element types (uit vision/LLM) naar Nederlandse STABU terminologie
+SYNONYMS = {
+    "wall": ("muur", "wand"),
+    "load": ("dragend",),
+    "bearing": ("dragend",),
+    "window": ("raam", "kozijn"),
+    "door": ("deur",),
+    "floor": ("vloer",),
+    "roof": ("dak",),
+    "foundation": ("fundering",),
+    "insulation": ("isolatie",),
+    "concrete": ("beton",),
+    "brick": ("baksteen", "metselwerk"),
+    "masonry": ("metselwerk",),
+    "wood": ("hout",),
+    "timber": ("hout",),
+    "steel": ("staal",),
+    "metal": ("staal", "metaal"),
+    "column": ("kolom",),
+    "beam": ("balk",),
+    "stairs": ("trap",),
+    "facade": ("gevel",),
+    "excavation": ("grondwerk", "ontgraven"),
+    "sand": ("zand",),
+    "tiles": ("pannen", "tegels"),
+    "paint": ("schilderwerk",),
+    "plaster": ("stucwerk",),
+}
+
+# Veldgewichten: code zwaarst, categorieën licht
+FIELD_WEIGHTS = {"code": 3.0, "description": 1.0, "category": 0.5, "subcategory": 0.5}
+
+CODE_QUERY = re.compile(r"^\d+(?:[.\-]\w*)*$")
+
+
+def normalize(text: str) -> str:
+    """Kleine letters, zonder accenten (ë → e)"""
+    text = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in text if not unicodedata.combining(char))
+
+
+def tokenize(text: str) -> List[str]:
+    """Tokens zonder stopwoorden, met eenvoudige stam voor meervouden (muren → mur, deuren → deur)"""
+    tokens = []
+    for token in re.findall(r"[a-z0-9]+", normalize(text or "")):
+        if token in STOPWORDS or len(token) < 2:
+            continue
+        tokens.append(stem(token))
+    return tokens
+
+
+def stem(token: str) -> str:
+    if token.isdigit() or len(token) <= 4:
+        return token
+    for suffix in ("en", "es", "s"):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 4:
+            return token[:-len(suffix)]
+    return token
+
+
+def trigrams(token: str) -> set:
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class STABUSearchIndex:
+    """
+    Lokale zoekindex over de STABU catalogus (code, omschrijving, categorie).
+    
+    Ranking met BM25 over gewogen velden. Woorden matchen ook als deel van
+    een samenstelling (wand → binnenwand), onbekende woorden via een trigram
+    index fuzzy (tikfouten) en het laatste
+    woord van de zoekvraag ook als prefix (typeahead). Engelse element types
+    worden via synoniemen naar Nederlandse termen vertaald.
+    """
+    
+    def __init__(self, k1: float = 1.2, b: float = 0.75, min_similarity: float = 0.45):
+        self.k1 = k1
+        self.b = b
+        self.min_similarity = min_similarity
+        
+        self.entries: List[Dict[str, Any]] = []
+        self._codes: List[str] = []          # gesorteerd, voor code prefix zoeken
+        self._code_docs: List[int] = []
+        self._vocabulary: Dict[str, int] = {}
+        self._terms: List[str] = []          # gesorteerd, voor prefix zoeken
+        self._postings: List[Tuple[np.ndarray, np.ndarray]] = []
+        self._idf = np.zeros(0)
+        self._norm = np.zeros(0)
+        self._trigrams: Dict[str, np.ndarray] = {}
+        self._trigram_counts = np.zeros(0)
+        self._compounds: Dict[str, List[Tuple[int, float]]] = {}
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+    
+    def build(self, entries: Iterable[Dict[str, Any]]):
+        """
+        Bouw de index opnieuw op
+        
+        Args:
+            entries: Dicts met code, description, category, subcategory (en verder vrij)
+        """
+        self.entries = list(entries)
+        postings: Dict[str, Dict[int, float]] = {}
+        lengths = np.zeros(len(self.entries))
+        
+        for doc, entry in enumerate(self.entries):
+            for field, weight in FIELD_WEIGHTS.items():
+                value = entry.get(field) or ""
+                tokens = re.split(r"[.\-\s]+", value.lower()) if field == "code" else tokenize(value)
+                for token in tokens:
+                    if token:
+                        postings.setdefault(token, {}).setdefault(doc, 0.0)
+                        postings[token][doc] += weight
+                        lengths[doc] += weight
+        
+        self._vocabulary = {term: i for i, term in enumerate(postings)}
+        self._terms = sorted(postings)
+        self._postings = [
+            (np.fromiter(docs.keys(), dtype=np.int64), np.fromiter(docs.values(), dtype=np.float64))
+            for docs in postings.values()
+        ]
+        
+        count = max(len(self.entries), 1)
+        document_frequency = np.array([len(docs) for docs, _ in self._postings], dtype=np.float64)
+        self._idf = np.log(1 + (count - document_frequency + 0.5) / (document_frequency + 0.5))
+        self._norm = self.k1 * (1 - self.b + self.b * lengths / max(lengths.mean(), 1e-9)) if len(lengths) else lengths
+        
+        # Trigram index over de woordenlijst voor fuzzy matching
+        trigram_terms: Dict[str, List[int]] = {}
+        for term, term_id in self._vocabulary.items():
+            for gram in trigrams(term):
+                trigram_terms.setdefault(gram, []).append(term_id)
+        self._trigrams = {gram: np.array(ids, dtype=np.int64) for gram, ids in trigram_terms.items()}
+        self._trigram_counts = np.array([len(trigrams(term)) for term in self._vocabulary], dtype=np.float64)
+        
+        # Samenstellingen: binnenwand bevat het hoofd 'wand', dakpannen de bepaling 'dak'
+        self._compounds = {}
+        for term, term_id in self._vocabulary.items():
+            if term.isdigit():
+                continue
+            for split in range(3, len(term) - 2):
+                head, modifier = term[split:], term[:split]
+                if len(head) >= 4:
+                    self._compounds.setdefault(head, []).append((term_id, 0.7))
+                self._compounds.setdefault(modifier, []).append((term_id, 0.5))
+        
+        order = sorted(range(len(self.entries)), key=lambda i: self.entries[i].get("code", ""))
+        self._codes = [self.entries[i].get("code", "") for i in order]
+        self._code_docs = order
+        
+        logger.info(f"STABU search index built: {len(self.entries)} entries, {len(self._vocabulary)} terms")
+    
+    def search(
+        self,
+        query: str,
+        limit: int = 20,
+        category: Optional[str] = None,
+        prefix: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Zoek in de catalogus
+        
+        Args:
+            query: Zoektekst of (begin van een) STABU code
+            limit: Maximaal aantal resultaten
+            category: Alleen deze categorie
+            prefix: Laatste woord ook als prefix matchen (typeahead)
+        
+        Returns:
+            Catalogusregels met score, best passend eerst
+        """
+        query = (query or "").strip()
+        if not query or not self.entries:
+            return []
+        
+        if CODE_QUERY.match(query):
+            docs = self._code_prefix(query)
+            if docs:
+                return self._results(docs, np.ones(len(docs)), limit, category)
+        
+        scores = self.score(query, prefix=prefix)
+        hits = np.flatnonzero(scores > 0)
+        if not len(hits):
+            return []
+        return self._results(hits, scores[hits], limit, category)
+    
+    def score(
+        self,
+        query: str,
+        prefix: bool = False,
+        weights: Optional[List[float]] = None,
+        min_similarity: float = 0.0
+    ) -> np.ndarray:
+        """
+        BM25 score per catalogusregel voor de zoekvraag
+        
+        Args:
+            query: Zoektekst
+            prefix: Laatste woord ook als prefix matchen
+            weights: Gewicht per woord van de zoekvraag
+            min_similarity: Alleen termen die minstens zo sterk matchen (1.0 exact/synoniem,
+                0.7 kern van een samenstelling, 0.5 bepaling van een samenstelling)
+        """
+        scores = np.zeros(len(self.entries))
+        words = [token for token in re.findall(r"[a-z0-9]+", normalize(query)) if token not in STOPWORDS]
+        
+        for position, word in enumerate(words):
+            weight = weights[position] if weights and position < len(weights) else 1.0
+            is_last = position == len(words) - 1
+            for term_id, similarity in self._expand(word, prefix and is_last):
+                if similarity < min_similarity:
+                    continue
+                docs, frequency = self._postings[term_id]
+                contribution = self._idf[term_id] * frequency * (self.k1 + 1) / (frequency + self._norm[docs])
+                scores[docs] += weight * similarity * contribution
+        return scores
+    
+    def best_match(
+        self,
+        query: str,
+        weights: Optional[List[float]] = None,
+        eligible: Optional[np.ndarray] = None,
+        min_score: float = 0.0
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Best passende catalogusregel (voor automatische element → code mapping)
+        
+        Args:
+            query: Zoektekst
+            weights: Gewicht per woord van de zoekvraag
+            eligible: Boolean masker per catalogusregel; andere regels tellen niet mee
+            min_score: Minimale score, anders geen match
+        """
+        if not self.entries:
+            return None
+        scores = self.score(query, weights=weights)
+        if eligible is not None:
+            scores = np.where(eligible, scores, 0.0)
+        best = int(np.argmax(scores))
+        if scores[best] <= max(min_score, 0.0):
+            return None
+        return {**self.entries[best], "score": float(scores[best])}
+    
+    def _expand(self, word: str, prefix: bool) -> List[Tuple[int, float]]:
+        """Term ids voor een woord: exact, synoniemen, prefix en fuzzy, met gewicht"""
+        expansions: Dict[int, float] = {}
+        
+        candidates = [stem(word)] + [stem(synonym) for synonym in SYNONYMS.get(word, ())]
+        for candidate in candidates:
+            term_id = self._vocabulary.get(candidate)
+            if term_id is not None:
+                expansions[term_id] = 1.0
+            for term_id, weight in self._compounds.get(candidate, ()):
+                expansions[term_id] = max(expansions.get(term_id, 0.0), weight)
+        
+        if prefix and len(word) >= 2:
+            start = bisect_left(self._terms, word)
+            for term in self._terms[start:start + 20]:
+                if not term.startswith(word):
+                    break
+                term_id = self._vocabulary[term]
+                expansions[term_id] = max(expansions.get(term_id, 0.0), 0.8)
+        
+        if not expansions and len(word) >= 4:
+            for candidate in candidates:
+                for term_id, similarity in self._fuzzy(candidate):
+                    expansions[term_id] = max(expansions.get(term_id, 0.0), similarity)
+        
+        return list(expansions.items())
+    
+    def _fuzzy(self, word: str, top: int = 3) -> List[Tuple[int, float]]:
+        grams = [self._trigrams[gram] for gram in trigrams(word) if gram in self._trigrams]
+        if not grams:
+            return []
+        
+        shared = np.bincount(np.concatenate(grams), minlength=len(self._vocabulary)).astype(np.float64)
+        similarity = shared / (len(trigrams(word)) + self._trigram_counts - shared)
+        best = np.argsort(similarity)[::-1][:top]
+        return [(int(term_id), float(similarity[term_id])) for term_id in best if similarity[term_id] >= self.min_similarity]
+    
+    def _code_prefix(self, query: str) -> List[int]:
+        start = bisect_left(self._codes, query)
+        docs = []
+        for index in range(start, len(self._codes)):
+            if not self._codes[index].startswith(query):
+                break
+            docs.append(self._code_docs[index])
+        return docs
+    
+    def _results(
+        self,
+        docs: Any,
+        scores: np.ndarray,
+        limit: int,
+        category: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        docs = np.asarray(docs, dtype=np.int64)
+        if category:
+            keep = np.array([self.entries[doc].get("category") == category for doc in docs], dtype=bool)
+            docs, scores = docs[keep], scores[keep]
+        
+        if len(docs) > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            docs, scores = docs[top], scores[top]
+        order = np.argsort(-scores, kind="stable")
+        
+        return [
+            {**self.entries[int(docs[i])], "score": round(float(scores[i]), 4)}
+            for i in order
+        ]
+
+
+# Factory functie
+def get_stabu_search_index(**kwargs: Any) -> STABUSearchIndex:
+    """Factory om STABUSearchIndex instantie te maken"""
+    return STABUSearchIndex(**kwargs)
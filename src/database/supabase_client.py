@@ -1,13 +1,16 @@
 import logging
 import os
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, TYPE_CHECKING
 from datetime import datetime
 import json
+import uuid
 
-from supabase import create_client, Client
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
+if TYPE_CHECKING:
+    from supabase import Client
+
 logger = logging.getLogger(__name__)
 
 # Laad environment variabelen
@@ -54,7 +57,11 @@ class SupabaseClient:
         if not self.supabase_url or not self.supabase_key:
             raise ValueError("Supabase URL en Service Key moeten geconfigureerd zijn in .env")
         
-        self.client: Client = create_client(self.supabase_url, self.supabase_key)
+        # SDK pas hier importeren: de modellen in deze module (bijv. STABUPrice)
+        # zijn zo ook bruikbaar zonder de Supabase client te laden
+        from supabase import create_client
+        
+        self.client: "Client" = create_client(self.supabase_url, self.supabase_key)
         logger.info("Supabase client initialized")
     
     async def test_connection(self) -> bool:
@@ -78,7 +85,8 @@ class SupabaseClient:
     ) -> str:
         """Voeg een nieuwe calculatie toe aan de database"""
         try:
-            calculation_id = f"calc_{datetime.now().strftime('%Y%m%d%H%M%S')}_{project_id}"
+            # Suffix voorkomt botsingen bij twee saves in dezelfde seconde
+            calculation_id = f"calc_{datetime.now().strftime('%Y%m%d%H%M%S')}_{project_id}_{uuid.uuid4().hex[:8]}"
             
             data = {
                 "id": calculation_id,
@@ -148,6 +156,113 @@ class SupabaseClient:
         """Deactiveer een calculatie (soft delete)"""
         return await self.update_calculation(calculation_id, {"is_active": False})
     
+    # CALCULATION VERSION STORE
+    async def insert_calculation_items(self, items: Dict[str, Any]) -> int:
+        """
+        Sla content-addressed calculatieposten op (hash → data)
+        
+        Bestaande hashes worden overgeslagen; alleen nieuwe inhoud wordt geschreven.
+        
+        Returns:
+            Aantal nieuw geschreven posten
+        """
+        if not items:
+            return 0
+        
+        existing = await self.get_existing_item_hashes(list(items))
+        rows = [
+            {"hash": item_hash, "data": data, "created_at": datetime.now().isoformat()}
+            for item_hash, data in items.items()
+            if item_hash not in existing
+        ]
+        if rows:
+            self.client.table("calculation_items").upsert(rows, on_conflict="hash", ignore_duplicates=True).execute()
+        return len(rows)
+    
+    async def get_existing_item_hashes(self, hashes: List[str], batch_size: int = 500) -> set:
+        """Welke van de hashes staan al in calculation_items"""
+        existing = set()
+        for start in range(0, len(hashes), batch_size):
+            batch = hashes[start:start + batch_size]
+            response = self.client.table("calculation_items").select("hash").in_("hash", batch).execute()
+            existing.update(row["hash"] for row in response.data)
+        return existing
+    
+    async def get_calculation_items(self, hashes: List[str], batch_size: int = 500) -> Dict[str, Any]:
+        """Haal calculatieposten op per hash"""
+        items = {}
+        for start in range(0, len(hashes), batch_size):
+            batch = hashes[start:start + batch_size]
+            response = self.client.table("calculation_items").select("hash,data").in_("hash", batch).execute()
+            items.update({row["hash"]: row["data"] for row in response.data})
+        return items
+    
+    async def insert_calculation_version(self, version: Dict[str, Any]) -> Optional[str]:
+        """
+        Sla een calculatieversie (delta of snapshot van het manifest) op
+        
+        Returns:
+            Versie ID, of None als dit versienummer al bestaat (unique calculation_id, version)
+        """
+        try:
+            response = self.client.table("calculation_versions").insert(version).execute()
+        except Exception as e:
+            if getattr(e, "code", None) == "23505" or "duplicate key" in str(e):
+                logger.warning(f"Version {version['version']} of calculation {version['calculation_id']} already exists")
+                return None
+            raise
+        if not response.data:
+            raise Exception("No data returned from insert")
+        return version["id"]
+    
+    async def get_latest_calculation_version(self, calculation_id: str) -> Optional[Dict[str, Any]]:
+        """Nummer en hash van de laatste versie van een calculatie (zonder manifest)"""
+        response = (
+            self.client.table("calculation_versions")
+            .select("version,content_hash")
+            .eq("calculation_id", calculation_id)
+            .order("version", desc=True)
+            .limit(1)
+            .execute()
+        )
+        return response.data[0] if response.data else None
+    
+    async def get_latest_snapshot_version(
+        self,
+        calculation_id: str,
+        up_to: Optional[int] = None
+    ) -> Optional[int]:
+        """Nummer van de laatste versie met een volledig manifest (optioneel t/m een versienummer)"""
+        query = (
+            self.client.table("calculation_versions")
+            .select("version")
+            .eq("calculation_id", calculation_id)
+            .not_.is_("snapshot", "null")
+        )
+        if up_to is not None:
+            query = query.lte("version", up_to)
+        response = query.order("version", desc=True).limit(1).execute()
+        return response.data[0]["version"] if response.data else None
+    
+    async def get_calculation_versions(
+        self,
+        calculation_id: str,
+        up_to: Optional[int] = None,
+        from_version: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Versies van een calculatie in oplopende volgorde (optioneel van/t/m een versienummer)"""
+        try:
+            query = self.client.table("calculation_versions").select("*").eq("calculation_id", calculation_id)
+            if from_version is not None:
+                query = query.gte("version", from_version)
+            if up_to is not None:
+                query = query.lte("version", up_to)
+            response = query.order("version").execute()
+            return response.data
+        except Exception as e:
+            logger.error(f"Error getting versions for calculation {calculation_id}: {e}")
+            return []
+    
     # DOCUMENT ANALYSIS MANAGEMENT
     async def insert_document_analysis(
         self,
@@ -190,10 +305,25 @@ class SupabaseClient:
             return []
     
     # STABU PRICE MANAGEMENT
-    async def get_stabu_price(self, code: str) -> Optional[STABUPrice]:
-        """Haal STABU prijs op bij code"""
+    async def get_stabu_price(self, code: str, at: Optional[datetime] = None) -> Optional[STABUPrice]:
+        """
+        Haal de STABU prijs op die op een datum geldt
+        
+        Args:
+            code: STABU code
+            at: Peildatum (valid_from <= at < valid_to), standaard nu
+        """
         try:
-            response = self.client.table("stabu_prices").select("*").eq("code", code).eq("is_active", True).execute()
+            moment = (at or datetime.now()).isoformat()
+            response = (
+                self.client.table("stabu_prices").select("*")
+                .eq("code", code).eq("is_active", True)
+                .lte("valid_from", moment)
+                .or_(f"valid_to.is.null,valid_to.gt.{moment}")
+                .order("valid_from", desc=True)
+                .limit(1)
+                .execute()
+            )
             
             if response.data:
                 data = response.data[0]
@@ -204,6 +334,41 @@ class SupabaseClient:
             logger.error(f"Error getting STABU price for code {code}: {e}")
             return None
     
+    async def fetch_stabu_prices(
+        self,
+        updated_since: Optional[str] = None,
+        page_size: int = 1000
+    ) -> List[Dict[str, Any]]:
+        """
+        Haal de stabu_prices tabel in bulk op (voor de STABU prijsindex)
+        
+        Args:
+            updated_since: Alleen rijen met updated_at vanaf dit tijdstip (ISO),
+                inclusief inactieve rijen zodat verwijderde versies verdwijnen
+            page_size: Aantal rijen per request
+        
+        Returns:
+            Ruwe rijen uit de tabel
+        """
+        rows = []
+        offset = 0
+        while True:
+            query = self.client.table("stabu_prices").select("*")
+            if updated_since:
+                query = query.gte("updated_at", updated_since)
+            else:
+                query = query.eq("is_active", True)
+            
+            response = query.order("code").order("valid_from").range(offset, offset + page_size - 1).execute()
+            rows.extend(response.data)
+            
+            if len(response.data) < page_size:
+                break
+            offset += page_size
+        
+        logger.info(f"Fetched {len(rows)} STABU price rows")
+        return rows
+    
     async def get_stabu_prices_by_category(self, category: str) -> List[STABUPrice]:
         """Haal alle STABU prijzen op voor een categorie"""
         try:
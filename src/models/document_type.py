@@ -0,0 +1,17 @@
+from enum import Enum
+
+
+class DocumentType(str, Enum):
+    """
+    Soorten documenten die de engine herkent.
+    
+    Staat los van de document processor zodat analyzers het type kunnen
+    gebruiken zonder de processor (en daarmee zichzelf) te importeren.
+    """
+    DRAWING = "drawing"
+    TAXATION_REPORT = "taxation_report"
+    ASBESTOS_REPORT = "asbestos_report"
+    PERMIT = "permit"
+    ENVIRONMENTAL_PERMIT = "environmental_permit"
+    BILL_OF_QUANTITIES = "bill_of_quantities"  # staat of begroting
+    OTHER = "other"
@@ -0,0 +1,369 @@
+import logging
+from typing import Dict, List, Optional, Any, Iterator, Sequence, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+# Vorm van een element: bepaalt hoe location/dimensions aan de API grens worden opgebouwd
+SHAPE_BOX = 0
+SHAPE_SEGMENT = 1
+SHAPE_CIRCLE = 2
+
+
+class CodeTable:
+    """Interneert strings (element types, materialen, lagen) naar compacte integer codes"""
+    
+    def __init__(self, names: Optional[Sequence[str]] = None):
+        self._names: List[str] = []
+        self._codes: Dict[str, int] = {}
+        for name in names or []:
+            self.code(name)
+    
+    def code(self, name: Optional[str]) -> int:
+        """Geef de code voor een naam (-1 voor None)"""
+        if name is None:
+            return -1
+        code = self._codes.get(name)
+        if code is None:
+            code = len(self._names)
+            self._names.append(name)
+            self._codes[name] = code
+        return code
+    
+    def codes(self, names: Sequence[str]) -> np.ndarray:
+        """Bulk variant van code()"""
+        return np.fromiter((self.code(n) for n in names), dtype=np.int16, count=len(names))
+    
+    def name(self, code: int) -> Optional[str]:
+        return self._names[code] if 0 <= code < len(self._names) else None
+    
+    def lookup(self, codes: np.ndarray) -> np.ndarray:
+        """Vertaal een array codes terug naar een object array met namen"""
+        names = np.array(self._names + [None], dtype=object)
+        return names[np.where(codes < 0, len(self._names), codes)]
+    
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+# Gedeelde tabellen zodat stores zonder hercodering samengevoegd kunnen worden
+ELEMENT_TYPES = CodeTable([
+    "line", "wall", "beam", "detail_line", "wall_section", "column", "column_circular",
+    "room", "window", "door", "opening", "hole", "dimension", "annotation", "unknown"
+])
+MATERIALS = CodeTable()
+LAYERS = CodeTable()
+
+
+class ElementStore:
+    """
+    Kolomgebaseerde (struct-of-arrays) opslag voor gedetecteerde tekeningelementen.
+    
+    Elk element is een rij in een set NumPy arrays. Classificatie, overlap detectie
+    en totalen werken direct op de kolommen; Pydantic modellen worden pas aan de
+    API grens opgebouwd uit to_records().
+    
+    Kolommen die voor een element niet van toepassing zijn bevatten NaN (floats)
+    of -1 (codes).
+    """
+    
+    _float_columns = ("confidence", "length", "angle", "area", "radius", "aspect_ratio")
+    _code_columns = ("type_code", "material_code", "layer_code")
+    
+    def __init__(
+        self,
+        bbox: np.ndarray,
+        points: np.ndarray,
+        shape: np.ndarray,
+        type_code: np.ndarray,
+        confidence: np.ndarray,
+        length: np.ndarray,
+        angle: np.ndarray,
+        area: np.ndarray,
+        radius: np.ndarray,
+        aspect_ratio: np.ndarray,
+        material_code: np.ndarray,
+        layer_code: np.ndarray,
+        page: np.ndarray
+    ):
+        self.bbox = bbox                    # (n, 4) x, y, width, height
+        self.points = points                # (n, 4) x1, y1, x2, y2 voor lijnsegmenten
+        self.shape = shape                  # SHAPE_BOX / SHAPE_SEGMENT / SHAPE_CIRCLE
+        self.type_code = type_code
+        self.confidence = confidence
+        self.length = length
+        self.angle = angle
+        self.area = area
+        self.radius = radius
+        self.aspect_ratio = aspect_ratio
+        self.material_code = material_code
+        self.layer_code = layer_code
+        self.page = page
+    
+    # === CONSTRUCTIE ===
+    
+    @classmethod
+    def empty(cls) -> "ElementStore":
+        return cls.from_columns("unknown", np.zeros((0, 4), dtype=np.float64))
+    
+    @classmethod
+    def from_columns(
+        cls,
+        element_type: Union[str, Sequence[str], np.ndarray],
+        bbox: np.ndarray,
+        confidence: Union[float, np.ndarray] = 0.5,
+        shape: Union[int, np.ndarray] = SHAPE_BOX,
+        points: Optional[np.ndarray] = None,
+        length: Optional[Union[float, np.ndarray]] = None,
+        angle: Optional[Union[float, np.ndarray]] = None,
+        area: Optional[Union[float, np.ndarray]] = None,
+        radius: Optional[Union[float, np.ndarray]] = None,
+        aspect_ratio: Optional[Union[float, np.ndarray]] = None,
+        material: Optional[Union[str, Sequence[Optional[str]]]] = None,
+        layer: Optional[Union[str, Sequence[Optional[str]]]] = None,
+        page: Union[int, np.ndarray] = 0
+    ) -> "ElementStore":
+        """
+        Bouw een store uit kolommen. Scalars worden over alle rijen uitgesmeerd.
+        
+        Args:
+            element_type: Eén type naam, een lijst namen of een array met type codes
+            bbox: (n, 4) array met x, y, width, height
+        """
+        bbox = np.asarray(bbox, dtype=np.float64).reshape(-1, 4)
+        n = len(bbox)
+        
+        def floats(value) -> np.ndarray:
+            if value is None:
+                return np.full(n, np.nan, dtype=np.float64)
+            return np.broadcast_to(np.asarray(value, dtype=np.float64), (n,)).copy()
+        
+        def codes(value, table: CodeTable) -> np.ndarray:
+            if value is None or isinstance(value, str):
+                return np.full(n, table.code(value), dtype=np.int16)
+            return table.codes(list(value))
+        
+        if isinstance(element_type, np.ndarray) and element_type.dtype.kind in "iu":
+            type_code = np.broadcast_to(element_type.astype(np.int16), (n,)).copy()
+        else:
+            type_code = codes(element_type, ELEMENT_TYPES)
+        
+        if points is None:
+            points = np.full((n, 4), np.nan, dtype=np.float64)
+        
+        return cls(
+            bbox=bbox,
+            points=np.asarray(points, dtype=np.float64).reshape(-1, 4),
+            shape=np.broadcast_to(np.asarray(shape, dtype=np.int8), (n,)).copy(),
+            type_code=type_code,
+            confidence=floats(confidence),
+            length=floats(length),
+            angle=floats(angle),
+            area=floats(area),
+            radius=floats(radius),
+            aspect_ratio=floats(aspect_ratio),
+            material_code=codes(material, MATERIALS),
+            layer_code=codes(layer, LAYERS),
+            page=np.broadcast_to(np.asarray(page, dtype=np.int16), (n,)).copy()
+        )
+    
+    @classmethod
+    def from_segments(
+        cls,
+        segments: np.ndarray,
+        element_type: Union[str, Sequence[str], np.ndarray] = "line",
+        confidence: Union[float, np.ndarray] = 0.5,
+        **kwargs
+    ) -> "ElementStore":
+        """Bouw een store uit een (n, 4) array lijnsegmenten x1, y1, x2, y2"""
+        segments = np.asarray(segments, dtype=np.float64).reshape(-1, 4)
+        dx = segments[:, 2] - segments[:, 0]
+        dy = segments[:, 3] - segments[:, 1]
+        bbox = np.column_stack([
+            np.minimum(segments[:, 0], segments[:, 2]),
+            np.minimum(segments[:, 1], segments[:, 3]),
+            np.abs(dx),
+            np.abs(dy)
+        ])
+        kwargs.setdefault("length", np.hypot(dx, dy))
+        kwargs.setdefault("angle", np.degrees(np.arctan2(dy, dx)))
+        return cls.from_columns(
+            element_type, bbox, confidence=confidence,
+            shape=SHAPE_SEGMENT, points=segments, **kwargs
+        )
+    
+    @classmethod
+    def concat(cls, stores: Sequence["ElementStore"]) -> "ElementStore":
+        """Voeg meerdere stores samen tot één store"""
+        stores = [s for s in stores if s is not None and len(s)]
+        if not stores:
+            return cls.empty()
+        if len(stores) == 1:
+            return stores[0]
+        return cls(**{
+            name: np.concatenate([getattr(s, name) for s in stores])
+            for name in cls._column_names()
+        })
+    
+    @classmethod
+    def _column_names(cls) -> List[str]:
+        return ["bbox", "points", "shape", "page", *cls._code_columns, *cls._float_columns]
+    
+    # === SELECTIE ===
+    
+    def __len__(self) -> int:
+        return len(self.type_code)
+    
+    def take(self, index: np.ndarray) -> "ElementStore":
+        """Selecteer rijen met een bool mask of index array"""
+        return ElementStore(**{name: getattr(self, name)[index] for name in self._column_names()})
+    
+    def with_page(self, page: int) -> "ElementStore":
+        self.page[:] = page
+        return self
+    
+    def type_mask(self, *element_types: str) -> np.ndarray:
+        """Bool mask voor rijen met één van de gegeven types"""
+        codes = [ELEMENT_TYPES.code(t) for t in element_types]
+        return np.isin(self.type_code, codes)
+    
+    def set_type(self, mask: np.ndarray, element_type: str):
+        self.type_code[mask] = ELEMENT_TYPES.code(element_type)
+    
+    def type_names(self) -> set:
+        return {ELEMENT_TYPES.name(int(c)) for c in np.unique(self.type_code)}
+    
+    def shifted(self, dx: float, dy: float) -> "ElementStore":
+        """Verschuif alle coördinaten (in-place), bijv. van tegel naar pagina"""
+        self.bbox[:, 0] += dx
+        self.bbox[:, 1] += dy
+        self.points += (dx, dy, dx, dy)
+        return self
+    
+    def scaled(self, factor: float) -> "ElementStore":
+        """Schaal alle coördinaten en maten (in-place), bijv. van overzicht naar volle resolutie"""
+        self.bbox *= factor
+        self.points *= factor
+        self.length *= factor
+        self.radius *= factor
+        self.area *= factor ** 2
+        return self
+    
+    def page_factors(self, factors: Dict[int, float]) -> np.ndarray:
+        """Factor per element op basis van zijn pagina (NaN voor pagina's zonder factor)"""
+        result = np.full(len(self), np.nan)
+        for page, factor in factors.items():
+            result[self.page == page] = factor
+        return result
+    
+    # === AGGREGATIES ===
+    
+    def type_counts(self) -> Dict[str, int]:
+        """Aantal elementen per type"""
+        if not len(self):
+            return {}
+        counts = np.bincount(self.type_code.astype(np.int64), minlength=len(ELEMENT_TYPES))
+        return {ELEMENT_TYPES.name(code): int(count) for code, count in enumerate(counts) if count}
+    
+    def total_area(self) -> float:
+        """Som van alle bekende oppervlaktes"""
+        return float(np.nansum(self.area, dtype=np.float64))
+    
+    def first_overlap(self, other: "ElementStore", chunk_size: int = 2048) -> np.ndarray:
+        """
+        Index van het eerste overlappende element in other voor elke rij (-1 als geen).
+        
+        Alleen rechthoekige en cirkelvormige elementen doen mee; lijnsegmenten hebben
+        geen zinvolle bbox overlap. Rekent in blokken om het geheugen van de
+        paarsgewijze vergelijking te begrenzen.
+        """
+        result = np.full(len(self), -1, dtype=np.int64)
+        
+        own = np.flatnonzero(self.shape != SHAPE_SEGMENT)
+        candidates = np.flatnonzero(other.shape != SHAPE_SEGMENT)
+        if not len(own) or not len(candidates):
+            return result
+        
+        ob = other.bbox[candidates]
+        ox1, oy1 = ob[:, 0], ob[:, 1]
+        ox2, oy2 = ox1 + ob[:, 2], oy1 + ob[:, 3]
+        
+        for start in range(0, len(own), chunk_size):
+            rows = own[start:start + chunk_size]
+            b = self.bbox[rows]
+            x1, y1 = b[:, 0:1], b[:, 1:2]
+            x2, y2 = x1 + b[:, 2:3], y1 + b[:, 3:4]
+            
+            overlap = ~((x2 < ox1) | (ox2 < x1) | (y2 < oy1) | (oy2 < y1))
+            hit = overlap.any(axis=1)
+            result[rows[hit]] = candidates[overlap[hit].argmax(axis=1)]
+        
+        return result
+    
+    # === API GRENS ===
+    
+    def to_records(self) -> Iterator[Dict[str, Any]]:
+        """
+        Itereer over de elementen als plain dicts (NaN -> None).
+        
+        Bedoeld voor het opbouwen van Pydantic modellen aan de API grens.
+        """
+        type_names = ELEMENT_TYPES.lookup(self.type_code)
+        materials = MATERIALS.lookup(self.material_code)
+        layers = LAYERS.lookup(self.layer_code)
+        
+        floats = {}
+        for name in self._float_columns:
+            column = getattr(self, name)
+            values = column.astype(np.float64).astype(object)
+            values[np.isnan(column)] = None
+            floats[name] = values
+        
+        bbox = self.bbox.tolist()
+        points = self.points.tolist()
+        shape = self.shape.tolist()
+        page = self.page.tolist()
+        
+        for i in range(len(self)):
+            record = {
+                "element_type": type_names[i],
+                "shape": shape[i],
+                "bbox": bbox[i],
+                "points": points[i] if shape[i] == SHAPE_SEGMENT else None,
+                "material": materials[i],
+                "layer": layers[i],
+                "page": page[i]
+            }
+            for name, values in floats.items():
+                record[name] = values[i]
+            yield record
+    
+    # === PERSISTENTIE ===
+    
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """
+        Kolommen voor np.savez. Codes worden als namen opgeslagen omdat de
+        code tabellen per proces worden opgebouwd.
+        """
+        arrays = {name: getattr(self, name) for name in ("bbox", "points", "shape", "page", *self._float_columns)}
+        for name, table in (("type_code", ELEMENT_TYPES), ("material_code", MATERIALS), ("layer_code", LAYERS)):
+            arrays[name] = np.array([value or "" for value in table.lookup(getattr(self, name))], dtype=str)
+        return arrays
+    
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> "ElementStore":
+        """Herbouw een store uit to_arrays() (bijv. geladen met np.load)"""
+        columns = {name: np.asarray(arrays[name]) for name in ("bbox", "points", "shape", "page", *cls._float_columns)}
+        for name, table in (("type_code", ELEMENT_TYPES), ("material_code", MATERIALS), ("layer_code", LAYERS)):
+            columns[name] = table.codes([str(value) or None for value in arrays[name]])
+        columns["bbox"] = columns["bbox"].reshape(-1, 4)
+        columns["points"] = columns["points"].reshape(-1, 4)
+        return cls(**columns)
+    
+    def copy(self) -> "ElementStore":
+        return ElementStore(**{name: getattr(self, name).copy() for name in self._column_names()})
+    
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in self._column_names())
@@ -0,0 +1,237 @@
+import asyncio
+import json
+import logging
+import re
+from typing import Dict, List, Optional, Any
+
+from .llm_client import LLMClient, LLMProvider
+
+logger = logging.getLogger(__name__)
+
+
+class BatchItem:
+    """Eén item in een batch: payload plus de future waar het antwoord naartoe gaat"""
+    
+    def __init__(self, item_id: str, payload: str, future: asyncio.Future):
+        self.item_id = item_id
+        self.payload = payload
+        self.future = future
+
+
+class _PendingBatch:
+    """Items die op dezelfde instructie en provider wachten"""
+    
+    def __init__(self, instruction: str, provider: LLMProvider):
+        self.instruction = instruction
+        self.provider = provider
+        self.items: List[BatchItem] = []
+        self.chars = 0
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class LLMBatcher:
+    """
+    Bundelt LLM aanroepen van meerdere pagina's en documenten in één request.
+    
+    Aanroepers doen submit() met een payload en een instructie; items met
+    dezelfde instructie en provider die binnen max_wait binnenkomen worden
+    samen verstuurd, binnen de limieten voor items, invoer (tekens) en
+    uitvoer (tokens). Het model geeft één JSON object met per item id het
+    antwoord terug, dat naar de juiste aanroeper wordt gerouteerd. Mislukt
+    een batch (of is het antwoord afgekapt of zonder één bekend item id),
+    dan wordt hij gehalveerd en opnieuw geprobeerd, tot losse items.
+    """
+    
+    def __init__(
+        self,
+        llm_client: LLMClient,
+        max_items: int = 16,
+        max_chars: int = 48000,
+        max_wait: float = 0.05,
+        output_tokens_per_item: int = 500,
+        max_output_tokens: int = 8000,
+        default_provider: LLMProvider = LLMProvider.ANTHROPIC
+    ):
+        self.llm_client = llm_client
+        self.max_items = max_items
+        self.max_chars = max_chars
+        self.max_wait = max_wait
+        self.output_tokens_per_item = output_tokens_per_item
+        self.max_output_tokens = max_output_tokens
+        self.default_provider = default_provider
+        
+        self._pending: Dict[tuple, _PendingBatch] = {}
+        self._counter = 0
+        self.stats = {"items": 0, "requests": 0, "splits": 0}
+    
+    async def submit(
+        self,
+        payload: Any,
+        instruction: str,
+        provider: Optional[LLMProvider] = None
+    ) -> Any:
+        """
+        Voeg een item toe aan de volgende batch en wacht op het antwoord
+        
+        Args:
+            payload: Invoer voor dit item (wordt als tekst meegestuurd)
+            instruction: Opdracht die voor alle items in de batch geldt
+            provider: Provider (standaard default_provider)
+        
+        Returns:
+            Het (JSON) antwoord voor dit item
+        """
+        provider = provider or self.default_provider
+        payload = payload if isinstance(payload, str) else str(payload)
+        
+        loop = asyncio.get_running_loop()
+        self._counter += 1
+        item = BatchItem(f"item_{self._counter}", payload, loop.create_future())
+        self.stats["items"] += 1
+        
+        key = (instruction, provider)
+        batch = self._pending.get(key)
+        
+        # Past het item niet meer in de wachtende batch: die eerst versturen
+        if batch is not None and batch.items and batch.chars + len(payload) > self.max_chars:
+            self._dispatch(key)
+            batch = None
+        
+        if batch is None:
+            batch = _PendingBatch(instruction, provider)
+            batch.timer = loop.call_later(self.max_wait, self._dispatch, key)
+            self._pending[key] = batch
+        
+        batch.items.append(item)
+        batch.chars += len(payload)
+        
+        if len(batch.items) >= self.max_items or batch.chars >= self.max_chars:
+            self._dispatch(key)
+        
+        return await item.future
+    
+    async def submit_many(
+        self,
+        payloads: List[Any],
+        instruction: str,
+        provider: Optional[LLMProvider] = None
+    ) -> List[Any]:
+        """Meerdere items tegelijk; resultaten in dezelfde volgorde (exceptions als waarde)"""
+        return await asyncio.gather(
+            *(self.submit(payload, instruction, provider) for payload in payloads),
+            return_exceptions=True
+        )
+    
+    def _dispatch(self, key: tuple):
+        """Haal de wachtende batch weg en verstuur hem op de achtergrond"""
+        batch = self._pending.pop(key, None)
+        if batch is None or not batch.items:
+            return
+        if batch.timer is not None:
+            batch.timer.cancel()
+        asyncio.ensure_future(self._run(batch.instruction, batch.provider, batch.items))
+    
+    async def _run(self, instruction: str, provider: LLMProvider, items: List[BatchItem]):
+        """Verstuur een batch en routeer de antwoorden; halveer bij fouten"""
+        try:
+            if len(items) == 1:
+                results = {items[0].item_id: await self._complete_single(instruction, provider, items[0])}
+            else:
+                results = await self._complete_batch(instruction, provider, items)
+            
+            missing = [item for item in items if item.item_id not in results]
+            for item in items:
+                if item.item_id in results and not item.future.done():
+                    item.future.set_result(results[item.item_id])
+            
+            if not missing:
+                return
+            
+            if len(missing) < len(items):
+                # Voortgang geboekt: alleen de ontbrekende items opnieuw
+                logger.warning(f"LLM batch response missing {len(missing)}/{len(items)} items, retrying")
+                self.stats["splits"] += 1
+                await self._run(instruction, provider, missing)
+                return
+            
+            # Geen enkel item beantwoord: niet dezelfde batch herhalen maar splitsen
+            raise ValueError(f"LLM batch response contained none of the {len(items)} item ids")
+        
+        except Exception as e:
+            if len(items) == 1:
+                if not items[0].future.done():
+                    items[0].future.set_exception(e)
+                return
+            
+            logger.warning(f"LLM batch of {len(items)} items failed ({e}), splitting")
+            self.stats["splits"] += 1
+            half = len(items) // 2
+            await asyncio.gather(
+                self._run(instruction, provider, items[:half]),
+                self._run(instruction, provider, items[half:])
+            )
+    
+    async def _complete_batch(
+        self,
+        instruction: str,
+        provider: LLMProvider,
+        items: List[BatchItem]
+    ) -> Dict[str, Any]:
+        sections = "\n\n".join(f"### {item.item_id}\n{item.payload}" for item in items)
+        prompt = f"""
+        {instruction}
+        
+        Voer de opdracht hierboven afzonderlijk uit voor elk van de onderstaande {len(items)} items.
+        Geef het antwoord als één JSON object met de item id's als keys
+        ({", ".join(item.item_id for item in items)}) en per key het antwoord voor dat item.
+        
+        {sections}
+        """
+        
+        parsed = await self._complete_json(prompt, provider, len(items))
+        if not isinstance(parsed, dict):
+            raise ValueError("Batch response is not a JSON object")
+        return {key: value for key, value in parsed.items() if key in {item.item_id for item in items}}
+    
+    async def _complete_single(self, instruction: str, provider: LLMProvider, item: BatchItem) -> Any:
+        prompt = f"""
+        {instruction}
+        
+        {item.payload}
+        """
+        return await self._complete_json(prompt, provider, 1)
+    
+    async def _complete_json(self, prompt: str, provider: LLMProvider, item_count: int) -> Any:
+        """Eén request met uitvoerlimiet naar rato van het aantal items"""
+        config = self.llm_client.default_configs[provider].model_copy(update={
+            "max_tokens": min(self.max_output_tokens, self.output_tokens_per_item * max(1, item_count))
+        })
+        
+        self.stats["requests"] += 1
+        response = await self.llm_client.complete(
+            prompt=prompt,
+            provider=provider,
+            config=config,
+            response_format="json"
+        )
+        
+        if response.finish_reason in ("length", "max_tokens", "MAX_TOKENS"):
+            raise ValueError("Batch response was truncated")
+        
+        return self._parse_json(response.content)
+    
+    def _parse_json(self, content: str) -> Any:
+        try:
+            return json.loads(content)
+        except json.JSONDecodeError:
+            # Model zet soms tekst of code fences om de JSON heen
+            match = re.search(r"[\[{].*[\]}]", content, re.DOTALL)
+            if match:
+                return json.loads(match.group())
+            raise ValueError(f"Could not extract valid JSON from response: {content[:200]}")
+
+
+# Factory functie
+def get_llm_batcher(llm_client: Optional[LLMClient] = None, **kwargs: Any) -> LLMBatcher:
+    """Factory om LLMBatcher instantie te maken"""
+    return LLMBatcher(llm_client or LLMClient(), **kwargs)
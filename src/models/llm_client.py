@@ -4,9 +4,6 @@ from enum import Enum
 from typing import Dict, List, Optional, Any, Union
 import asyncio
 
-import openai
-from anthropic import Anthropic, AsyncAnthropic
-import google.generativeai as genai
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 
@@ -52,6 +49,12 @@ class LLMClient:
     
     def _initialize_clients(self):
         """Initialiseer alle LLM clients"""
+        # Provider SDK's pas hier importeren: de modellen en enums in deze module
+        # zijn zo ook bruikbaar (bijv. in tests) zonder de SDK's te laden
+        import openai
+        from anthropic import AsyncAnthropic
+        import google.generativeai as genai
+        
         # OpenAI
         openai_api_key = os.getenv("OPENAI_API_KEY")
         if openai_api_key:
@@ -8,9 +8,17 @@ import cv2
 import numpy as np
 from PIL import Image
 import pdf2image
-import pytesseract
 from pydantic import BaseModel, Field
 
+from .element_store import ElementStore, SHAPE_SEGMENT, SHAPE_CIRCLE
+from ..utils.line_geometry import merge_collinear_segments
+from ..utils.tiling import TiledDetector
+from ..utils.image_preprocessing import ImagePreprocessor, PreprocessingProfile
+from ..utils.dxf_reader import DXFReader
+from ..utils.scale_engine import ScaleEngine, ScaleCalibration
+from ..utils.ocr_engine import get_ocr_engine
+from ..utils.table_extractor import TableExtractor
+
 logger = logging.getLogger(__name__)
 
 
@@ -40,7 +48,10 @@ class VisionClient:
             "line_detection": {
                 "min_line_length": 30,
                 "max_line_gap": 10,
-                "threshold": 50
+                "threshold": 50,
+                "merge_angle_tolerance": 2.0,
+                "merge_distance_tolerance": 3.0,
+                "merge_gap": 10
             },
             "rectangle_detection": {
                 "min_area": 100,
@@ -61,8 +72,32 @@ class VisionClient:
             }
         }
         
+        # Grote tekeningen (A0/A1) worden in tegels geanalyseerd
+        self.tiler = TiledDetector(**self.merge_tolerances())
+        
+        # Voorbewerkingsprofiel (vector, light, scan) wordt per pagina gekozen
+        self.preprocessor = ImagePreprocessor()
+        
+        # Schaal uit titelblok, gecachet per tekeningreeks en bladformaat
+        self.scale_engine = ScaleEngine(dpi=150)
+        
+        # Gedeelde OCR pool met langlevende Tesseract workers
+        self.ocr_engine = get_ocr_engine()
+        
+        # Tabellen (staten, begrotingen) als rijen met getypeerde waarden
+        self.table_extractor = TableExtractor(ocr_engine=self.ocr_engine)
+        
         logger.info("VisionClient initialized")
     
+    def merge_tolerances(self) -> Dict[str, float]:
+        """Toleranties voor merge_collinear_segments uit de lijndetectie config"""
+        cfg = self.config["line_detection"]
+        return {
+            "angle_tolerance": cfg["merge_angle_tolerance"],
+            "distance_tolerance": cfg["merge_distance_tolerance"],
+            "gap_tolerance": cfg["merge_gap"]
+        }
+    
     async def analyze_drawing(self, image_path: str) -> Dict[str, Any]:
         """
         Analyseer een bouwtekening en extraheer elementen
@@ -83,38 +118,16 @@ class VisionClient:
                 raise ValueError(f"Could not convert {image_path} to images")
             
             # Analyseer eerste pagina
-            image = cv2.imread(image_paths[0])
-            if image is None:
-                raise ValueError(f"Could not load image: {image_paths[0]}")
-            
-            # Voorverwerking
-            processed = self._preprocess_image(image)
-            
-            # Voer verschillende detecties uit
-            lines = await self._detect_lines(processed)
-            rectangles = await self._detect_rectangles(processed)
-            circles = await self._detect_circles(processed)
-            text_regions = await self._detect_text_regions(processed)
-            
-            # Classificeer elementen
-            classified_elements = await self._classify_elements(
-                lines, rectangles, circles, text_regions
-            )
-            
-            # Detecteer schaal en metadata
-            scale = await self._detect_scale(image_paths[0], classified_elements)
-            metadata = await self._extract_metadata(image_paths[0])
-            
-            # Bereken confidence
-            confidence = self._calculate_confidence(classified_elements, metadata)
+            analysis = await self.analyze_drawing_columnar(image_paths[0], source_path=image_path)
+            store = analysis["elements"]
             
             result = DrawingAnalysis(
-                elements=classified_elements,
-                metadata=metadata,
-                scale=scale,
+                elements=self._to_vision_elements(store),
+                metadata=analysis["metadata"],
+                scale=analysis["scale"],
                 units="mm",
-                confidence=confidence,
-                warnings=self._generate_warnings(classified_elements, metadata)
+                confidence=analysis["confidence"],
+                warnings=analysis["warnings"]
             )
             
             # Cleanup temp files
@@ -125,13 +138,71 @@ class VisionClient:
                     except:
                         pass
             
-            logger.info(f"Drawing analysis complete: {len(classified_elements)} elements found")
+            logger.info(f"Drawing analysis complete: {len(store)} elements found")
             return result.dict()
             
         except Exception as e:
             logger.error(f"Drawing analysis failed: {e}")
             raise
     
+    async def analyze_drawing_columnar(
+        self,
+        image_path: str,
+        source_path: Optional[str] = None,
+        detect_scale: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Analyseer een enkele image en houd de elementen kolomgebaseerd
+        
+        Args:
+            image_path: Pad naar een image (geen PDF/CAD)
+            source_path: Oorspronkelijk bestand (bepaalt de tekeningreeks voor de schaal cache)
+            detect_scale: False als de aanroeper de schaal zelf kalibreert
+            
+        Returns:
+            Dict met een ElementStore onder "elements" plus metadata, schaal,
+            confidence en waarschuwingen
+        """
+        image = cv2.imread(image_path)
+        if image is None:
+            raise ValueError(f"Could not load image: {image_path}")
+        
+        # Kies één voorbewerkingsprofiel voor de hele pagina (ook bij tegels)
+        profile = self.preprocessor.select_profile(image)
+        
+        def preprocess(region: np.ndarray) -> np.ndarray:
+            return self._preprocess_image(region, profile)
+        
+        # Voorverwerking en detectie (grote tekeningen per tegel)
+        if self.tiler.should_tile(image):
+            primitives = await self.tiler.detect(image, preprocess, self._detect_primitives)
+        else:
+            primitives = await self._detect_primitives(preprocess(image))
+        
+        # Classificeer elementen
+        store = await self._classify_elements(
+            primitives.get("lines", ElementStore.empty()),
+            primitives.get("rectangles", ElementStore.empty()),
+            primitives.get("circles", ElementStore.empty()),
+            primitives.get("text_regions", ElementStore.empty())
+        )
+        
+        # Detecteer schaal en metadata
+        calibration = await self._detect_scale(source_path or image_path, image) if detect_scale else None
+        metadata = await self._extract_metadata(image_path)
+        metadata["preprocessing"] = profile.dict()
+        if calibration:
+            metadata["calibration"] = calibration.dict()
+        
+        return {
+            "elements": store,
+            "metadata": metadata,
+            "scale": calibration.scale if calibration else None,
+            "calibration": calibration,
+            "confidence": self._calculate_confidence(store, metadata),
+            "warnings": self._generate_warnings(store, metadata)
+        }
+    
     async def classify_document(self, image_path: str) -> str:
         """
         Classificeer document type via vision analysis
@@ -194,14 +265,8 @@ class VisionClient:
             Geëxtraheerde tekst
         """
         try:
-            # Laad image
-            image = Image.open(image_path)
-            
-            # Configureer Tesseract
-            pytesseract.pytesseract.tesseract_cmd = r'/usr/bin/tesseract'
-            
-            # Extraheer tekst
-            text = pytesseract.image_to_string(image, lang=language)
+            # Extraheer tekst op een worker uit de gedeelde OCR pool
+            text = await self.ocr_engine.recognize_async(image_path, language=language)
             
             logger.info(f"Text extraction complete: {len(text)} characters")
             return text.strip()
@@ -218,23 +283,17 @@ class VisionClient:
             image_path: Pad naar het document
             
         Returns:
-            Lijst van gedetecteerde tabellen
+            Lijst van gedetecteerde tabellen (ExtractedTable als dict)
         """
         try:
-            image = cv2.imread(image_path)
+            image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
             if image is None:
                 return []
             
-            processed = self._preprocess_image(image)
+            # Raster per tabel, cellen met getypeerde waarden (OCR per cel)
+            tables = await self.table_extractor.extract(image)
             
-            # Detecteer horizontale en verticale lijnen
-            horizontal = await self._detect_horizontal_lines(processed)
-            vertical = await self._detect_vertical_lines(processed)
-            
-            # Vind tabel structuren
-            tables = await self._find_table_structures(horizontal, vertical)
-            
-            return tables
+            return [table.dict() for table in tables]
             
         except Exception as e:
             logger.error(f"Table detection failed: {e}")
@@ -263,9 +322,16 @@ class VisionClient:
                 # Al een image
                 image_paths.append(file_path)
                 
-            elif file_ext in ['.dwg', '.dxf']:
-                # CAD files - in productie zouden we een converter gebruiken
-                logger.warning(f"CAD file conversion not implemented for {file_ext}")
+            elif file_ext == '.dxf':
+                # DXF native inlezen en tekenen
+                drawing = DXFReader().read(file_path)
+                with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp:
+                    cv2.imwrite(tmp.name, drawing.render())
+                    image_paths.append(tmp.name)
+                
+            elif file_ext == '.dwg':
+                # DWG moet eerst naar DXF worden omgezet
+                logger.warning("DWG is not supported, convert the drawing to DXF first")
                 return []
                 
             else:
@@ -278,35 +344,26 @@ class VisionClient:
             logger.error(f"File conversion failed: {e}")
             return []
     
-    def _preprocess_image(self, image: np.ndarray) -> np.ndarray:
-        """Voorverwerk image voor betere analyse"""
+    def _preprocess_image(self, image: np.ndarray, profile: Optional[PreprocessingProfile] = None) -> np.ndarray:
+        """Voorverwerk image voor betere analyse (profiel wordt gemeten als het ontbreekt)"""
         try:
-            # Converteer naar grijswaarden
-            if len(image.shape) == 3:
-                gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            else:
-                gray = image
-            
-            # Verwijder ruis
-            denoised = cv2.fastNlMeansDenoising(gray, h=10)
-            
-            # Verhoog contrast
-            clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-            enhanced = clahe.apply(denoised)
-            
-            # Binariseer voor lijn detectie
-            _, binary = cv2.threshold(enhanced, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-            
-            return binary
+            return self.preprocessor.apply(image, profile)
             
         except Exception as e:
             logger.warning(f"Image preprocessing failed: {e}")
             return image
     
-    async def _detect_lines(self, image: np.ndarray) -> List[Dict[str, Any]]:
+    async def _detect_primitives(self, image: np.ndarray) -> Dict[str, ElementStore]:
+        """Voer alle detecties uit op een voorbewerkt beeld"""
+        return {
+            "lines": await self._detect_lines(image),
+            "rectangles": await self._detect_rectangles(image),
+            "circles": await self._detect_circles(image),
+            "text_regions": await self._detect_text_regions(image)
+        }
+    
+    async def _detect_lines(self, image: np.ndarray) -> ElementStore:
         """Detecteer lijnen in de image"""
-        lines = []
-        
         try:
             # Edge detection
             edges = cv2.Canny(image, 50, 150, apertureSize=3)
@@ -321,33 +378,26 @@ class VisionClient:
                 maxLineGap=self.config["line_detection"]["max_line_gap"]
             )
             
-            if hough_lines is not None:
-                for line in hough_lines:
-                    x1, y1, x2, y2 = line[0]
-                    length = np.sqrt((x2 - x1)**2 + (y2 - y1)**2)
-                    
-                    lines.append({
-                        "type": "line",
-                        "points": [(x1, y1), (x2, y2)],
-                        "length": float(length),
-                        "angle": np.degrees(np.arctan2(y2 - y1, x2 - x1)),
-                        "bbox": (min(x1, x2), min(y1, y2), abs(x2 - x1), abs(y2 - y1))
-                    })
+            if hough_lines is None:
+                return ElementStore.empty()
             
-            return lines
+            # Voeg onderbroken muurlijnen en dubbele Hough hits samen
+            segments = merge_collinear_segments(hough_lines.reshape(-1, 4), **self.merge_tolerances())
+            
+            # Lengte, hoek en bbox worden in één keer over alle segmenten berekend
+            return ElementStore.from_segments(segments, "line")
             
         except Exception as e:
             logger.warning(f"Line detection failed: {e}")
-            return []
+            return ElementStore.empty()
     
-    async def _detect_rectangles(self, image: np.ndarray) -> List[Dict[str, Any]]:
+    async def _detect_rectangles(self, image: np.ndarray) -> ElementStore:
         """Detecteer rechthoeken in de image"""
-        rectangles = []
-        
         try:
             # Zoek contouren
             contours, _ = cv2.findContours(image, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
             
+            boxes = []
             for contour in contours:
                 # Benader contour met polygoon
                 epsilon = self.config["rectangle_detection"]["epsilon_factor"] * cv2.arcLength(contour, True)
@@ -355,33 +405,33 @@ class VisionClient:
                 
                 # Controleer of het een rechthoek is (4 hoeken)
                 if len(approx) == 4:
-                    x, y, w, h = cv2.boundingRect(approx)
-                    area = w * h
-                    
-                    # Filter op minimale grootte
-                    if area >= self.config["rectangle_detection"]["min_area"]:
-                        aspect_ratio = w / h if h > 0 else 0
-                        
-                        # Filter op extreme aspect ratios
-                        if aspect_ratio <= self.config["rectangle_detection"]["max_aspect_ratio"]:
-                            rectangles.append({
-                                "type": "rectangle",
-                                "bbox": (x, y, w, h),
-                                "area": float(area),
-                                "aspect_ratio": float(aspect_ratio),
-                                "center": (x + w // 2, y + h // 2)
-                            })
-            
-            return rectangles
+                    boxes.append(cv2.boundingRect(approx))
+            
+            if not boxes:
+                return ElementStore.empty()
+            
+            bbox = np.asarray(boxes, dtype=np.float64)
+            w, h = bbox[:, 2], bbox[:, 3]
+            area = w * h
+            aspect_ratio = np.divide(w, h, out=np.zeros_like(w), where=h > 0)
+            
+            # Filter op minimale grootte en extreme aspect ratios
+            cfg = self.config["rectangle_detection"]
+            keep = (area >= cfg["min_area"]) & (aspect_ratio <= cfg["max_aspect_ratio"])
+            
+            return ElementStore.from_columns(
+                "opening",
+                bbox[keep],
+                area=area[keep],
+                aspect_ratio=aspect_ratio[keep]
+            )
             
         except Exception as e:
             logger.warning(f"Rectangle detection failed: {e}")
-            return []
+            return ElementStore.empty()
     
-    async def _detect_circles(self, image: np.ndarray) -> List[Dict[str, Any]]:
+    async def _detect_circles(self, image: np.ndarray) -> ElementStore:
         """Detecteer cirkels in de image"""
-        circles = []
-        
         try:
             # Gaussian blur voor betere detectie
             blurred = cv2.GaussianBlur(image, (5, 5), 0)
@@ -398,271 +448,141 @@ class VisionClient:
                 maxRadius=self.config["circle_detection"]["max_radius"]
             )
             
-            if detected_circles is not None:
-                detected_circles = np.uint16(np.around(detected_circles))
-                
-                for circle in detected_circles[0, :]:
-                    x, y, radius = circle[0], circle[1], circle[2]
-                    
-                    circles.append({
-                        "type": "circle",
-                        "center": (int(x), int(y)),
-                        "radius": int(radius),
-                        "diameter": int(radius * 2),
-                        "area": float(np.pi * radius ** 2),
-                        "bbox": (x - radius, y - radius, radius * 2, radius * 2)
-                    })
+            if detected_circles is None:
+                return ElementStore.empty()
             
-            return circles
+            circles = np.around(detected_circles[0]).astype(np.float64)
+            x, y, radius = circles[:, 0], circles[:, 1], circles[:, 2]
+            
+            return ElementStore.from_columns(
+                "hole",
+                np.column_stack([x - radius, y - radius, radius * 2, radius * 2]),
+                shape=SHAPE_CIRCLE,
+                radius=radius,
+                area=np.pi * radius ** 2
+            )
             
         except Exception as e:
             logger.warning(f"Circle detection failed: {e}")
-            return []
+            return ElementStore.empty()
     
-    async def _detect_text_regions(self, image: np.ndarray) -> List[Dict[str, Any]]:
+    async def _detect_text_regions(self, image: np.ndarray) -> ElementStore:
         """Detecteer tekst regio's"""
-        text_regions = []
-        
         try:
             # Zoek contouren
             contours, _ = cv2.findContours(image, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            if not contours:
+                return ElementStore.empty()
             
-            for contour in contours:
-                x, y, w, h = cv2.boundingRect(contour)
-                
-                # Filter op tekst-achtige afmetingen
-                cfg = self.config["text_detection"]
-                if (cfg["min_width"] <= w <= cfg["max_width"] and 
-                    cfg["min_height"] <= h <= cfg["max_height"]):
-                    
-                    aspect_ratio = w / h if h > 0 else 0
-                    
-                    text_regions.append({
-                        "type": "text_region",
-                        "bbox": (x, y, w, h),
-                        "area": w * h,
-                        "aspect_ratio": aspect_ratio,
-                        "is_dimension": self._is_dimension_indicator(w, h, aspect_ratio)
-                    })
-            
-            return text_regions
-            
-        except Exception as e:
-            logger.warning(f"Text region detection failed: {e}")
-            return []
-    
-    async def _detect_horizontal_lines(self, image: np.ndarray) -> List[Dict[str, Any]]:
-        """Detecteer horizontale lijnen (voor tabel detectie)"""
-        horizontal = []
-        
-        try:
-            # Specifieke kernel voor horizontale lijnen
-            horizontal_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (40, 1))
-            
-            # Morphologische operaties
-            horizontal_lines = cv2.morphologyEx(image, cv2.MORPH_OPEN, horizontal_kernel, iterations=2)
+            bbox = np.asarray([cv2.boundingRect(c) for c in contours], dtype=np.float64)
+            w, h = bbox[:, 2], bbox[:, 3]
             
-            # Zoek contouren
-            contours, _ = cv2.findContours(horizontal_lines, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-            
-            for contour in contours:
-                x, y, w, h = cv2.boundingRect(contour)
-                if w > 100 and h < 20:  # Breed maar niet hoog
-                    horizontal.append({
-                        "bbox": (x, y, w, h),
-                        "length": w,
-                        "is_table_line": True
-                    })
-            
-            return horizontal
-            
-        except Exception as e:
-            logger.warning(f"Horizontal line detection failed: {e}")
-            return []
-    
-    async def _detect_vertical_lines(self, image: np.ndarray) -> List[Dict[str, Any]]:
-        """Detecteer verticale lijnen (voor tabel detectie)"""
-        vertical = []
-        
-        try:
-            # Specifieke kernel voor verticale lijnen
-            vertical_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, 40))
-            
-            # Morphologische operaties
-            vertical_lines = cv2.morphologyEx(image, cv2.MORPH_OPEN, vertical_kernel, iterations=2)
-            
-            # Zoek contouren
-            contours, _ = cv2.findContours(vertical_lines, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-            
-            for contour in contours:
-                x, y, w, h = cv2.boundingRect(contour)
-                if h > 100 and w < 20:  # Hoog maar niet breed
-                    vertical.append({
-                        "bbox": (x, y, w, h),
-                        "length": h,
-                        "is_table_line": True
-                    })
-            
-            return vertical
+            # Filter op tekst-achtige afmetingen
+            cfg = self.config["text_detection"]
+            keep = (
+                (w >= cfg["min_width"]) & (w <= cfg["max_width"]) &
+                (h >= cfg["min_height"]) & (h <= cfg["max_height"])
+            )
+            bbox, w, h = bbox[keep], w[keep], h[keep]
+            aspect_ratio = np.divide(w, h, out=np.zeros_like(w), where=h > 0)
             
-        except Exception as e:
-            logger.warning(f"Vertical line detection failed: {e}")
-            return []
-    
-    async def _find_table_structures(self, horizontal: List, vertical: List) -> List[Dict[str, Any]]:
-        """Vind tabel structuren op basis van horizontale en verticale lijnen"""
-        tables = []
-        
-        try:
-            # Groepeer horizontale lijnen die dicht bij elkaar liggen
-            horizontal_groups = self._group_lines(horizontal, axis='y', threshold=20)
-            vertical_groups = self._group_lines(vertical, axis='x', threshold=20)
-            
-            # Vind snijpunten tussen groepen
-            for h_group in horizontal_groups:
-                for v_group in vertical_groups:
-                    # Bepaal tabel regio
-                    x_min = min(v["bbox"][0] for v in v_group)
-                    x_max = max(v["bbox"][0] + v["bbox"][2] for v in v_group)
-                    y_min = min(h["bbox"][1] for h in h_group)
-                    y_max = max(h["bbox"][1] + h["bbox"][3] for h in h_group)
-                    
-                    # Alleen als het een redelijke grootte heeft
-                    width = x_max - x_min
-                    height = y_max - y_min
-                    
-                    if width > 100 and height > 100:
-                        tables.append({
-                            "bbox": (x_min, y_min, width, height),
-                            "rows": len(h_group),
-                            "columns": len(v_group),
-                            "cells": len(h_group) * len(v_group)
-                        })
+            element_type = np.where(
+                self._is_dimension_indicator(w, h, aspect_ratio), "dimension", "annotation"
+            )
             
-            return tables
+            return ElementStore.from_columns(
+                element_type.tolist(),
+                bbox,
+                area=w * h,
+                aspect_ratio=aspect_ratio
+            )
             
         except Exception as e:
-            logger.warning(f"Table structure detection failed: {e}")
-            return []
+            logger.warning(f"Text region detection failed: {e}")
+            return ElementStore.empty()
     
     async def _classify_elements(
         self,
-        lines: List[Dict],
-        rectangles: List[Dict],
-        circles: List[Dict],
-        text_regions: List[Dict]
-    ) -> List[VisionElement]:
+        lines: ElementStore,
+        rectangles: ElementStore,
+        circles: ElementStore,
+        text_regions: ElementStore
+    ) -> ElementStore:
         """Classificeer gedetecteerde elementen als bouwelementen"""
+        # Classificeer lijnen
+        length = lines.length
+        lines.set_type(length <= 50, "detail_line")
+        lines.set_type((length > 50) & (length <= 200), "beam")
+        lines.set_type(length > 200, "wall")
+        lines.confidence[:] = 0.8
+        
+        # Classificeer rechthoeken (volgorde: laatste regel wint, dus omgekeerde prioriteit)
+        area = rectangles.area
+        aspect_ratio = rectangles.aspect_ratio
+        rectangles.set_type(np.ones(len(rectangles), dtype=bool), "opening")
+        rectangles.set_type(area > 1000, "window")
+        rectangles.set_type(area > 10000, "room")
+        rectangles.set_type(aspect_ratio < 0.2, "column")
+        rectangles.set_type(aspect_ratio > 5, "wall_section")
+        rectangles.confidence[:] = 0.7
+        
+        # Classificeer cirkels
+        circles.set_type(circles.radius <= 30, "hole")
+        circles.set_type(circles.radius > 30, "column_circular")
+        circles.confidence[:] = 0.6
+        
+        # Tekst regio's zijn al als dimension/annotation getypeerd
+        text_regions.confidence[:] = 0.5
+        
+        return ElementStore.concat([lines, rectangles, circles, text_regions])
+    
+    def _to_vision_elements(self, store: ElementStore) -> List[VisionElement]:
+        """Bouw VisionElement modellen uit de store (alleen aan de API grens)"""
         elements = []
         
-        # Classificeer lijnen
-        for line in lines:
-            length = line.get("length", 0)
-            angle = line.get("angle", 0)
-            
-            if length > 200:
-                element_type = "wall"
-            elif 50 < length <= 200:
-                element_type = "beam"
-            else:
-                element_type = "detail_line"
+        for record in store.to_records():
+            element_type = record["element_type"]
+            x, y, w, h = (int(v) for v in record["bbox"])
             
-            elements.append(VisionElement(
-                element_type=element_type,
-                bbox=line["bbox"],
-                confidence=0.8,
-                properties={
-                    "length": length,
-                    "angle": angle,
+            if record["shape"] == SHAPE_SEGMENT:
+                properties = {
+                    "length": record["length"],
+                    "angle": record["angle"],
                     "is_structural": element_type in ["wall", "beam"]
                 }
-            ))
-        
-        # Classificeer rechthoeken
-        for rect in rectangles:
-            area = rect.get("area", 0)
-            aspect_ratio = rect.get("aspect_ratio", 1)
-            
-            if aspect_ratio > 5:
-                element_type = "wall_section"
-            elif aspect_ratio < 0.2:
-                element_type = "column"
-            elif area > 10000:
-                element_type = "room"
-            elif area > 1000:
-                element_type = "window"
-            else:
-                element_type = "opening"
-            
-            elements.append(VisionElement(
-                element_type=element_type,
-                bbox=rect["bbox"],
-                confidence=0.7,
-                properties={
-                    "area": area,
-                    "aspect_ratio": aspect_ratio,
-                    "center": rect.get("center", (0, 0))
-                }
-            ))
-        
-        # Classificeer cirkels
-        for circle in circles:
-            radius = circle.get("radius", 0)
-            
-            if radius > 30:
-                element_type = "column_circular"
-            else:
-                element_type = "hole"
-            
-            elements.append(VisionElement(
-                element_type=element_type,
-                bbox=circle["bbox"],
-                confidence=0.6,
-                properties={
+            elif record["shape"] == SHAPE_CIRCLE:
+                radius = int(record["radius"])
+                properties = {
                     "radius": radius,
-                    "diameter": circle.get("diameter", 0),
-                    "area": circle.get("area", 0)
+                    "diameter": radius * 2,
+                    "area": record["area"]
+                }
+            elif element_type in ["dimension", "annotation"]:
+                properties = {
+                    "area": record["area"],
+                    "aspect_ratio": record["aspect_ratio"]
                 }
-            ))
-        
-        # Classificeer tekst regio's
-        for text in text_regions:
-            if text.get("is_dimension", False):
-                element_type = "dimension"
             else:
-                element_type = "annotation"
+                properties = {
+                    "area": record["area"],
+                    "aspect_ratio": record["aspect_ratio"],
+                    "center": (x + w // 2, y + h // 2)
+                }
             
             elements.append(VisionElement(
                 element_type=element_type,
-                bbox=text["bbox"],
-                confidence=0.5,
-                properties={
-                    "area": text.get("area", 0),
-                    "aspect_ratio": text.get("aspect_ratio", 0)
-                }
+                bbox=(x, y, w, h),
+                confidence=record["confidence"],
+                properties=properties
             ))
         
         return elements
     
-    async def _detect_scale(self, image_path: str, elements: List[VisionElement]) -> Optional[str]:
-        """Detecteer schaal van de tekening"""
+    async def _detect_scale(self, source_path: str, image: np.ndarray) -> Optional[ScaleCalibration]:
+        """Detecteer schaal van de tekening (titelblok OCR, of eerdere revisie uit de cache)"""
         try:
-            # Zoek naar schaalbalk of dimension annotaties
-            dimension_elements = [e for e in elements if e.element_type == "dimension"]
-            
-            if dimension_elements:
-                # Gebruik meest voorkomende dimensie als referentie
-                return "1:100"  # Placeholder - in productie: analyseer werkelijke maten
-            
-            # Controleer metadata in image
-            with Image.open(image_path) as img:
-                # Check EXIF data
-                if hasattr(img, '_getexif') and img._getexif():
-                    exif = img._getexif()
-                    # Zoek naar schaal informatie
-                    pass
-            
-            return None
+            height, width = image.shape[:2]
+            return self.scale_engine.calibrate(source_path, 1, (width, height), image=image)
             
         except Exception as e:
             logger.warning(f"Scale detection failed: {e}")
@@ -711,7 +631,7 @@ class VisionClient:
         
         return metadata
     
-    def _calculate_confidence(self, elements: List[VisionElement], metadata: Dict) -> float:
+    def _calculate_confidence(self, elements: ElementStore, metadata: Dict) -> float:
         """Bereken confidence score voor de analyse"""
         confidence = 0.5
         
@@ -725,7 +645,7 @@ class VisionClient:
             confidence += 0.1
         
         # Hoger bij structuurelementen
-        structural_count = sum(1 for e in elements if e.properties.get("is_structural", False))
+        structural_count = int(elements.type_mask("wall", "beam").sum())
         if structural_count > 5:
             confidence += 0.1
         
@@ -735,15 +655,14 @@ class VisionClient:
         
         return min(0.95, max(0.3, confidence))
     
-    def _generate_warnings(self, elements: List[VisionElement], metadata: Dict) -> List[str]:
+    def _generate_warnings(self, elements: ElementStore, metadata: Dict) -> List[str]:
         """Genereer waarschuwingen op basis van analyse"""
         warnings = []
         
         if len(elements) < 5:
             warnings.append("Weinig elementen gedetecteerd - mogelijk lage beeldkwaliteit")
         
-        structural_elements = [e for e in elements if e.properties.get("is_structural", False)]
-        if len(structural_elements) == 0:
+        if not elements.type_mask("wall", "beam").any():
             warnings.append("Geen structuurelementen gedetecteerd - mogelijk geen bouwtekening")
         
         if not metadata.get("has_exif", False):
@@ -751,45 +670,10 @@ class VisionClient:
         
         return warnings
     
-    def _is_dimension_indicator(self, width: int, height: int, aspect_ratio: float) -> bool:
-        """Check of een regio een maataanduiding is"""
+    def _is_dimension_indicator(self, width, height, aspect_ratio):
+        """Check of een regio een maataanduiding is (werkt ook op arrays)"""
         # Dimensies zijn meestal lang en smal
-        return 3.0 < aspect_ratio < 10.0 and width > 50
-    
-    def _group_lines(self, lines: List[Dict], axis: str = 'x', threshold: int = 20) -> List[List[Dict]]:
-        """Groepeer lijnen die dicht bij elkaar liggen"""
-        if not lines:
-            return []
-        
-        # Sorteer op de gespecificeerde as
-        if axis == 'x':
-            lines.sort(key=lambda l: l["bbox"][0])
-        else:  # 'y'
-            lines.sort(key=lambda l: l["bbox"][1])
-        
-        groups = []
-        current_group = [lines[0]]
-        
-        for i in range(1, len(lines)):
-            current_line = lines[i]
-            last_line = current_group[-1]
-            
-            # Bepaal afstand
-            if axis == 'x':
-                dist = abs(current_line["bbox"][0] - last_line["bbox"][0])
-            else:
-                dist = abs(current_line["bbox"][1] - last_line["bbox"][1])
-            
-            if dist <= threshold:
-                current_group.append(current_line)
-            else:
-                groups.append(current_group)
-                current_group = [current_line]
-        
-        if current_group:
-            groups.append(current_group)
-        
-        return groups
+        return (3.0 < aspect_ratio) & (aspect_ratio < 10.0) & (width > 50)
 
 
 # Factory functie
@@ -2,9 +2,21 @@
 Utility modules
 """
 
-from .file_handler import FileHandler, get_file_handler
+import importlib
+from typing import Any
 
-__all__ = [
-    "FileHandler", 
-    "get_file_handler",
-]
+# Exports worden pas bij gebruik geïmporteerd, zodat losse submodules
+# importeerbaar blijven zonder de afhankelijkheden van file_handler
+_EXPORTS = {
+    "FileHandler": ".file_handler",
+    "get_file_handler": ".file_handler",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module, __name__), name)
@@ -0,0 +1,459 @@
+import csv
+import io
+import logging
+import re
+import zipfile
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, List, Optional, Any, Iterable, Iterator, Tuple
+from xml.sax.saxutils import escape
+
+logger = logging.getLogger(__name__)
+
+try:
+    from fastapi.responses import StreamingResponse
+    FASTAPI_AVAILABLE = True
+except ImportError:
+    FASTAPI_AVAILABLE = False
+
+
+# Kolommen van de export: (veld, kop, breedte in PDF punten)
+EXPORT_COLUMNS = [
+    ("item_code", "Code", 70),
+    ("description", "Omschrijving", 190),
+    ("category", "Categorie", 65),
+    ("quantity", "Hoeveelheid", 60),
+    ("unit", "Eenheid", 40),
+    ("unit_price", "Eenheidsprijs", 70),
+    ("total_price", "Totaal", 80),
+]
+
+NUMERIC_FIELDS = {"quantity", "unit_price", "total_price"}
+
+# Volgorde van de secties uit CostBreakdown
+BREAKDOWN_SECTIONS = [
+    ("material_costs", "Materiaal"),
+    ("labor_costs", "Arbeid"),
+    ("equipment_costs", "Materieel"),
+    ("overhead_costs", "Opslagen"),
+]
+
+# Tekens die niet in XML 1.0 mogen (Excel weigert het bestand), ook niet als entity
+XML_ILLEGAL_CHARACTERS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "pdf": "application/pdf",
+}
+
+
+def _field(item: Any, field: str) -> Any:
+    return item.get(field) if isinstance(item, dict) else getattr(item, field, None)
+
+
+def _xml_text(value: Any) -> str:
+    """Tekst voor in XML: ongeldige stuurtekens weg, daarna escapen"""
+    return escape(XML_ILLEGAL_CHARACTERS.sub("", str(value)))
+
+
+def iter_breakdown_items(breakdown: Any) -> Iterator[Any]:
+    """Alle posten van een CostBreakdown (of dict) in sectievolgorde, zonder kopieën"""
+    for section, _ in BREAKDOWN_SECTIONS:
+        for item in _field(breakdown, section) or []:
+            yield item
+
+
+def breakdown_totals(breakdown: Any) -> List[Tuple[str, Any]]:
+    """Samenvattingsregels (subtotalen, BTW, totalen) voor onder de export"""
+    subtotals = _field(breakdown, "subtotals") or {}
+    lines = [(f"Subtotaal {name}", value) for name, value in subtotals.items()]
+    lines.append(("Totaal excl. BTW", _field(breakdown, "total_excl_vat")))
+    lines.append(("BTW", _field(breakdown, "vat_amount")))
+    lines.append(("Totaal incl. BTW", _field(breakdown, "total_incl_vat")))
+    return [(label, value) for label, value in lines if value is not None]
+
+
+class _ChunkBuffer(io.RawIOBase):
+    """Schrijfbare, niet-seekbare stream waarvan de inhoud in chunks wordt afgetapt"""
+    
+    def __init__(self):
+        self._buffer = bytearray()
+        self._position = 0
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, data: bytes) -> int:
+        self._buffer.extend(data)
+        self._position += len(data)
+        return len(data)
+    
+    def tell(self) -> int:
+        return self._position
+    
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+    
+    @property
+    def pending(self) -> int:
+        """Aantal nog niet afgetapte bytes"""
+        return len(self._buffer)
+
+
+class CalculationExporter:
+    """
+    Streaming export van calculatieposten naar CSV, XLSX en PDF.
+    
+    Alle formaten worden als generator van byte-chunks geschreven: de eerste
+    bytes zijn er direct en het geheugengebruik is onafhankelijk van het
+    aantal posten. XLSX wordt als zip met data descriptors naar een
+    niet-seekbare stream geschreven (inline strings, geen shared strings
+    tabel); PDF wordt object voor object geschreven met de xref aan het eind.
+    """
+    
+    def __init__(
+        self,
+        chunk_size: int = 64 * 1024,
+        csv_delimiter: str = ";",
+        rows_per_page: int = 48
+    ):
+        self.chunk_size = chunk_size
+        self.csv_delimiter = csv_delimiter
+        self.rows_per_page = rows_per_page
+    
+    def stream(
+        self,
+        items: Iterable[Any],
+        fmt: str,
+        title: str = "Calculatie",
+        totals: Optional[List[Tuple[str, Any]]] = None
+    ) -> Iterator[bytes]:
+        """
+        Exporteer posten als stream van bytes
+        
+        Args:
+            items: CostItems of dicts (bijv. iter_breakdown_items(breakdown))
+            fmt: "csv", "xlsx" of "pdf"
+            title: Titel (PDF kop, werkbladnaam)
+            totals: Samenvattingsregels (label, bedrag) na de posten
+        
+        Returns:
+            Iterator met byte-chunks
+        """
+        writers = {"csv": self.csv_chunks, "xlsx": self.xlsx_chunks, "pdf": self.pdf_chunks}
+        writer = writers.get(fmt.lower())
+        if writer is None:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        return writer(items, title, totals or [])
+    
+    def stream_breakdown(self, breakdown: Any, fmt: str, title: str = "Calculatie") -> Iterator[bytes]:
+        """Exporteer een CostBreakdown (of CostAnalysisResult.breakdown als dict)"""
+        return self.stream(iter_breakdown_items(breakdown), fmt, title, breakdown_totals(breakdown))
+    
+    # === CSV ===
+    
+    def csv_chunks(self, items: Iterable[Any], title: str, totals: List[Tuple[str, Any]]) -> Iterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, delimiter=self.csv_delimiter)
+        
+        buffer.write("\ufeff")  # BOM zodat Excel UTF-8 herkent
+        writer.writerow([header for _, header, _ in EXPORT_COLUMNS])
+        
+        def flush() -> bytes:
+            data = buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            return data
+        
+        for item in items:
+            writer.writerow([self._text(_field(item, field), field) for field, _, _ in EXPORT_COLUMNS])
+            if buffer.tell() >= self.chunk_size:
+                yield flush()
+        
+        if totals:
+            writer.writerow([])
+            for label, value in totals:
+                row = [""] * len(EXPORT_COLUMNS)
+                row[1], row[-1] = label, self._text(value, "total_price")
+                writer.writerow(row)
+        
+        yield flush()
+    
+    # === XLSX ===
+    
+    def xlsx_chunks(self, items: Iterable[Any], title: str, totals: List[Tuple[str, Any]]) -> Iterator[bytes]:
+        stream = _ChunkBuffer()
+        sheet_name = _xml_text(title[:31] or "Calculatie")
+        
+        with zipfile.ZipFile(stream, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("[Content_Types].xml", XLSX_CONTENT_TYPES)
+            archive.writestr("_rels/.rels", XLSX_ROOT_RELS)
+            archive.writestr("xl/workbook.xml", XLSX_WORKBOOK.format(sheet_name=sheet_name))
+            archive.writestr("xl/_rels/workbook.xml.rels", XLSX_WORKBOOK_RELS)
+            archive.writestr("xl/styles.xml", XLSX_STYLES)
+            
+            with archive.open("xl/worksheets/sheet1.xml", "w") as sheet:
+                sheet.write(XLSX_SHEET_START.encode("utf-8"))
+                sheet.write(self._xlsx_row(1, [header for _, header, _ in EXPORT_COLUMNS], style=1))
+                
+                row_number = 1
+                for item in items:
+                    row_number += 1
+                    values = [_field(item, field) for field, _, _ in EXPORT_COLUMNS]
+                    sheet.write(self._xlsx_row(row_number, values))
+                    if stream.pending >= self.chunk_size:
+                        yield stream.drain()
+                
+                row_number += 1
+                for label, value in totals:
+                    row_number += 1
+                    values = [None] * len(EXPORT_COLUMNS)
+                    values[1], values[-1] = label, value
+                    sheet.write(self._xlsx_row(row_number, values, style=1))
+                
+                sheet.write(XLSX_SHEET_END.encode("utf-8"))
+        
+        yield stream.drain()
+    
+    def _xlsx_row(self, row_number: int, values: List[Any], style: int = 0) -> bytes:
+        cells = []
+        style_attribute = f' s="{style}"' if style else ""
+        for column, value in enumerate(values):
+            if value is None or value == "":
+                continue
+            reference = f"{chr(ord('A') + column)}{row_number}"
+            if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+                cells.append(f'<c r="{reference}"{style_attribute}><v>{value}</v></c>')
+            else:
+                text = _xml_text(value)
+                cells.append(f'<c r="{reference}" t="inlineStr"{style_attribute}><is><t>{text}</t></is></c>')
+        return f'<row r="{row_number}">{"".join(cells)}</row>'.encode("utf-8")
+    
+    # === PDF ===
+    
+    def pdf_chunks(self, items: Iterable[Any], title: str, totals: List[Tuple[str, Any]]) -> Iterator[bytes]:
+        writer = _PDFStreamWriter()
+        yield writer.header()
+        
+        rows: List[List[str]] = []
+        page_number = 0
+        
+        def page(rows: List[List[str]]) -> bytes:
+            nonlocal page_number
+            page_number += 1
+            return writer.page(self._pdf_page_content(title, rows, page_number))
+        
+        for item in items:
+            rows.append([self._text(_field(item, field), field) for field, _, _ in EXPORT_COLUMNS])
+            if len(rows) >= self.rows_per_page:
+                yield page(rows)
+                rows = []
+        
+        for label, value in totals:
+            row = [""] * len(EXPORT_COLUMNS)
+            row[1], row[-1] = label, self._text(value, "total_price")
+            rows.append(row)
+            if len(rows) >= self.rows_per_page:
+                yield page(rows)
+                rows = []
+        
+        if rows or page_number == 0:
+            yield page(rows)
+        
+        yield writer.finish()
+    
+    def _pdf_page_content(self, title: str, rows: List[List[str]], page_number: int) -> bytes:
+        """Content stream van één A4 liggende pagina (842 × 595 punten)"""
+        lines = ["BT", "/F2 12 Tf", f"40 560 Td ({_pdf_text(title)}) Tj", "ET"]
+        lines += ["BT", "/F1 8 Tf", f"760 560 Td (Pagina {page_number}) Tj", "ET"]
+        
+        y = 530
+        lines.append("/F2 8 Tf")
+        lines += self._pdf_row([header for _, header, _ in EXPORT_COLUMNS], y)
+        lines.append(f"40 {y - 4} m 802 {y - 4} l S")
+        
+        lines.append("/F1 8 Tf")
+        for row in rows:
+            y -= 10
+            lines += self._pdf_row(row, y)
+        
+        return "\n".join(lines).encode("cp1252", errors="replace")
+    
+    def _pdf_row(self, values: List[str], y: int) -> List[str]:
+        commands = []
+        x = 40
+        for (field, _, width), value in zip(EXPORT_COLUMNS, values):
+            text = value if len(value) * 4.2 < width else value[:max(1, int(width / 4.2) - 1)] + "…"
+            if field in NUMERIC_FIELDS:
+                # Rechts uitlijnen op een geschatte tekstbreedte
+                offset = x + width - 6 - len(text) * 4.2
+                commands.append(f"BT {offset:.1f} {y} Td ({_pdf_text(text)}) Tj ET")
+            else:
+                commands.append(f"BT {x} {y} Td ({_pdf_text(text)}) Tj ET")
+            x += width
+        return commands
+    
+    # === HULPFUNCTIES ===
+    
+    @staticmethod
+    def _text(value: Any, field: str) -> str:
+        if value is None:
+            return ""
+        if field in NUMERIC_FIELDS and isinstance(value, (int, float, Decimal)):
+            # Nederlandse notatie: 1.234,56
+            formatted = f"{float(value):,.2f}" if field != "quantity" else f"{float(value):,.3f}".rstrip("0").rstrip(".")
+            return formatted.replace(",", "_").replace(".", ",").replace("_", ".")
+        return str(value)
+
+
+def _pdf_text(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+class _PDFStreamWriter:
+    """Minimale PDF schrijver die objecten direct uitvoert en offsets bijhoudt"""
+    
+    # Vaste objectnummers: 1 catalogus, 2 paginaboom, 3-4 fonts
+    CATALOG, PAGES, FONT_REGULAR, FONT_BOLD = 1, 2, 3, 4
+    
+    def __init__(self):
+        self.offsets: Dict[int, int] = {}
+        self.position = 0
+        self.next_object = 5
+        self.pages: List[int] = []
+    
+    def header(self) -> bytes:
+        data = b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"
+        data += self._object(self.FONT_REGULAR, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>", len(data))
+        data += self._object(self.FONT_BOLD, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>", len(data))
+        self.position = len(data)
+        return data
+    
+    def page(self, content: bytes) -> bytes:
+        content_id, page_id = self.next_object, self.next_object + 1
+        self.next_object += 2
+        self.pages.append(page_id)
+        
+        data = self._object(
+            content_id,
+            b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream",
+            self.position
+        )
+        data += self._object(
+            page_id,
+            (
+                f"<< /Type /Page /Parent {self.PAGES} 0 R /MediaBox [0 0 842 595] "
+                f"/Resources << /Font << /F1 {self.FONT_REGULAR} 0 R /F2 {self.FONT_BOLD} 0 R >> >> "
+                f"/Contents {content_id} 0 R >>"
+            ).encode("ascii"),
+            self.position + len(data)
+        )
+        self.position += len(data)
+        return data
+    
+    def finish(self) -> bytes:
+        kids = " ".join(f"{page} 0 R" for page in self.pages)
+        data = self._object(self.PAGES, f"<< /Type /Pages /Kids [{kids}] /Count {len(self.pages)} >>".encode("ascii"), self.position)
+        data += self._object(self.CATALOG, f"<< /Type /Catalog /Pages {self.PAGES} 0 R >>".encode("ascii"), self.position + len(data))
+        
+        xref_position = self.position + len(data)
+        count = self.next_object
+        xref = [f"xref\n0 {count}\n", "0000000000 65535 f \n"]
+        for number in range(1, count):
+            xref.append(f"{self.offsets.get(number, 0):010d} 00000 n \n")
+        trailer = f"trailer\n<< /Size {count} /Root {self.CATALOG} 0 R >>\nstartxref\n{xref_position}\n%%EOF\n"
+        return data + "".join(xref).encode("ascii") + trailer.encode("ascii")
+    
+    def _object(self, number: int, body: bytes, position: int) -> bytes:
+        self.offsets[number] = position
+        return b"%d 0 obj\n" % number + body + b"\nendobj\n"
+
+
+XLSX_CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>
+<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>
+<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>
+</Types>"""
+
+XLSX_ROOT_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>
+</Relationships>"""
+
+XLSX_WORKBOOK = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">
+<sheets><sheet name="{sheet_name}" sheetId="1" r:id="rId1"/></sheets>
+</workbook>"""
+
+XLSX_WORKBOOK_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>
+<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>
+</Relationships>"""
+
+XLSX_STYLES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
+<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font><font><b/><sz val="11"/><name val="Calibri"/></font></fonts>
+<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>
+<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>
+<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>
+<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/><xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>
+</styleSheet>"""
+
+XLSX_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<sheetViews><sheetView workbookViewId="0"><pane ySplit="1" topLeftCell="A2" state="frozen"/></sheetView></sheetViews>'
+    '<cols><col min="1" max="1" width="14"/><col min="2" max="2" width="48"/><col min="3" max="7" width="14"/></cols>'
+    '<sheetData>'
+)
+
+XLSX_SHEET_END = "</sheetData></worksheet>"
+
+
+def streaming_response(
+    breakdown: Any,
+    fmt: str,
+    filename: Optional[str] = None,
+    title: str = "Calculatie",
+    exporter: Optional[CalculationExporter] = None
+) -> Any:
+    """
+    FastAPI StreamingResponse (chunked) voor een export van een CostBreakdown
+    
+    Args:
+        breakdown: CostBreakdown of dict
+        fmt: "csv", "xlsx" of "pdf"
+        filename: Bestandsnaam zonder extensie
+        title: Titel in het document
+        exporter: Eigen CalculationExporter instellingen
+    
+    Returns:
+        StreamingResponse met Content-Disposition attachment
+    """
+    if not FASTAPI_AVAILABLE:
+        raise RuntimeError("fastapi is required for streaming responses")
+    
+    fmt = fmt.lower()
+    if fmt not in MEDIA_TYPES:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    
+    exporter = exporter or CalculationExporter()
+    filename = f"{filename or 'calculatie_' + datetime.now().strftime('%Y%m%d_%H%M%S')}.{fmt}"
+    return StreamingResponse(
+        exporter.stream_breakdown(breakdown, fmt, title),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+# Factory functie
+def get_calculation_exporter(**kwargs: Any) -> CalculationExporter:
+    """Factory om CalculationExporter instantie te maken"""
+    return CalculationExporter(**kwargs)
@@ -0,0 +1,775 @@
+import logging
+import math
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Iterator, Tuple, Iterable
+
+import cv2
+import numpy as np
+
+from ..models.element_store import ElementStore, SHAPE_CIRCLE, SHAPE_SEGMENT, LAYERS
+
+logger = logging.getLogger(__name__)
+
+
+# $INSUNITS naar millimeters (0 = zonder eenheid, dan gaan we uit van mm)
+INSUNITS_TO_MM = {0: 1.0, 1: 25.4, 2: 304.8, 4: 1.0, 5: 10.0, 6: 1000.0}
+
+# Element type op basis van de laagnaam: NL-SfB codes (prefix) en trefwoorden
+NLSFB_TYPES = {
+    "16": "foundation",
+    "21": "wall",
+    "22": "wall",
+    "23": "floor",
+    "24": "stairs",
+    "27": "roof",
+    "28": "column",
+    "31": "window",
+    "32": "door",
+}
+
+LAYER_KEYWORDS = [
+    ("wall", ("wand", "muur", "wall")),
+    ("column", ("kolom", "column")),
+    ("beam", ("balk", "beam", "ligger")),
+    ("window", ("raam", "ramen", "kozijn", "window")),
+    ("door", ("deur", "door")),
+    ("floor", ("vloer", "floor", "slab")),
+    ("roof", ("dak", "roof")),
+    ("stairs", ("trap", "stair")),
+    ("room", ("ruimte", "room", "space")),
+    ("foundation", ("fundering", "foundation", "paal")),
+    ("dimension", ("maatvoering", "maat", "dim")),
+    ("annotation", ("tekst", "text", "anno")),
+]
+
+# Opmaakcodes in MTEXT (\P nieuwe alinea, \f lettertype; ... en accolades)
+MTEXT_FORMATTING = re.compile(r"\\[A-Za-z][^;\\]*;|\\[PpNn~]|[{}]")
+
+MAX_INSERT_DEPTH = 8
+
+
+class DXFEntity:
+    """Eén DXF entiteit: type, laag en de ruwe group code paren"""
+    
+    __slots__ = ("dxftype", "layer", "tags")
+    
+    def __init__(self, dxftype: str, layer: str, tags: List[Tuple[int, str]]):
+        self.dxftype = dxftype
+        self.layer = layer
+        self.tags = tags
+    
+    def get(self, code: int, default: Any = None) -> Any:
+        for tag_code, value in self.tags:
+            if tag_code == code:
+                return value
+        return default
+    
+    def float(self, code: int, default: float = 0.0) -> float:
+        value = self.get(code)
+        return float(value) if value is not None else default
+
+
+class DXFDrawing:
+    """Resultaat van het inlezen: geometrie in millimeters, per soort een ElementStore"""
+    
+    def __init__(
+        self,
+        primitives: Dict[str, ElementStore],
+        texts: List[str],
+        outlines: List[np.ndarray],
+        header: Dict[str, Any],
+        units_to_mm: float
+    ):
+        self.primitives = primitives  # lines, polygons, circles, text_regions, dimensions
+        self.texts = texts            # tekst per rij in primitives["text_regions"]
+        self.outlines = outlines      # hoekpunten van gesloten contouren (voor weergave)
+        self.header = header
+        self.units_to_mm = units_to_mm
+    
+    @property
+    def elements(self) -> ElementStore:
+        return ElementStore.concat(list(self.primitives.values()))
+    
+    def layer_quantities(self) -> Dict[str, Dict[str, float]]:
+        """
+        Lengte, oppervlakte en aantal per laag
+        
+        Returns:
+            Dict per laagnaam met length (mm), area (mm²) en count
+        """
+        elements = self.elements
+        if not len(elements):
+            return {}
+        
+        # Maatvoering en tekst zijn geen hoeveelheden
+        measurable = ~elements.type_mask("dimension", "annotation")
+        codes = elements.layer_code[measurable].astype(np.int64) + 1  # -1 (geen laag) wordt 0
+        length = np.nan_to_num(elements.length[measurable])
+        area = np.nan_to_num(elements.area[measurable])
+        
+        lengths = np.bincount(codes, weights=length)
+        areas = np.bincount(codes, weights=area)
+        counts = np.bincount(codes)
+        
+        quantities = {}
+        for code in np.flatnonzero(counts):
+            name = LAYERS.lookup(int(code) - 1) or "0"
+            quantities[name] = {
+                "length": float(lengths[code]),
+                "area": float(areas[code]),
+                "count": int(counts[code])
+            }
+        return quantities
+    
+    def render(self, max_side: int = 4000, margin: int = 20) -> np.ndarray:
+        """
+        Teken de geometrie als afbeelding (voor vision analyse en previews)
+        
+        Args:
+            max_side: Maximale breedte/hoogte in pixels
+            margin: Witte rand in pixels
+        
+        Returns:
+            BGR afbeelding, y-as omgedraaid naar beeldcoördinaten
+        """
+        elements = self.elements
+        if not len(elements):
+            return np.full((max(1, 2 * margin), max(1, 2 * margin), 3), 255, dtype=np.uint8)
+        
+        x, y, w, h = elements.bbox.T
+        min_x, min_y = float(np.min(x)), float(np.min(y))
+        max_x, max_y = float(np.max(x + w)), float(np.max(y + h))
+        extent = max(max_x - min_x, max_y - min_y, 1e-9)
+        scale = (max_side - 2 * margin) / extent
+        
+        width = int(math.ceil((max_x - min_x) * scale)) + 2 * margin
+        height = int(math.ceil((max_y - min_y) * scale)) + 2 * margin
+        image = np.full((height, width, 3), 255, dtype=np.uint8)
+        
+        def to_pixels(points: np.ndarray) -> np.ndarray:
+            px = (points[:, 0] - min_x) * scale + margin
+            py = height - ((points[:, 1] - min_y) * scale + margin)
+            return np.round(np.column_stack([px, py])).astype(np.int32)
+        
+        segments = elements.take(elements.shape == SHAPE_SEGMENT).points
+        if len(segments):
+            ends = to_pixels(segments.reshape(-1, 2)).reshape(-1, 2, 2)
+            cv2.polylines(image, list(ends), False, (0, 0, 0), 1)
+        
+        if self.outlines:
+            cv2.polylines(image, [to_pixels(outline) for outline in self.outlines], True, (0, 0, 0), 1)
+        
+        circles = elements.take(elements.shape == SHAPE_CIRCLE)
+        if len(circles):
+            centers = to_pixels(circles.bbox[:, :2] + circles.bbox[:, 2:] / 2)
+            for (cx, cy), radius in zip(centers, circles.radius):
+                cv2.circle(image, (int(cx), int(cy)), max(1, int(round(radius * scale))), (0, 0, 0), 1)
+        
+        return image
+
+
+class _Collector:
+    """Verzamelt geometrie tijdens het streamen (in tekeningeenheden)"""
+    
+    def __init__(self):
+        self.segments: List[Tuple[float, float, float, float]] = []
+        self.segment_layers: List[str] = []
+        self.polygons: List[np.ndarray] = []
+        self.polygon_areas: List[float] = []
+        self.polygon_perimeters: List[float] = []
+        self.polygon_layers: List[str] = []
+        self.polygon_kinds: List[str] = []
+        self.circles: List[Tuple[float, float, float]] = []
+        self.circle_layers: List[str] = []
+        self.texts: List[Tuple[float, float, float, float, str]] = []
+        self.text_layers: List[str] = []
+        self.dimensions: List[Tuple[float, float, float, float, float, str]] = []
+        self.dimension_layers: List[str] = []
+
+
+class DXFReader:
+    """
+    Native DXF lezer die entiteiten streamt zonder de tekening te renderen.
+    
+    Ondersteunt LINE, LWPOLYLINE/POLYLINE, ARC, CIRCLE, HATCH, INSERT (blokken
+    worden uitgevouwen), TEXT/MTEXT en DIMENSION. Lengtes en oppervlaktes
+    worden direct uit de geometrie berekend (inclusief bulges in polylijnen)
+    en omgerekend naar millimeters op basis van $INSUNITS. Alleen ASCII DXF;
+    DWG moet eerst naar DXF worden omgezet.
+    """
+    
+    def __init__(self, arc_segments_per_quadrant: int = 8):
+        self.arc_segments_per_quadrant = arc_segments_per_quadrant
+    
+    def supports(self, file_path: str) -> bool:
+        return Path(file_path).suffix.lower() == '.dxf'
+    
+    def read(self, file_path: str, layers: Optional[Iterable[str]] = None) -> DXFDrawing:
+        """
+        Lees een DXF bestand in
+        
+        Args:
+            file_path: Pad naar het DXF bestand
+            layers: Optioneel alleen deze lagen inlezen
+        
+        Returns:
+            DXFDrawing met ElementStores per soort geometrie
+        """
+        header: Dict[str, Any] = {}
+        collector = _Collector()
+        layer_filter = set(layers) if layers is not None else None
+        
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as stream:
+            blocks: Dict[str, Tuple[Tuple[float, float], List[DXFEntity]]] = {}
+            for section, entity in self._iter_sections(stream, header, blocks):
+                if section != "ENTITIES":
+                    continue
+                if layer_filter is not None and entity.layer not in layer_filter and entity.dxftype != "INSERT":
+                    continue
+                self._collect(entity, collector, blocks, IDENTITY, entity.layer, 0, layer_filter)
+        
+        units_to_mm = INSUNITS_TO_MM.get(int(header.get("$INSUNITS", 0) or 0), 1.0)
+        drawing = self._build(collector, header, units_to_mm)
+        
+        logger.info(
+            f"DXF read: {len(drawing.elements)} elements on "
+            f"{len(drawing.layer_quantities())} layers from {Path(file_path).name}"
+        )
+        return drawing
+    
+    def iter_entities(self, file_path: str, layers: Optional[Iterable[str]] = None) -> Iterator[DXFEntity]:
+        """
+        Stream de entiteiten uit de ENTITIES sectie (zonder blokken uit te vouwen)
+        
+        Args:
+            file_path: Pad naar het DXF bestand
+            layers: Optioneel alleen entiteiten op deze lagen
+        """
+        layer_filter = set(layers) if layers is not None else None
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as stream:
+            for section, entity in self._iter_sections(stream, {}, {}):
+                if section == "ENTITIES" and (layer_filter is None or entity.layer in layer_filter):
+                    yield entity
+    
+    # ------------------------------------------------------------------
+    # Streaming
+    # ------------------------------------------------------------------
+    
+    def _iter_pairs(self, stream) -> Iterator[Tuple[int, str]]:
+        """Lees group code / waarde paren regel voor regel"""
+        first = stream.readline()
+        if first.startswith("AutoCAD Binary DXF"):
+            raise ValueError("Binary DXF is not supported")
+        
+        code_line = first
+        while code_line:
+            value_line = stream.readline()
+            try:
+                code = int(code_line.strip())
+            except ValueError:
+                raise ValueError(f"Invalid DXF group code: {code_line.strip()!r}")
+            yield code, value_line.rstrip("\r\n")
+            code_line = stream.readline()
+    
+    def _iter_entities(self, pairs: Iterator[Tuple[int, str]]) -> Iterator[DXFEntity]:
+        """Groepeer paren tot entiteiten; elke code 0 start een nieuwe entiteit"""
+        dxftype = None
+        tags: List[Tuple[int, str]] = []
+        for code, value in pairs:
+            if code == 0:
+                if dxftype is not None:
+                    yield DXFEntity(dxftype, self._layer(tags), tags)
+                dxftype, tags = value.strip(), []
+            else:
+                tags.append((code, value))
+        if dxftype is not None:
+            yield DXFEntity(dxftype, self._layer(tags), tags)
+    
+    def _iter_sections(
+        self,
+        stream,
+        header: Dict[str, Any],
+        blocks: Dict[str, Tuple[Tuple[float, float], List[DXFEntity]]]
+    ) -> Iterator[Tuple[str, DXFEntity]]:
+        """
+        Loop door de secties. HEADER variabelen en BLOCKS definities worden
+        verzameld (ze staan vóór ENTITIES), entiteiten worden doorgegeven.
+        """
+        section = None
+        block_name, block_base, block_entities = None, (0.0, 0.0), []
+        polyline: Optional[DXFEntity] = None
+        
+        for entity in self._iter_entities(self._iter_pairs(stream)):
+            kind = entity.dxftype
+            
+            if kind == "SECTION":
+                section = entity.get(2, "").strip()
+                if section == "HEADER":
+                    self._parse_header(entity.tags, header)
+                continue
+            if kind == "ENDSEC":
+                section = None
+                continue
+            if kind == "EOF":
+                return
+            
+            # Oude POLYLINE: hoekpunten volgen als losse VERTEX entiteiten
+            if kind == "POLYLINE":
+                # Het eigen 10/20/30 punt van POLYLINE is alleen de hoogte, geen hoekpunt
+                polyline = DXFEntity("POLYLINE", entity.layer, [tag for tag in entity.tags if tag[0] not in (10, 20, 30)])
+                continue
+            if kind == "VERTEX" and polyline is not None:
+                polyline.tags.extend(tag for tag in entity.tags if tag[0] in (10, 20, 42))
+                continue
+            if kind == "SEQEND" and polyline is not None:
+                entity, polyline = polyline, None
+                kind = entity.dxftype
+            
+            if section == "BLOCKS":
+                if kind == "BLOCK":
+                    block_name = entity.get(2, "").strip()
+                    block_base = (entity.float(10), entity.float(20))
+                    block_entities = []
+                elif kind == "ENDBLK":
+                    if block_name:
+                        blocks[block_name] = (block_base, block_entities)
+                    block_name = None
+                elif block_name is not None:
+                    block_entities.append(entity)
+            elif section == "ENTITIES":
+                yield section, entity
+    
+    def _parse_header(self, tags: List[Tuple[int, str]], header: Dict[str, Any]):
+        """HEADER variabelen staan als code 9 gevolgd door hun waarde(n)"""
+        name = None
+        for code, value in tags:
+            if code == 9:
+                name = value.strip()
+            elif name is not None and name not in header and code != 2:
+                header[name] = value.strip()
+    
+    def _layer(self, tags: List[Tuple[int, str]]) -> str:
+        for code, value in tags:
+            if code == 8:
+                return value.strip()
+        return "0"
+    
+    # ------------------------------------------------------------------
+    # Geometrie
+    # ------------------------------------------------------------------
+    
+    def _collect(
+        self,
+        entity: DXFEntity,
+        collector: _Collector,
+        blocks: Dict[str, Tuple[Tuple[float, float], List[DXFEntity]]],
+        transform: Tuple[float, ...],
+        layer: str,
+        depth: int,
+        layer_filter: Optional[set] = None
+    ):
+        """Zet één entiteit (met blok transformatie) om naar geometrie"""
+        # Entiteiten op laag 0 in een blok erven de laag van de INSERT
+        if depth > 0 and entity.layer != "0":
+            layer = entity.layer
+        if layer_filter is not None and entity.dxftype != "INSERT" and layer not in layer_filter:
+            return
+        
+        kind = entity.dxftype
+        try:
+            if kind == "LINE":
+                p1 = _apply(transform, entity.float(10), entity.float(20))
+                p2 = _apply(transform, entity.float(11), entity.float(21))
+                collector.segments.append((*p1, *p2))
+                collector.segment_layers.append(layer)
+            
+            elif kind in ("LWPOLYLINE", "POLYLINE"):
+                vertices, bulges = self._polyline_vertices(entity)
+                closed = bool(int(entity.get(70, "0") or 0) & 1)
+                self._add_polyline(collector, vertices, bulges, closed, transform, layer, kind.lower())
+            
+            elif kind == "ARC":
+                points = self._arc_points(
+                    entity.float(10), entity.float(20), entity.float(40),
+                    entity.float(50), entity.float(51)
+                )
+                self._add_polyline(collector, points, np.zeros(len(points)), False, transform, layer, "arc")
+            
+            elif kind == "CIRCLE":
+                cx, cy = _apply(transform, entity.float(10), entity.float(20))
+                collector.circles.append((cx, cy, entity.float(40) * _scale(transform)))
+                collector.circle_layers.append(layer)
+            
+            elif kind == "HATCH":
+                self._add_hatch(collector, entity, transform, layer)
+            
+            elif kind in ("TEXT", "MTEXT"):
+                text = entity.get(1, "")
+                if kind == "MTEXT":
+                    text = "".join(value for code, value in entity.tags if code == 3) + text
+                    text = MTEXT_FORMATTING.sub(" ", text)
+                text = " ".join(text.split())
+                if text:
+                    x, y = _apply(transform, entity.float(10), entity.float(20))
+                    height = entity.float(40, 2.5) * _scale(transform)
+                    collector.texts.append((x, y, height * 0.6 * len(text), height, text))
+                    collector.text_layers.append(layer)
+            
+            elif kind == "DIMENSION":
+                p1 = _apply(transform, entity.float(13), entity.float(23))
+                p2 = _apply(transform, entity.float(14), entity.float(24))
+                measurement = entity.float(42, math.hypot(p2[0] - p1[0], p2[1] - p1[1]))
+                collector.dimensions.append((*p1, *p2, measurement * _scale(transform), entity.get(1, "")))
+                collector.dimension_layers.append(layer)
+            
+            elif kind == "INSERT":
+                self._expand_insert(entity, collector, blocks, transform, layer, depth, layer_filter)
+        
+        except (ValueError, IndexError, ZeroDivisionError) as e:
+            logger.warning(f"Skipping malformed {kind} on layer {layer}: {e}")
+    
+    def _expand_insert(
+        self,
+        entity: DXFEntity,
+        collector: _Collector,
+        blocks: Dict[str, Tuple[Tuple[float, float], List[DXFEntity]]],
+        transform: Tuple[float, ...],
+        layer: str,
+        depth: int,
+        layer_filter: Optional[set]
+    ):
+        """Vouw een blokreferentie uit met invoegpunt, schaal en rotatie"""
+        name = entity.get(2, "").strip()
+        if name not in blocks:
+            return
+        if depth >= MAX_INSERT_DEPTH:
+            logger.warning(f"Block nesting too deep at {name}, skipping")
+            return
+        
+        (base_x, base_y), block_entities = blocks[name]
+        sx = entity.float(41, 1.0)
+        sy = entity.float(42, 1.0)
+        rotation = math.radians(entity.float(50))
+        cos_r, sin_r = math.cos(rotation), math.sin(rotation)
+        ix, iy = entity.float(10), entity.float(20)
+        
+        # Blok coördinaten: - basispunt, schalen, roteren, verplaatsen naar invoegpunt
+        local = (
+            cos_r * sx, -sin_r * sy,
+            sin_r * sx, cos_r * sy,
+            ix - (cos_r * sx * base_x - sin_r * sy * base_y),
+            iy - (sin_r * sx * base_x + cos_r * sy * base_y)
+        )
+        combined = _compose(transform, local)
+        
+        for block_entity in block_entities:
+            self._collect(block_entity, collector, blocks, combined, layer, depth + 1, layer_filter)
+    
+    def _polyline_vertices(self, entity: DXFEntity) -> Tuple[np.ndarray, np.ndarray]:
+        """Hoekpunten en bulges van een (LW)POLYLINE"""
+        vertices, bulges = [], []
+        x = None
+        for code, value in entity.tags:
+            if code == 10:
+                x = float(value)
+            elif code == 20 and x is not None:
+                vertices.append((x, float(value)))
+                bulges.append(0.0)
+                x = None
+            elif code == 42 and bulges:
+                bulges[-1] = float(value)
+        return np.asarray(vertices, dtype=np.float64).reshape(-1, 2), np.asarray(bulges, dtype=np.float64)
+    
+    def _add_polyline(
+        self,
+        collector: _Collector,
+        vertices: np.ndarray,
+        bulges: np.ndarray,
+        closed: bool,
+        transform: Tuple[float, ...],
+        layer: str,
+        kind: str
+    ):
+        """Open polylijnen worden segmenten, gesloten polylijnen een oppervlak"""
+        if len(vertices) < 2:
+            return
+        
+        points = _apply_array(transform, vertices)
+        
+        if not closed:
+            collector.segments.extend(map(tuple, np.column_stack([points[:-1], points[1:]])))
+            collector.segment_layers.extend([layer] * (len(points) - 1))
+            return
+        
+        # Lengte en oppervlak in blok coördinaten, daarna geschaald
+        starts, ends = vertices, np.roll(vertices, -1, axis=0)
+        
+        # Bulge = tan(θ/4); boog lengte en cirkelsegment exact uit de koorde
+        chord = np.hypot(ends[:, 0] - starts[:, 0], ends[:, 1] - starts[:, 1])
+        theta = 4 * np.arctan(np.abs(bulges))
+        half_sin = np.sin(theta / 2)
+        curved = half_sin > 1e-12
+        radius = np.divide(chord, 2 * half_sin, out=np.zeros_like(chord), where=curved)
+        arc_length = np.where(curved, radius * theta, chord)
+        
+        # Een positieve bulge buigt naar rechts van de looprichting: bij een polygoon
+        # tegen de klok in naar buiten, met de klok mee naar binnen
+        segment_area = np.sign(bulges) * radius ** 2 * (theta - np.sin(theta)) / 2
+        area = abs(_polygon_area(vertices) + segment_area.sum())
+        
+        collector.polygons.append(points)
+        collector.polygon_areas.append(area * abs(np.linalg.det(_linear(transform))))
+        collector.polygon_perimeters.append(float(arc_length.sum()) * _scale(transform))
+        collector.polygon_layers.append(layer)
+        collector.polygon_kinds.append(kind)
+    
+    def _arc_points(self, cx: float, cy: float, radius: float, start: float, end: float) -> np.ndarray:
+        """Benader een boog (graden, tegen de klok in) met koorden"""
+        sweep = (end - start) % 360 or 360
+        steps = max(1, int(math.ceil(sweep / 90 * self.arc_segments_per_quadrant)))
+        angles = np.radians(start + np.linspace(0, sweep, steps + 1))
+        return np.column_stack([cx + radius * np.cos(angles), cy + radius * np.sin(angles)])
+    
+    def _add_hatch(self, collector: _Collector, entity: DXFEntity, transform: Tuple[float, ...], layer: str):
+        """Arcering: oppervlak = buitenste contouren minus gaten"""
+        paths = self._hatch_paths(entity.tags)
+        if not paths:
+            return
+        
+        det = abs(np.linalg.det(_linear(transform)))
+        areas = []
+        outlines = []
+        for flags, points in paths:
+            if len(points) < 3:
+                continue
+            area = abs(_polygon_area(points)) * det
+            areas.append((flags, area))
+            outlines.append(_apply_array(transform, points))
+        
+        if not areas:
+            return
+        
+        external = [area for flags, area in areas if flags & (1 | 16)]
+        if external:
+            total = sum(external) - sum(area for flags, area in areas if not flags & (1 | 16))
+        else:
+            # Geen vlaggen: de grootste contour is de buitenrand, de rest zijn gaten
+            largest = max(area for _, area in areas)
+            total = largest - (sum(area for _, area in areas) - largest)
+        
+        outline = max(outlines, key=lambda points: np.ptp(points[:, 0]) * np.ptp(points[:, 1]))
+        perimeter = float(np.sum(np.hypot(*np.diff(np.vstack([outline, outline[:1]]), axis=0).T)))
+        
+        collector.polygons.append(outline)
+        collector.polygon_areas.append(max(0.0, float(total)))
+        collector.polygon_perimeters.append(perimeter)
+        collector.polygon_layers.append(layer)
+        collector.polygon_kinds.append("hatch")
+    
+    def _hatch_paths(self, tags: List[Tuple[int, str]]) -> List[Tuple[int, np.ndarray]]:
+        """Lees de contouren van een HATCH (polylijn contouren en lijn/boog randen)"""
+        cursor = _TagCursor(tags)
+        if not cursor.seek(91):
+            return []
+        
+        paths = []
+        for _ in range(int(cursor.value())):
+            if not cursor.seek(92):
+                break
+            flags = int(cursor.value())
+            points: List[Tuple[float, float]] = []
+            
+            if flags & 2:
+                # Polylijn contour
+                if not cursor.seek(93):
+                    break
+                for _ in range(int(cursor.value())):
+                    points.append((float(cursor.expect(10)), float(cursor.expect(20))))
+                    cursor.skip_if(42)
+            else:
+                # Contour uit losse randen
+                if not cursor.seek(93):
+                    break
+                for _ in range(int(cursor.value())):
+                    edge_type = int(cursor.expect(72))
+                    if edge_type == 1:
+                        points.append((float(cursor.expect(10)), float(cursor.expect(20))))
+                        cursor.expect(11)
+                        cursor.expect(21)
+                    elif edge_type == 2:
+                        cx, cy = float(cursor.expect(10)), float(cursor.expect(20))
+                        radius = float(cursor.expect(40))
+                        start, end = float(cursor.expect(50)), float(cursor.expect(51))
+                        ccw = int(cursor.expect(73))
+                        if not ccw:
+                            start, end = 360 - end, 360 - start
+                        points.extend(map(tuple, self._arc_points(cx, cy, radius, start, end)[:-1]))
+                    else:
+                        # Ellips en spline: benader met de eerste controle punt(en)
+                        if cursor.seek(10):
+                            points.append((float(cursor.value()), float(cursor.expect(20))))
+            
+            paths.append((flags, np.asarray(points, dtype=np.float64).reshape(-1, 2)))
+        
+        return paths
+    
+    # ------------------------------------------------------------------
+    # Opbouw van de stores
+    # ------------------------------------------------------------------
+    
+    def _build(self, collector: _Collector, header: Dict[str, Any], units_to_mm: float) -> DXFDrawing:
+        mm = units_to_mm
+        primitives: Dict[str, ElementStore] = {}
+        
+        if collector.segments:
+            segments = np.asarray(collector.segments, dtype=np.float64) * mm
+            primitives["lines"] = ElementStore.from_segments(
+                segments,
+                self._layer_types(collector.segment_layers, "line"),
+                confidence=0.95,
+                layer=collector.segment_layers
+            )
+        
+        if collector.polygons:
+            outlines = [points * mm for points in collector.polygons]
+            low = np.array([points.min(axis=0) for points in outlines])
+            high = np.array([points.max(axis=0) for points in outlines])
+            size = high - low
+            primitives["polygons"] = ElementStore.from_columns(
+                self._layer_types(collector.polygon_layers, "area"),
+                np.column_stack([low, size]),
+                confidence=0.95,
+                area=np.asarray(collector.polygon_areas) * mm ** 2,
+                length=np.asarray(collector.polygon_perimeters) * mm,
+                aspect_ratio=np.divide(size[:, 0], size[:, 1], out=np.zeros(len(size)), where=size[:, 1] > 0),
+                layer=collector.polygon_layers
+            )
+        else:
+            outlines = []
+        
+        if collector.circles:
+            circles = np.asarray(collector.circles, dtype=np.float64) * mm
+            radius = circles[:, 2]
+            primitives["circles"] = ElementStore.from_columns(
+                self._layer_types(collector.circle_layers, "column_circular"),
+                np.column_stack([circles[:, :2] - radius[:, None], 2 * radius, 2 * radius]),
+                confidence=0.95,
+                shape=SHAPE_CIRCLE,
+                radius=radius,
+                area=np.pi * radius ** 2,
+                layer=collector.circle_layers
+            )
+        
+        texts = [text for *_, text in collector.texts]
+        if collector.texts:
+            boxes = np.asarray([box for *box, _ in collector.texts], dtype=np.float64) * mm
+            primitives["text_regions"] = ElementStore.from_columns(
+                "annotation",
+                boxes,
+                confidence=0.95,
+                layer=collector.text_layers
+            )
+        
+        if collector.dimensions:
+            dims = np.asarray([row[:5] for row in collector.dimensions], dtype=np.float64) * mm
+            store = ElementStore.from_segments(dims[:, :4], "dimension", confidence=0.95, layer=collector.dimension_layers)
+            store.length[:] = dims[:, 4]  # gemeten waarde, niet de afstand tussen de hulppunten
+            primitives["dimensions"] = store
+        
+        return DXFDrawing(primitives, texts, outlines, header, units_to_mm)
+    
+    def _layer_types(self, layers: List[str], default: str) -> List[str]:
+        """Element type per laag (gecachet, tekeningen hebben weinig lagen)"""
+        cache: Dict[str, str] = {}
+        types = []
+        for layer in layers:
+            if layer not in cache:
+                cache[layer] = self.element_type_for_layer(layer) or default
+            types.append(cache[layer])
+        return types
+    
+    def element_type_for_layer(self, layer: str) -> Optional[str]:
+        """Bepaal het element type uit een laagnaam (NL-SfB code of trefwoord)"""
+        name = layer.lower()
+        match = re.match(r"^\D{0,3}(\d{2})", name)
+        if match and match.group(1) in NLSFB_TYPES:
+            return NLSFB_TYPES[match.group(1)]
+        for element_type, keywords in LAYER_KEYWORDS:
+            if any(keyword in name for keyword in keywords):
+                return element_type
+        return None
+
+
+class _TagCursor:
+    """Sequentiële lezer over de group codes van één entiteit"""
+    
+    def __init__(self, tags: List[Tuple[int, str]]):
+        self.tags = tags
+        self.index = -1
+    
+    def seek(self, code: int) -> bool:
+        """Ga naar de volgende tag met deze code"""
+        for index in range(self.index + 1, len(self.tags)):
+            if self.tags[index][0] == code:
+                self.index = index
+                return True
+        self.index = len(self.tags)
+        return False
+    
+    def value(self) -> str:
+        return self.tags[self.index][1]
+    
+    def expect(self, code: int) -> str:
+        if not self.seek(code):
+            raise ValueError(f"Missing group code {code}")
+        return self.value()
+    
+    def skip_if(self, code: int):
+        if self.index + 1 < len(self.tags) and self.tags[self.index + 1][0] == code:
+            self.index += 1
+
+
+IDENTITY = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+
+def _apply(transform: Tuple[float, ...], x: float, y: float) -> Tuple[float, float]:
+    a, b, c, d, e, f = transform
+    return a * x + b * y + e, c * x + d * y + f
+
+
+def _apply_array(transform: Tuple[float, ...], points: np.ndarray) -> np.ndarray:
+    a, b, c, d, e, f = transform
+    return np.column_stack([a * points[:, 0] + b * points[:, 1] + e, c * points[:, 0] + d * points[:, 1] + f])
+
+
+def _compose(outer: Tuple[float, ...], inner: Tuple[float, ...]) -> Tuple[float, ...]:
+    """outer ∘ inner voor affiene transformaties (a, b, c, d, e, f)"""
+    a1, b1, c1, d1, e1, f1 = outer
+    a2, b2, c2, d2, e2, f2 = inner
+    return (
+        a1 * a2 + b1 * c2, a1 * b2 + b1 * d2,
+        c1 * a2 + d1 * c2, c1 * b2 + d1 * d2,
+        a1 * e2 + b1 * f2 + e1, c1 * e2 + d1 * f2 + f1
+    )
+
+
+def _linear(transform: Tuple[float, ...]) -> np.ndarray:
+    a, b, c, d, _, _ = transform
+    return np.array([[a, b], [c, d]])
+
+
+def _scale(transform: Tuple[float, ...]) -> float:
+    """Gemiddelde lineaire schaal van een transformatie (voor radius en teksthoogte)"""
+    return math.sqrt(abs(np.linalg.det(_linear(transform))))
+
+
+def _polygon_area(points: np.ndarray) -> float:
+    x, y = points[:, 0], points[:, 1]
+    return float(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y)) / 2
+
+
+# Factory functie
+def get_dxf_reader(**kwargs: Any) -> DXFReader:
+    """Factory om DXFReader instantie te maken"""
+    return DXFReader(**kwargs)
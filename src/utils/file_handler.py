@@ -8,12 +8,15 @@ import mimetypes
 import asyncio
 
 import aiofiles
-import PyPDF2
 from PIL import Image
 import pdf2image
-import pytesseract
+import cv2
 from pydantic import BaseModel
 
+from .dxf_reader import DXFReader
+from .ocr_engine import get_ocr_engine
+from .pdf_text import PDFTextExtractor
+
 logger = logging.getLogger(__name__)
 
 
@@ -54,6 +57,20 @@ class FileHandler:
         for directory in [self.upload_dir, self.processed_dir, self.cache_dir]:
             os.makedirs(directory, exist_ok=True)
         
+        # Tekstlaag via uitwisselbare backend (standaard PyMuPDF)
+        self.text_extractor = PDFTextExtractor()
+        
+        # Gedeelde OCR pool: geen tesseract proces en modellaadtijd per pagina
+        self.ocr_engine = get_ocr_engine()
+        
+        # Pagina's met minder tekens in de tekstlaag worden als scan behandeld
+        self.min_page_text_chars = 20
+        self.ocr_dpi = 200
+        
+        # Niet meer pagina's tegelijk renderen dan de OCR pool kan verwerken:
+        # gerenderde pagina's op ocr_dpi kosten tientallen MB per stuk
+        self._ocr_slots = asyncio.Semaphore(self.ocr_engine.workers)
+        
         logger.info(f"FileHandler initialized with temp dir: {self.temp_dir}")
     
     async def save_uploaded_file(
@@ -208,64 +225,87 @@ class FileHandler:
             return ""
     
     async def _extract_text_from_pdf(self, file_path: str) -> str:
-        """Extraheer tekst uit PDF"""
+        """
+        Extraheer tekst uit PDF, per pagina hybride
+        
+        Pagina's met een bruikbare tekstlaag worden direct gelezen; alleen
+        pagina's zonder (gescande bijlagen) gaan parallel door OCR.
+        """
         try:
-            text = ""
-            
-            # Probeer eerst met PyPDF2
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                
-                for page_num in range(len(pdf_reader.pages)):
-                    page = pdf_reader.pages[page_num]
-                    page_text = page.extract_text()
-                    
-                    if page_text:
-                        text += page_text + "\n"
+            # Tekstlaag per pagina, buiten de event loop
+            loop = asyncio.get_running_loop()
+            pages = await loop.run_in_executor(
+                None,
+                lambda: list(self.text_extractor.iter_pages(file_path))
+            )
+            page_texts = [page.text for page in pages]
+            
+            # Alleen pagina's zonder bruikbare tekstlaag door OCR
+            scanned_pages = [
+                i for i, page in enumerate(pages)
+                if page.char_count < self.min_page_text_chars
+            ]
+            if scanned_pages:
+                logger.info(
+                    f"OCR on {len(scanned_pages)}/{len(page_texts)} pages without text layer: {file_path}"
+                )
+                ocr_texts = await self._ocr_pdf(file_path, scanned_pages)
+                for i, ocr_text in zip(scanned_pages, ocr_texts):
+                    if len(ocr_text.strip()) > len(page_texts[i].strip()):
+                        page_texts[i] = ocr_text
             
-            # Als PyPDF2 weinig tekst vindt, probeer OCR
-            if len(text.strip()) < 100:
-                logger.info(f"PDF has little text, trying OCR: {file_path}")
-                ocr_text = await self._ocr_pdf(file_path)
-                if ocr_text:
-                    text = ocr_text
-            
-            return text
+            return "\n".join(page_text for page_text in page_texts if page_text)
             
         except Exception as e:
             logger.error(f"PDF text extraction failed: {e}")
             return ""
     
-    async def _ocr_pdf(self, file_path: str) -> str:
-        """Voer OCR uit op PDF met pytesseract"""
+    async def _ocr_pdf(self, file_path: str, pages: Optional[List[int]] = None) -> List[str]:
+        """
+        Voer OCR uit op (een deel van de) pagina's van een PDF
+        
+        Args:
+            file_path: Pad naar de PDF
+            pages: 0-based paginanummers, standaard alle pagina's
+        
+        Returns:
+            OCR tekst per gevraagde pagina, in dezelfde volgorde
+        """
+        if pages is None:
+            try:
+                pages = list(range(pdf2image.pdfinfo_from_path(file_path)["Pages"]))
+            except Exception as e:
+                logger.error(f"PDF OCR failed: {e}")
+                return []
+        
+        return list(await asyncio.gather(
+            *(self._ocr_pdf_page(file_path, page) for page in pages)
+        ))
+    
+    async def _ocr_pdf_page(self, file_path: str, page: int) -> str:
+        """Render één pagina en OCR via de pool (image blijft in het geheugen)"""
         try:
-            # Converteer PDF naar images
-            images = pdf2image.convert_from_path(file_path, dpi=200)
-            
-            text_parts = []
-            for i, image in enumerate(images):
-                # Sla image tijdelijk op
-                with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as tmp:
-                    image.save(tmp.name, 'JPEG', quality=90)
-                    
-                    # Voer OCR uit
-                    page_text = pytesseract.image_to_string(Image.open(tmp.name))
-                    text_parts.append(page_text)
+            async with self._ocr_slots:
+                loop = asyncio.get_running_loop()
+                images = await loop.run_in_executor(
+                    None,
+                    lambda: pdf2image.convert_from_path(
+                        file_path, dpi=self.ocr_dpi, first_page=page + 1, last_page=page + 1
+                    )
+                )
                 
-                # Cleanup
-                os.unlink(tmp.name)
-            
-            return "\n".join(text_parts)
+                text_parts = await self.ocr_engine.recognize_many(images)
+                return "\n".join(text_parts)
             
         except Exception as e:
-            logger.error(f"PDF OCR failed: {e}")
+            logger.error(f"PDF OCR failed for page {page + 1}: {e}")
             return ""
     
     async def _extract_text_from_image(self, file_path: str) -> str:
         """Extraheer tekst uit image met OCR"""
         try:
             # Voer OCR uit
-            text = pytesseract.image_to_string(Image.open(file_path))
+            text = await self.ocr_engine.recognize_async(file_path)
             return text
             
         except Exception as e:
@@ -380,14 +420,28 @@ class FileHandler:
     ) -> ConversionResult:
         """Converteer CAD bestand naar image"""
         try:
-            # In productie: gebruik ODA File Converter of Teigha
-            # Voor nu: return error
-            error = f"CAD to image conversion not implemented for {Path(file_path).suffix}"
-            logger.warning(error)
+            if Path(file_path).suffix.lower() != '.dxf':
+                # DWG is een gesloten formaat: eerst naar DXF omzetten
+                error = f"CAD to image conversion not supported for {Path(file_path).suffix}, convert to DXF first"
+                logger.warning(error)
+                
+                return ConversionResult(
+                    success=False,
+                    error=error,
+                    conversion_type="cad_to_image"
+                )
+            
+            # Teken de DXF op A1 formaat (841 mm breed) bij de gevraagde dpi
+            drawing = DXFReader().read(file_path)
+            image = drawing.render(max_side=int(841 / 25.4 * dpi))
+            
+            output_filename = f"{Path(file_path).stem}.{output_format}"
+            output_path = os.path.join(self.processed_dir, output_filename)
+            cv2.imwrite(output_path, image)
             
             return ConversionResult(
-                success=False,
-                error=error,
+                success=True,
+                output_path=output_path,
                 conversion_type="cad_to_image"
             )
             
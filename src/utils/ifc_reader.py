@@ -0,0 +1,462 @@
+import logging
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Iterator, Tuple
+
+from pydantic import BaseModel, Field
+
+logger = logging.getLogger(__name__)
+
+
+# Bouwdelen die we uit het model halen, met hun element type
+IFC_ELEMENT_TYPES = {
+    "IFCWALL": "wall",
+    "IFCWALLSTANDARDCASE": "wall",
+    "IFCWALLELEMENTEDCASE": "wall",
+    "IFCSLAB": "floor",
+    "IFCSLABSTANDARDCASE": "floor",
+    "IFCSLABELEMENTEDCASE": "floor",
+    "IFCROOF": "roof",
+    "IFCWINDOW": "window",
+    "IFCWINDOWSTANDARDCASE": "window",
+    "IFCDOOR": "door",
+    "IFCDOORSTANDARDCASE": "door",
+    "IFCCOLUMN": "column",
+    "IFCCOLUMNSTANDARDCASE": "column",
+    "IFCBEAM": "beam",
+    "IFCBEAMSTANDARDCASE": "beam",
+    "IFCFOOTING": "foundation",
+    "IFCSTAIR": "stairs",
+}
+
+# Relaties, eigenschappen en eenheden die nodig zijn om de bouwdelen te verrijken.
+# Al het andere (geometrie, plaatsing) wordt overgeslagen zonder te parsen.
+IFC_SUPPORT_TYPES = {
+    "IFCRELDEFINESBYPROPERTIES",
+    "IFCELEMENTQUANTITY",
+    "IFCQUANTITYLENGTH",
+    "IFCQUANTITYAREA",
+    "IFCQUANTITYVOLUME",
+    "IFCQUANTITYCOUNT",
+    "IFCQUANTITYWEIGHT",
+    "IFCPROPERTYSET",
+    "IFCPROPERTYSINGLEVALUE",
+    "IFCRELASSOCIATESMATERIAL",
+    "IFCMATERIAL",
+    "IFCMATERIALLIST",
+    "IFCMATERIALLAYER",
+    "IFCMATERIALLAYERSET",
+    "IFCMATERIALLAYERSETUSAGE",
+    "IFCMATERIALCONSTITUENTSET",
+    "IFCMATERIALPROFILESET",
+    "IFCMATERIALPROFILESETUSAGE",
+    "IFCRELCONTAINEDINSPATIALSTRUCTURE",
+    "IFCRELAGGREGATES",
+    "IFCBUILDINGSTOREY",
+    "IFCUNITASSIGNMENT",
+    "IFCSIUNIT",
+}
+
+SI_PREFIXES = {
+    None: 1.0,
+    "KILO": 1e3,
+    "HECTO": 1e2,
+    "DECA": 1e1,
+    "DECI": 1e-1,
+    "CENTI": 1e-2,
+    "MILLI": 1e-3,
+    "MICRO": 1e-6,
+}
+
+# Voorkeursvolgorde van hoeveelheden uit de Qto_*BaseQuantities sets
+AREA_QUANTITIES = [
+    "NetSideArea", "GrossSideArea", "NetArea", "GrossArea", "Area",
+    "NetFootprintArea", "GrossFootprintArea", "ProjectedArea", "OuterSurfaceArea"
+]
+VOLUME_QUANTITIES = ["NetVolume", "GrossVolume", "Volume"]
+LENGTH_QUANTITIES = ["Length", "Perimeter", "Height"]
+
+RECORD_PATTERN = re.compile(r"#(\d+)\s*=\s*([A-Za-z0-9_]+)\s*\(", re.ASCII)
+
+TOKEN_PATTERN = re.compile(
+    r"\s*(?:"
+    r"(?P<string>'(?:[^']|'')*')"
+    r"|(?P<ref>#\d+)"
+    r"|(?P<enum>\.[A-Za-z0-9_]+\.)"
+    r"|(?P<number>[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)"
+    r"|(?P<typed>[A-Za-z][A-Za-z0-9_]*\s*\()"
+    r"|(?P<open>\()"
+    r"|(?P<close>\))"
+    r"|(?P<null>[$*])"
+    r"|(?P<comma>,)"
+    r")"
+)
+
+
+class IFCRef(int):
+    """Verwijzing naar een ander record (#123)"""
+
+
+class IFCElement(BaseModel):
+    """Bouwdeel uit een IFC model met exacte hoeveelheden (SI: m, m², m³)"""
+    global_id: str
+    ifc_type: str
+    element_type: str
+    name: Optional[str] = None
+    storey: Optional[str] = None
+    material: Optional[str] = None
+    properties: Dict[str, Any] = Field(default_factory=dict)
+    quantities: Dict[str, float] = Field(default_factory=dict)
+    length: Optional[float] = None
+    area: Optional[float] = None
+    volume: Optional[float] = None
+    
+    def unit_quantities(self) -> Dict[str, float]:
+        """Hoeveelheid per eenheid, zodat de calculatie de juiste maat kiest"""
+        unit_quantities = {"stuk": 1.0}
+        if self.length is not None:
+            unit_quantities["m"] = self.length
+        if self.area is not None:
+            unit_quantities["m2"] = self.area
+        if self.volume is not None:
+            unit_quantities["m3"] = self.volume
+        return unit_quantities
+    
+    def to_cost_element(self) -> Dict[str, Any]:
+        """Element in het formaat van CostAnalyzer._extract_elements"""
+        return {
+            "source": "ifc",
+            "element_type": self.element_type,
+            "dimensions": {
+                key: value for key, value in
+                (("length", self.length), ("area", self.area), ("volume", self.volume))
+                if value is not None
+            },
+            "material": self.material,
+            "quantity": None,  # hoeveelheid volgt uit unit_quantities
+            "unit_quantities": self.unit_quantities(),
+            "metadata": {
+                "global_id": self.global_id,
+                "ifc_type": self.ifc_type,
+                "name": self.name,
+                "storey": self.storey
+            }
+        }
+
+
+class IFCReader:
+    """
+    Native lezer voor IFC (STEP, ISO 10303-21) bestanden.
+    
+    Records worden regel voor regel gestreamd. Alleen bouwdelen,
+    hoeveelheden, eigenschappen, materialen, verdiepingen en eenheden worden
+    geparsed; geometrie wordt overgeslagen. Hoeveelheden komen uit de
+    quantity sets (IfcElementQuantity) en worden naar SI omgerekend.
+    """
+    
+    def __init__(self, element_types: Optional[Dict[str, str]] = None):
+        self.element_types = element_types or IFC_ELEMENT_TYPES
+        self.wanted = set(self.element_types) | IFC_SUPPORT_TYPES
+    
+    def supports(self, file_path: str) -> bool:
+        return Path(file_path).suffix.lower() == '.ifc'
+    
+    def read(self, file_path: str) -> List[IFCElement]:
+        """
+        Lees alle bouwdelen met hun hoeveelheden
+        
+        Args:
+            file_path: Pad naar het IFC bestand
+        
+        Returns:
+            Lijst van IFCElement
+        """
+        elements = list(self.iter_elements(file_path))
+        logger.info(f"IFC read: {len(elements)} building elements from {Path(file_path).name}")
+        return elements
+    
+    def iter_elements(self, file_path: str) -> Iterator[IFCElement]:
+        """Lees het model en geef de bouwdelen één voor één terug"""
+        records = self._load_records(file_path)
+        yield from self._build_elements(records)
+    
+    def iter_cost_elements(self, file_path: str) -> Iterator[Dict[str, Any]]:
+        """Bouwdelen in het formaat dat CostAnalyzer verwacht"""
+        for element in self.iter_elements(file_path):
+            yield element.to_cost_element()
+    
+    # ------------------------------------------------------------------
+    # Streaming en parsen
+    # ------------------------------------------------------------------
+    
+    def _iter_records(self, file_path: str) -> Iterator[str]:
+        """Geef complete records uit de DATA sectie (kunnen over meerdere regels lopen)"""
+        in_data = False
+        buffer: List[str] = []
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as stream:
+            for line in stream:
+                stripped = line.strip()
+                if not in_data:
+                    if stripped.upper().startswith("DATA"):
+                        in_data = True
+                    continue
+                if not buffer and stripped.upper().startswith("ENDSEC"):
+                    in_data = False
+                    continue
+                
+                buffer.append(stripped)
+                # Record compleet bij ';' buiten een string (even aantal quotes)
+                if stripped.endswith(";"):
+                    record = "".join(buffer) if len(buffer) > 1 else stripped
+                    if record.count("'") % 2 == 0:
+                        buffer = []
+                        yield record
+    
+    def _load_records(self, file_path: str) -> Dict[int, Tuple[str, List[Any]]]:
+        """Parse alleen records van relevante types"""
+        records = {}
+        skipped = 0
+        for record in self._iter_records(file_path):
+            match = RECORD_PATTERN.match(record)
+            if not match:
+                continue
+            entity = match.group(2).upper()
+            if entity not in self.wanted:
+                skipped += 1
+                continue
+            try:
+                args, _ = self._parse_list(record, match.end())
+                records[int(match.group(1))] = (entity, args)
+            except ValueError as e:
+                logger.warning(f"Skipping malformed IFC record #{match.group(1)}: {e}")
+        
+        logger.debug(f"IFC parse: {len(records)} records kept, {skipped} skipped")
+        return records
+    
+    def _parse_list(self, text: str, position: int) -> Tuple[List[Any], int]:
+        """Parse argumenten tot het sluitende haakje; position staat na '('"""
+        values: List[Any] = []
+        while True:
+            match = TOKEN_PATTERN.match(text, position)
+            if not match:
+                raise ValueError(f"Unexpected input at {position}")
+            position = match.end()
+            kind = match.lastgroup
+            token = match.group(kind)
+            
+            if kind == "close":
+                return values, position
+            if kind == "comma":
+                continue
+            if kind == "open":
+                value, position = self._parse_list(text, position)
+            elif kind == "typed":
+                # Getypeerde waarde zoals IFCBOOLEAN(.T.) of IFCLENGTHMEASURE(3.)
+                inner, position = self._parse_list(text, position)
+                value = inner[0] if len(inner) == 1 else inner
+            elif kind == "string":
+                value = _decode_string(token[1:-1])
+            elif kind == "ref":
+                value = IFCRef(token[1:])
+            elif kind == "enum":
+                value = {"T": True, "F": False, "U": None}.get(token[1:-1].upper(), token[1:-1].upper())
+            elif kind == "number":
+                value = float(token) if any(c in token for c in ".eE") else int(token)
+            else:
+                value = None
+            values.append(value)
+    
+    # ------------------------------------------------------------------
+    # Opbouw van de bouwdelen
+    # ------------------------------------------------------------------
+    
+    def _build_elements(self, records: Dict[int, Tuple[str, List[Any]]]) -> Iterator[IFCElement]:
+        unit_factors = self._unit_factors(records)
+        
+        quantities: Dict[int, Dict[str, float]] = {}
+        properties: Dict[int, Dict[str, Any]] = {}
+        materials: Dict[int, str] = {}
+        storeys: Dict[int, str] = {}
+        parent: Dict[int, int] = {}
+        
+        for entity, args in records.values():
+            if entity == "IFCRELDEFINESBYPROPERTIES":
+                related, definitions = _arg(args, 4), _arg(args, 5)
+                for definition in definitions if isinstance(definitions, list) else [definitions]:
+                    resolved = records.get(definition)
+                    if resolved is None:
+                        continue
+                    if resolved[0] == "IFCELEMENTQUANTITY":
+                        values = self._quantity_values(records, resolved[1], unit_factors)
+                        for element_id in related or []:
+                            quantities.setdefault(element_id, {}).update(values)
+                    elif resolved[0] == "IFCPROPERTYSET":
+                        values = self._property_values(records, resolved[1])
+                        for element_id in related or []:
+                            properties.setdefault(element_id, {}).update(values)
+            
+            elif entity == "IFCRELASSOCIATESMATERIAL":
+                name = self._material_name(records, _arg(args, 5))
+                if name:
+                    for element_id in _arg(args, 4) or []:
+                        materials[element_id] = name
+            
+            elif entity == "IFCRELCONTAINEDINSPATIALSTRUCTURE":
+                structure = records.get(_arg(args, 5))
+                if structure and structure[0] == "IFCBUILDINGSTOREY":
+                    for element_id in _arg(args, 4) or []:
+                        storeys[element_id] = _arg(structure[1], 2)
+            
+            elif entity == "IFCRELAGGREGATES":
+                for part_id in _arg(args, 5) or []:
+                    parent[part_id] = _arg(args, 4)
+        
+        # Een geaggregeerd bouwdeel (dak, trap) met eigen onderdelen wordt via de
+        # onderdelen geteld, anders zouden hoeveelheden dubbel meetellen
+        containers = {
+            parent_id for part_id, parent_id in parent.items()
+            if records.get(part_id, ("",))[0] in self.element_types
+        }
+        
+        for record_id, (entity, args) in records.items():
+            if entity not in self.element_types or record_id in containers:
+                continue
+            
+            element_type = self.element_types[entity]
+            container = records.get(parent.get(record_id))
+            if container and container[0] in self.element_types:
+                # Dakvlakken en traponderdelen nemen het type van het geheel over
+                element_type = self.element_types[container[0]]
+            elif entity.startswith("IFCSLAB") and _arg(args, 8) == "ROOF":
+                element_type = "roof"
+            
+            element_properties = properties.get(record_id, {})
+            if element_type == "wall" and element_properties.get("LoadBearing") is True:
+                element_type = "load_bearing_wall"
+            
+            values = quantities.get(record_id, {})
+            container_id = parent.get(record_id)
+            yield IFCElement(
+                global_id=str(_arg(args, 0) or record_id),
+                ifc_type=entity,
+                element_type=element_type,
+                name=_arg(args, 2),
+                storey=storeys.get(record_id) or storeys.get(container_id),
+                material=materials.get(record_id) or materials.get(container_id),
+                properties=element_properties,
+                quantities=values,
+                length=_first(values, LENGTH_QUANTITIES),
+                area=_first(values, AREA_QUANTITIES),
+                volume=_first(values, VOLUME_QUANTITIES)
+            )
+    
+    def _unit_factors(self, records: Dict[int, Tuple[str, List[Any]]]) -> Dict[str, float]:
+        """Factor van projecteenheden naar m, m² en m³ (alleen SI eenheden)"""
+        factors = {"LENGTHUNIT": 1.0, "AREAUNIT": 1.0, "VOLUMEUNIT": 1.0}
+        for entity, args in records.values():
+            if entity != "IFCUNITASSIGNMENT":
+                continue
+            for unit_id in _arg(args, 0) or []:
+                unit = records.get(unit_id)
+                if not unit or unit[0] != "IFCSIUNIT":
+                    continue
+                unit_type, prefix = _arg(unit[1], 1), _arg(unit[1], 2)
+                if unit_type in factors:
+                    power = {"LENGTHUNIT": 1, "AREAUNIT": 2, "VOLUMEUNIT": 3}[unit_type]
+                    factors[unit_type] = SI_PREFIXES.get(prefix, 1.0) ** power
+        return factors
+    
+    def _quantity_values(
+        self,
+        records: Dict[int, Tuple[str, List[Any]]],
+        args: List[Any],
+        unit_factors: Dict[str, float]
+    ) -> Dict[str, float]:
+        """Hoeveelheden uit een IfcElementQuantity, omgerekend naar SI"""
+        values = {}
+        for quantity_id in _arg(args, 5) or []:
+            quantity = records.get(quantity_id)
+            if not quantity:
+                continue
+            entity, quantity_args = quantity
+            name, value = _arg(quantity_args, 0), _arg(quantity_args, 3)
+            if not name or not isinstance(value, (int, float)):
+                continue
+            factor = {
+                "IFCQUANTITYLENGTH": unit_factors["LENGTHUNIT"],
+                "IFCQUANTITYAREA": unit_factors["AREAUNIT"],
+                "IFCQUANTITYVOLUME": unit_factors["VOLUMEUNIT"],
+            }.get(entity, 1.0)
+            values[name] = float(value) * factor
+        return values
+    
+    def _property_values(self, records: Dict[int, Tuple[str, List[Any]]], args: List[Any]) -> Dict[str, Any]:
+        """Enkelvoudige eigenschappen uit een IfcPropertySet (bijv. LoadBearing, IsExternal)"""
+        values = {}
+        for property_id in _arg(args, 4) or []:
+            prop = records.get(property_id)
+            if prop and prop[0] == "IFCPROPERTYSINGLEVALUE":
+                name, value = _arg(prop[1], 0), _arg(prop[1], 2)
+                if name and not isinstance(value, (list, IFCRef)):
+                    values[name] = value
+        return values
+    
+    def _material_name(self, records: Dict[int, Tuple[str, List[Any]]], material_id: Any, depth: int = 0) -> Optional[str]:
+        """Naam van het (dominante) materiaal achter een materiaal definitie"""
+        material = records.get(material_id)
+        if not material or depth > 4:
+            return None
+        entity, args = material
+        
+        if entity == "IFCMATERIAL":
+            return _arg(args, 0)
+        if entity in ("IFCMATERIALLAYERSETUSAGE", "IFCMATERIALPROFILESETUSAGE"):
+            return self._material_name(records, _arg(args, 0), depth + 1)
+        if entity == "IFCMATERIALLAYERSET":
+            # Dikste laag bepaalt het materiaal, anders de naam van de set
+            layers = [records.get(layer_id) for layer_id in _arg(args, 0) or []]
+            layers = [layer[1] for layer in layers if layer and layer[0] == "IFCMATERIALLAYER"]
+            if layers:
+                thickest = max(layers, key=lambda layer: _arg(layer, 1) or 0)
+                name = self._material_name(records, _arg(thickest, 0), depth + 1)
+                if name:
+                    return name
+            return _arg(args, 1)
+        if entity == "IFCMATERIALLIST":
+            materials = _arg(args, 0) or []
+            return self._material_name(records, materials[0], depth + 1) if materials else None
+        if entity in ("IFCMATERIALCONSTITUENTSET", "IFCMATERIALPROFILESET"):
+            return _arg(args, 0)
+        return None
+
+
+def _arg(args: List[Any], index: int) -> Any:
+    return args[index] if index < len(args) else None
+
+
+def _first(values: Dict[str, float], names: List[str]) -> Optional[float]:
+    for name in names:
+        if name in values:
+            return values[name]
+    return None
+
+
+def _decode_string(value: str) -> str:
+    """STEP string escapes: '' en \\X2\\hex\\X0\\ (UTF-16) en \\X\\hh (ISO 8859-1)"""
+    value = value.replace("''", "'")
+    if "\\" not in value:
+        return value
+    
+    def decode_x2(match: re.Match) -> str:
+        hex_digits = match.group(1)
+        return "".join(chr(int(hex_digits[i:i + 4], 16)) for i in range(0, len(hex_digits), 4))
+    
+    value = re.sub(r"\\X2\\([0-9A-Fa-f]+)\\X0\\", decode_x2, value)
+    value = re.sub(r"\\X\\([0-9A-Fa-f]{2})", lambda m: chr(int(m.group(1), 16)), value)
+    return value.replace("\\\\", "\\")
+
+
+# Factory functie
+def get_ifc_reader(**kwargs: Any) -> IFCReader:
+    """Factory om IFCReader instantie te maken"""
+    return IFCReader(**kwargs)
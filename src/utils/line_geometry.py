@@ -0,0 +1,291 @@
+import logging
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def segment_metrics(segments: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Bereken lengte en hoek van alle lijnsegmenten in één keer
+    
+    Args:
+        segments: (n, 4) array met x1, y1, x2, y2
+    
+    Returns:
+        Tuple van (lengtes, hoeken in graden)
+    """
+    segments = np.asarray(segments, dtype=np.float64).reshape(-1, 4)
+    dx = segments[:, 2] - segments[:, 0]
+    dy = segments[:, 3] - segments[:, 1]
+    return np.hypot(dx, dy), np.degrees(np.arctan2(dy, dx))
+
+
+def cluster_axis(values: np.ndarray, threshold: float) -> np.ndarray:
+    """
+    Cluster 1D posities: een nieuw cluster begint waar het gat met de vorige
+    (gesorteerde) positie groter is dan threshold
+    
+    Args:
+        values: Posities langs één as
+        threshold: Maximale afstand tussen opeenvolgende posities in een cluster
+    
+    Returns:
+        Cluster label per waarde (in de oorspronkelijke volgorde), labels oplopend
+        met de positie
+    """
+    values = np.asarray(values, dtype=np.float64).ravel()
+    labels = np.zeros(len(values), dtype=np.int64)
+    if len(values) < 2:
+        return labels
+    
+    order = np.argsort(values, kind="stable")
+    breaks = np.diff(values[order]) > threshold
+    labels[order] = np.concatenate([[0], np.cumsum(breaks)])
+    return labels
+
+
+def cluster_centers(values: np.ndarray, labels: np.ndarray) -> np.ndarray:
+    """Gemiddelde positie per cluster label"""
+    counts = np.bincount(labels)
+    return np.bincount(labels, weights=values) / np.maximum(counts, 1)
+
+
+def bounded_groups(values: np.ndarray, tolerance: float, keys: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Groepeer 1D waarden zonder ketenvorming: elke groep beslaat hoogstens tolerance
+    
+    Anders dan cluster_axis wordt elke waarde vergeleken met de eerste
+    (referentie) waarde van de groep, niet met de vorige waarde. Een reeks
+    waarden in kleine stappen valt zo uiteen in groepen van begrensde breedte.
+    
+    Args:
+        values: Posities langs één as
+        tolerance: Maximale afstand tot de referentie van de groep
+        keys: Optioneel een bestaand groepslabel per waarde; groepen lopen
+            nooit over verschillende keys heen
+    
+    Returns:
+        Groepslabel per waarde (in de oorspronkelijke volgorde)
+    """
+    values = np.asarray(values, dtype=np.float64).ravel()
+    keys = np.zeros(len(values), dtype=np.int64) if keys is None else np.asarray(keys, dtype=np.int64)
+    labels = np.zeros(len(values), dtype=np.int64)
+    if not len(values):
+        return labels
+    
+    order = np.lexsort((values, keys))
+    sorted_values = values[order]
+    sorted_keys = keys[order]
+    
+    # Ketens: een nieuwe keten begint bij een andere key of een gat groter dan tolerance
+    group_start = np.ones(len(order), dtype=bool)
+    group_start[1:] = (np.diff(sorted_keys) != 0) | (np.diff(sorted_values) > tolerance)
+    
+    # Alleen ketens die breder zijn dan tolerance moeten verder opgeknipt worden
+    chain_starts = np.flatnonzero(group_start)
+    chain_ends = np.append(chain_starts[1:], len(order)) - 1
+    wide = sorted_values[chain_ends] - sorted_values[chain_starts] > tolerance
+    if wide.any():
+        group_start[_bounded_starts(sorted_values, group_start, chain_starts[wide], tolerance)] = True
+    
+    labels[order] = np.cumsum(group_start) - 1
+    return labels
+
+
+def _bounded_starts(
+    sorted_values: np.ndarray,
+    chain_start: np.ndarray,
+    roots: np.ndarray,
+    tolerance: float
+) -> np.ndarray:
+    """
+    Groepsbegin posities binnen brede ketens, vanaf de gegeven keten begin posities
+    
+    Vanaf elke positie begint de volgende groep bij de eerste waarde voorbij
+    positie + tolerance. Die sprongen worden met pointer doubling gevolgd: per
+    ronde verdubbelt het aantal gevonden groepen, zodat een keten met g groepen
+    in log2(g) gevectoriseerde rondes is opgeknipt.
+    
+    Args:
+        sorted_values: Waarden, gesorteerd binnen elke keten
+        chain_start: Bool mask met het begin van elke keten
+        roots: Begin posities van de ketens die opgeknipt moeten worden
+        tolerance: Maximale afstand tot de referentie van de groep
+    
+    Returns:
+        Posities waar een groep begint
+    """
+    n = len(sorted_values)
+    
+    # Waarden relatief aan het begin van hun keten, met een offset per keten die
+    # groter is dan elke keten, zodat het geheel oplopend is en een zoekactie
+    # hoogstens tot het begin van de volgende keten loopt
+    chain = np.cumsum(chain_start) - 1
+    relative = sorted_values - sorted_values[np.flatnonzero(chain_start)][chain]
+    position = relative + chain * (float(relative.max()) + tolerance + 1.0)
+    
+    # jump[i]: begin van de groep na die van i; n is het (absorberende) einde.
+    # De offset kan afronden, dus de grens wordt gecorrigeerd op de echte waarden
+    # (zelfde vergelijking als value - reference > tolerance)
+    index = np.arange(n)
+    target = np.searchsorted(position, position + tolerance, side="right")
+    while True:
+        back = (target > index + 1) & (chain[np.maximum(target - 1, 0)] == chain)
+        back &= sorted_values[np.maximum(target - 1, 0)] - sorted_values > tolerance
+        ahead = (target < n) & (chain[np.minimum(target, n - 1)] == chain)
+        ahead &= ~(sorted_values[np.minimum(target, n - 1)] - sorted_values > tolerance)
+        if not back.any() and not ahead.any():
+            break
+        target = target - back + ahead
+    jump = np.append(target, n)
+    
+    starts = np.asarray(roots, dtype=np.int64)
+    while True:
+        step = jump[starts]
+        step = step[step < n]
+        if not len(step):
+            return starts
+        starts = np.union1d(starts, step)
+        jump = jump[jump]
+
+
+def merge_collinear_segments(
+    segments: np.ndarray,
+    angle_tolerance: float = 2.0,
+    distance_tolerance: float = 3.0,
+    gap_tolerance: float = 10.0
+) -> np.ndarray:
+    """
+    Voeg collineaire lijnsegmenten samen (onderbroken muurlijnen, dubbele Hough hits)
+    
+    Segmenten worden gegroepeerd op oriëntatie (groepen van hoogstens
+    angle_tolerance breed, met het langste segment als referentierichting)
+    en loodrechte afstand. Alleen segmenten waarvan beide eindpunten binnen
+    distance_tolerance van de referentielijn liggen worden samengevoegd;
+    overlappende of bijna aansluitende segmenten worden één segment met een
+    eigen, naar lengte gewogen, gefitte richting.
+    
+    Args:
+        segments: (n, 4) array met x1, y1, x2, y2
+        angle_tolerance: Maximaal hoekverschil in graden
+        distance_tolerance: Maximale loodrechte afstand tussen de lijnen
+        gap_tolerance: Maximaal gat langs de lijn dat nog overbrugd wordt
+    
+    Returns:
+        (m, 4) array met samengevoegde segmenten, m <= n
+    """
+    segments = np.asarray(segments, dtype=np.float64).reshape(-1, 4)
+    if len(segments) < 2:
+        return segments
+    
+    # Oriëntatie in [-tol/2, 180 - tol/2) zodat bijna-horizontale lijnen niet
+    # over de 0/180 grens in verschillende groepen vallen
+    length, angle = segment_metrics(segments)
+    orientation = np.mod(angle + angle_tolerance / 2, 180.0) - angle_tolerance / 2
+    angle_group = bounded_groups(orientation, angle_tolerance)
+    
+    # Richting van het langste segment per groep als referentie
+    order = np.lexsort((-length, angle_group))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = np.diff(angle_group[order]) != 0
+    reference = np.empty(angle_group.max() + 1)
+    reference[angle_group[order][first]] = orientation[order][first]
+    theta = np.radians(reference)[angle_group]
+    direction = np.column_stack([np.cos(theta), np.sin(theta)])
+    normal = np.column_stack([-direction[:, 1], direction[:, 0]])
+    
+    start, end = segments[:, :2], segments[:, 2:]
+    rho_start = np.einsum("ij,ij->i", start, normal)
+    rho_end = np.einsum("ij,ij->i", end, normal)
+    rho = (rho_start + rho_end) / 2
+    
+    # Groepeer op afstand tot de oorsprong binnen elke oriëntatie groep (begrensd);
+    # segmenten die te schuin op de referentie staan blijven los
+    line_id = bounded_groups(rho, distance_tolerance, keys=angle_group)
+    skewed = np.abs(rho_start - rho_end) / 2 > distance_tolerance
+    line_id[skewed] = line_id.max() + 1 + np.arange(int(skewed.sum()))
+    
+    # Projecteer eindpunten op de referentierichting
+    t_start = np.einsum("ij,ij->i", start, direction)
+    t_end = np.einsum("ij,ij->i", end, direction)
+    t_min = np.minimum(t_start, t_end)
+    t_max = np.maximum(t_start, t_end)
+    
+    # Sorteer per lijn op beginpositie en houd het lopende maximum van de eindpositie bij.
+    # Een offset per lijn maakt het cumulatieve maximum per groep gescheiden.
+    order = np.lexsort((t_min, line_id))
+    span = float(np.ptp(np.concatenate([t_min, t_max]))) + gap_tolerance + 1.0
+    offset = line_id[order] * span
+    running_max = np.maximum.accumulate(t_max[order] + offset) - offset
+    
+    new_run = np.ones(len(order), dtype=bool)
+    new_run[1:] = (
+        (np.diff(line_id[order]) != 0) |
+        (t_min[order][1:] > running_max[:-1] + gap_tolerance)
+    )
+    run_id = np.empty(len(order), dtype=np.int64)
+    run_id[order] = np.cumsum(new_run) - 1
+    
+    return _fit_runs(segments, length, angle, run_id)
+
+
+def _fit_runs(segments: np.ndarray, length: np.ndarray, angle: np.ndarray, run_id: np.ndarray) -> np.ndarray:
+    """
+    Eén segment per run: naar lengte gewogen richting (verdubbelde hoek, zodat
+    tegengestelde richtingen niet uitdoven) door het gewogen zwaartepunt, met
+    de uiterste geprojecteerde eindpunten als begin en eind
+    """
+    runs = int(run_id.max()) + 1
+    weight = np.maximum(length, 1e-9)
+    doubled = np.radians(angle) * 2
+    fitted = np.arctan2(
+        np.bincount(run_id, weights=weight * np.sin(doubled), minlength=runs),
+        np.bincount(run_id, weights=weight * np.cos(doubled), minlength=runs)
+    ) / 2
+    direction = np.column_stack([np.cos(fitted), np.sin(fitted)])
+    
+    total = np.bincount(run_id, weights=weight, minlength=runs)
+    middle = (segments[:, :2] + segments[:, 2:]) / 2
+    centroid = np.column_stack([
+        np.bincount(run_id, weights=weight * middle[:, 0], minlength=runs),
+        np.bincount(run_id, weights=weight * middle[:, 1], minlength=runs)
+    ]) / total[:, None]
+    
+    seg_direction = direction[run_id]
+    seg_centroid = centroid[run_id]
+    t_start = np.einsum("ij,ij->i", segments[:, :2] - seg_centroid, seg_direction)
+    t_end = np.einsum("ij,ij->i", segments[:, 2:] - seg_centroid, seg_direction)
+    
+    t_min = np.full(runs, np.inf)
+    t_max = np.full(runs, -np.inf)
+    np.minimum.at(t_min, run_id, np.minimum(t_start, t_end))
+    np.maximum.at(t_max, run_id, np.maximum(t_start, t_end))
+    
+    p1 = centroid + direction * t_min[:, None]
+    p2 = centroid + direction * t_max[:, None]
+    return np.column_stack([p1, p2])
+
+
+def group_boxes_by_axis(bboxes: np.ndarray, axis: str = 'x', threshold: float = 20) -> List[np.ndarray]:
+    """
+    Groepeer bounding boxes die langs een as dicht bij elkaar liggen
+    
+    Args:
+        bboxes: (n, 4) array met x, y, width, height
+        axis: 'x' of 'y'
+        threshold: Maximale afstand tussen opeenvolgende boxes in een groep
+    
+    Returns:
+        Lijst van (k, 4) arrays, gesorteerd op positie
+    """
+    bboxes = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+    if not len(bboxes):
+        return []
+    
+    position = bboxes[:, 0] if axis == 'x' else bboxes[:, 1]
+    labels = cluster_axis(position, threshold)
+    order = np.lexsort((position, labels))
+    splits = np.flatnonzero(np.diff(labels[order])) + 1
+    return np.split(bboxes[order], splits)
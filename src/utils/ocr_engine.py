@@ -0,0 +1,204 @@
+import asyncio
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any, Union
+
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# tesserocr bindt direct aan libtesseract: één geladen model per worker thread
+try:
+    import tesserocr
+    TESSEROCR_AVAILABLE = True
+except ImportError:
+    TESSEROCR_AVAILABLE = False
+
+# Terugval: pytesseract start per aanroep een tesseract proces
+try:
+    import pytesseract
+    PYTESSERACT_AVAILABLE = True
+except ImportError:
+    PYTESSERACT_AVAILABLE = False
+
+
+OCRInput = Union[str, np.ndarray, Image.Image]
+
+
+class OCREngine:
+    """
+    OCR service met een pool van langlevende workers.
+    
+    Met tesserocr houdt elke worker thread per taal een eigen Tesseract API
+    (taaldata één keer geladen) en wordt het image in het geheugen doorgegeven.
+    libtesseract geeft de GIL vrij, zodat de workers echt parallel draaien.
+    Zonder tesserocr valt de engine terug op pytesseract in dezelfde pool:
+    nog steeds één proces per pagina, maar wel parallel en zonder tijdelijke bestanden.
+    """
+    
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        language: Optional[str] = None,
+        psm: int = 3,
+        tessdata_path: Optional[str] = None,
+        tesseract_cmd: Optional[str] = None
+    ):
+        self.workers = workers or max(1, os.cpu_count() or 1)
+        self.language = language or os.getenv("OCR_LANGUAGE", "nld+eng")
+        self.psm = psm
+        self.tessdata_path = tessdata_path or os.getenv("TESSDATA_PREFIX")
+        
+        # Eenmalig configureren in plaats van bij elke aanroep
+        tesseract_cmd = tesseract_cmd or os.getenv("TESSERACT_CMD")
+        if PYTESSERACT_AVAILABLE and tesseract_cmd:
+            pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+        
+        self.backend = "tesserocr" if TESSEROCR_AVAILABLE else "pytesseract" if PYTESSERACT_AVAILABLE else None
+        
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._local = threading.local()
+        self._apis: List[Any] = []
+        self._lock = threading.Lock()
+        
+        logger.info(f"OCREngine initialized: backend={self.backend}, workers={self.workers}")
+    
+    @property
+    def available(self) -> bool:
+        return self.backend is not None
+    
+    def recognize(
+        self,
+        image: OCRInput,
+        language: Optional[str] = None,
+        psm: Optional[int] = None
+    ) -> str:
+        """
+        OCR van één image in de huidige thread
+        
+        Args:
+            image: Pad, numpy array (grijs/BGR) of PIL image
+            language: Tesseract taal(en), standaard die van de engine
+            psm: Page segmentation mode, standaard die van de engine
+        
+        Returns:
+            Herkende tekst (leeg bij een fout)
+        """
+        if not self.available:
+            logger.warning("No OCR backend available")
+            return ""
+        
+        language = language or self.language
+        psm = self.psm if psm is None else psm
+        
+        try:
+            pil_image = self._to_pil(image)
+            
+            if self.backend == "tesserocr":
+                api = self._api(language)
+                api.SetPageSegMode(psm)
+                api.SetImage(pil_image)
+                text = api.GetUTF8Text()
+                api.Clear()
+                return text
+            
+            return pytesseract.image_to_string(pil_image, lang=language, config=f"--psm {psm}")
+        
+        except Exception as e:
+            logger.error(f"OCR failed: {e}")
+            return ""
+    
+    async def recognize_async(
+        self,
+        image: OCRInput,
+        language: Optional[str] = None,
+        psm: Optional[int] = None
+    ) -> str:
+        """OCR op een worker uit de pool, zonder de event loop te blokkeren"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool(), self.recognize, image, language, psm)
+    
+    async def recognize_many(
+        self,
+        images: List[OCRInput],
+        language: Optional[str] = None,
+        psm: Optional[int] = None
+    ) -> List[str]:
+        """OCR van meerdere pagina's parallel over de pool; volgorde blijft behouden"""
+        return list(await asyncio.gather(
+            *(self.recognize_async(image, language, psm) for image in images)
+        ))
+    
+    def close(self):
+        """Stop de pool en geef de Tesseract modellen vrij"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        
+        with self._lock:
+            for api in self._apis:
+                try:
+                    api.End()
+                except Exception:
+                    pass
+            self._apis = []
+        self._local = threading.local()
+    
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers,
+                        thread_name_prefix="ocr"
+                    )
+        return self._executor
+    
+    def _api(self, language: str) -> Any:
+        """Tesseract API van deze worker thread voor de gevraagde taal (lazy geladen)"""
+        apis: Optional[Dict[str, Any]] = getattr(self._local, "apis", None)
+        if apis is None:
+            apis = self._local.apis = {}
+        
+        api = apis.get(language)
+        if api is None:
+            kwargs = {"lang": language}
+            if self.tessdata_path:
+                kwargs["path"] = self.tessdata_path
+            api = tesserocr.PyTessBaseAPI(**kwargs)
+            apis[language] = api
+            with self._lock:
+                self._apis.append(api)
+        return api
+    
+    def _to_pil(self, image: OCRInput) -> Image.Image:
+        if isinstance(image, Image.Image):
+            return image
+        if isinstance(image, np.ndarray):
+            if image.ndim == 3:
+                # OpenCV levert BGR
+                return Image.fromarray(image[:, :, ::-1].copy())
+            return Image.fromarray(image)
+        return Image.open(image)
+
+
+_shared_engine: Optional[OCREngine] = None
+
+
+# Factory functie
+def get_ocr_engine(**kwargs: Any) -> OCREngine:
+    """
+    Factory om OCREngine instantie te maken
+    
+    Zonder argumenten wordt één gedeelde engine teruggegeven, zodat alle
+    modules dezelfde pool (en geladen modellen) gebruiken.
+    """
+    global _shared_engine
+    if kwargs:
+        return OCREngine(**kwargs)
+    if _shared_engine is None:
+        _shared_engine = OCREngine()
+    return _shared_engine
@@ -0,0 +1,368 @@
+import logging
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Any
+
+import cv2
+import numpy as np
+from pydantic import BaseModel
+import pdf2image
+
+from .pdf_vector import VectorPage
+
+logger = logging.getLogger(__name__)
+
+try:
+    import fitz  # PyMuPDF
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    PYMUPDF_AVAILABLE = False
+
+
+# Tekeningsoorten die door de volledige analyse gaan
+DRAWING_LABELS = ("plan", "elevation", "section", "detail")
+
+# Twijfelgeval: geen snelle route, de pagina krijgt de volledige analyse
+UNKNOWN_LABEL = "unknown"
+
+# Titelblok trefwoorden per tekeningsoort (NL en EN)
+TITLE_KEYWORDS = {
+    "plan": re.compile(r"plattegrond|begane grond|verdieping|floor ?plan|situatie", re.IGNORECASE),
+    "elevation": re.compile(r"gevel|aanzicht|elevation", re.IGNORECASE),
+    "section": re.compile(r"doorsnede|section", re.IGNORECASE),
+    "detail": re.compile(r"\bdetail", re.IGNORECASE)
+}
+
+# Mapping naar de drawing types van DrawingAnalyzer
+DRAWING_TYPES = {
+    "plan": "floor_plan",
+    "elevation": "elevation",
+    "section": "section",
+    "detail": "detail"
+}
+
+
+class PageClassification(BaseModel):
+    page_number: int
+    label: str  # plan, elevation, section, detail, text, blank, unknown
+    confidence: float
+    ink_density: float = 0.0
+    line_ratio: float = 0.0
+    text_ratio: float = 0.0
+    source: str = "thumbnail"  # thumbnail, vector
+    
+    @property
+    def is_drawing(self) -> bool:
+        return self.label in DRAWING_LABELS or self.label == UNKNOWN_LABEL
+
+
+class PageTriage:
+    """
+    Goedkope classificatie per pagina vóór de zware analyse.
+    
+    Tekeningsets bevatten naast tekeningen ook voorbladen, legenda's,
+    algemene notities en staten. Op een thumbnail worden inktdichtheid,
+    lange lijnen (morfologisch) en tekstachtige componenten gemeten;
+    daarmee wordt elke pagina gelabeld als plan, elevation, section, detail,
+    text of blank. Voor vector pagina's worden paden en teksten direct geteld.
+    Onder min_confidence wordt het label unknown en gaat de pagina door de
+    volledige analyse.
+    """
+    
+    def __init__(
+        self,
+        thumbnail_side: int = 1000,
+        blank_ink: float = 0.002,
+        text_ratio: float = 0.45,
+        max_text_line_ratio: float = 0.35,
+        max_text_other_ratio: float = 0.15,
+        min_text_glyphs: int = 150,
+        min_confidence: float = 0.4
+    ):
+        self.thumbnail_side = thumbnail_side
+        self.blank_ink = blank_ink
+        self.text_ratio = text_ratio
+        self.max_text_line_ratio = max_text_line_ratio
+        self.max_text_other_ratio = max_text_other_ratio
+        self.min_text_glyphs = min_text_glyphs
+        self.min_confidence = min_confidence
+    
+    def classify_pdf(self, file_path: str, pages: Optional[List[int]] = None) -> List[PageClassification]:
+        """
+        Classificeer PDF pagina's op basis van thumbnails
+        
+        Args:
+            file_path: Pad naar de PDF
+            pages: Optioneel alleen deze pagina's (0-based)
+        
+        Returns:
+            Classificatie per pagina, lege lijst als de thumbnails niet gemaakt konden worden
+        """
+        try:
+            results = []
+            for index, thumbnail in self._pdf_thumbnails(file_path, pages):
+                results.append(self.classify_image(thumbnail, index + 1))
+            
+            counts = {}
+            for result in results:
+                counts[result.label] = counts.get(result.label, 0) + 1
+            logger.info(f"Page triage for {Path(file_path).name}: {counts}")
+            return results
+        
+        except Exception as e:
+            logger.warning(f"Page triage failed for {file_path}: {e}")
+            return []
+    
+    def classify_image(
+        self,
+        image: np.ndarray,
+        page_number: int = 1,
+        texts: Optional[List[str]] = None
+    ) -> PageClassification:
+        """
+        Classificeer een pagina op basis van een (verkleinde) afbeelding
+        
+        Args:
+            image: Pagina (BGR of grijswaarden), wordt zo nodig verkleind
+            page_number: Paginanummer (1-based)
+            texts: Optioneel al bekende tekst van de pagina (titelblok)
+        
+        Returns:
+            Classificatie met de gemeten kenmerken
+        """
+        try:
+            features = self._features(self._thumbnail(image))
+        except Exception as e:
+            # Bij twijfel de volledige analyse laten draaien
+            logger.warning(f"Page triage failed for page {page_number}: {e}")
+            return PageClassification(page_number=page_number, label=UNKNOWN_LABEL, confidence=0.0)
+        
+        if features["ink_density"] < self.blank_ink:
+            label, confidence = "blank", 1.0 - features["ink_density"] / self.blank_ink
+        elif self._is_text_page(features):
+            label, confidence = "text", min(1.0, features["text_ratio"] / self.text_ratio / 2 + 0.5)
+        else:
+            label, confidence = self._drawing_label(self._drawing_scores(features), texts)
+        
+        if confidence < self.min_confidence:
+            label = UNKNOWN_LABEL
+        
+        return PageClassification(
+            page_number=page_number,
+            label=label,
+            confidence=round(confidence, 3),
+            ink_density=round(features["ink_density"], 4),
+            line_ratio=round(features["line_ratio"], 3),
+            text_ratio=round(features["text_ratio"], 3)
+        )
+    
+    def classify_vector_page(self, vector_page: VectorPage) -> PageClassification:
+        """
+        Classificeer een vector pagina op basis van de aantallen paden en teksten
+        
+        Args:
+            vector_page: Uitgelezen vectorgeometrie van de pagina
+        
+        Returns:
+            Classificatie van de pagina
+        """
+        primitives = vector_page.primitives
+        geometry = sum(len(primitives.get(kind, ())) for kind in ("lines", "rectangles", "circles"))
+        text_count = len(vector_page.texts)
+        total = geometry + text_count
+        
+        text_ratio = text_count / total if total else 0.0
+        line_ratio = geometry / total if total else 0.0
+        
+        if total == 0:
+            label, confidence = "blank", 1.0
+        elif text_count >= self.min_text_glyphs / 5 and text_ratio >= 0.5:
+            # Veel tekstregels tegen weinig geometrie: notities, legenda of staat
+            label, confidence = "text", min(1.0, text_ratio)
+        else:
+            lines = primitives.get("lines", ())
+            scores = dict.fromkeys(DRAWING_LABELS, 0.0)
+            if len(lines):
+                scores.update(self._orientation_scores(lines.points))
+            label, confidence = self._drawing_label(scores, vector_page.texts)
+        
+        if confidence < self.min_confidence:
+            label = UNKNOWN_LABEL
+        
+        return PageClassification(
+            page_number=vector_page.page_number,
+            label=label,
+            confidence=round(confidence, 3),
+            line_ratio=round(line_ratio, 3),
+            text_ratio=round(text_ratio, 3),
+            source="vector"
+        )
+    
+    def _pdf_thumbnails(self, file_path: str, pages: Optional[List[int]] = None):
+        """Render kleine thumbnails per pagina; PyMuPDF is sneller dan pdf2image"""
+        if PYMUPDF_AVAILABLE:
+            with fitz.open(file_path) as doc:
+                indices = range(doc.page_count) if pages is None else pages
+                for index in indices:
+                    page = doc[index]
+                    zoom = self.thumbnail_side / max(page.rect.width, page.rect.height, 1)
+                    pixmap = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csGRAY, alpha=False)
+                    gray = np.frombuffer(pixmap.samples, dtype=np.uint8).reshape(pixmap.height, pixmap.stride)
+                    yield index, gray[:, :pixmap.width].copy()
+            return
+        
+        if pages is None:
+            images = pdf2image.convert_from_path(file_path, dpi=72, grayscale=True)
+            indexed = enumerate(images)
+        else:
+            indexed = []
+            for index in pages:
+                indexed.extend(
+                    (index, image) for image in pdf2image.convert_from_path(
+                        file_path, dpi=72, grayscale=True, first_page=index + 1, last_page=index + 1
+                    )
+                )
+        
+        for index, image in indexed:
+            yield index, np.asarray(image.convert("L"))
+    
+    def _thumbnail(self, image: np.ndarray) -> np.ndarray:
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        height, width = gray.shape
+        factor = self.thumbnail_side / max(height, width)
+        if factor >= 1:
+            return gray
+        return cv2.resize(
+            gray,
+            (max(1, round(width * factor)), max(1, round(height * factor))),
+            interpolation=cv2.INTER_AREA
+        )
+    
+    def _features(self, gray: np.ndarray) -> Dict[str, float]:
+        """Meet inkt, lange lijnen, tekstcomponenten, vullingen en gesloten ruimtes"""
+        height, width = gray.shape
+        
+        # Vaste drempel: Otsu kiest op een lege pagina een drempel midden in de ruis
+        ink = (gray < 160).astype(np.uint8) * 255
+        ink_pixels = int(np.count_nonzero(ink))
+        features = {
+            "ink_density": ink_pixels / float(ink.size),
+            "line_ratio": 0.0,
+            "text_ratio": 0.0
+        }
+        if features["ink_density"] < self.blank_ink:
+            return features
+        
+        # Lange horizontale en verticale lijnen
+        length = max(15, max(height, width) // 30)
+        horizontal = cv2.morphologyEx(ink, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (length, 1)))
+        vertical = cv2.morphologyEx(ink, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (1, length)))
+        h_ink = int(np.count_nonzero(horizontal))
+        v_ink = int(np.count_nonzero(vertical))
+        line_mask = cv2.bitwise_or(horizontal, vertical)
+        
+        # Overige inkt: tekst (glyph formaat), schuine lijnen, bogen en arceringen
+        rest = cv2.bitwise_and(ink, cv2.bitwise_not(line_mask))
+        count, _, stats, _ = cv2.connectedComponentsWithStats(rest, connectivity=8)
+        comp_w = stats[1:, cv2.CC_STAT_WIDTH]
+        comp_h = stats[1:, cv2.CC_STAT_HEIGHT]
+        comp_area = stats[1:, cv2.CC_STAT_AREA]
+        max_glyph = max(4, int(max(height, width) * 0.03))
+        glyph = (comp_h >= 2) & (comp_h <= max_glyph) & (comp_w <= max_glyph * 2)
+        text_ink = int(comp_area[glyph].sum())
+        other_ink = int(comp_area.sum()) - text_ink
+        
+        # Gevulde vlakken (poché, arcering in doorsnedes en details)
+        solid = cv2.erode(ink, np.ones((3, 3), np.uint8))
+        
+        # Gesloten ruimtes: witte gebieden die de rand niet raken
+        _, _, white_stats, _ = cv2.connectedComponentsWithStats(cv2.bitwise_not(ink), connectivity=4)
+        wx, wy = white_stats[1:, cv2.CC_STAT_LEFT], white_stats[1:, cv2.CC_STAT_TOP]
+        ww, wh = white_stats[1:, cv2.CC_STAT_WIDTH], white_stats[1:, cv2.CC_STAT_HEIGHT]
+        inner = (wx > 0) & (wy > 0) & (wx + ww < width) & (wy + wh < height)
+        enclosed = int(np.count_nonzero(inner & (white_stats[1:, cv2.CC_STAT_AREA] > ink.size * 0.002)))
+        
+        # Maaiveld/vloerlijn: een horizontale lijn over meer dan de halve breedte
+        _, _, h_stats, _ = cv2.connectedComponentsWithStats(horizontal, connectivity=8)
+        ground_line = bool(np.any(h_stats[1:, cv2.CC_STAT_WIDTH] > width * 0.5))
+        
+        features.update({
+            "line_ratio": (h_ink + v_ink) / float(ink_pixels),
+            "text_ratio": text_ink / float(ink_pixels),
+            "other_ratio": max(0, other_ink) / float(ink_pixels),
+            "fill_ratio": int(np.count_nonzero(solid)) / float(ink_pixels),
+            "h_ink": float(h_ink),
+            "v_ink": float(v_ink),
+            "glyphs": float(np.count_nonzero(glyph)),
+            "enclosed": float(enclosed),
+            "ground_line": float(ground_line)
+        })
+        return features
+    
+    def _is_text_page(self, features: Dict[str, float]) -> bool:
+        """Veel glyphs, weinig schuine lijnen en bogen: notities, legenda of staat"""
+        return (
+            features.get("glyphs", 0) >= self.min_text_glyphs and
+            features["text_ratio"] >= self.text_ratio and
+            features["line_ratio"] <= self.max_text_line_ratio and
+            features.get("other_ratio", 1.0) <= self.max_text_other_ratio
+        )
+    
+    def _drawing_scores(self, features: Dict[str, float]) -> Dict[str, float]:
+        """Heuristische score per tekeningsoort"""
+        h_ink, v_ink = features["h_ink"], features["v_ink"]
+        balance = min(h_ink, v_ink) / max(h_ink, v_ink) if max(h_ink, v_ink) > 0 else 0.0
+        horizontal_dominance = 1.0 if h_ink > 1.5 * v_ink else 0.0
+        rooms = min(features["enclosed"] / 15.0, 1.0)
+        ground = features["ground_line"]
+        fill = min(features["fill_ratio"] * 2, 1.0)
+        other = min(features["other_ratio"] * 2, 1.0)
+        
+        return {
+            # Plattegrond: horizontaal en verticaal in balans, veel gesloten ruimtes
+            "plan": balance + rooms,
+            # Gevel: maaiveldlijn, horizontaal dominant, weinig vulling
+            "elevation": ground + 0.5 * horizontal_dominance + 0.3 * (1 - fill),
+            # Doorsnede: maaiveld/vloeren plus gevulde (gearceerde) constructie
+            "section": 0.7 * ground + fill + 0.3 * rooms,
+            # Detail: veel arcering en schuine lijnen, weinig ruimtes
+            "detail": other + fill + 0.3 * (1 - rooms)
+        }
+    
+    def _orientation_scores(self, points: np.ndarray) -> Dict[str, float]:
+        """Scores voor vector pagina's op basis van de lijnrichtingen"""
+        dx = np.abs(points[:, 2] - points[:, 0])
+        dy = np.abs(points[:, 3] - points[:, 1])
+        length = np.hypot(dx, dy)
+        total = float(length.sum()) or 1.0
+        
+        h_len = float(length[dy <= dx * 0.05].sum())
+        v_len = float(length[dx <= dy * 0.05].sum())
+        diagonal = max(0.0, total - h_len - v_len) / total
+        balance = min(h_len, v_len) / max(h_len, v_len) if max(h_len, v_len) > 0 else 0.0
+        
+        return {
+            "plan": balance,
+            "elevation": 0.5 if h_len > 1.5 * v_len else 0.0,
+            "section": 0.0,
+            "detail": min(diagonal * 2, 1.0)
+        }
+    
+    def _drawing_label(self, scores: Dict[str, float], texts: Optional[List[str]] = None) -> tuple:
+        """Kies de tekeningsoort; een titelblok trefwoord weegt zwaarder dan de geometrie"""
+        scores = dict(scores)
+        joined = "\n".join(texts or [])
+        for label, pattern in TITLE_KEYWORDS.items():
+            if pattern.search(joined):
+                scores[label] = scores.get(label, 0.0) + 1.5
+        
+        label = max(DRAWING_LABELS, key=lambda name: scores.get(name, 0.0))
+        total = sum(max(0.0, score) for score in scores.values())
+        confidence = scores[label] / total if total > 0 else 0.25
+        return label, confidence
+
+
+# Factory functie
+def get_page_triage(**kwargs: Any) -> PageTriage:
+    """Factory om PageTriage instantie te maken"""
+    return PageTriage(**kwargs)
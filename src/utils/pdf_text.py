@@ -0,0 +1,221 @@
+import logging
+import os
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Any, Iterator, Tuple, Type
+
+from pydantic import BaseModel, Field
+
+logger = logging.getLogger(__name__)
+
+try:
+    import fitz  # PyMuPDF
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    PYMUPDF_AVAILABLE = False
+
+try:
+    import PyPDF2
+    PYPDF2_AVAILABLE = True
+except ImportError:
+    PYPDF2_AVAILABLE = False
+
+
+class TextLine(BaseModel):
+    """Eén regel uit de tekstlaag met positie (PDF punten, oorsprong linksboven)"""
+    text: str
+    bbox: Tuple[float, float, float, float]
+    block: int = 0
+    font_size: Optional[float] = None
+
+
+class PageText(BaseModel):
+    """Tekstlaag van één pagina"""
+    page_number: int  # 1-based
+    text: str = ""
+    lines: List[TextLine] = Field(default_factory=list)
+    width: Optional[float] = None
+    height: Optional[float] = None
+    
+    @property
+    def char_count(self) -> int:
+        """Aantal tekens zonder witruimte (maat voor een bruikbare tekstlaag)"""
+        return len("".join(self.text.split()))
+
+
+class PDFTextBackend(ABC):
+    """Basis voor een tekstlaag backend"""
+    
+    name = "base"
+    
+    @classmethod
+    def available(cls) -> bool:
+        return False
+    
+    @abstractmethod
+    def iter_pages(
+        self,
+        file_path: str,
+        pages: Optional[List[int]] = None,
+        layout: bool = False
+    ) -> Iterator[PageText]:
+        """Stream de tekstlaag per pagina (0-based paginanummers, standaard alle)"""
+
+
+class PyMuPDFTextBackend(PDFTextBackend):
+    """MuPDF (C): snel, met blok- en regelcoördinaten"""
+    
+    name = "pymupdf"
+    
+    @classmethod
+    def available(cls) -> bool:
+        return PYMUPDF_AVAILABLE
+    
+    def iter_pages(
+        self,
+        file_path: str,
+        pages: Optional[List[int]] = None,
+        layout: bool = False
+    ) -> Iterator[PageText]:
+        with fitz.open(file_path) as doc:
+            indices = range(doc.page_count) if pages is None else pages
+            for index in indices:
+                page = doc.load_page(index)
+                if layout:
+                    yield self._layout_page(page, index)
+                else:
+                    yield PageText(
+                        page_number=index + 1,
+                        text=page.get_text("text", sort=True),
+                        width=page.rect.width,
+                        height=page.rect.height
+                    )
+    
+    def _layout_page(self, page: Any, index: int) -> PageText:
+        lines = []
+        for block in page.get_text("dict", sort=True)["blocks"]:
+            if block.get("type") != 0:
+                continue  # afbeeldingen
+            for line in block["lines"]:
+                spans = line["spans"]
+                text = "".join(span["text"] for span in spans)
+                if not text.strip():
+                    continue
+                lines.append(TextLine(
+                    text=text,
+                    bbox=tuple(line["bbox"]),
+                    block=block["number"],
+                    font_size=max(span["size"] for span in spans)
+                ))
+        
+        return PageText(
+            page_number=index + 1,
+            text="\n".join(line.text for line in lines),
+            lines=lines,
+            width=page.rect.width,
+            height=page.rect.height
+        )
+
+
+class PyPDF2TextBackend(PDFTextBackend):
+    """Pure Python terugval: alleen tekst, geen coördinaten"""
+    
+    name = "pypdf2"
+    
+    @classmethod
+    def available(cls) -> bool:
+        return PYPDF2_AVAILABLE
+    
+    def iter_pages(
+        self,
+        file_path: str,
+        pages: Optional[List[int]] = None,
+        layout: bool = False
+    ) -> Iterator[PageText]:
+        with open(file_path, 'rb') as file:
+            reader = PyPDF2.PdfReader(file)
+            indices = range(len(reader.pages)) if pages is None else pages
+            for index in indices:
+                page = reader.pages[index]
+                yield PageText(
+                    page_number=index + 1,
+                    text=page.extract_text() or "",
+                    width=float(page.mediabox.width),
+                    height=float(page.mediabox.height)
+                )
+
+
+# Backends in volgorde van voorkeur
+TEXT_BACKENDS: Dict[str, Type[PDFTextBackend]] = {
+    PyMuPDFTextBackend.name: PyMuPDFTextBackend,
+    PyPDF2TextBackend.name: PyPDF2TextBackend,
+}
+
+
+class PDFTextExtractor:
+    """
+    Leest de tekstlaag van PDF's via een uitwisselbare backend.
+    
+    Standaard PyMuPDF; via PDF_TEXT_BACKEND of het backend argument is een
+    andere te kiezen. Pagina's worden gestreamd, zodat grote rapporten niet
+    in één keer in het geheugen staan.
+    """
+    
+    def __init__(self, backend: Optional[str] = None):
+        self.backend = self._select_backend(backend or os.getenv("PDF_TEXT_BACKEND"))
+        logger.info(f"PDFTextExtractor initialized with backend: {self.backend.name if self.backend else None}")
+    
+    def iter_pages(
+        self,
+        file_path: str,
+        pages: Optional[List[int]] = None,
+        layout: bool = False
+    ) -> Iterator[PageText]:
+        """
+        Stream de tekstlaag per pagina
+        
+        Args:
+            file_path: Pad naar de PDF
+            pages: 0-based paginanummers, standaard alle pagina's
+            layout: Regels met coördinaten meegeven (voor tabellen en velden)
+        
+        Returns:
+            Iterator met PageText per pagina
+        """
+        if self.backend is None:
+            raise RuntimeError("No PDF text backend available")
+        return self.backend.iter_pages(file_path, pages, layout)
+    
+    def extract_pages(
+        self,
+        file_path: str,
+        pages: Optional[List[int]] = None,
+        layout: bool = False
+    ) -> List[PageText]:
+        """Tekstlaag van alle (gevraagde) pagina's; leeg bij een fout"""
+        try:
+            return list(self.iter_pages(file_path, pages, layout))
+        except Exception as e:
+            logger.error(f"PDF text extraction failed for {file_path}: {e}")
+            return []
+    
+    def extract_text(self, file_path: str) -> str:
+        """Volledige tekst van de PDF, pagina's gescheiden door een regelovergang"""
+        return "\n".join(page.text for page in self.extract_pages(file_path) if page.text)
+    
+    def _select_backend(self, name: Optional[str]) -> Optional[PDFTextBackend]:
+        if name:
+            backend_class = TEXT_BACKENDS.get(name.lower())
+            if backend_class is not None and backend_class.available():
+                return backend_class()
+            logger.warning(f"PDF text backend '{name}' not available, using default")
+        
+        for backend_class in TEXT_BACKENDS.values():
+            if backend_class.available():
+                return backend_class()
+        return None
+
+
+# Factory functie
+def get_pdf_text_extractor(**kwargs: Any) -> PDFTextExtractor:
+    """Factory om PDFTextExtractor instantie te maken"""
+    return PDFTextExtractor(**kwargs)
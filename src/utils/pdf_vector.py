@@ -0,0 +1,284 @@
+import logging
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Any
+
+import numpy as np
+
+from ..models.element_store import ElementStore, SHAPE_CIRCLE
+
+logger = logging.getLogger(__name__)
+
+try:
+    import fitz  # PyMuPDF
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    PYMUPDF_AVAILABLE = False
+    logger.warning("PyMuPDF not available, vector PDF extraction disabled")
+
+
+# Maatvoering: getallen met optioneel decimalen, bijv. "3600", "2,45", "1.200"
+DIMENSION_PATTERN = re.compile(r"^\d{1,6}([.,]\d{1,3})?$")
+
+
+class VectorPage:
+    """Vectorgeometrie van één PDF pagina, in pixels op de raster resolutie"""
+    
+    def __init__(
+        self,
+        page_number: int,
+        width: float,
+        height: float,
+        primitives: Dict[str, ElementStore],
+        texts: List[str]
+    ):
+        self.page_number = page_number
+        self.width = width
+        self.height = height
+        self.primitives = primitives  # lines, rectangles, circles, text_regions
+        self.texts = texts            # tekst per rij in primitives["text_regions"]
+    
+    @property
+    def element_count(self) -> int:
+        return sum(len(store) for store in self.primitives.values())
+
+
+class PDFVectorExtractor:
+    """
+    Leest lijnen, rechthoeken, cirkels en tekst direct uit vector PDF's.
+    
+    Coördinaten worden omgerekend naar pixels op dezelfde resolutie als het
+    rasterpad (standaard 150 dpi), zodat classificatie en drempels gelijk
+    blijven. Pagina's die een scan bevatten worden overgeslagen (None) en
+    gaan via het rasterpad.
+    """
+    
+    def __init__(
+        self,
+        dpi: int = 150,
+        min_paths: int = 20,
+        max_image_coverage: float = 0.5,
+        min_rectangle_area: float = 100.0
+    ):
+        self.dpi = dpi
+        self.min_paths = min_paths
+        self.max_image_coverage = max_image_coverage
+        self.min_rectangle_area = min_rectangle_area
+    
+    @property
+    def available(self) -> bool:
+        return PYMUPDF_AVAILABLE
+    
+    def supports(self, file_path: str) -> bool:
+        """Vector extractie is alleen mogelijk voor PDF's en met PyMuPDF"""
+        return self.available and Path(file_path).suffix.lower() == '.pdf'
+    
+    def extract(self, file_path: str) -> List[Optional[VectorPage]]:
+        """
+        Extraheer vectorgeometrie per pagina
+        
+        Args:
+            file_path: Pad naar de PDF
+        
+        Returns:
+            Lijst met per pagina een VectorPage, of None als de pagina gerasterd moet worden
+        """
+        pages = []
+        try:
+            with fitz.open(file_path) as doc:
+                for page in doc:
+                    pages.append(self.extract_page(page))
+        
+        except Exception as e:
+            logger.warning(f"Vector extraction failed for {file_path}: {e}")
+            return []
+        
+        vector_count = sum(1 for page in pages if page is not None)
+        logger.info(f"Vector extraction: {vector_count}/{len(pages)} pages contain vector geometry")
+        return pages
+    
+    def page_text(self, file_path: str, page_index: int) -> str:
+        """Tekstlaag van één pagina (0-based), leeg als er geen is"""
+        if not self.available:
+            return ""
+        try:
+            with fitz.open(file_path) as doc:
+                return doc[page_index].get_text()
+        except Exception as e:
+            logger.warning(f"Reading text layer failed for page {page_index + 1} of {file_path}: {e}")
+            return ""
+    
+    def extract_page(self, page: Any) -> Optional[VectorPage]:
+        """Extraheer één pagina, None als de pagina een scan is"""
+        try:
+            drawings = page.get_drawings()
+            if not self._is_vector_page(page, drawings):
+                return None
+            
+            # Van PDF punten (ongeroteerd) naar pixels op de pagina zoals weergegeven
+            matrix = page.rotation_matrix * fitz.Matrix(self.dpi / 72, self.dpi / 72)
+            transform = np.array([
+                [matrix.a, matrix.c, matrix.e],
+                [matrix.b, matrix.d, matrix.f]
+            ])
+            
+            segments, segment_layers = [], []
+            boxes, box_layers = [], []
+            circles, circle_layers = [], []
+            
+            for path in drawings:
+                layer = path.get("layer") or None
+                items = path.get("items", [])
+                
+                # Cirkel: gesloten pad van alleen Bézier curves met vierkante omhullende
+                if len(items) >= 4 and all(item[0] == "c" for item in items):
+                    rect = path["rect"]
+                    if rect.width > 0 and 0.9 < rect.height / rect.width < 1.1:
+                        circles.append((rect.x0, rect.y0, rect.x1, rect.y1))
+                        circle_layers.append(layer)
+                        continue
+                
+                for item in items:
+                    kind = item[0]
+                    if kind == "l":
+                        segments.append((item[1].x, item[1].y, item[2].x, item[2].y))
+                        segment_layers.append(layer)
+                    elif kind == "re":
+                        rect = item[1]
+                        boxes.append((rect.x0, rect.y0, rect.x1, rect.y1))
+                        box_layers.append(layer)
+                    elif kind == "qu":
+                        quad = item[1]
+                        for p1, p2 in ((quad.ul, quad.ur), (quad.ur, quad.lr), (quad.lr, quad.ll), (quad.ll, quad.ul)):
+                            segments.append((p1.x, p1.y, p2.x, p2.y))
+                            segment_layers.append(layer)
+            
+            text_regions, texts = self._extract_text(page, transform)
+            
+            primitives = {
+                "lines": self._segments_store(segments, segment_layers, transform),
+                "rectangles": self._boxes_store(boxes, box_layers, transform),
+                "circles": self._circles_store(circles, circle_layers, transform),
+                "text_regions": text_regions
+            }
+            
+            # page.rect houdt al rekening met de rotatie
+            scale = self.dpi / 72
+            return VectorPage(page.number + 1, page.rect.width * scale, page.rect.height * scale, primitives, texts)
+        
+        except Exception as e:
+            logger.warning(f"Vector extraction failed for page {page.number + 1}: {e}")
+            return None
+    
+    def _is_vector_page(self, page: Any, drawings: List[Dict]) -> bool:
+        """Een pagina is vector als er genoeg paden zijn en geen scan de pagina bedekt"""
+        if len(drawings) < self.min_paths:
+            return False
+        
+        page_area = abs(page.rect.width * page.rect.height)
+        if page_area <= 0:
+            return False
+        
+        image_area = 0.0
+        for info in page.get_image_info():
+            x0, y0, x1, y1 = info["bbox"]
+            image_area += abs((x1 - x0) * (y1 - y0))
+        
+        return image_area / page_area < self.max_image_coverage
+    
+    def _apply(self, transform: np.ndarray, points: np.ndarray) -> np.ndarray:
+        """Pas de affiene transformatie toe op (n, 2) punten"""
+        return points @ transform[:, :2].T + transform[:, 2]
+    
+    def _corners_to_bbox(self, corners: np.ndarray, transform: np.ndarray) -> np.ndarray:
+        """(n, 4) x0, y0, x1, y1 in PDF punten naar (n, 4) x, y, width, height in pixels"""
+        p1 = self._apply(transform, corners[:, :2])
+        p2 = self._apply(transform, corners[:, 2:])
+        low = np.minimum(p1, p2)
+        high = np.maximum(p1, p2)
+        return np.column_stack([low, high - low])
+    
+    def _segments_store(self, segments: List, layers: List, transform: np.ndarray) -> ElementStore:
+        if not segments:
+            return ElementStore.empty()
+        
+        points = np.asarray(segments, dtype=np.float64)
+        points = np.column_stack([
+            self._apply(transform, points[:, :2]),
+            self._apply(transform, points[:, 2:])
+        ])
+        
+        # Punten zonder lengte (markers) dragen geen geometrie
+        keep = np.hypot(points[:, 2] - points[:, 0], points[:, 3] - points[:, 1]) > 0
+        return ElementStore.from_segments(
+            points[keep],
+            layer=[layer for layer, k in zip(layers, keep) if k]
+        )
+    
+    def _boxes_store(self, boxes: List, layers: List, transform: np.ndarray) -> ElementStore:
+        if not boxes:
+            return ElementStore.empty()
+        
+        bbox = self._corners_to_bbox(np.asarray(boxes, dtype=np.float64), transform)
+        w, h = bbox[:, 2], bbox[:, 3]
+        area = w * h
+        keep = area > self.min_rectangle_area
+        
+        return ElementStore.from_columns(
+            "opening",
+            bbox[keep],
+            area=area[keep],
+            aspect_ratio=np.divide(w, h, out=np.zeros_like(w), where=h > 0)[keep],
+            layer=[layer for layer, k in zip(layers, keep) if k]
+        )
+    
+    def _circles_store(self, circles: List, layers: List, transform: np.ndarray) -> ElementStore:
+        if not circles:
+            return ElementStore.empty()
+        
+        bbox = self._corners_to_bbox(np.asarray(circles, dtype=np.float64), transform)
+        radius = (bbox[:, 2] + bbox[:, 3]) / 4
+        
+        return ElementStore.from_columns(
+            "column_circular",
+            bbox,
+            shape=SHAPE_CIRCLE,
+            radius=radius,
+            area=np.pi * radius ** 2,
+            layer=layers
+        )
+    
+    def _extract_text(self, page: Any, transform: np.ndarray) -> tuple:
+        """Tekst spans met hun positie; getallen worden als maatvoering getypeerd"""
+        spans, texts = [], []
+        for block in page.get_text("dict").get("blocks", []):
+            for line in block.get("lines", []):
+                for span in line.get("spans", []):
+                    text = span.get("text", "").strip()
+                    if text:
+                        spans.append(span["bbox"])
+                        texts.append(text)
+        
+        if not spans:
+            return ElementStore.empty(), []
+        
+        bbox = self._corners_to_bbox(np.asarray(spans, dtype=np.float64), transform)
+        w, h = bbox[:, 2], bbox[:, 3]
+        element_types = [
+            "dimension" if DIMENSION_PATTERN.match(text) else "annotation"
+            for text in texts
+        ]
+        
+        store = ElementStore.from_columns(
+            element_types,
+            bbox,
+            area=w * h,
+            aspect_ratio=np.divide(w, h, out=np.zeros_like(w), where=h > 0)
+        )
+        return store, texts
+
+
+# Factory functie
+def get_pdf_vector_extractor(**kwargs: Any) -> PDFVectorExtractor:
+    """Factory om PDFVectorExtractor instantie te maken"""
+    return PDFVectorExtractor(**kwargs)
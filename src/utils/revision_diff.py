@@ -0,0 +1,443 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from typing import Dict, List, Optional, Any, Callable, Awaitable
+
+import cv2
+import numpy as np
+
+from ..models.element_store import ElementStore, SHAPE_SEGMENT
+from .line_geometry import merge_collinear_segments
+from .tiling import TiledDetector, TilePlan, Tile
+
+logger = logging.getLogger(__name__)
+
+
+class RevisionRecord:
+    """Vorige revisie van een pagina: overzichtsbeeld, elementen en metadata"""
+    
+    def __init__(
+        self,
+        reference: np.ndarray,
+        image_shape: tuple,
+        elements: ElementStore,
+        metadata: Dict[str, Any],
+        source: Optional[str] = None
+    ):
+        self.reference = reference      # verkleind grijsbeeld (TilePlan.coarse)
+        self.image_shape = image_shape  # (hoogte, breedte) op volle resolutie
+        self.elements = elements        # geclassificeerde elementen in pixels
+        self.metadata = metadata        # DrawingMetadata.dict()
+        self.source = source
+
+
+class RevisionChange:
+    """Resultaat van de vergelijking met de vorige revisie"""
+    
+    def __init__(
+        self,
+        plan: TilePlan,
+        shift: tuple,
+        changed_tiles: List[Tile],
+        response: float,
+        regions: Optional[List[tuple]] = None
+    ):
+        self.plan = plan
+        self.shift = shift                  # (dx, dy) van vorige naar nieuwe revisie, volle resolutie
+        self.changed_tiles = changed_tiles
+        self.response = response            # piek van de fasecorrelatie (0..1)
+        # Detectieregio's (x0, y0, x1, y1): gewijzigde tegels plus de volledige
+        # omvang van de elementen die patch() daar weghaalt
+        self.regions = regions if regions is not None else [tile.rect for tile in changed_tiles]
+    
+    @property
+    def changed_fraction(self) -> float:
+        """Deel van het blad dat opnieuw gedetecteerd wordt"""
+        height, width = self.plan.image_shape
+        if not self.plan.tiles or not height or not width:
+            return 0.0
+        area = sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in self.regions)
+        return max(len(self.changed_tiles) / len(self.plan.tiles), area / float(height * width))
+    
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "shift": [round(v, 2) for v in self.shift],
+            "changed_tiles": len(self.changed_tiles),
+            "total_tiles": len(self.plan.tiles),
+            "changed_fraction": round(self.changed_fraction, 4),
+            "alignment_response": round(self.response, 3)
+        }
+
+
+class RevisionStore:
+    """
+    Laatste geanalyseerde revisie per tekeningreeks, bladformaat en pagina.
+    
+    Per sleutel een directory met het overzichtsbeeld (png), de elementen (npz)
+    en de metadata (json). Elke nieuwe revisie wordt de referentie voor de volgende.
+    """
+    
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or os.getenv(
+            "REVISION_CACHE_DIR",
+            os.path.join(tempfile.gettempdir(), "cache", "revisions")
+        )
+    
+    def get(self, key: str) -> Optional[RevisionRecord]:
+        path = self._path(key)
+        try:
+            if not os.path.exists(os.path.join(path, "record.json")):
+                return None
+            
+            with open(os.path.join(path, "record.json"), "r", encoding="utf-8") as f:
+                info = json.load(f)
+            reference = cv2.imread(os.path.join(path, "reference.png"), cv2.IMREAD_GRAYSCALE)
+            with np.load(os.path.join(path, "elements.npz"), allow_pickle=False) as arrays:
+                elements = ElementStore.from_arrays(dict(arrays))
+            
+            if reference is None:
+                return None
+            return RevisionRecord(reference, tuple(info["image_shape"]), elements, info["metadata"], info.get("source"))
+        
+        except Exception as e:
+            logger.warning(f"Could not read revision cache for {key}: {e}")
+            return None
+    
+    def put(self, key: str, record: RevisionRecord):
+        path = self._path(key)
+        staging = f"{path}.tmp"
+        try:
+            shutil.rmtree(staging, ignore_errors=True)
+            os.makedirs(staging, exist_ok=True)
+            
+            cv2.imwrite(os.path.join(staging, "reference.png"), record.reference)
+            np.savez_compressed(os.path.join(staging, "elements.npz"), **record.elements.to_arrays())
+            with open(os.path.join(staging, "record.json"), "w", encoding="utf-8") as f:
+                json.dump({
+                    "key": key,
+                    "image_shape": list(record.image_shape),
+                    "metadata": record.metadata,
+                    "source": record.source
+                }, f, default=str)
+            
+            # Vervang de vorige revisie pas als de nieuwe volledig geschreven is
+            shutil.rmtree(path, ignore_errors=True)
+            os.replace(staging, path)
+        
+        except Exception as e:
+            logger.warning(f"Could not write revision cache for {key}: {e}")
+            shutil.rmtree(staging, ignore_errors=True)
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(key.encode("utf-8")).hexdigest())
+
+
+class RevisionDiff:
+    """
+    Vergelijkt een nieuwe revisie met de vorige en bepaalt de gewijzigde tegels.
+    
+    De overzichtsbeelden worden uitgelijnd met fasecorrelatie (verschuiving van
+    het blad bij het plotten/scannen), daarna geeft het absolute verschil per
+    tegel aan wat opnieuw geanalyseerd moet worden. Elementen uit ongewijzigde
+    tegels komen uit de vorige revisie.
+    """
+    
+    def __init__(
+        self,
+        tiler: Optional[TiledDetector] = None,
+        diff_threshold: int = 48,
+        min_changed_pixels: int = 3,
+        max_changed_fraction: float = 0.5,
+        min_response: float = 0.1,
+        max_shape_change: float = 0.02
+    ):
+        # Kleine tegels: de doorlooptijd schaalt met de grootte van de wijziging
+        self.tiler = tiler or TiledDetector(tile_size=512, overlap=48)
+        self.diff_threshold = diff_threshold
+        self.min_changed_pixels = min_changed_pixels
+        self.max_changed_fraction = max_changed_fraction
+        self.min_response = min_response
+        self.max_shape_change = max_shape_change
+    
+    def plan(self, image: np.ndarray) -> TilePlan:
+        """Tegelplan met overzichtsbeeld; het overzicht is ook de referentie voor de volgende revisie"""
+        return self.tiler.plan(image)
+    
+    def compare(self, image: np.ndarray, record: RevisionRecord) -> Optional[RevisionChange]:
+        """
+        Vergelijk een nieuwe revisie met de vorige
+        
+        Args:
+            image: Nieuwe revisie op volle resolutie
+            record: Vorige revisie uit de RevisionStore
+        
+        Returns:
+            Gewijzigde tegels, of None als de bladen niet vergelijkbaar zijn
+        """
+        height, width = image.shape[:2]
+        old_height, old_width = record.image_shape
+        if (abs(height - old_height) > self.max_shape_change * old_height or
+                abs(width - old_width) > self.max_shape_change * old_width):
+            logger.info("Revision diff skipped: sheet size changed")
+            return None
+        
+        plan = self.plan(image)
+        new = plan.coarse
+        old = record.reference
+        if old.shape != new.shape:
+            old = cv2.resize(old, (new.shape[1], new.shape[0]), interpolation=cv2.INTER_AREA)
+        
+        # Uitlijnen: verschuiving van de vorige naar de nieuwe revisie
+        window = cv2.createHanningWindow((new.shape[1], new.shape[0]), cv2.CV_32F)
+        (dx, dy), response = cv2.phaseCorrelate(
+            255 - old.astype(np.float32),
+            255 - new.astype(np.float32),
+            window
+        )
+        if response < self.min_response:
+            logger.info(f"Revision diff skipped: alignment failed (response {response:.3f})")
+            return None
+        
+        aligned = cv2.warpAffine(
+            old,
+            np.float32([[1, 0, dx], [0, 1, dy]]),
+            (new.shape[1], new.shape[0]),
+            borderValue=255
+        )
+        
+        # Licht vervagen tegen anti-aliasing verschillen, dan drempelen
+        difference = cv2.absdiff(cv2.GaussianBlur(new, (3, 3), 0), cv2.GaussianBlur(aligned, (3, 3), 0))
+        changed = (difference > self.diff_threshold).astype(np.uint8)
+        integral = cv2.integral(changed)
+        
+        changed_tiles = []
+        for tile in plan.tiles:
+            cx0, cy0, cx1, cy1 = (int(v / plan.coarse_scale) for v in tile.core)
+            cx1, cy1 = max(cx1, cx0 + 1), max(cy1, cy0 + 1)
+            count = (
+                integral[cy1, cx1] - integral[cy0, cx1] -
+                integral[cy1, cx0] + integral[cy0, cx0]
+            )
+            if count >= self.min_changed_pixels:
+                changed_tiles.append(tile)
+        
+        shift = (dx * plan.coarse_scale, dy * plan.coarse_scale)
+        
+        # Elementen van de vorige revisie die verdwijnen moeten volledig opnieuw gevonden worden
+        regions = self._regions(plan, changed_tiles, record.elements.copy().shifted(*shift))
+        
+        change = RevisionChange(plan, shift, changed_tiles, float(response), regions)
+        logger.info(
+            f"Revision diff: {len(changed_tiles)}/{len(plan.tiles)} tiles changed, "
+            f"shift ({shift[0]:.1f}, {shift[1]:.1f}) px"
+        )
+        return change
+    
+    def _regions(self, plan: TilePlan, changed_tiles: List[Tile], previous: ElementStore) -> List[tuple]:
+        """
+        Detectieregio's voor de gewijzigde tegels
+        
+        patch() verwijdert elk vorig element waarvan de omtrek een gewijzigde
+        tegelkern raakt (lijnsegmenten worden alleen binnen de kern
+        weggeknipt); de regio van die tegel wordt uitgebreid met de bbox (plus
+        overlap) van die elementen, zodat ruimtes groter dan een tegel in hun
+        geheel opnieuw gevonden worden. Overlappende regio's worden samengevoegd.
+        """
+        height, width = plan.image_shape
+        margin = self.tiler.overlap
+        previous = previous.take(previous.shape != SHAPE_SEGMENT)
+        x, y, w, h = previous.bbox.T
+        
+        regions = []
+        for tile in changed_tiles:
+            owned = self._touches(previous.bbox, [tile.core])
+            rx0, ry0, rx1, ry1 = tile.rect
+            if owned.any():
+                rx0 = min(rx0, max(0, int(np.floor(x[owned].min())) - margin))
+                ry0 = min(ry0, max(0, int(np.floor(y[owned].min())) - margin))
+                rx1 = max(rx1, min(width, int(np.ceil((x + w)[owned].max())) + margin))
+                ry1 = max(ry1, min(height, int(np.ceil((y + h)[owned].max())) + margin))
+            regions.append((rx0, ry0, rx1, ry1))
+        
+        merged = True
+        while merged:
+            merged = False
+            for i in range(len(regions)):
+                for j in range(i + 1, len(regions)):
+                    a, b = regions[i], regions[j]
+                    if a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]:
+                        regions[i] = (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+                        del regions[j]
+                        merged = True
+                        break
+                if merged:
+                    break
+        return regions
+    
+    async def detect(
+        self,
+        image: np.ndarray,
+        change: RevisionChange,
+        preprocess: Callable[[np.ndarray], np.ndarray],
+        detect: Callable[[np.ndarray], Awaitable[Dict[str, ElementStore]]]
+    ) -> Optional[Dict[str, ElementStore]]:
+        """
+        Detecteer opnieuw in de regio's van een wijziging
+        
+        Lijnsegmenten blijven allemaal (patch() voegt ze samen); overige
+        elementen alleen als hun omtrek een gewijzigde tegelkern raakt, zodat
+        ongewijzigde elementen uit de vorige revisie niet dubbel komen.
+        
+        Returns:
+            Per soort primitieve een ElementStore in paginacoördinaten, of None
+            als een nieuw element door een regiorand wordt afgesneden (dan is
+            een volledige analyse nodig)
+        """
+        height, width = change.plan.image_shape
+        cores = [tile.core for tile in change.changed_tiles]
+        
+        parts: Dict[str, List[ElementStore]] = {}
+        for rx0, ry0, rx1, ry1 in change.regions:
+            primitives = await detect(preprocess(image[ry0:ry1, rx0:rx1]))
+            for kind, store in primitives.items():
+                if store is None or not len(store):
+                    continue
+                store.shifted(rx0, ry0)
+                x, y, w, h = store.bbox.T
+                in_changed = self._touches(store.bbox, cores)
+                truncated = (
+                    ((x <= rx0 + 1) & (rx0 > 0)) |
+                    ((y <= ry0 + 1) & (ry0 > 0)) |
+                    ((x + w >= rx1 - 1) & (rx1 < width)) |
+                    ((y + h >= ry1 - 1) & (ry1 < height))
+                )
+                is_segment = store.shape == SHAPE_SEGMENT
+                if (in_changed & truncated & ~is_segment).any():
+                    logger.info("Revision diff: new element extends past the changed region")
+                    return None
+                parts.setdefault(kind, []).append(store.take(is_segment | (in_changed & ~truncated)))
+        
+        return {kind: ElementStore.concat(stores) for kind, stores in parts.items()}
+    
+    def is_incremental(self, change: Optional[RevisionChange]) -> bool:
+        """Alleen bij een kleine wijziging is patchen goedkoper dan opnieuw analyseren"""
+        return change is not None and change.changed_fraction <= self.max_changed_fraction
+    
+    def patch(
+        self,
+        previous: ElementStore,
+        change: RevisionChange,
+        detected: ElementStore
+    ) -> ElementStore:
+        """
+        Vervang de elementen van de vorige revisie in gewijzigde tegels
+        
+        Args:
+            previous: Elementen van de vorige revisie (worden niet aangepast)
+            change: Resultaat van compare()
+            detected: Nieuw gedetecteerde elementen in de gewijzigde tegels
+        
+        Returns:
+            Elementen van de nieuwe revisie
+        """
+        kept = previous.copy().shifted(*change.shift)
+        
+        if change.changed_tiles:
+            cores = [tile.core for tile in change.changed_tiles]
+            
+            # Lijnsegmenten alleen buiten de gewijzigde kernen behouden (de rest
+            # wordt opnieuw gedetecteerd); overige elementen als hun omtrek
+            # geen gewijzigde kern raakt
+            is_segment = kept.shape == SHAPE_SEGMENT
+            segments = self._clip_segments(kept.take(is_segment), cores)
+            kept = ElementStore.concat([kept.take(~is_segment & ~self._touches(kept.bbox, cores)), segments])
+        
+        return self._merge_segments(ElementStore.concat([kept, detected]))
+    
+    @staticmethod
+    def _touches(bbox: np.ndarray, cores: List[tuple]) -> np.ndarray:
+        """Omtrek van de bbox (x, y, w, h) snijdt of ligt in een van de kernen"""
+        x, y, w, h = np.asarray(bbox, dtype=np.float64).reshape(-1, 4).T
+        touches = np.zeros(len(x), dtype=bool)
+        for x0, y0, x1, y1 in cores:
+            overlaps = (x < x1) & (x + w >= x0) & (y < y1) & (y + h >= y0)
+            # Kern volledig binnen de bbox: de omtrek loopt er omheen
+            encloses = (x < x0) & (y < y0) & (x + w >= x1) & (y + h >= y1)
+            touches |= overlaps & ~encloses
+        return touches
+    
+    @staticmethod
+    def _clip_segments(segments: ElementStore, cores: List[tuple], min_length: float = 1.0) -> ElementStore:
+        """Knip de delen van lijnsegmenten binnen de kernen weg (Liang-Barsky, gevectoriseerd)"""
+        for x0, y0, x1, y1 in cores:
+            if not len(segments):
+                break
+            points = segments.points
+            dx = points[:, 2] - points[:, 0]
+            dy = points[:, 3] - points[:, 1]
+            
+            t_in = np.zeros(len(points))
+            t_out = np.ones(len(points))
+            hit = np.ones(len(points), dtype=bool)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                for p, q in (
+                    (-dx, points[:, 0] - x0), (dx, x1 - points[:, 0]),
+                    (-dy, points[:, 1] - y0), (dy, y1 - points[:, 1])
+                ):
+                    ratio = q / p
+                    hit &= ~((p == 0) & (q < 0))
+                    t_in = np.where(p < 0, np.maximum(t_in, ratio), t_in)
+                    t_out = np.where(p > 0, np.minimum(t_out, ratio), t_out)
+            hit &= t_in < t_out
+            
+            length = np.hypot(dx, dy)
+            before = hit & (t_in * length >= min_length)
+            after = hit & ((1 - t_out) * length >= min_length)
+            
+            source = np.concatenate([np.flatnonzero(~hit), np.flatnonzero(before), np.flatnonzero(after)])
+            start = np.concatenate([np.zeros((~hit).sum()), np.zeros(before.sum()), t_out[after]])
+            end = np.concatenate([np.ones((~hit).sum()), t_in[before], np.ones(after.sum())])
+            
+            clipped = segments.take(source)
+            origin, delta = points[source, :2], np.column_stack([dx, dy])[source]
+            clipped.points = np.column_stack([origin + delta * start[:, None], origin + delta * end[:, None]])
+            new_dx = clipped.points[:, 2] - clipped.points[:, 0]
+            new_dy = clipped.points[:, 3] - clipped.points[:, 1]
+            clipped.bbox = np.column_stack([
+                np.minimum(clipped.points[:, 0], clipped.points[:, 2]),
+                np.minimum(clipped.points[:, 1], clipped.points[:, 3]),
+                np.abs(new_dx),
+                np.abs(new_dy)
+            ])
+            clipped.length = np.hypot(new_dx, new_dy)
+            segments = clipped
+        return segments
+    
+    def _merge_segments(self, store: ElementStore) -> ElementStore:
+        """Voeg lijnstukken aan de randen van gewijzigde tegels samen, per element type"""
+        segment_mask = store.shape == SHAPE_SEGMENT
+        if not segment_mask.any():
+            return store
+        
+        parts = [store.take(~segment_mask)]
+        segments = store.take(segment_mask)
+        for type_code in np.unique(segments.type_code):
+            group = segments.take(segments.type_code == type_code)
+            merged = merge_collinear_segments(group.points, **self.tiler.merge_tolerances)
+            parts.append(ElementStore.from_segments(
+                merged,
+                np.full(len(merged), type_code, dtype=np.int16),
+                confidence=float(np.max(group.confidence)),
+                page=group.page[0]
+            ))
+        
+        return ElementStore.concat(parts)
+
+
+# Factory functie
+def get_revision_diff(**kwargs: Any) -> RevisionDiff:
+    """Factory om RevisionDiff instantie te maken"""
+    return RevisionDiff(**kwargs)
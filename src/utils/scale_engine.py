@@ -0,0 +1,447 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Any
+
+import numpy as np
+from pydantic import BaseModel
+
+from ..models.element_store import ElementStore
+from .ocr_engine import get_ocr_engine
+
+logger = logging.getLogger(__name__)
+
+
+# Gangbare schalen voor bouwtekeningen
+STANDARD_SCALES = (1, 2, 5, 10, 20, 25, 50, 100, 200, 250, 500, 1000, 2000, 2500, 5000)
+
+# ISO papierformaten in mm (staand)
+PAPER_SIZES = {
+    "A0": (841, 1189),
+    "A1": (594, 841),
+    "A2": (420, 594),
+    "A3": (297, 420),
+    "A4": (210, 297)
+}
+
+# "Schaal 1:100", "SCALE 1/50", "sch. 1:20" en losse "1:100" in het titelblok
+LABELLED_SCALE_PATTERN = re.compile(r"(?:schaal|scale|sch)\.?\s*[:=]?\s*1\s*[:/]\s*(\d{1,5})\b", re.IGNORECASE)
+BARE_SCALE_PATTERN = re.compile(r"^\s*1\s*:\s*(\d{1,5})\s*$")
+
+# Schaalbalk labels met expliciete eenheid, bijv. "5 m" of "10m"
+SCALE_BAR_PATTERN = re.compile(r"^(\d+(?:[.,]\d+)?)\s*m$", re.IGNORECASE)
+
+# Revisie en upload suffixen die niet bij de tekeningreeks horen. Alleen expliciete
+# markeringen na een scheidingsteken ("A-101 rev B", "A-101_revC", "plan_v2",
+# upload tijdstempel); "kelder2" of "gevel_a" zijn aparte bladen, geen revisies
+REVISION_PATTERN = re.compile(
+    r"([-_ .](rev|revisie|versie)[-_ .]?([a-z]{1,2}|\d+[a-z]?)|[-_ .]v\d+|_\d{8}_\d{6})$",
+    re.IGNORECASE
+)
+
+
+class ScaleCalibration(BaseModel):
+    mm_per_pixel: float  # werkelijke mm per pixel (of per tekeningeenheid)
+    scale: Optional[str] = None  # bijv. "1:100"
+    method: str  # title_block, dimensions, title_block+dimensions, scale_bar, cad_units, cache
+    confidence: float
+    samples: int = 0
+    residual: Optional[float] = None  # mediane relatieve afwijking van de maatvoering
+    series_key: Optional[str] = None
+
+
+class CalibrationCache:
+    """
+    Kalibraties per project, tekeningreeks en bladformaat.
+    
+    Latere revisies van dezelfde tekening hergebruiken de kalibratie zodat de
+    (dure) titelblok OCR en handmatige controles niet opnieuw nodig zijn. Per
+    sleutel één JSON bestand dat atomair vervangen wordt, zodat workers die
+    tegelijk verschillende bladen kalibreren elkaars resultaten niet overschrijven.
+    """
+    
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or os.getenv(
+            "SCALE_CACHE_DIR",
+            os.path.join(tempfile.gettempdir(), "cache", "scale_calibrations")
+        )
+    
+    def get(self, key: str) -> Optional[ScaleCalibration]:
+        path = self._path(key)
+        try:
+            if not os.path.exists(path):
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            return ScaleCalibration(**entry["calibration"])
+        except Exception as e:
+            logger.warning(f"Ignoring invalid scale cache entry {key}: {e}")
+            return None
+    
+    def put(self, key: str, calibration: ScaleCalibration):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            
+            # Eerst naar een tijdelijk bestand, dan atomair vervangen
+            with tempfile.NamedTemporaryFile("w", dir=self.directory, suffix=".tmp", delete=False, encoding="utf-8") as tmp:
+                json.dump({
+                    "key": key,
+                    "calibration": calibration.dict(),
+                    "updated_at": datetime.now().isoformat()
+                }, tmp, indent=2)
+            os.replace(tmp.name, self._path(key))
+        
+        except Exception as e:
+            logger.warning(f"Could not write scale cache for {key}: {e}")
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.json")
+
+
+class ScaleEngine:
+    """
+    Bepaalt de schaal en de omrekening pixel → mm per tekeningpagina.
+    
+    Bronnen, van sterk naar zwak:
+    - maatvoering: getallen bij maatlijnen, robuust gefit (mediaan) en afgerond
+      op een standaard schaal; bevestigd door het titelblok als dat overeenkomt
+    - schaalbalk: labels met eenheid ("0" ... "5 m") op één rij
+    - titelblok: "Schaal 1:100" (vector tekst, of OCR van het titelblok bij scans)
+    - cache: eerdere kalibratie van dezelfde tekeningreeks en bladformaat binnen het project
+    """
+    
+    def __init__(
+        self,
+        dpi: int = 150,
+        cache: Optional[CalibrationCache] = None,
+        snap_tolerance: float = 0.05,
+        min_dimension_samples: int = 3,
+        min_cache_confidence: float = 0.7
+    ):
+        self.dpi = dpi
+        self.cache = cache or CalibrationCache()
+        self.snap_tolerance = snap_tolerance
+        self.min_dimension_samples = min_dimension_samples
+        self.min_cache_confidence = min_cache_confidence
+    
+    def calibrate(
+        self,
+        file_path: str,
+        page_number: int,
+        page_size: tuple,
+        texts: Optional[List[str]] = None,
+        text_regions: Optional[ElementStore] = None,
+        lines: Optional[ElementStore] = None,
+        image: Optional[np.ndarray] = None,
+        series: Optional[str] = None,
+        project_id: Optional[str] = None
+    ) -> Optional[ScaleCalibration]:
+        """
+        Kalibreer een pagina
+        
+        Args:
+            file_path: Pad naar de tekening (bepaalt de tekeningreeks)
+            page_number: Paginanummer (1-based)
+            page_size: (breedte, hoogte) in pixels op self.dpi
+            texts: Tekst per rij in text_regions (vector PDF's)
+            text_regions: Tekstposities (bbox in pixels)
+            lines: Lijnsegmenten van de pagina (voor maatlijnen)
+            image: Gerasterde pagina, alleen gebruikt voor titelblok OCR
+            series: Optioneel expliciete tekeningreeks (anders uit de bestandsnaam)
+            project_id: Project van de tekening; zonder project geen cache, want een
+                bestandsnaam is alleen binnen een project een tekeningreeks
+        
+        Returns:
+            Kalibratie, of None als er geen schaal bepaald kon worden
+        """
+        key = self.series_key(file_path, page_number, page_size, series, project_id)
+        cached = self.cache.get(key) if project_id else None
+        
+        try:
+            # Scans zonder tekstlaag: de cache bespaart de titelblok OCR
+            if texts is None and cached is not None:
+                return cached.model_copy(update={"method": "cache", "series_key": key})
+            
+            if texts is None and image is not None:
+                # OCR tekst heeft geen posities: alleen het titelblok telt
+                texts = self.read_title_block(image)
+                text_regions = None
+            
+            calibration = self._combine(
+                declared=self.declared_scales(texts or []),
+                measured=self.fit_dimensions(texts, text_regions, lines),
+                scale_bar=self.read_scale_bar(texts, text_regions)
+            )
+        
+        except Exception as e:
+            logger.warning(f"Scale calibration failed for page {page_number} of {file_path}: {e}")
+            calibration = None
+        
+        if calibration is None:
+            if cached is not None:
+                return cached.model_copy(update={"method": "cache", "series_key": key})
+            return None
+        
+        calibration.series_key = key
+        if cached is not None and cached.scale != calibration.scale:
+            logger.info(f"Scale for {key} changed from {cached.scale} to {calibration.scale}")
+        
+        # Een zwakkere bevestiging van dezelfde schaal overschrijft de cache niet
+        confirmed = cached is not None and cached.scale == calibration.scale and cached.confidence > calibration.confidence
+        if project_id and calibration.confidence >= self.min_cache_confidence and not confirmed:
+            self.cache.put(key, calibration)
+        
+        return calibration
+    
+    def from_scale(self, ratio: float) -> float:
+        """mm in werkelijkheid per pixel bij schaal 1:ratio"""
+        return ratio * 25.4 / self.dpi
+    
+    def series_key(
+        self,
+        file_path: str,
+        page_number: int,
+        page_size: tuple,
+        series: Optional[str] = None,
+        project_id: Optional[str] = None
+    ) -> str:
+        """Sleutel per project, tekeningreeks, bladformaat en pagina; revisiesuffixen vallen weg"""
+        if series is None:
+            series = Path(file_path).stem
+            while True:
+                stripped = REVISION_PATTERN.sub("", series)
+                if stripped == series or not stripped:
+                    break
+                series = stripped
+        
+        return f"{project_id or ''}|{series.lower()}|{self.sheet_size(page_size)}|{page_number}"
+    
+    def sheet_size(self, page_size: tuple) -> str:
+        """Papierformaat uit de paginagrootte in pixels, bijv. 'A1-landscape'"""
+        width_mm, height_mm = (value * 25.4 / self.dpi for value in page_size)
+        short, long = sorted((width_mm, height_mm))
+        orientation = "landscape" if width_mm > height_mm else "portrait"
+        
+        for name, (paper_short, paper_long) in PAPER_SIZES.items():
+            if abs(short - paper_short) <= 0.03 * paper_short and abs(long - paper_long) <= 0.03 * paper_long:
+                return f"{name}-{orientation}"
+        
+        return f"{round(width_mm / 10) * 10}x{round(height_mm / 10) * 10}mm"
+    
+    def declared_scales(self, texts: List[str]) -> List[int]:
+        """Schalen uit het titelblok; gelabelde ('Schaal 1:100') eerst"""
+        labelled, bare = [], []
+        for text in texts:
+            labelled.extend(int(match) for match in LABELLED_SCALE_PATTERN.findall(text))
+            match = BARE_SCALE_PATTERN.match(text)
+            if match:
+                bare.append(int(match.group(1)))
+        
+        ordered = []
+        for ratio in labelled + sorted(bare, key=bare.count, reverse=True):
+            if ratio > 0 and ratio not in ordered:
+                ordered.append(ratio)
+        return ordered
+    
+    def read_title_block(self, image: np.ndarray) -> List[str]:
+        """OCR van alleen het titelblok (rechtsonder), niet van de hele tekening"""
+        ocr_engine = get_ocr_engine()
+        if not ocr_engine.available:
+            return []
+        
+        try:
+            height, width = image.shape[:2]
+            crop = image[int(height * 0.7):, int(width * 0.6):]
+            text = ocr_engine.recognize(crop)
+            return [line.strip() for line in text.splitlines() if line.strip()]
+        
+        except Exception as e:
+            logger.warning(f"Title block OCR failed: {e}")
+            return []
+    
+    def fit_dimensions(
+        self,
+        texts: Optional[List[str]],
+        text_regions: Optional[ElementStore],
+        lines: Optional[ElementStore]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Fit mm per pixel uit maatvoering: elke maat wordt gekoppeld aan de
+        dichtstbijzijnde evenwijdige lijn waar de tekst naast staat
+        
+        Returns:
+            Dict met mm_per_pixel, samples en residual, of None bij te weinig maten
+        """
+        if not texts or text_regions is None or lines is None or not len(lines) or not len(text_regions):
+            return None
+        
+        values = np.array([self._dimension_value(text) for text in texts], dtype=np.float64)
+        valid = ~np.isnan(values) & (values > 0)
+        if np.count_nonzero(valid) < self.min_dimension_samples:
+            return None
+        
+        bbox = text_regions.bbox[valid]
+        values = values[valid]
+        cx = bbox[:, 0] + bbox[:, 2] / 2
+        cy = bbox[:, 1] + bbox[:, 3] / 2
+        vertical_text = bbox[:, 3] > bbox[:, 2]
+        text_size = np.minimum(bbox[:, 2], bbox[:, 3])
+        
+        x1, y1, x2, y2 = lines.points.T
+        dx, dy = np.abs(x2 - x1), np.abs(y2 - y1)
+        horizontal_lines = np.flatnonzero(dy <= dx * 0.02)
+        vertical_lines = np.flatnonzero(dx <= dy * 0.02)
+        
+        lengths = np.full(len(values), np.nan)
+        for is_vertical, candidates in ((False, horizontal_lines), (True, vertical_lines)):
+            rows = np.flatnonzero(vertical_text == is_vertical)
+            if not len(rows) or not len(candidates):
+                continue
+            
+            if is_vertical:
+                along_lo = np.minimum(y1, y2)[candidates]
+                along_hi = np.maximum(y1, y2)[candidates]
+                across = x1[candidates]
+                text_along, text_across = cy[rows], cx[rows]
+            else:
+                along_lo = np.minimum(x1, x2)[candidates]
+                along_hi = np.maximum(x1, x2)[candidates]
+                across = y1[candidates]
+                text_along, text_across = cx[rows], cy[rows]
+            
+            # In blokken om het geheugen van de afstandsmatrix te begrenzen
+            for start in range(0, len(rows), 256):
+                block = slice(start, start + 256)
+                distance = np.abs(across[None, :] - text_across[block, None])
+                inside = (along_lo[None, :] <= text_along[block, None]) & (along_hi[None, :] >= text_along[block, None])
+                near = inside & (distance <= 2.5 * text_size[rows[block], None])
+                distance = np.where(near, distance, np.inf)
+                
+                best = np.argmin(distance, axis=1)
+                found = np.isfinite(distance[np.arange(len(best)), best])
+                lengths[rows[block][found]] = (along_hi - along_lo)[best[found]]
+        
+        ok = np.isfinite(lengths) & (lengths > 0)
+        if np.count_nonzero(ok) < self.min_dimension_samples:
+            return None
+        
+        ratios = values[ok] / lengths[ok]
+        median = float(np.median(ratios))
+        
+        # Uitschieters (maat bij een hulplijn of verkeerde lijn) vallen weg
+        inliers = ratios[np.abs(ratios / median - 1) <= 0.1]
+        if len(inliers) < self.min_dimension_samples:
+            return None
+        
+        mm_per_pixel = float(np.median(inliers))
+        residual = float(np.median(np.abs(inliers / mm_per_pixel - 1)))
+        return {"mm_per_pixel": mm_per_pixel, "samples": int(len(inliers)), "residual": residual}
+    
+    def read_scale_bar(
+        self,
+        texts: Optional[List[str]],
+        text_regions: Optional[ElementStore]
+    ) -> Optional[float]:
+        """mm per pixel uit schaalbalk labels: '0' en 'N m' op dezelfde rij"""
+        if not texts or text_regions is None or not len(text_regions):
+            return None
+        
+        bbox = text_regions.bbox
+        cx = bbox[:, 0] + bbox[:, 2] / 2
+        cy = bbox[:, 1] + bbox[:, 3] / 2
+        zeros = [i for i, text in enumerate(texts) if text.strip() == "0"]
+        
+        estimates = []
+        for i, text in enumerate(texts):
+            match = SCALE_BAR_PATTERN.match(text.strip())
+            if not match:
+                continue
+            
+            value_mm = float(match.group(1).replace(",", ".")) * 1000
+            for z in zeros:
+                same_row = abs(cy[z] - cy[i]) <= max(bbox[i, 3], bbox[z, 3])
+                if same_row and cx[i] > cx[z]:
+                    estimates.append(value_mm / (cx[i] - cx[z]))
+        
+        return float(np.median(estimates)) if estimates else None
+    
+    def _combine(
+        self,
+        declared: List[int],
+        measured: Optional[Dict[str, Any]],
+        scale_bar: Optional[float]
+    ) -> Optional[ScaleCalibration]:
+        """Kies de sterkste bron; titelblok en maatvoering bevestigen elkaar"""
+        if measured is not None:
+            ratio = measured["mm_per_pixel"] * self.dpi / 25.4
+            
+            for declared_ratio in declared:
+                if abs(ratio / declared_ratio - 1) <= self.snap_tolerance:
+                    return ScaleCalibration(
+                        mm_per_pixel=self.from_scale(declared_ratio),
+                        scale=f"1:{declared_ratio}",
+                        method="title_block+dimensions",
+                        confidence=0.95,
+                        samples=measured["samples"],
+                        residual=measured["residual"]
+                    )
+            
+            snapped = self._snap(ratio)
+            return ScaleCalibration(
+                mm_per_pixel=self.from_scale(snapped) if snapped else measured["mm_per_pixel"],
+                scale=f"1:{snapped}" if snapped else f"1:{round(ratio)}",
+                method="dimensions",
+                confidence=0.85 if snapped else 0.7,
+                samples=measured["samples"],
+                residual=measured["residual"]
+            )
+        
+        if scale_bar is not None:
+            ratio = scale_bar * self.dpi / 25.4
+            snapped = self._snap(ratio)
+            return ScaleCalibration(
+                mm_per_pixel=self.from_scale(snapped) if snapped else scale_bar,
+                scale=f"1:{snapped or round(ratio)}",
+                method="scale_bar",
+                confidence=0.8
+            )
+        
+        if declared:
+            # Meerdere schalen op één blad (bijv. details): minder zeker
+            return ScaleCalibration(
+                mm_per_pixel=self.from_scale(declared[0]),
+                scale=f"1:{declared[0]}",
+                method="title_block",
+                confidence=0.75 if len(declared) == 1 else 0.6
+            )
+        
+        return None
+    
+    def _snap(self, ratio: float) -> Optional[int]:
+        """Rond af op een standaard schaal als die binnen de tolerantie ligt"""
+        nearest = min(STANDARD_SCALES, key=lambda standard: abs(ratio / standard - 1))
+        if abs(ratio / nearest - 1) <= self.snap_tolerance:
+            return nearest
+        return None
+    
+    def _dimension_value(self, text: str) -> float:
+        """Maat in mm: '3600' en '1.200' zijn mm, '3,60' is m"""
+        text = text.strip()
+        if re.fullmatch(r"\d{1,6}", text):
+            return float(text)
+        if re.fullmatch(r"\d{1,3}\.\d{3}", text):
+            return float(text.replace(".", ""))
+        if re.fullmatch(r"\d{1,3}[.,]\d{1,2}", text):
+            return float(text.replace(",", ".")) * 1000
+        return np.nan
+
+
+# Factory functie
+def get_scale_engine(**kwargs: Any) -> ScaleEngine:
+    """Factory om ScaleEngine instantie te maken"""
+    return ScaleEngine(**kwargs)
@@ -0,0 +1,487 @@
+import logging
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Tuple
+
+import cv2
+import numpy as np
+from pydantic import BaseModel, Field
+
+from .line_geometry import cluster_axis, cluster_centers
+from .ocr_engine import OCREngine, get_ocr_engine
+from .pdf_text import PDFTextExtractor, PageText
+
+logger = logging.getLogger(__name__)
+
+try:
+    import fitz  # PyMuPDF
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    PYMUPDF_AVAILABLE = False
+
+
+# Nederlandse notatie: 1.234,56 / 12,5 / 1234.56, optioneel met valuta, procent of eenheid
+VALUE_PATTERN = re.compile(
+    r"^(?P<currency>€|eur)?\s*(?P<number>[-+]?\d[\d.,\s]*)\s*"
+    r"(?P<suffix>%|m1|m2|m3|m²|m³|m|mm|kg|ton|st|stk|stuks?|pst|uur|u|post|ps)?$",
+    re.IGNORECASE
+)
+
+# Bestekcodes (21.12.10-a): minstens twee scheidingen of een letter, anders is het een getal
+CODE_PATTERN = re.compile(r"^\d{1,2}(?:\.\d{1,3}){2,4}(?:-?[a-z])?$|^\d{1,2}\.\d{1,3}-?[a-z]$", re.IGNORECASE)
+
+# In een codekolom ook korte STABU codes (3.1)
+STABU_CODE_PATTERN = re.compile(r"^\d{1,2}(?:[.\-]\d{1,3}){0,4}(?:-?[a-z])?$", re.IGNORECASE)
+
+# Eenheden naar de eenheden van CostAnalyzer (unit_quantities)
+UNIT_ALIASES = {
+    "m1": "m", "m": "m", "m2": "m2", "m²": "m2", "m3": "m3", "m³": "m3",
+    "st": "stuk", "stk": "stuk", "stuk": "stuk", "stuks": "stuk", "pst": "stuk", "post": "stuk", "ps": "stuk",
+}
+
+# Kolomrollen op basis van de kop; volgorde = prioriteit bij overlappende trefwoorden
+COLUMN_ROLES = {
+    "unit_price": ("eenheidsprijs", "prijs per", "prijs/eh", "tarief", "unit price"),
+    "total": ("totaal", "bedrag", "total", "subtotaal"),
+    "quantity": ("hoeveelheid", "aantal", "hvh", "qty", "quantity"),
+    "unit": ("eenheid", "eh", "unit"),
+    "code": ("stabu", "code", "post", "nr", "artikel"),
+    "description": ("omschrijving", "description", "werkzaamheden", "onderdeel", "bouwdeel", "element"),
+}
+
+# Korte koppen die alleen als volledige kop tellen: "Prijs" wel, "Totaalprijs" niet
+COLUMN_TITLES = {
+    "prijs": "unit_price",
+    "eenh": "unit",
+}
+
+
+def parse_value(text: str) -> Tuple[Any, str]:
+    """
+    Zet celtekst om naar een getypeerde waarde
+    
+    Args:
+        text: Tekst van de cel
+    
+    Returns:
+        Tuple van (waarde, type): empty, code, currency, percentage, quantity, number of text
+    """
+    text = " ".join(text.split())
+    if not text:
+        return None, "empty"
+    
+    if CODE_PATTERN.match(text):
+        return text, "code"
+    
+    match = VALUE_PATTERN.match(text)
+    if not match:
+        return text, "text"
+    
+    number = _parse_number(match.group("number"))
+    if number is None:
+        return text, "text"
+    
+    suffix = (match.group("suffix") or "").lower()
+    if match.group("currency"):
+        return number, "currency"
+    if suffix == "%":
+        return number, "percentage"
+    if suffix:
+        return {"value": number, "unit": UNIT_ALIASES.get(suffix, suffix)}, "quantity"
+    return number, "number"
+
+
+def _parse_number(text: str) -> Optional[float]:
+    text = text.replace(" ", "")
+    if "," in text:
+        # Komma is decimaalteken, punten zijn duizendtallen
+        text = text.replace(".", "").replace(",", ".")
+    elif re.fullmatch(r"[-+]?\d{1,3}(?:\.\d{3})+", text):
+        text = text.replace(".", "")
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+class TableCell(BaseModel):
+    row: int
+    column: int
+    bbox: Tuple[int, int, int, int]  # x, y, width, height
+    text: str = ""
+    value: Any = None
+    value_type: str = "empty"
+
+
+class ExtractedTable(BaseModel):
+    """Tabel als raster van getypeerde cellen"""
+    page_number: int = 1
+    bbox: Tuple[int, int, int, int]
+    rows: int
+    columns: int
+    cells: List[TableCell] = Field(default_factory=list)
+    header: List[str] = Field(default_factory=list)
+    has_header: bool = False
+    text_source: str = "ocr"  # ocr of text_layer
+    
+    @property
+    def grid(self) -> List[List[TableCell]]:
+        """Cellen per rij"""
+        grid = [[None] * self.columns for _ in range(self.rows)]
+        for cell in self.cells:
+            grid[cell.row][cell.column] = cell
+        return grid
+    
+    @property
+    def records(self) -> List[Dict[str, Any]]:
+        """Datarijen als dicts met de kop als keys"""
+        body = self.grid[1:] if self.has_header else self.grid
+        return [
+            {self.header[cell.column]: cell.value for cell in row}
+            for row in body
+            if any(cell.value_type != "empty" for cell in row)
+        ]
+    
+    def column_roles(self) -> Dict[str, int]:
+        """Kolomindex per rol (code, description, quantity, unit, unit_price, total)"""
+        roles: Dict[str, int] = {}
+        if not self.has_header:
+            return roles
+        
+        for column, title in enumerate(self.header):
+            role = COLUMN_TITLES.get(title.lower().strip(" .:"))
+            if role and role not in roles:
+                roles[role] = column
+        
+        for role, keywords in COLUMN_ROLES.items():
+            if role in roles:
+                continue
+            for column, title in enumerate(self.header):
+                title = title.lower()
+                if column not in roles.values() and any(keyword in title for keyword in keywords):
+                    roles[role] = column
+                    break
+        return roles
+    
+    def to_cost_elements(self) -> List[Dict[str, Any]]:
+        """
+        Rijen van een staat of begroting als elementen voor CostAnalyzer
+        
+        Alleen rijen met een hoeveelheid, of een bedrag en een code, worden
+        meegenomen; de STABU code uit de tabel gaat voor op classificatie op
+        omschrijving. Eenheid, eenheidsprijs en totaal van de rij gaan mee
+        naar CostEngine: rijen met een prijs worden tegen die prijs gerekend,
+        rijen zonder hoeveelheid als vaste post.
+        """
+        roles = self.column_roles()
+        if "quantity" not in roles and "total" not in roles:
+            return []
+        
+        elements = []
+        for row_index, row in enumerate(self.grid[1:], start=1):
+            values = {role: row[column] for role, column in roles.items()}
+            
+            quantity_cell = values.get("quantity")
+            quantity, unit = None, None
+            if quantity_cell is not None and quantity_cell.value_type == "quantity":
+                quantity, unit = quantity_cell.value["value"], quantity_cell.value["unit"]
+            elif quantity_cell is not None and quantity_cell.value_type == "number":
+                quantity = quantity_cell.value
+            
+            if values.get("unit") is not None and values["unit"].text:
+                unit = UNIT_ALIASES.get(values["unit"].text.strip().lower(), values["unit"].text.strip().lower())
+            
+            total = self._number(values.get("total"))
+            description = values["description"].text if "description" in values else ""
+            code = values["code"].text.strip() if "code" in values else None
+            if code and not STABU_CODE_PATTERN.match(code):
+                code = None
+            
+            # Zonder hoeveelheid alleen posten met een code (geen (sub)totaalregels)
+            if quantity is None and (total is None or not code):
+                continue
+            
+            unit_price = self._number(values.get("unit_price"))
+            metadata = {
+                "source_table": {"page": self.page_number, "row": row_index},
+                "unit": unit,
+                "unit_price": unit_price,
+                "total": total
+            }
+            element = {
+                "source": "table",
+                "element_type": description,
+                "description": description,
+                "quantity": quantity,
+                "unit": unit,
+                "unit_price": unit_price,
+                "total_price": total,
+                "unit_quantities": {unit: quantity} if unit and quantity is not None else None,
+                "metadata": metadata
+            }
+            if code:
+                element["stabu_code"] = code
+                element["stabu_chapter"] = re.split(r"[.\-]", code)[0]
+                metadata["stabu_code"] = code
+            
+            elements.append(element)
+        
+        return elements
+    
+    def _number(self, cell: Optional[TableCell]) -> Optional[float]:
+        if cell is None:
+            return None
+        if cell.value_type in ("number", "currency"):
+            return cell.value
+        if cell.value_type == "quantity":
+            return cell.value["value"]
+        return None
+
+
+class TableExtractor:
+    """
+    Haalt tabellen (staten, begrotingen, bestekposten) uit pagina's.
+    
+    Rasterlijnen worden morfologisch gevonden en per tabel (samenhangend
+    lijnennet) gevectoriseerd tot rij- en kolomscheidingen. Celtekst komt
+    uit de tekstlaag als die er is, anders via OCR per cel over de OCR pool.
+    """
+    
+    def __init__(
+        self,
+        min_table_size: int = 100,
+        line_scale: int = 40,
+        min_line_coverage: float = 0.3,
+        min_cell_ink: int = 8,
+        dpi: int = 200,
+        ocr_engine: Optional[OCREngine] = None
+    ):
+        self.min_table_size = min_table_size
+        self.line_scale = line_scale
+        self.min_line_coverage = min_line_coverage
+        self.min_cell_ink = min_cell_ink
+        self.dpi = dpi
+        self.ocr_engine = ocr_engine or get_ocr_engine()
+        self.text_extractor = PDFTextExtractor()
+    
+    async def extract_file(self, file_path: str) -> List[ExtractedTable]:
+        """
+        Alle tabellen uit een PDF of image
+        
+        Args:
+            file_path: Pad naar PDF of image
+        
+        Returns:
+            Tabellen van alle pagina's
+        """
+        tables = []
+        try:
+            if Path(file_path).suffix.lower() == '.pdf' and PYMUPDF_AVAILABLE:
+                scale = self.dpi / 72
+                page_texts = self.text_extractor.extract_pages(file_path, layout=True)
+                with fitz.open(file_path) as doc:
+                    for index, page in enumerate(doc):
+                        pixmap = page.get_pixmap(matrix=fitz.Matrix(scale, scale), colorspace=fitz.csGRAY, alpha=False)
+                        image = np.frombuffer(pixmap.samples, dtype=np.uint8).reshape(pixmap.height, pixmap.width)
+                        page_text = page_texts[index] if index < len(page_texts) else None
+                        tables.extend(await self.extract(image, index + 1, page_text, scale))
+            else:
+                image = cv2.imread(file_path, cv2.IMREAD_GRAYSCALE)
+                if image is None:
+                    return []
+                tables.extend(await self.extract(image))
+        
+        except Exception as e:
+            logger.error(f"Table extraction failed for {file_path}: {e}")
+        
+        return tables
+    
+    async def extract(
+        self,
+        image: np.ndarray,
+        page_number: int = 1,
+        page_text: Optional[PageText] = None,
+        text_scale: float = 1.0
+    ) -> List[ExtractedTable]:
+        """
+        Tabellen uit één pagina
+        
+        Args:
+            image: Pagina als grijs- of BGR beeld
+            page_number: Paginanummer (1-based)
+            page_text: Tekstlaag met regelcoördinaten (PDF punten), optioneel
+            text_scale: Pixels per PDF punt van het beeld
+        
+        Returns:
+            Gevonden tabellen met getypeerde cellen
+        """
+        gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        use_text_layer = page_text is not None and bool(page_text.lines)
+        
+        tables = []
+        for bbox, row_edges, column_edges in self.detect_grids(gray):
+            if use_text_layer:
+                texts = self._cell_texts_from_layer(page_text, text_scale, row_edges, column_edges)
+            else:
+                texts = await self._cell_texts_from_ocr(gray, row_edges, column_edges)
+            tables.append(self._build_table(page_number, bbox, row_edges, column_edges, texts, use_text_layer))
+        
+        return tables
+    
+    def detect_grids(self, gray: np.ndarray) -> List[Tuple[Tuple[int, int, int, int], np.ndarray, np.ndarray]]:
+        """
+        Rasters op de pagina: per samenhangend lijnennet de rij- en kolomranden
+        
+        Returns:
+            Lijst van (bbox, rijranden y, kolomranden x) in pixels
+        """
+        binary = cv2.adaptiveThreshold(
+            cv2.bitwise_not(gray), 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY, 15, -2
+        )
+        
+        height, width = gray.shape
+        horizontal = cv2.morphologyEx(
+            binary, cv2.MORPH_OPEN,
+            cv2.getStructuringElement(cv2.MORPH_RECT, (max(20, width // self.line_scale), 1))
+        )
+        vertical = cv2.morphologyEx(
+            binary, cv2.MORPH_OPEN,
+            cv2.getStructuringElement(cv2.MORPH_RECT, (1, max(20, height // self.line_scale)))
+        )
+        
+        # Elk samenhangend lijnennet is één tabel (geen kruisproduct van lijngroepen)
+        grid = cv2.dilate(cv2.bitwise_or(horizontal, vertical), np.ones((3, 3), np.uint8))
+        count, labels, stats, _ = cv2.connectedComponentsWithStats(grid, connectivity=8)
+        
+        grids = []
+        for label in range(1, count):
+            x, y, w, h = (int(v) for v in stats[label, :4])
+            if w < self.min_table_size or h < self.min_table_size:
+                continue
+            
+            member = labels[y:y + h, x:x + w] == label
+            row_edges = self._edges(horizontal[y:y + h, x:x + w] & member, axis=1, length=w) + y
+            column_edges = self._edges(vertical[y:y + h, x:x + w] & member, axis=0, length=h) + x
+            if len(row_edges) >= 2 and len(column_edges) >= 2:
+                grids.append(((x, y, w, h), row_edges, column_edges))
+        
+        grids.sort(key=lambda g: (g[0][1], g[0][0]))
+        return grids
+    
+    def _edges(self, mask: np.ndarray, axis: int, length: int) -> np.ndarray:
+        """Posities van lijnen die een voldoende deel van de tabel overspannen"""
+        coverage = np.count_nonzero(mask, axis=axis) / max(length, 1)
+        positions = np.flatnonzero(coverage >= self.min_line_coverage).astype(np.float64)
+        if not len(positions):
+            return np.zeros(0, dtype=np.int64)
+        
+        # Dikke lijnen en dubbele lijnen worden één rand
+        labels = cluster_axis(positions, threshold=3)
+        return np.round(cluster_centers(positions, labels)).astype(np.int64)
+    
+    def _cell_texts_from_layer(
+        self,
+        page_text: PageText,
+        scale: float,
+        row_edges: np.ndarray,
+        column_edges: np.ndarray
+    ) -> Dict[Tuple[int, int], str]:
+        """Wijs tekstregels toe aan cellen op hun middelpunt"""
+        bboxes = np.array([line.bbox for line in page_text.lines], dtype=np.float64) * scale
+        cx = (bboxes[:, 0] + bboxes[:, 2]) / 2
+        cy = (bboxes[:, 1] + bboxes[:, 3]) / 2
+        
+        rows = np.searchsorted(row_edges, cy) - 1
+        columns = np.searchsorted(column_edges, cx) - 1
+        inside = (rows >= 0) & (rows < len(row_edges) - 1) & (columns >= 0) & (columns < len(column_edges) - 1)
+        
+        texts: Dict[Tuple[int, int], List[str]] = {}
+        for index in np.flatnonzero(inside)[np.lexsort((cx[inside], cy[inside]))]:
+            texts.setdefault((int(rows[index]), int(columns[index])), []).append(page_text.lines[index].text.strip())
+        
+        return {key: " ".join(parts) for key, parts in texts.items()}
+    
+    async def _cell_texts_from_ocr(
+        self,
+        gray: np.ndarray,
+        row_edges: np.ndarray,
+        column_edges: np.ndarray,
+        inset: int = 3
+    ) -> Dict[Tuple[int, int], str]:
+        """OCR per niet-lege cel, parallel over de OCR pool"""
+        _, ink = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)
+        
+        keys, crops = [], []
+        for row in range(len(row_edges) - 1):
+            y0, y1 = row_edges[row] + inset, row_edges[row + 1] - inset
+            for column in range(len(column_edges) - 1):
+                x0, x1 = column_edges[column] + inset, column_edges[column + 1] - inset
+                if y1 - y0 < 4 or x1 - x0 < 4:
+                    continue
+                if cv2.countNonZero(ink[y0:y1, x0:x1]) < self.min_cell_ink:
+                    continue
+                keys.append((row, column))
+                # Witrand helpt Tesseract bij tekst tegen de celrand
+                crops.append(cv2.copyMakeBorder(gray[y0:y1, x0:x1], 8, 8, 8, 8, cv2.BORDER_CONSTANT, value=255))
+        
+        texts = await self.ocr_engine.recognize_many(crops, psm=6) if crops else []
+        return {key: " ".join(text.split()) for key, text in zip(keys, texts)}
+    
+    def _build_table(
+        self,
+        page_number: int,
+        bbox: Tuple[int, int, int, int],
+        row_edges: np.ndarray,
+        column_edges: np.ndarray,
+        texts: Dict[Tuple[int, int], str],
+        from_text_layer: bool
+    ) -> ExtractedTable:
+        rows, columns = len(row_edges) - 1, len(column_edges) - 1
+        
+        cells = []
+        for row in range(rows):
+            for column in range(columns):
+                text = texts.get((row, column), "")
+                value, value_type = parse_value(text)
+                cells.append(TableCell(
+                    row=row,
+                    column=column,
+                    bbox=(
+                        int(column_edges[column]), int(row_edges[row]),
+                        int(column_edges[column + 1] - column_edges[column]),
+                        int(row_edges[row + 1] - row_edges[row])
+                    ),
+                    text=text,
+                    value=value,
+                    value_type=value_type
+                ))
+        
+        # Kop: eerste rij alleen tekst, terwijl de rijen eronder getallen bevatten
+        first = [cell for cell in cells[:columns] if cell.value_type != "empty"]
+        rest = cells[columns:]
+        has_header = (
+            rows > 1 and bool(first) and
+            all(cell.value_type == "text" for cell in first) and
+            any(cell.value_type in ("number", "currency", "quantity", "percentage") for cell in rest)
+        )
+        header = [
+            (cells[column].text if has_header else "") or f"kolom_{column + 1}"
+            for column in range(columns)
+        ]
+        
+        return ExtractedTable(
+            page_number=page_number,
+            bbox=bbox,
+            rows=rows,
+            columns=columns,
+            cells=cells,
+            header=header,
+            has_header=has_header,
+            text_source="text_layer" if from_text_layer else "ocr"
+        )
+
+
+# Factory functie
+def get_table_extractor(**kwargs: Any) -> TableExtractor:
+    """Factory om TableExtractor instantie te maken"""
+    return TableExtractor(**kwargs)
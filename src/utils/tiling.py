@@ -0,0 +1,265 @@
+import logging
+from typing import Dict, List, Optional, Any, Callable, Awaitable
+
+import cv2
+import numpy as np
+
+from ..models.element_store import ElementStore, SHAPE_SEGMENT
+from .line_geometry import merge_collinear_segments
+
+logger = logging.getLogger(__name__)
+
+
+class Tile:
+    """Een tegel van een grote tekening: kern (zonder overlap) plus uitgebreide regio"""
+    
+    def __init__(self, core: tuple, rect: tuple, active: bool):
+        self.core = core      # x0, y0, x1, y1 zonder overlap (tegels vormen een partitie)
+        self.rect = rect      # x0, y0, x1, y1 inclusief overlap, geclipt op de pagina
+        self.active = active  # False als de overzichtspass geen inkt vond
+    
+    def crop(self, image: np.ndarray) -> np.ndarray:
+        x0, y0, x1, y1 = self.rect
+        return image[y0:y1, x0:x1]
+
+
+class TilePlan:
+    """Resultaat van de overzichtspass: tegels, overzichtsbeeld en schaalfactor"""
+    
+    def __init__(self, tiles: List[Tile], image_shape: tuple, coarse: np.ndarray, coarse_scale: float):
+        self.tiles = tiles
+        self.image_shape = image_shape  # (hoogte, breedte)
+        self.coarse = coarse            # verkleind beeld voor grote structuren
+        self.coarse_scale = coarse_scale  # factor van overzicht naar volle resolutie
+    
+    @property
+    def active_tiles(self) -> List[Tile]:
+        return [t for t in self.tiles if t.active]
+
+
+class TiledDetector:
+    """
+    Multi-resolutie analyse voor grote tekeningen (A0/A1 op 150 dpi).
+    
+    Een verkleinde overzichtspass bepaalt welke tegels inkt bevatten en vindt
+    grote structuren die over tegelgrenzen lopen. Alleen actieve tegels worden
+    op volle resolutie voorbewerkt en gedetecteerd. Resultaten worden aan de
+    naden samengevoegd: lijnsegmenten via collineair samenvoegen, overige
+    elementen via het middelpunt in de tegelkern.
+    """
+    
+    def __init__(
+        self,
+        tile_size: int = 2048,
+        overlap: int = 128,
+        min_image_side: int = 4000,
+        coarse_max_side: int = 1600,
+        min_ink_fraction: float = 0.001,
+        angle_tolerance: float = 2.0,
+        distance_tolerance: float = 3.0,
+        gap_tolerance: float = 10.0
+    ):
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.min_image_side = min_image_side
+        self.coarse_max_side = coarse_max_side
+        self.min_ink_fraction = min_ink_fraction
+        
+        # Zelfde toleranties als de ongetegelde lijndetectie (VisionClient config)
+        self.merge_tolerances = {
+            "angle_tolerance": angle_tolerance,
+            "distance_tolerance": distance_tolerance,
+            "gap_tolerance": gap_tolerance
+        }
+    
+    def should_tile(self, image: np.ndarray) -> bool:
+        """Alleen grote tekeningen worden in tegels verwerkt"""
+        return max(image.shape[:2]) >= self.min_image_side
+    
+    def plan(self, image: np.ndarray) -> TilePlan:
+        """Overzichtspass: verklein de tekening en markeer tegels met inkt"""
+        height, width = image.shape[:2]
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        
+        coarse_scale = max(1.0, max(height, width) / self.coarse_max_side)
+        coarse = cv2.resize(
+            gray,
+            (max(1, round(width / coarse_scale)), max(1, round(height / coarse_scale))),
+            interpolation=cv2.INTER_AREA
+        )
+        
+        # Inkt masker op overzichtsniveau, integraalbeeld voor snelle sommen per tegel
+        _, ink = cv2.threshold(coarse, 0, 1, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+        integral = cv2.integral(ink)
+        
+        tiles = []
+        for y0 in range(0, height, self.tile_size):
+            for x0 in range(0, width, self.tile_size):
+                core = (x0, y0, min(x0 + self.tile_size, width), min(y0 + self.tile_size, height))
+                rect = (
+                    max(0, core[0] - self.overlap),
+                    max(0, core[1] - self.overlap),
+                    min(width, core[2] + self.overlap),
+                    min(height, core[3] + self.overlap)
+                )
+                
+                # Inkt fractie van de uitgebreide regio in overzichtscoördinaten
+                cx0, cy0, cx1, cy1 = (int(v / coarse_scale) for v in rect)
+                cx1, cy1 = max(cx1, cx0 + 1), max(cy1, cy0 + 1)
+                ink_sum = (
+                    integral[cy1, cx1] - integral[cy0, cx1] -
+                    integral[cy1, cx0] + integral[cy0, cx0]
+                )
+                fraction = ink_sum / float((cx1 - cx0) * (cy1 - cy0))
+                
+                tiles.append(Tile(core, rect, fraction >= self.min_ink_fraction))
+        
+        plan = TilePlan(tiles, (height, width), coarse, coarse_scale)
+        logger.info(
+            f"Tiled analysis: {len(plan.active_tiles)}/{len(tiles)} tiles active "
+            f"for {width}x{height} image"
+        )
+        return plan
+    
+    async def detect(
+        self,
+        image: np.ndarray,
+        preprocess: Callable[[np.ndarray], np.ndarray],
+        detect: Callable[[np.ndarray], Awaitable[Dict[str, ElementStore]]]
+    ) -> Dict[str, ElementStore]:
+        """
+        Voer voorbewerking en detectie per actieve tegel uit en voeg de resultaten samen
+        
+        Args:
+            image: Volledige tekening (BGR of grijswaarden)
+            preprocess: Voorbewerking per tegel (bijv. _preprocess_image)
+            detect: Async detectie die per soort primitieve een ElementStore teruggeeft
+        
+        Returns:
+            Per soort primitieve een ElementStore in paginacoördinaten
+        """
+        plan = self.plan(image)
+        tile_results = await self._detect_tiles(image, plan.active_tiles, preprocess, detect)
+        
+        # Grote structuren die over tegelgrenzen lopen komen uit de overzichtspass
+        coarse_results = await detect(preprocess(plan.coarse))
+        
+        return self.stitch(plan, tile_results, coarse_results)
+    
+    async def detect_tiles(
+        self,
+        image: np.ndarray,
+        plan: TilePlan,
+        tiles: List[Tile],
+        preprocess: Callable[[np.ndarray], np.ndarray],
+        detect: Callable[[np.ndarray], Awaitable[Dict[str, ElementStore]]]
+    ) -> Dict[str, ElementStore]:
+        """
+        Detecteer alleen in de gegeven tegels (bijv. gewijzigde regio's van een revisie)
+        
+        Elementen waarvan het middelpunt in een andere actieve tegel ligt vallen weg;
+        die komen van elders (bijv. uit de vorige revisie).
+        """
+        tile_results = await self._detect_tiles(image, tiles, preprocess, detect)
+        return self.stitch(plan, tile_results)
+    
+    async def _detect_tiles(
+        self,
+        image: np.ndarray,
+        tiles: List[Tile],
+        preprocess: Callable[[np.ndarray], np.ndarray],
+        detect: Callable[[np.ndarray], Awaitable[Dict[str, ElementStore]]]
+    ) -> List[tuple]:
+        tile_results = []
+        for tile in tiles:
+            primitives = await detect(preprocess(tile.crop(image)))
+            tile_results.append((tile, primitives))
+        return tile_results
+    
+    def stitch(
+        self,
+        plan: TilePlan,
+        tile_results: List[tuple],
+        coarse_results: Optional[Dict[str, ElementStore]] = None
+    ) -> Dict[str, ElementStore]:
+        """Voeg tegelresultaten samen tot paginaresultaten zonder dubbelingen aan de naden"""
+        kinds = set()
+        for _, primitives in tile_results:
+            kinds.update(primitives.keys())
+        
+        stitched = {}
+        for kind in kinds:
+            parts = []
+            for tile, primitives in tile_results:
+                store = primitives.get(kind)
+                if store is None or not len(store):
+                    continue
+                store.shifted(tile.rect[0], tile.rect[1])
+                parts.append(store.take(self._owned_by_tile(plan, tile, store)))
+            
+            if coarse_results is not None and len(coarse_results.get(kind, ())):
+                coarse = coarse_results[kind].scaled(plan.coarse_scale)
+                parts.append(coarse.take(self._spans_tiles(plan, coarse)))
+            
+            stitched[kind] = self._merge_segments(ElementStore.concat(parts))
+        
+        return stitched
+    
+    def _owned_by_tile(self, plan: TilePlan, tile: Tile, store: ElementStore) -> np.ndarray:
+        """
+        Welke elementen uit deze tegel behouden blijven.
+        
+        Lijnsegmenten blijven allemaal (ze worden later samengevoegd). Overige elementen
+        blijven als hun middelpunt in de tegelkern (of een inactieve kern) ligt en ze
+        niet door een binnenrand van de tegel zijn afgesneden.
+        """
+        height, width = plan.image_shape
+        x, y, w, h = store.bbox.T
+        cx, cy = x + w / 2, y + h / 2
+        
+        x0, y0, x1, y1 = tile.core
+        in_core = (cx >= x0) & (cx < x1) & (cy >= y0) & (cy < y1)
+        
+        # Middelpunten in kernen waar geen tegel voor draaide vallen toe aan de vinder
+        for other in plan.tiles:
+            if not other.active:
+                ox0, oy0, ox1, oy1 = other.core
+                in_core |= (cx >= ox0) & (cx < ox1) & (cy >= oy0) & (cy < oy1)
+        
+        rx0, ry0, rx1, ry1 = tile.rect
+        truncated = (
+            ((x <= rx0 + 1) & (rx0 > 0)) |
+            ((y <= ry0 + 1) & (ry0 > 0)) |
+            ((x + w >= rx1 - 1) & (rx1 < width)) |
+            ((y + h >= ry1 - 1) & (ry1 < height))
+        )
+        
+        return (store.shape == SHAPE_SEGMENT) | (in_core & ~truncated)
+    
+    def _spans_tiles(self, plan: TilePlan, store: ElementStore) -> np.ndarray:
+        """Elementen uit de overzichtspass die in geen enkele tegel volledig passen"""
+        x, y, w, h = store.bbox.T
+        contained = np.zeros(len(store), dtype=bool)
+        for tile in plan.tiles:
+            rx0, ry0, rx1, ry1 = tile.rect
+            contained |= (x >= rx0) & (y >= ry0) & (x + w <= rx1) & (y + h <= ry1)
+        return (store.shape != SHAPE_SEGMENT) & ~contained
+    
+    def _merge_segments(self, store: ElementStore) -> ElementStore:
+        """Voeg lijnsegmenten die over naden liepen weer samen"""
+        segment_mask = store.shape == SHAPE_SEGMENT
+        if not segment_mask.any():
+            return store
+        
+        segments = store.take(segment_mask)
+        merged = merge_collinear_segments(segments.points, **self.merge_tolerances)
+        return ElementStore.concat([
+            ElementStore.from_segments(merged, segments.type_code[:1].repeat(len(merged))),
+            store.take(~segment_mask)
+        ])
+
+
+# Factory functie
+def get_tiled_detector(**kwargs: Any) -> TiledDetector:
+    """Factory om TiledDetector instantie te maken"""
+    return TiledDetector(**kwargs)
@@ -0,0 +1,107 @@
+import csv
+import io
+import zipfile
+from decimal import Decimal
+from xml.dom import minidom
+
+import fitz
+import pytest
+
+from src.analyzers.cost_engine import CostEngine
+from src.database.price_index import STABUPriceIndex
+from src.utils.calculation_export import CalculationExporter
+
+ITEMS = [
+    {
+        "item_code": "3.1",
+        "description": "Fundering C20/25",
+        "category": "material",
+        "quantity": 12.5,
+        "unit": "m3",
+        "unit_price": Decimal('145.00'),
+        "total_price": Decimal('1812.50'),
+    },
+    {
+        "item_code": "4.2\x01",
+        "description": "Binnenwand\x0b blokken\x1f & <kalkzandsteen> (\"dik\")\x00",
+        "category": "material",
+        "quantity": 1234.5,
+        "unit": "m2",
+        "unit_price": Decimal('45.00'),
+        "total_price": Decimal('55552.50'),
+    },
+]
+
+TOTALS = [("Totaal excl. BTW", Decimal('57365.00'))]
+
+
+def _export(fmt, items=ITEMS, **kwargs):
+    exporter = CalculationExporter(**kwargs)
+    return b"".join(exporter.stream(iter(items), fmt, "Calculatie\x07 test", TOTALS))
+
+
+def test_csv_export_uses_dutch_number_format():
+    data = _export("csv").decode("utf-8-sig")
+    
+    rows = list(csv.reader(io.StringIO(data), delimiter=";"))
+    
+    assert rows[0][:2] == ["Code", "Omschrijving"]
+    assert rows[1] == ["3.1", "Fundering C20/25", "material", "12,5", "m3", "145,00", "1.812,50"]
+    assert rows[2][3] == "1.234,5"
+    assert rows[-1][1] == "Totaal excl. BTW" and rows[-1][-1] == "57.365,00"
+
+
+def test_xlsx_export_is_valid_xml_with_control_characters():
+    archive = zipfile.ZipFile(io.BytesIO(_export("xlsx")))
+    
+    for name in archive.namelist():
+        if name.endswith(".xml") or name.endswith(".rels"):
+            minidom.parseString(archive.read(name))
+    
+    sheet = archive.read("xl/worksheets/sheet1.xml").decode("utf-8")
+    assert "Binnenwand blokken &amp; &lt;kalkzandsteen&gt;" in sheet
+    assert "<v>1234.5</v>" in sheet
+    assert 'name="Calculatie test"' in archive.read("xl/workbook.xml").decode("utf-8")
+
+
+def test_xlsx_export_streams_in_chunks():
+    exporter = CalculationExporter(chunk_size=1024)
+    items = [{**ITEMS[0], "item_code": f"3.1.{i}", "quantity": i * 0.37} for i in range(5000)]
+    
+    chunks = list(exporter.stream(iter(items), "xlsx", "Calculatie", TOTALS))
+    
+    assert len(chunks) > 2
+    sheet = zipfile.ZipFile(io.BytesIO(b"".join(chunks))).read("xl/worksheets/sheet1.xml")
+    assert sheet.count(b"<row ") == len(items) + 1 + len(TOTALS)
+
+
+def test_pdf_export_has_page_per_rows_and_valid_xref():
+    data = _export("pdf", items=ITEMS * 25, rows_per_page=20)
+    
+    assert data.startswith(b"%PDF-")
+    assert data.rstrip().endswith(b"%%EOF")
+    
+    # startxref wijst naar de xref tabel
+    offset = int(data[data.rindex(b"startxref") + len(b"startxref"):].split()[0])
+    assert data[offset:offset + 4] == b"xref"
+    
+    document = fitz.open(stream=data, filetype="pdf")
+    assert document.page_count == 3
+    assert "Fundering C20/25" in document[0].get_text()
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError):
+        CalculationExporter().stream(iter(ITEMS), "docx")
+
+
+def test_breakdown_export_lists_all_sections_and_totals():
+    engine = CostEngine(STABUPriceIndex(), {"metselaar": Decimal('55.00')}, {})
+    breakdown = engine.compute([{"element_type": "wand", "stabu_code": "4.2", "quantity": 100.0}]).to_breakdown()
+    
+    data = b"".join(CalculationExporter().stream_breakdown(breakdown, "csv")).decode("utf-8-sig")
+    rows = list(csv.reader(io.StringIO(data), delimiter=";"))
+    
+    codes = [row[0] for row in rows[1:] if row and row[0]]
+    assert codes == ["4.2", "LABOR_METSELAAR", "OVERHEAD_PM", "OVERHEAD_OH", "OVERHEAD_PROFIT"]
+    assert rows[-1] == ["", "Totaal incl. BTW", "", "", "", "", "13.416,48"]
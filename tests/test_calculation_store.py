@@ -0,0 +1,203 @@
+import asyncio
+import copy
+
+from src.database.calculation_store import SERIES_STUB, CalculationStore
+
+
+class FakeSupabase:
+    """In-memory variant van de SupabaseClient methodes die CalculationStore gebruikt"""
+    
+    def __init__(self):
+        self.calculations = []
+        self.items = {}
+        self.versions = []
+        self.item_writes = 0
+        self.version_reads = []  # (from_version, up_to) per get_calculation_versions
+    
+    async def insert_calculation(self, project_id, calculation_data, version="1.0", created_by=None):
+        calculation_id = f"calc_{len(self.calculations)}_{project_id}"
+        self.calculations.insert(0, {
+            "id": calculation_id,
+            "project_id": project_id,
+            "version": version,
+            "calculation_data": copy.deepcopy(calculation_data),
+            "is_active": True
+        })
+        return calculation_id
+    
+    async def get_project_calculations(self, project_id):
+        return [row for row in self.calculations if row["project_id"] == project_id]
+    
+    async def update_calculation(self, calculation_id, updates):
+        for row in self.calculations:
+            if row["id"] == calculation_id:
+                row.update(updates)
+        return True
+    
+    async def insert_calculation_items(self, items):
+        await asyncio.sleep(0)
+        new = {item_hash: data for item_hash, data in items.items() if item_hash not in self.items}
+        self.items.update(copy.deepcopy(new))
+        self.item_writes += len(new)
+        return len(new)
+    
+    async def get_calculation_items(self, hashes):
+        return {item_hash: copy.deepcopy(self.items[item_hash]) for item_hash in hashes if item_hash in self.items}
+    
+    async def insert_calculation_version(self, version):
+        await asyncio.sleep(0)
+        # unique (calculation_id, version)
+        if any(row["calculation_id"] == version["calculation_id"] and row["version"] == version["version"] for row in self.versions):
+            return None
+        self.versions.append(copy.deepcopy(version))
+        return version["id"]
+    
+    async def get_latest_calculation_version(self, calculation_id):
+        rows = [row for row in self.versions if row["calculation_id"] == calculation_id]
+        if not rows:
+            return None
+        latest = max(rows, key=lambda row: row["version"])
+        return {"version": latest["version"], "content_hash": latest["content_hash"]}
+    
+    async def get_latest_snapshot_version(self, calculation_id, up_to=None):
+        versions = [
+            row["version"] for row in self.versions
+            if row["calculation_id"] == calculation_id and row.get("snapshot") is not None
+            and (up_to is None or row["version"] <= up_to)
+        ]
+        return max(versions) if versions else None
+    
+    async def get_calculation_versions(self, calculation_id, up_to=None, from_version=None):
+        self.version_reads.append((from_version, up_to))
+        rows = [
+            copy.deepcopy(row) for row in self.versions
+            if row["calculation_id"] == calculation_id
+            and (up_to is None or row["version"] <= up_to)
+            and (from_version is None or row["version"] >= from_version)
+        ]
+        return sorted(rows, key=lambda row: row["version"])
+
+
+def calculation(factor, count=5):
+    return {
+        "project": "Nieuwbouw",
+        "total": 100 * factor,
+        "items": [{"item_code": f"C{i}", "quantity": i * factor, "unit": "m2"} for i in range(count)],
+    }
+
+
+def _run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_save_and_load_roundtrip():
+    async def scenario():
+        database = FakeSupabase()
+        store = CalculationStore(database)
+        saved = await store.save("p1", calculation(1))
+        return database, saved, await CalculationStore(database).load(saved["calculation_id"])
+    
+    database, saved, loaded = _run(scenario())
+    
+    assert saved["version"] == 1 and saved["changed"]
+    assert loaded == calculation(1)
+    # De versie hoort bij een rij in calculations, zonder de volledige calculatie
+    assert database.calculations[0]["id"] == saved["calculation_id"]
+    assert database.calculations[0]["calculation_data"] == SERIES_STUB
+
+
+def test_new_version_continues_project_series_and_writes_only_changes():
+    async def scenario():
+        database = FakeSupabase()
+        store = CalculationStore(database)
+        first = await store.save("p1", calculation(1))
+        writes = database.item_writes
+        changed = calculation(1)
+        changed["items"][2]["quantity"] = 99
+        second = await store.save("p1", changed)
+        unchanged = await store.save("p1", changed)
+        return database, first, second, unchanged, database.item_writes - writes
+    
+    database, first, second, unchanged, new_writes = _run(scenario())
+    
+    assert second["calculation_id"] == first["calculation_id"]
+    assert second["version"] == 2
+    assert new_writes == 1
+    assert "delta" in database.versions[1] and "snapshot" not in database.versions[1]
+    assert unchanged["changed"] is False and unchanged["version"] == 2
+
+
+def test_load_older_version_and_diff():
+    async def scenario():
+        store = CalculationStore(FakeSupabase())
+        saved = await store.save("p1", calculation(1))
+        await store.save("p1", calculation(2, count=4))
+        calculation_id = saved["calculation_id"]
+        return await store.load(calculation_id, 1), await store.diff(calculation_id, 1, 2)
+    
+    old, diff = _run(scenario())
+    
+    assert old == calculation(1)
+    assert diff["from_version"] == 1 and diff["to_version"] == 2
+    assert {"path": "total", "before": 100, "after": 200} in diff["changed"]
+    assert [change["path"] for change in diff["removed"]] == ["items/item_code=C4"]
+    quantity = next(change for change in diff["changed"] if change["path"] == "items/item_code=C3")
+    assert quantity["fields"] == {"quantity": {"before": 3, "after": 6}}
+
+
+def test_snapshot_every_checkpoint_interval():
+    async def scenario():
+        database = FakeSupabase()
+        store = CalculationStore(database, checkpoint_interval=3)
+        for factor in range(1, 8):
+            await store.save("p1", calculation(factor))
+        return database, await CalculationStore(database).load(database.versions[0]["calculation_id"])
+    
+    database, latest = _run(scenario())
+    
+    assert [row["version"] for row in database.versions if "snapshot" in row] == [1, 3, 6]
+    assert latest == calculation(7)
+
+
+def test_concurrent_workers_get_distinct_versions():
+    async def scenario():
+        database = FakeSupabase()
+        first = CalculationStore(database)
+        saved = await first.save("p1", calculation(1))
+        second = CalculationStore(database)
+        await second.load(saved["calculation_id"])
+        # Beide workers hebben dezelfde head in hun cache
+        results = await asyncio.gather(first.save("p1", calculation(2)), second.save("p1", calculation(3)))
+        return database, results, await CalculationStore(database).load(saved["calculation_id"])
+    
+    database, results, latest = _run(scenario())
+    
+    assert sorted(result["version"] for result in results) == [2, 3]
+    assert [row["version"] for row in database.versions] == [1, 2, 3]
+    winner = max(results, key=lambda result: result["version"])
+    assert latest == calculation(2 if winner is results[0] else 3)
+
+
+def test_manifest_reads_only_versions_from_the_last_snapshot():
+    async def scenario():
+        database = FakeSupabase()
+        store = CalculationStore(database, checkpoint_interval=3)
+        for factor in range(1, 8):
+            await store.save("p1", calculation(factor))
+        calculation_id = database.versions[0]["calculation_id"]
+        database.version_reads.clear()
+        
+        # Nieuwe worker: geen gecachte head
+        fresh = CalculationStore(database)
+        latest = await fresh.load(calculation_id)
+        older = await fresh.load(calculation_id, 5)
+        first = await fresh.load(calculation_id, 2)
+        return database.version_reads, latest, older, first
+    
+    reads, latest, older, first = _run(scenario())
+    
+    # Snapshots op 1, 3 en 6
+    assert reads == [(6, 7), (3, 5), (1, 2)]
+    assert latest == calculation(7)
+    assert older == calculation(5)
+    assert first == calculation(2)
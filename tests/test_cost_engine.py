@@ -0,0 +1,138 @@
+from decimal import Decimal, ROUND_HALF_UP
+
+import numpy as np
+import pytest
+
+from src.analyzers.cost_engine import CostEngine, from_cents, to_cents
+from src.database.price_index import STABUPriceIndex
+
+LABOR_RATES = {
+    "metselaar": Decimal('55.00'),
+    "timmerman": Decimal('52.00'),
+    "betonvlechter": Decimal('48.00'),
+    "kraanmachinist": Decimal('65.00'),
+    "algemeen_bouwarbeider": Decimal('42.00'),
+}
+
+EQUIPMENT_RATES = {
+    "kraan_25t": Decimal('850.00'),
+    "graafmachine": Decimal('450.00'),
+    "betonpomp": Decimal('600.00'),
+    "hoogwerker": Decimal('185.00'),
+}
+
+
+@pytest.fixture
+def engine():
+    return CostEngine(STABUPriceIndex(), LABOR_RATES, EQUIPMENT_RATES)
+
+
+@pytest.fixture
+def elements():
+    return [
+        {"element_type": "beam", "stabu_code": "3.1", "quantity": 2.0, "unit_quantities": {"m3": 2.0, "m": 12.0}},
+        {"element_type": "beam", "stabu_code": "3.1", "quantity": 1.0, "unit_quantities": {"m3": 1.0, "m": 6.0}},
+        {"element_type": "wall", "stabu_code": "4.2", "dimensions": {"area": 10.333}},
+    ]
+
+
+def test_to_and_from_cents_round_half_up():
+    assert to_cents(Decimal('0.005')) == 1
+    assert to_cents(Decimal('145.00')) == 14500
+    assert from_cents(12345) == Decimal('123.45')
+
+
+def test_prepare_groups_quantities_per_code(engine, elements):
+    inputs = engine.prepare(elements)
+    
+    assert inputs.codes == ["3.1", "4.2"]
+    assert inputs.units == ["m3", "m2"]
+    np.testing.assert_allclose(inputs.code_quantities, [3.0, 10.333])
+    np.testing.assert_array_equal(inputs.base_cents, [14500, 4500])
+
+
+def test_totals_are_exact_in_cents(engine, elements):
+    result = engine.price(engine.prepare(elements), {})
+    
+    # Posttotaal = hoeveelheid × eenheidsprijs, afgerond op hele centen
+    expected = np.floor(result.inputs.code_quantities * result.unit_cents + 0.5).astype(np.int64)
+    np.testing.assert_array_equal(result.total_cents, expected)
+    
+    assert result.total_excl_vat_cents == sum(result.subtotal_cents.values())
+    vat = (Decimal(result.total_excl_vat_cents) * Decimal('0.21')).quantize(Decimal('1'), rounding=ROUND_HALF_UP)
+    assert result.vat_cents == int(vat)
+    assert result.total_incl_vat_cents == result.total_excl_vat_cents + result.vat_cents
+    
+    breakdown = result.to_breakdown()
+    material_total = sum(item.total_price for item in breakdown.material_costs)
+    assert material_total == breakdown.subtotals["materials"]
+    assert breakdown.total_excl_vat == sum(breakdown.subtotals.values())
+    assert breakdown.total_incl_vat == breakdown.total_excl_vat + breakdown.vat_amount
+    assert all(value == value.quantize(Decimal('0.01')) for value in breakdown.subtotals.values())
+
+
+def test_prepare_skips_elements_without_code(engine, elements):
+    inputs = engine.prepare(elements + [{"element_type": "onbekend"}])
+    
+    assert len(inputs) == 3
+
+
+@pytest.mark.parametrize("element, unit, expected", [
+    ({"unit_quantities": {"m3": 2.5, "m2": 10.0}, "quantity": 1}, "m3", 2.5),
+    ({"quantity": 4}, "m2", 4.0),
+    ({"dimensions": {"width": 2.0, "height": 3.0}}, "m2", 6.0),
+    ({"dimensions": {"length": 7.5}}, "m", 7.5),
+    ({}, "stuk", 1.0),
+])
+def test_extract_quantity(engine, element, unit, expected):
+    assert engine.extract_quantity(element, unit) == expected
+
+
+def test_unknown_codes_fall_back_on_chapter_and_element_type(engine):
+    inputs = engine.prepare([
+        {"element_type": "stalen ligger", "stabu_code": "5.9", "quantity": 2},
+        {"element_type": "grondverzet", "stabu_code": "2.9", "quantity": 1},
+    ])
+    
+    assert inputs.units == ["m", "m3"]
+    assert [engine.category_for(code) for code in inputs.codes] == ["material", "labor"]
+    np.testing.assert_array_equal(inputs.base_cents, [12500, 2500])
+
+
+def test_repricing_reuses_prepared_inputs(engine, elements):
+    inputs = engine.prepare(elements)
+    
+    base = engine.price(inputs, {})
+    complex_ = engine.price(inputs, {"complexity": "high"})
+    
+    assert complex_.inputs is base.inputs
+    assert (complex_.unit_cents > base.unit_cents).all()
+    assert complex_.total_excl_vat_cents > base.total_excl_vat_cents
+
+
+def test_substitution_within_same_unit_keeps_quantities(engine, elements):
+    inputs = engine.prepare(elements)
+    
+    substituted = engine.substitute(inputs, {"3.1": "3.2"})
+    
+    assert substituted.codes == ["3.2", "4.2"]
+    np.testing.assert_array_equal(substituted.quantities, inputs.quantities)
+    assert substituted.base_cents[0] == 16500
+
+
+def test_substitution_across_units_uses_unit_quantities(engine, elements):
+    inputs = engine.prepare(elements)
+    
+    substituted = engine.substitute(inputs, {"3.1": "5.1"})
+    
+    assert substituted.units == ["m", "m2"]
+    np.testing.assert_allclose(substituted.code_quantities, [18.0, 10.333])
+    # De basis blijft ongewijzigd
+    np.testing.assert_allclose(inputs.code_quantities, [3.0, 10.333])
+
+
+def test_substitution_across_units_without_quantity_is_rejected(engine, elements):
+    inputs = engine.prepare(elements)
+    
+    with pytest.raises(ValueError):
+        engine.substitute(inputs, {"4.2": "5.1"})
@@ -0,0 +1,86 @@
+import asyncio
+import math
+
+import pytest
+
+from src.analyzers.drawing_analyzer import DrawingAnalyzer
+from src.models.document_type import DocumentType
+from src.utils.dxf_reader import DXFReader
+
+
+def _dxf(*sections: str) -> str:
+    return "".join(sections) + "0\nEOF\n"
+
+
+def _section(name: str, body: str) -> str:
+    return f"0\nSECTION\n2\n{name}\n{body}0\nENDSEC\n"
+
+
+def _line(layer: str, x1: float, y1: float, x2: float, y2: float) -> str:
+    return f"0\nLINE\n8\n{layer}\n10\n{x1}\n20\n{y1}\n11\n{x2}\n21\n{y2}\n"
+
+
+@pytest.fixture
+def floor_plan(tmp_path):
+    # Eenheden in meters ($INSUNITS 6)
+    header = "9\n$INSUNITS\n70\n6\n"
+    blocks = "0\nBLOCK\n8\n0\n2\nSTIJL\n10\n0\n20\n0\n" + _line("0", 0, 0, 0, 1) + "0\nENDBLK\n"
+    entities = (
+        _line("21_wanden", 0, 0, 5, 0) +
+        _line("21_wanden", 5, 0, 5, 4) +
+        # Gesloten ruimte 4 x 4 met een halve cirkel (bulge 1) als westgevel
+        "0\nLWPOLYLINE\n8\nruimtes\n90\n4\n70\n1\n"
+        "10\n0\n20\n0\n10\n4\n20\n0\n10\n4\n20\n4\n10\n0\n20\n4\n42\n1\n" +
+        "0\nCIRCLE\n8\n28_kolommen\n10\n2\n20\n2\n40\n0.2\n" +
+        "0\nTEXT\n8\ntekst\n10\n1\n20\n1\n40\n0.25\n1\nWoonkamer\n" +
+        # Blok twee keer ingevoegd, één keer op schaal 2
+        "0\nINSERT\n8\n22_binnenwanden\n2\nSTIJL\n10\n10\n20\n0\n" +
+        "0\nINSERT\n8\n22_binnenwanden\n2\nSTIJL\n10\n12\n20\n0\n41\n2\n42\n2\n"
+    )
+    path = tmp_path / "plattegrond.dxf"
+    path.write_text(_dxf(_section("HEADER", header), _section("BLOCKS", blocks), _section("ENTITIES", entities)))
+    return str(path)
+
+
+def test_quantities_per_layer_in_millimetres(floor_plan):
+    quantities = DXFReader().read(floor_plan).layer_quantities()
+    
+    assert quantities["21_wanden"]["length"] == pytest.approx(9000)
+    assert quantities["21_wanden"]["count"] == 2
+    assert quantities["22_binnenwanden"]["length"] == pytest.approx(3000)
+    assert quantities["ruimtes"]["area"] == pytest.approx((16 + 2 * math.pi) * 1e6)
+    assert quantities["28_kolommen"]["area"] == pytest.approx(math.pi * 200 ** 2)
+    assert "tekst" not in quantities
+
+
+def test_layer_names_map_to_element_types(floor_plan):
+    drawing = DXFReader().read(floor_plan)
+    
+    assert drawing.primitives["lines"].type_names() == {"wall"}
+    assert drawing.primitives["circles"].type_names() == {"column"}
+    assert drawing.texts == ["Woonkamer"]
+
+
+def test_layer_filter_limits_entities(floor_plan):
+    reader = DXFReader()
+    
+    drawing = reader.read(floor_plan, layers=["22_binnenwanden"])
+    
+    assert set(drawing.layer_quantities()) == {"22_binnenwanden"}
+    assert [entity.layer for entity in reader.iter_entities(floor_plan, layers=["ruimtes"])] == ["ruimtes"]
+
+
+def test_binary_dxf_is_rejected(tmp_path):
+    path = tmp_path / "binair.dxf"
+    path.write_bytes(b"AutoCAD Binary DXF\r\n\x1a\x00")
+    
+    with pytest.raises(ValueError):
+        DXFReader().read(str(path))
+
+
+def test_dwg_reaches_the_caller(tmp_path):
+    path = tmp_path / "plattegrond.dwg"
+    path.write_bytes(b"AC1032")
+    
+    with pytest.raises(ValueError, match="convert the drawing to DXF"):
+        asyncio.run(DrawingAnalyzer(None).analyze(str(path), DocumentType.DRAWING))
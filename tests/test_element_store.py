@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from src.models.element_store import ElementStore, SHAPE_BOX, SHAPE_SEGMENT
+
+
+def test_from_segments_derives_bbox_length_and_angle():
+    store = ElementStore.from_segments(np.array([[0, 0, 30, 40], [10, 10, 10, 0]], dtype=float), element_type="wall")
+    
+    np.testing.assert_allclose(store.bbox, [[0, 0, 30, 40], [10, 0, 0, 10]])
+    np.testing.assert_allclose(store.length, [50, 10])
+    np.testing.assert_allclose(store.angle, [np.degrees(np.arctan2(40, 30)), -90])
+    assert store.type_counts() == {"wall": 2}
+
+
+def test_records_use_none_for_missing_values():
+    store = ElementStore.from_columns(["room", "door"], np.array([[0, 0, 10, 5], [2, 0, 1, 2]]), area=[50.0, np.nan], material=["beton", None])
+    
+    records = list(store.to_records())
+    
+    assert [record["element_type"] for record in records] == ["room", "door"]
+    assert records[0]["area"] == 50.0 and records[1]["area"] is None
+    assert records[0]["material"] == "beton" and records[1]["material"] is None
+    assert records[0]["points"] is None and records[0]["shape"] == SHAPE_BOX
+    assert store.total_area() == 50.0
+
+
+def test_take_concat_and_type_mask():
+    walls = ElementStore.from_segments(np.array([[0, 0, 10, 0], [0, 5, 10, 5]], dtype=float), element_type="wall")
+    rooms = ElementStore.from_columns("room", np.array([[0, 0, 10, 5]]))
+    
+    combined = ElementStore.concat([walls, None, rooms])
+    
+    assert len(combined) == 3
+    assert combined.type_mask("wall").tolist() == [True, True, False]
+    assert len(combined.take(combined.type_mask("room"))) == 1
+    assert combined.shape.tolist() == [SHAPE_SEGMENT, SHAPE_SEGMENT, SHAPE_BOX]
+
+
+def test_shift_and_scale_move_coordinates_and_measures():
+    store = ElementStore.from_segments(np.array([[0, 0, 10, 0]], dtype=float))
+    store.area[:] = 4.0
+    
+    store.shifted(5, 5).scaled(2)
+    
+    np.testing.assert_allclose(store.points, [[10, 10, 30, 10]])
+    np.testing.assert_allclose(store.bbox, [[10, 10, 20, 0]])
+    assert store.length[0] == pytest.approx(20)
+    assert store.area[0] == pytest.approx(16)
+
+
+def test_first_overlap_ignores_segments():
+    own = ElementStore.from_columns("room", np.array([[0, 0, 10, 10], [100, 100, 5, 5]]))
+    other = ElementStore.concat([
+        ElementStore.from_segments(np.array([[0, 0, 10, 10]], dtype=float)),
+        ElementStore.from_columns("door", np.array([[8, 8, 4, 4]]))
+    ])
+    
+    assert own.first_overlap(other, chunk_size=1).tolist() == [1, -1]
+
+
+def test_arrays_roundtrip():
+    store = ElementStore.from_columns(["wall", "room"], np.array([[0, 0, 1, 1], [2, 2, 3, 3]]), material=["beton", None], layer="A-WALL", page=3)
+    
+    restored = ElementStore.from_arrays(store.to_arrays())
+    
+    assert list(restored.to_records()) == list(store.to_records())
@@ -0,0 +1,120 @@
+import asyncio
+
+import fitz
+import pytest
+from PIL import Image
+
+from src.utils import file_handler
+from src.utils.file_handler import FileHandler
+
+
+class FakeOCREngine:
+    """Vervangt de OCR pool: geeft per image een vaste tekst en telt gelijktijdige aanroepen"""
+    
+    def __init__(self, workers=2):
+        self.workers = workers
+        self.active = 0
+        self.max_active = 0
+        self.calls = 0
+    
+    async def recognize_many(self, images):
+        self.calls += 1
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        return [f"ocr {image.info['page']}" for image in images]
+
+
+@pytest.fixture
+def rendered_pages(monkeypatch):
+    """pdf2image zonder poppler: onthoud welke pagina's gerenderd worden"""
+    pages = []
+    
+    def convert_from_path(file_path, dpi=200, first_page=1, last_page=1):
+        pages.append(first_page)
+        image = Image.new("L", (10, 10), 255)
+        image.info["page"] = first_page
+        return [image]
+    
+    monkeypatch.setattr(file_handler.pdf2image, "convert_from_path", convert_from_path)
+    return pages
+
+
+def make_pdf(path, texts):
+    """PDF met één pagina per tekst; lege tekst geeft een pagina zonder tekstlaag"""
+    doc = fitz.open()
+    for text in texts:
+        page = doc.new_page()
+        if text:
+            page.insert_text((72, 72), text)
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+def make_handler(tmp_path, workers=2):
+    handler = FileHandler(temp_dir=str(tmp_path))
+    handler.ocr_engine = FakeOCREngine(workers)
+    handler._ocr_slots = asyncio.Semaphore(workers)
+    return handler
+
+
+def test_only_pages_without_text_layer_go_through_ocr(tmp_path, rendered_pages):
+    pdf = make_pdf(tmp_path / "bestek.pdf", [
+        "Hoofdstuk 21 metselwerk kalkzandsteen",
+        "",
+        "Hoofdstuk 22 natuursteen en vensterbanken",
+    ])
+    handler = make_handler(tmp_path)
+    
+    text = asyncio.run(handler.extract_text(pdf))
+    
+    # Alleen de tweede (gescande) pagina wordt gerenderd
+    assert rendered_pages == [2]
+    assert handler.ocr_engine.calls == 1
+    assert text.split("\n") == [
+        "Hoofdstuk 21 metselwerk kalkzandsteen",
+        "ocr 2",
+        "Hoofdstuk 22 natuursteen en vensterbanken",
+    ]
+
+
+def test_pdf_with_text_layer_skips_ocr(tmp_path, rendered_pages):
+    pdf = make_pdf(tmp_path / "tekst.pdf", ["Dit is een pagina met een tekstlaag"] * 3)
+    handler = make_handler(tmp_path)
+    
+    text = asyncio.run(handler.extract_text(pdf))
+    
+    assert rendered_pages == []
+    assert handler.ocr_engine.calls == 0
+    assert text.count("tekstlaag") == 3
+
+
+def test_ocr_keeps_short_text_layer_when_ocr_finds_less(tmp_path, rendered_pages, monkeypatch):
+    pdf = make_pdf(tmp_path / "kort.pdf", ["A1"])
+    handler = make_handler(tmp_path)
+    
+    async def empty_ocr(images):
+        return [""]
+    
+    monkeypatch.setattr(handler.ocr_engine, "recognize_many", empty_ocr)
+    
+    text = asyncio.run(handler.extract_text(pdf))
+    
+    # Pagina onder de drempel gaat wel door OCR, maar lege OCR overschrijft niets
+    assert rendered_pages == [1]
+    assert text == "A1"
+
+
+def test_scanned_pages_are_bounded_by_ocr_slots(tmp_path, rendered_pages):
+    pdf = make_pdf(tmp_path / "scan.pdf", [""] * 6)
+    handler = make_handler(tmp_path, workers=2)
+    
+    text = asyncio.run(handler.extract_text(pdf))
+    
+    assert sorted(rendered_pages) == [1, 2, 3, 4, 5, 6]
+    assert handler.ocr_engine.calls == 6
+    assert handler.ocr_engine.max_active == 2
+    # Volgorde van de pagina's blijft behouden
+    assert text.split("\n") == [f"ocr {page}" for page in range(1, 7)]
@@ -0,0 +1,84 @@
+import pytest
+
+from src.utils.ifc_reader import IFCReader
+
+MODEL = """ISO-10303-21;
+HEADER;
+FILE_DESCRIPTION(('ViewDefinition [CoordinationView]'),'2;1');
+ENDSEC;
+DATA;
+#1=IFCSIUNIT(*,.LENGTHUNIT.,.MILLI.,.METRE.);
+#2=IFCSIUNIT(*,.AREAUNIT.,$,.SQUARE_METRE.);
+#3=IFCUNITASSIGNMENT((#1,#2));
+#10=IFCBUILDINGSTOREY('st1',$,'Begane grond',$,$,$,$,$,.ELEMENT.,0.);
+#20=IFCWALLSTANDARDCASE('w1',$,'Wand 1',$,$,#100,#101,$);
+#21=IFCWALL('w2',$,'Wand \\X2\\00EB\\X0\\n''s',$,$,$,$,$);
+#30=IFCQUANTITYLENGTH('Length',$,$,5000.);
+#31=IFCQUANTITYAREA('NetSideArea',$,$,12.5);
+#32=IFCQUANTITYVOLUME('NetVolume',$,$,1.25);
+#33=IFCELEMENTQUANTITY('q1',$,'Qto_WallBaseQuantities',$,$,(#30,#31,#32));
+#34=IFCRELDEFINESBYPROPERTIES('r1',$,$,$,(#20),#33);
+#40=IFCPROPERTYSINGLEVALUE('LoadBearing',$,IFCBOOLEAN(.T.),$);
+#41=IFCPROPERTYSET('p1',$,'Pset_WallCommon',$,(#40));
+#42=IFCRELDEFINESBYPROPERTIES('r2',$,$,$,(#20),#41);
+#50=IFCMATERIAL('Kalkzandsteen');
+#51=IFCMATERIAL('Isolatie');
+#52=IFCMATERIALLAYER(#50,214.,$);
+#53=IFCMATERIALLAYER(#51,100.,$);
+#54=IFCMATERIALLAYERSET((#52,#53),'Spouwmuur');
+#55=IFCMATERIALLAYERSETUSAGE(#54,.AXIS2.,.POSITIVE.,0.);
+#56=IFCRELASSOCIATESMATERIAL('m1',$,$,$,(#20,#21),#55);
+#60=IFCRELCONTAINEDINSPATIALSTRUCTURE('c1',$,$,$,(#20,#21,#70),#10);
+#70=IFCROOF('roof',$,'Dak',$,$,$,$,$,.GABLE_ROOF.);
+#71=IFCSLAB('s1',$,'Dakvlak',$,$,$,$,$,.ROOF.);
+#72=IFCRELAGGREGATES('a1',$,$,$,#70,(#71));
+#100=IFCCARTESIANPOINT((0.,
+0.,0.));
+ENDSEC;
+END-ISO-10303-21;
+"""
+
+
+@pytest.fixture
+def model(tmp_path):
+    path = tmp_path / "woning.ifc"
+    path.write_text(MODEL)
+    return str(path)
+
+
+def test_elements_with_quantities_in_si_units(model):
+    elements = {element.global_id: element for element in IFCReader().read(model)}
+    
+    assert set(elements) == {"w1", "w2", "s1"}
+    wall = elements["w1"]
+    assert wall.length == pytest.approx(5.0)
+    assert wall.area == pytest.approx(12.5)
+    assert wall.volume == pytest.approx(1.25)
+    assert wall.unit_quantities() == {"stuk": 1.0, "m": 5.0, "m2": 12.5, "m3": 1.25}
+
+
+def test_properties_materials_and_storeys(model):
+    elements = {element.global_id: element for element in IFCReader().read(model)}
+    
+    assert elements["w1"].element_type == "load_bearing_wall"
+    assert elements["w2"].element_type == "wall"
+    assert elements["w1"].material == elements["w2"].material == "Kalkzandsteen"
+    assert elements["w2"].name == "Wand ën's"
+    assert elements["w1"].storey == "Begane grond"
+
+
+def test_aggregated_roof_is_counted_through_its_parts(model):
+    elements = {element.global_id: element for element in IFCReader().read(model)}
+    
+    assert elements["s1"].element_type == "roof"
+    assert elements["s1"].storey == "Begane grond"
+    assert "roof" not in elements
+
+
+def test_cost_elements_leave_quantity_to_unit_quantities(model):
+    cost_elements = list(IFCReader().iter_cost_elements(model))
+    
+    wall = next(element for element in cost_elements if element["metadata"]["global_id"] == "w1")
+    assert wall["quantity"] is None
+    assert wall["unit_quantities"]["m2"] == pytest.approx(12.5)
+    assert wall["source"] == "ifc"
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from src.utils.image_preprocessing import ImagePreprocessor, PreprocessingProfile
+
+
+def _drawing(noise_sigma: float, seed: int = 0) -> np.ndarray:
+    image = np.full((400, 600), 240.0)
+    image[100:103, 50:550] = 20
+    image[50:350, 300:303] = 20
+    if noise_sigma:
+        image += np.random.default_rng(seed).normal(0, noise_sigma, image.shape)
+    return np.clip(image, 0, 255).astype(np.uint8)
+
+
+@pytest.mark.parametrize("noise_sigma, expected", [(0, "vector"), (1.5, "light"), (12, "scan")])
+def test_profile_follows_measured_noise(noise_sigma, expected):
+    profile = ImagePreprocessor().select_profile(_drawing(noise_sigma))
+    
+    assert profile.name == expected
+
+
+def test_noise_estimate_ignores_lines():
+    preprocessor = ImagePreprocessor()
+    
+    assert preprocessor.estimate_noise(_drawing(0)) == pytest.approx(0, abs=0.05)
+    assert preprocessor.estimate_noise(_drawing(8)) == pytest.approx(8, rel=0.25)
+
+
+def test_large_images_are_sampled():
+    preprocessor = ImagePreprocessor(sample_pixels=10_000)
+    
+    sample = preprocessor._sample(np.zeros((1000, 1000), dtype=np.uint8))
+    
+    assert sample.size <= 10_000
+
+
+def test_apply_returns_binary_image_for_given_profile():
+    image = np.dstack([_drawing(0)] * 3)
+    
+    binary = ImagePreprocessor().apply(image, PreprocessingProfile(name="vector", noise_sigma=0.0, sharpness=0.0))
+    
+    assert binary.shape == (400, 600)
+    assert set(np.unique(binary).tolist()) == {0, 255}
+    assert binary[101, 200] == 0 and binary[200, 100] == 255
+
+
+def test_failed_measurement_falls_back_to_scan():
+    profile = ImagePreprocessor().select_profile(np.zeros((0, 0), dtype=np.uint8))
+    
+    assert profile.name == "scan"
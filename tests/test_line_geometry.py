@@ -0,0 +1,102 @@
+import math
+
+import numpy as np
+import pytest
+
+from src.utils.line_geometry import bounded_groups, merge_collinear_segments
+
+
+def _horizontal(segments: np.ndarray, y: float, tolerance: float = 1e-6) -> np.ndarray:
+    return segments[(np.abs(segments[:, 1] - y) < tolerance) & (np.abs(segments[:, 3] - y) < tolerance)]
+
+
+def test_broken_walls_are_merged():
+    segments = np.array([
+        [0, 100, 150, 100],
+        [160, 100.5, 300, 100.5],
+        [305, 99.8, 500, 99.8],
+        [0, 300, 0, 400],
+        [0, 405, 0, 600],
+    ], dtype=float)
+    
+    merged = merge_collinear_segments(segments)
+    
+    assert len(merged) == 2
+    horizontal = merged[np.argmax(np.abs(merged[:, 2] - merged[:, 0]))]
+    assert sorted([horizontal[0], horizontal[2]]) == pytest.approx([0, 500], abs=0.5)
+    assert horizontal[1] == pytest.approx(100.1, abs=0.5)
+
+
+def test_gap_larger_than_tolerance_is_kept():
+    segments = np.array([[0, 0, 100, 0], [150, 0, 250, 0]], dtype=float)
+    
+    assert len(merge_collinear_segments(segments, gap_tolerance=10.0)) == 2
+    assert len(merge_collinear_segments(segments, gap_tolerance=60.0)) == 1
+
+
+def test_fan_of_small_angle_steps_does_not_tilt_wall():
+    # Een waaier in stappen van 1.5° mag niet tot één hoekgroep samenvallen
+    wall = [[0, 500, 400, 500]]
+    fan = []
+    for k in range(61):
+        angle = math.radians(k * 1.5)
+        dx, dy = 140 * math.cos(angle), 140 * math.sin(angle)
+        fan.append([200 - dx, 500 - dy, 200 + dx, 500 + dy])
+    
+    merged = merge_collinear_segments(np.array(wall + fan, dtype=float))
+    
+    walls = _horizontal(merged, 500.0, tolerance=0.5)
+    assert len(walls) == 1
+    assert sorted([walls[0, 0], walls[0, 2]]) == pytest.approx([0, 400], abs=0.5)
+    assert len(merged) > 50
+
+
+def test_opposite_directions_merge():
+    segments = np.array([[0, 0, 100, 0], [100, 0, 0, 0]], dtype=float)
+    
+    merged = merge_collinear_segments(segments)
+    
+    assert len(merged) == 1
+    assert sorted([merged[0, 0], merged[0, 2]]) == pytest.approx([0, 100], abs=1e-6)
+
+
+def test_single_segment_is_returned_unchanged():
+    segment = np.array([[1, 2, 3, 4]], dtype=float)
+    
+    np.testing.assert_array_equal(merge_collinear_segments(segment), segment)
+
+
+def test_bounded_groups_split_chains_from_their_reference():
+    values = np.arange(0, 10, 0.5)
+    
+    labels = bounded_groups(values, 2.0)
+    
+    # Elke groep beslaat hoogstens 2.0 gemeten vanaf zijn eerste waarde
+    assert labels.tolist() == [0] * 5 + [1] * 5 + [2] * 5 + [3] * 5
+
+
+def test_bounded_groups_never_cross_keys():
+    values = np.array([5.0, 0.0, 1.0, 0.5, 5.5, 30.0])
+    keys = np.array([1, 0, 1, 0, 1, 0])
+    
+    labels = bounded_groups(values, 2.0, keys=keys)
+    
+    assert labels[1] == labels[3]
+    assert labels[2] != labels[0] and labels[0] == labels[4]
+    assert len(set(labels.tolist())) == 4
+
+
+def test_bounded_groups_match_sequential_grouping():
+    rng = np.random.default_rng(7)
+    values = np.round(rng.uniform(0, 40, 500), 1)
+    keys = rng.integers(0, 3, 500)
+    
+    labels = bounded_groups(values, 1.5, keys=keys)
+    
+    expected = np.zeros(len(values), dtype=np.int64)
+    label, reference, key = -1, None, None
+    for index in np.lexsort((values, keys)):
+        if key != keys[index] or values[index] - reference > 1.5:
+            label, reference, key = label + 1, values[index], keys[index]
+        expected[index] = label
+    np.testing.assert_array_equal(labels, expected)
@@ -0,0 +1,99 @@
+import asyncio
+import json
+import re
+
+import pytest
+
+from src.models.llm_batcher import LLMBatcher
+from src.models.llm_client import LLMConfig, LLMProvider, LLMResponse
+
+
+class FakeLLMClient:
+    """Antwoordt per item id met een functie van de payload"""
+    
+    def __init__(self, answer=None):
+        self.default_configs = {
+            provider: LLMConfig(provider=provider, model="fake", max_tokens=4000) for provider in LLMProvider
+        }
+        self.answer = answer or self._echo
+        self.prompts = []
+        self.configs = []
+    
+    async def complete(self, prompt, provider, config, response_format=None):
+        self.prompts.append(prompt)
+        self.configs.append(config)
+        content = self.answer(prompt)
+        return LLMResponse(
+            content=content if isinstance(content, str) else json.dumps(content),
+            model="fake",
+            provider=provider,
+            finish_reason="stop",
+            processing_time=0.0
+        )
+    
+    @staticmethod
+    def _echo(prompt):
+        sections = re.findall(r"### (item_\d+)\n(.*)", prompt)
+        if sections:
+            return {item_id: {"echo": payload.strip()} for item_id, payload in sections}
+        return {"echo": prompt.strip().splitlines()[-1].strip()}
+
+
+def _run(coroutine):
+    return asyncio.run(asyncio.wait_for(coroutine, timeout=5))
+
+
+def test_answers_are_routed_to_their_caller():
+    client = FakeLLMClient()
+    batcher = LLMBatcher(client, max_items=8, max_wait=0.01)
+    payloads = [f"pagina {i}" for i in range(5)]
+    
+    results = _run(batcher.submit_many(payloads, "Vat samen"))
+    
+    assert results == [{"echo": payload} for payload in payloads]
+    assert batcher.stats["requests"] == 1
+    assert client.configs[0].max_tokens == 5 * batcher.output_tokens_per_item
+    assert client.default_configs[LLMProvider.ANTHROPIC].max_tokens == 4000
+
+
+def test_partial_answer_retries_only_missing_items():
+    def answer(prompt):
+        ids = re.findall(r"### (item_\d+)", prompt)
+        if not ids:
+            return {"single": True}
+        return {item_id: "ok" for item_id in ids[:-1]}
+    
+    client = FakeLLMClient(answer)
+    batcher = LLMBatcher(client, max_items=4, max_wait=0.01)
+    
+    results = _run(batcher.submit_many(["a", "b", "c", "d"], "Doe iets"))
+    
+    assert results == ["ok", "ok", "ok", {"single": True}]
+    assert batcher.stats["requests"] == 2
+
+
+def test_batch_without_any_known_id_is_split_not_repeated():
+    client = FakeLLMClient(lambda prompt: {"onbekend": 1})
+    batcher = LLMBatcher(client, max_items=8, max_wait=0.01)
+    
+    results = _run(batcher.submit_many([f"p{i}" for i in range(8)], "Doe iets"))
+    
+    # Halveren tot losse items: 1 + 2 + 4 batches en 8 losse requests
+    assert batcher.stats["requests"] == 15
+    assert results == [{"onbekend": 1}] * 8
+
+
+def test_failing_single_item_raises_for_that_caller_only():
+    def answer(prompt):
+        # Batch en het kapotte item geven geen JSON terug
+        if "### " in prompt or "kapot" in prompt:
+            return "geen json"
+        return {"ok": True}
+    
+    client = FakeLLMClient(answer)
+    batcher = LLMBatcher(client, max_items=2, max_wait=0.01)
+    
+    results = _run(batcher.submit_many(["goed", "kapot"], "Doe iets"))
+    
+    assert results[0] == {"ok": True}
+    assert isinstance(results[1], Exception)
@@ -0,0 +1,110 @@
+import asyncio
+import threading
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from src.analyzers.cost_analyzer import CostAnalyzer
+from src.analyzers.cost_engine import CostEngine
+from src.analyzers.monte_carlo import (
+    MIN_SAMPLE_TABLE_SIZE,
+    SAMPLE_TABLE_SIZE,
+    MonteCarloSimulator,
+)
+from src.database.price_index import STABUPriceIndex
+
+
+@pytest.fixture(scope="module")
+def costing():
+    engine = CostEngine(STABUPriceIndex(), {"metselaar": Decimal('55.00')}, {"kraan_25t": Decimal('850.00')})
+    inputs = engine.prepare([
+        {"element_type": "fundering", "stabu_code": "3.1", "quantity": 40.0},
+        {"element_type": "wand", "stabu_code": "4.2", "quantity": 300.0},
+        {"element_type": "grondverzet", "stabu_code": "2.1", "quantity": 120.0},
+    ])
+    return engine.price(inputs, {})
+
+
+def test_percentiles_and_contributions(costing):
+    result = MonteCarloSimulator(draws=20_000, seed=1).simulate(costing)
+    
+    assert result.draws == 20_000
+    assert result.base_total == Decimal(costing.total_excl_vat_cents) / 100
+    assert result.p10 < result.p50 < result.p90
+    # Spreiding is scheef naar boven: de meeste uitkomsten boven de raming
+    assert result.probability_within_base < 0.5
+    assert sum(result.category_contributions.values()) == pytest.approx(1.0, abs=0.02)
+    assert {line["item_code"] for line in result.top_lines} <= set(costing.inputs.codes)
+
+
+def test_seed_makes_simulation_reproducible(costing):
+    first = MonteCarloSimulator(draws=2_000, seed=7).simulate(costing)
+    second = MonteCarloSimulator(draws=2_000, seed=7).simulate(costing)
+    
+    assert first == second
+
+
+def test_uncertainty_override_widens_the_range(costing):
+    simulator = MonteCarloSimulator(draws=10_000, seed=3)
+    
+    base = simulator.simulate(costing)
+    wide = simulator.simulate(costing, {"3.1": {"quantity": (0.8, 1.0, 1.6)}})
+    
+    assert wide.p90 - wide.p10 > base.p90 - base.p10
+
+
+def test_table_size_is_bounded_by_memory_budget():
+    simulator = MonteCarloSimulator(max_table_bytes=64 * 1024 * 1024)
+    
+    assert simulator.table_size(10) == SAMPLE_TABLE_SIZE
+    # 64 MB / (4 tabellen × 8 bytes × 5.000 posten) = 419 waarden per post
+    assert simulator.table_size(5_000) == 419
+    # Bij 10.000 posten nog maar 209: direct per batch trekken
+    assert simulator.table_size(10_000) == 0
+    assert MonteCarloSimulator(max_table_bytes=0).table_size(1) == 0
+    assert MIN_SAMPLE_TABLE_SIZE <= simulator.table_size(5_000) < SAMPLE_TABLE_SIZE
+
+
+def test_direct_sampling_matches_table_sampling(costing):
+    tables = MonteCarloSimulator(draws=40_000, seed=5).simulate(costing)
+    direct = MonteCarloSimulator(draws=40_000, seed=5, max_table_bytes=0).simulate(costing)
+    
+    assert float(direct.mean) == pytest.approx(float(tables.mean), rel=0.005)
+    assert float(direct.p90) == pytest.approx(float(tables.p90), rel=0.01)
+    assert float(direct.std) == pytest.approx(float(tables.std), rel=0.05)
+
+
+class RecordingSimulator(MonteCarloSimulator):
+    """Onthoudt per aanroep het aantal trekkingen en de thread"""
+    
+    def __init__(self):
+        super().__init__(seed=0)
+        self.calls = []
+    
+    def simulate(self, costing, uncertainty=None, draws=None, top=10):
+        self.calls.append((draws, threading.get_ident()))
+        return super().simulate(costing, uncertainty, draws, top)
+
+
+def test_analysis_uses_few_draws_off_the_event_loop(costing):
+    simulator = RecordingSimulator()
+    analyzer = CostAnalyzer(None, price_index=STABUPriceIndex(), simulator=simulator, analysis_draws=500)
+    breakdown = costing.to_breakdown()
+    
+    risks = asyncio.run(analyzer._assess_risks(breakdown, {}, costing))
+    
+    [(draws, thread)] = simulator.calls
+    assert draws == 500
+    assert thread != threading.get_ident()
+    assert risks["cost_range"]["draws"] == 500
+
+
+def test_analysis_simulation_can_be_switched_off(costing):
+    simulator = RecordingSimulator()
+    analyzer = CostAnalyzer(None, price_index=STABUPriceIndex(), simulator=simulator)
+    
+    risks = asyncio.run(analyzer._assess_risks(costing.to_breakdown(), {"cost_simulation_draws": 0}, costing))
+    
+    assert simulator.calls == []
+    assert "cost_range" not in risks
@@ -0,0 +1,98 @@
+import asyncio
+import threading
+import types
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from src.utils import ocr_engine
+from src.utils.ocr_engine import OCREngine, get_ocr_engine
+
+
+class FakeTessAPI:
+    """Neemt de plaats in van tesserocr.PyTessBaseAPI: 'leest' de grijswaarde van pixel (0, 0)"""
+    
+    created = []
+    
+    def __init__(self, lang, path=None):
+        self.lang = lang
+        self.thread = threading.get_ident()
+        self.ended = False
+        self.image = None
+        FakeTessAPI.created.append(self)
+    
+    def SetPageSegMode(self, psm):
+        self.psm = psm
+    
+    def SetImage(self, image):
+        self.image = image
+    
+    def GetUTF8Text(self):
+        return f"{self.lang}:{self.image.convert('L').getpixel((0, 0))}"
+    
+    def Clear(self):
+        self.image = None
+    
+    def End(self):
+        self.ended = True
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    FakeTessAPI.created = []
+    monkeypatch.setattr(ocr_engine, "TESSEROCR_AVAILABLE", True)
+    monkeypatch.setattr(ocr_engine, "tesserocr", types.SimpleNamespace(PyTessBaseAPI=FakeTessAPI), raising=False)
+    engine = OCREngine(workers=2, language="nld")
+    yield engine
+    engine.close()
+
+
+def _page(value: int) -> np.ndarray:
+    return np.full((20, 20), value, dtype=np.uint8)
+
+
+def test_models_are_loaded_once_per_worker_and_language(engine):
+    texts = asyncio.run(engine.recognize_many([_page(value) for value in range(10, 30)]))
+    
+    assert texts == [f"nld:{value}" for value in range(10, 30)]
+    assert 1 <= len(FakeTessAPI.created) <= 2
+    assert len({api.thread for api in FakeTessAPI.created}) == len(FakeTessAPI.created)
+    
+    asyncio.run(engine.recognize_async(_page(5), language="eng"))
+    assert sorted({api.lang for api in FakeTessAPI.created}) == ["eng", "nld"]
+
+
+def test_bgr_arrays_are_converted(engine):
+    image = np.zeros((4, 4, 3), dtype=np.uint8)
+    image[:, :, 0] = 255  # blauw in OpenCV volgorde
+    
+    engine.recognize(image)
+    
+    assert FakeTessAPI.created[0].image is None  # na Clear()
+    assert engine._to_pil(image).getpixel((0, 0)) == (0, 0, 255)
+    assert engine._to_pil(Image.new("L", (2, 2))).size == (2, 2)
+
+
+def test_close_releases_models(engine):
+    engine.recognize(_page(1))
+    
+    engine.close()
+    
+    assert all(api.ended for api in FakeTessAPI.created)
+    assert engine._executor is None
+
+
+def test_without_backend_nothing_is_recognised(monkeypatch):
+    monkeypatch.setattr(ocr_engine, "TESSEROCR_AVAILABLE", False)
+    monkeypatch.setattr(ocr_engine, "PYTESSERACT_AVAILABLE", False)
+    
+    engine = OCREngine(workers=1)
+    
+    assert not engine.available
+    assert engine.recognize(_page(1)) == ""
+
+
+def test_shared_engine_without_arguments():
+    assert get_ocr_engine() is get_ocr_engine()
+    assert get_ocr_engine(workers=1) is not get_ocr_engine()
@@ -0,0 +1,88 @@
+import cv2
+import fitz
+import numpy as np
+import pytest
+
+from src.models.element_store import ElementStore
+from src.utils.page_triage import PageTriage, UNKNOWN_LABEL
+from src.utils.pdf_vector import VectorPage
+
+
+def _page(height: int = 800, width: int = 1100) -> np.ndarray:
+    return np.full((height, width), 255, dtype=np.uint8)
+
+
+def _text_page() -> np.ndarray:
+    page = _page()
+    for row in range(30):
+        cv2.putText(page, "Algemene bepalingen en notities %d" % row, (40, 30 + row * 25),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, 0, 1)
+    return page
+
+
+def _floor_plan() -> np.ndarray:
+    # Twee woningen met elk een raster van kamers, dunne wanden
+    page = _page()
+    for left in (80, 580):
+        for x in range(left, left + 421, 105):
+            cv2.line(page, (x, 100), (x, 700), 0, 2)
+        for y in range(100, 701, 120):
+            cv2.line(page, (left, y), (left + 420, y), 0, 2)
+    return page
+
+
+def _vector_page(segments: np.ndarray, texts: list) -> VectorPage:
+    text_regions = ElementStore.from_columns("annotation", np.zeros((len(texts), 4)))
+    return VectorPage(1, 1000, 700, {"lines": ElementStore.from_segments(segments), "text_regions": text_regions}, texts)
+
+
+def test_blank_text_and_drawing_pages():
+    triage = PageTriage()
+    
+    assert triage.classify_image(_page()).label == "blank"
+    assert triage.classify_image(_text_page()).label == "text"
+    plan = triage.classify_image(_floor_plan())
+    assert plan.label == "plan" and plan.is_drawing
+
+
+def test_title_block_keyword_decides_between_drawing_types():
+    grid = np.array([[0, y, 900, y] for y in range(0, 700, 100)] + [[x, 0, x, 700] for x in range(0, 1000, 100)], dtype=float)
+    
+    page = PageTriage().classify_vector_page(_vector_page(grid, ["Noordgevel", "Schaal 1:100"]))
+    
+    assert page.label == "elevation"
+    assert page.source == "vector"
+
+
+def test_low_confidence_becomes_unknown_and_gets_full_analysis():
+    # Geen lijnen en geen titelblok: alle scores gelijk
+    page = PageTriage().classify_vector_page(_vector_page(np.zeros((0, 4)), ["A", "B"]))
+    
+    assert page.label == UNKNOWN_LABEL
+    assert page.is_drawing
+
+
+def test_unreadable_image_is_unknown():
+    page = PageTriage().classify_image(np.zeros((0, 0), dtype=np.uint8), page_number=3)
+    
+    assert page.label == UNKNOWN_LABEL and page.page_number == 3
+    assert page.is_drawing
+
+
+def test_classify_pdf_pages_from_thumbnails(tmp_path):
+    path = tmp_path / "set.pdf"
+    doc = fitz.open()
+    doc.new_page(width=842, height=595)
+    drawing = doc.new_page(width=842, height=595)
+    for left in (60, 450):
+        for x in range(left, left + 331, 82):
+            drawing.draw_line((x, 80), (x, 520), width=1)
+        for y in range(80, 521, 88):
+            drawing.draw_line((left, y), (left + 330, y), width=1)
+    doc.save(path)
+    doc.close()
+    
+    pages = PageTriage().classify_pdf(str(path))
+    
+    assert [page.label for page in pages] == ["blank", "plan"]
+    assert [page.page_number for page in PageTriage().classify_pdf(str(path), pages=[1])] == [2]
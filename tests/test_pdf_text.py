@@ -0,0 +1,107 @@
+import fitz
+import pytest
+
+from src.utils import pdf_text
+from src.utils.pdf_text import (
+    PDFTextBackend,
+    PDFTextExtractor,
+    PageText,
+    PyMuPDFTextBackend,
+    PyPDF2TextBackend,
+    get_pdf_text_extractor,
+)
+
+
+def make_pdf(path, texts):
+    """PDF met één pagina per tekst; lege tekst geeft een pagina zonder tekstlaag"""
+    doc = fitz.open()
+    for text in texts:
+        page = doc.new_page(width=595, height=842)
+        if text:
+            page.insert_text((72, 100), text, fontsize=12)
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+def test_backend_base_class_is_abstract():
+    with pytest.raises(TypeError):
+        PDFTextBackend()
+    
+    class IncompleteBackend(PDFTextBackend):
+        name = "incomplete"
+    
+    with pytest.raises(TypeError):
+        IncompleteBackend()
+
+
+def test_char_count_ignores_whitespace():
+    assert PageText(page_number=1, text=" a b\n c \t").char_count == 3
+    assert PageText(page_number=1).char_count == 0
+
+
+def test_pymupdf_streams_pages_with_size(tmp_path):
+    pdf = make_pdf(tmp_path / "rapport.pdf", ["Eerste pagina", "", "Derde pagina"])
+    extractor = PDFTextExtractor("pymupdf")
+    
+    pages = list(extractor.iter_pages(pdf))
+    
+    assert isinstance(extractor.backend, PyMuPDFTextBackend)
+    assert [page.page_number for page in pages] == [1, 2, 3]
+    assert pages[0].text.strip() == "Eerste pagina"
+    assert pages[1].char_count == 0
+    assert (pages[0].width, pages[0].height) == (595, 842)
+
+
+def test_pymupdf_selected_pages_and_layout(tmp_path):
+    pdf = make_pdf(tmp_path / "rapport.pdf", ["Eerste pagina", "Tweede pagina"])
+    extractor = PDFTextExtractor("pymupdf")
+    
+    pages = extractor.extract_pages(pdf, pages=[1], layout=True)
+    
+    assert len(pages) == 1
+    assert pages[0].page_number == 2
+    assert [line.text for line in pages[0].lines] == ["Tweede pagina"]
+    x0, y0, x1, y1 = pages[0].lines[0].bbox
+    assert x0 == pytest.approx(72, abs=1)
+    assert y0 < 100 < y1
+    assert pages[0].lines[0].font_size == pytest.approx(12)
+
+
+def test_pypdf2_backend_reads_text(tmp_path):
+    pdf = make_pdf(tmp_path / "rapport.pdf", ["Fundering op staal"])
+    extractor = PDFTextExtractor("pypdf2")
+    
+    assert isinstance(extractor.backend, PyPDF2TextBackend)
+    assert "Fundering op staal" in extractor.extract_text(pdf)
+
+
+def test_unknown_or_unavailable_backend_falls_back(monkeypatch):
+    assert isinstance(PDFTextExtractor("onbekend").backend, PyMuPDFTextBackend)
+    
+    monkeypatch.setenv("PDF_TEXT_BACKEND", "pypdf2")
+    assert isinstance(get_pdf_text_extractor().backend, PyPDF2TextBackend)
+    
+    monkeypatch.setattr(pdf_text, "PYMUPDF_AVAILABLE", False)
+    monkeypatch.delenv("PDF_TEXT_BACKEND")
+    assert isinstance(PDFTextExtractor().backend, PyPDF2TextBackend)
+
+
+def test_no_backend_available(monkeypatch, tmp_path):
+    monkeypatch.setattr(pdf_text, "PYMUPDF_AVAILABLE", False)
+    monkeypatch.setattr(pdf_text, "PYPDF2_AVAILABLE", False)
+    extractor = PDFTextExtractor()
+    
+    assert extractor.backend is None
+    with pytest.raises(RuntimeError):
+        extractor.iter_pages(str(tmp_path / "rapport.pdf"))
+    # extract_pages vangt de fout af
+    assert extractor.extract_pages(str(tmp_path / "rapport.pdf")) == []
+
+
+def test_extract_text_skips_empty_pages_and_missing_files(tmp_path):
+    pdf = make_pdf(tmp_path / "rapport.pdf", ["Een", "", "Twee"])
+    extractor = PDFTextExtractor("pymupdf")
+    
+    assert extractor.extract_text(pdf).split() == ["Een", "Twee"]
+    assert extractor.extract_text(str(tmp_path / "bestaat_niet.pdf")) == ""
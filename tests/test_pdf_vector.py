@@ -0,0 +1,77 @@
+import fitz
+import numpy as np
+import pytest
+
+from src.utils.pdf_vector import PDFVectorExtractor
+
+SCALE = 150 / 72
+
+
+@pytest.fixture
+def drawing_pdf(tmp_path):
+    path = tmp_path / "tekening.pdf"
+    doc = fitz.open()
+    
+    # Vectortekening: raster van lijnen, een kozijn, een kolom en tekst
+    page = doc.new_page(width=600, height=400)
+    for i in range(25):
+        page.draw_line((20, 20 + i * 10), (520, 20 + i * 10))
+    page.draw_rect(fitz.Rect(100, 300, 160, 340))
+    page.draw_circle((400, 320), 15)
+    page.insert_text((50, 380), "3600", fontsize=10)
+    page.insert_text((200, 380), "Woonkamer", fontsize=10)
+    
+    # Scan: één afbeelding over de hele pagina
+    scan = doc.new_page(width=600, height=400)
+    pixmap = fitz.Pixmap(fitz.csGRAY, fitz.IRect(0, 0, 60, 40), False)
+    pixmap.clear_with(200)
+    scan.insert_image(scan.rect, pixmap=pixmap)
+    for i in range(25):
+        scan.draw_line((20, 20 + i * 10), (520, 20 + i * 10))
+    
+    # Vrijwel lege pagina
+    doc.new_page(width=600, height=400).draw_line((0, 0), (100, 100))
+    
+    doc.save(path)
+    doc.close()
+    return str(path)
+
+
+def test_vector_pages_are_extracted_and_scans_skipped(drawing_pdf):
+    pages = PDFVectorExtractor().extract(drawing_pdf)
+    
+    assert len(pages) == 3
+    assert pages[1] is None and pages[2] is None
+    assert pages[0].page_number == 1
+    assert pages[0].width == pytest.approx(600 * SCALE)
+
+
+def test_geometry_is_in_pixels_at_raster_resolution(drawing_pdf):
+    page = PDFVectorExtractor().extract(drawing_pdf)[0]
+    
+    lines = page.primitives["lines"]
+    assert len(lines) == 25
+    np.testing.assert_allclose(lines.points[0], np.array([20, 20, 520, 20]) * SCALE)
+    
+    rectangles = page.primitives["rectangles"]
+    assert len(rectangles) == 1
+    np.testing.assert_allclose(rectangles.bbox[0], np.array([100, 300, 60, 40]) * SCALE)
+    
+    circles = page.primitives["circles"]
+    assert len(circles) == 1
+    assert circles.radius[0] == pytest.approx(15 * SCALE, rel=0.02)
+
+
+def test_numbers_are_typed_as_dimensions(drawing_pdf):
+    page = PDFVectorExtractor().extract(drawing_pdf)[0]
+    
+    kinds = dict(zip(page.texts, (record["element_type"] for record in page.primitives["text_regions"].to_records())))
+    
+    assert kinds == {"3600": "dimension", "Woonkamer": "annotation"}
+
+
+def test_only_pdfs_are_supported():
+    extractor = PDFVectorExtractor()
+    
+    assert extractor.supports("plattegrond.PDF")
+    assert not extractor.supports("plattegrond.png")
@@ -0,0 +1,159 @@
+import asyncio
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+
+from src.database.price_index import DEFAULT_STABU_PRICES, STABUPriceIndex
+
+
+def _row(code, price, valid_from, updated_at, **extra):
+    return {
+        "code": code,
+        "description": extra.pop("description", f"Post {code}"),
+        "unit": extra.pop("unit", "m2"),
+        "price": price,
+        "category": extra.pop("category", "metselwerk"),
+        "valid_from": valid_from,
+        "source": "test",
+        "updated_at": updated_at,
+        **extra
+    }
+
+
+class FakeSupabase:
+    """fetch_stabu_prices zoals SupabaseClient: volledig, of alleen rijen vanaf updated_since"""
+    
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self.calls = []
+        self.fail = False
+    
+    async def fetch_stabu_prices(self, updated_since=None):
+        self.calls.append(updated_since)
+        if self.fail:
+            raise ConnectionError("database niet bereikbaar")
+        if updated_since is None:
+            return [row for row in self.rows if row.get("is_active", True)]
+        return [row for row in self.rows if row["updated_at"] >= updated_since]
+
+
+@pytest.fixture
+def client():
+    return FakeSupabase([
+        _row("21.12.10", 80.0, "2024-01-01T00:00:00+00:00", "2024-01-01T00:00:00+00:00"),
+        _row("21.12.10", 90.0, "2025-01-01T00:00:00+00:00", "2024-12-01T00:00:00+00:00"),
+        _row("21.12", 70.0, "2024-01-01T00:00:00+00:00", "2024-01-01T00:00:00+00:00"),
+    ])
+
+
+def _at(year, month=1, day=1):
+    return datetime(year, month, day, tzinfo=timezone.utc)
+
+
+def test_seed_without_database():
+    index = STABUPriceIndex()
+    
+    assert len(index) == len(DEFAULT_STABU_PRICES)
+    assert index.price("3.1") == Decimal('145.00')
+    assert index.info("3.1") == {"description": "Fundering C20/25", "unit": "m3", "category": "betonwerk"}
+
+
+def test_full_load_replaces_seed_and_keeps_price_versions(client):
+    index = STABUPriceIndex(client)
+    
+    assert asyncio.run(index.refresh()) == 3
+    
+    assert len(index) == 2
+    assert index.price("3.1") is None
+    assert index.price("21.12.10", _at(2024, 6)) == Decimal('80.0')
+    assert index.price("21.12.10", _at(2025, 6)) == Decimal('90.0')
+    assert index.price("21.12.10", _at(2023, 6)) is None
+
+
+def test_lookup_falls_back_to_parent_code(client):
+    index = STABUPriceIndex(client)
+    asyncio.run(index.refresh())
+    
+    assert index.lookup("21.12.10", _at(2024, 6)) == ("21.12.10", Decimal('80.0'))
+    assert index.lookup("21.12.20-a", _at(2024, 6)) == ("21.12", Decimal('70.0'))
+    # Voor de eerste ingangsdatum geldt ook de bovenliggende code nog niet
+    assert index.lookup("21.12.10", _at(2023, 6)) is None
+    assert index.lookup("22.10", _at(2024, 6)) is None
+
+
+def test_incremental_refresh_uses_watermark_and_removes_inactive_versions(client):
+    index = STABUPriceIndex(client)
+    asyncio.run(index.refresh())
+    
+    client.rows.append(_row(
+        "21.12.10", 90.0, "2025-01-01T00:00:00+00:00", "2025-02-01T00:00:00+00:00", is_active=False
+    ))
+    client.rows.append(_row("21.13", 55.0, "2024-01-01T00:00:00+00:00", "2025-02-01T00:00:00+00:00"))
+    
+    asyncio.run(index.refresh())
+    
+    assert client.calls == [None, "2024-12-01T00:00:00+00:00"]
+    # Versie van 2025 is vervallen: de prijs van 2024 geldt weer
+    assert index.price("21.12.10", _at(2025, 6)) == Decimal('80.0')
+    assert index.price("21.13", _at(2025, 6)) == Decimal('55.0')
+    assert index.search("21.13")[0]["code"] == "21.13"
+
+
+def test_ensure_fresh_refreshes_once_per_interval(client):
+    index = STABUPriceIndex(client, refresh_interval=3600)
+    
+    async def run():
+        await asyncio.gather(*(index.ensure_fresh() for _ in range(5)))
+        await index.ensure_fresh()
+    
+    asyncio.run(run())
+    
+    assert client.calls == [None]
+
+
+def test_failed_first_refresh_falls_back_to_defaults(client):
+    client.fail = True
+    index = STABUPriceIndex(client)
+    
+    assert asyncio.run(index.refresh()) == 0
+    assert index.price("3.1") == Decimal('145.00')
+
+
+def test_invalid_rows_are_skipped(client):
+    index = STABUPriceIndex(client)
+    
+    count = index.load_rows([
+        {"code": "99.1", "price": "geen prijs"},
+        _row("21.14", 12.5, "2024-01-01T00:00:00+00:00", "2024-01-01T00:00:00+00:00"),
+    ])
+    
+    assert count == 1
+    assert index.price("21.14", _at(2024, 6)) == Decimal('12.5')
+
+
+@pytest.fixture(scope="module")
+def index():
+    return STABUPriceIndex()
+
+
+@pytest.mark.parametrize("element_type, material, expected", [
+    ("wall", "brick", "4.2"),
+    ("interior_wall", None, "4.2"),
+    ("floor", "concrete", "3.2"),
+    ("foundation", "concrete", "3.1"),
+    ("beam", "wood", "5.1"),
+])
+def test_best_code_on_element_type(index, element_type, material, expected):
+    assert index.best_code(element_type, material) == expected
+
+
+@pytest.mark.parametrize("element_type, material", [
+    ("stairs", "concrete"),            # alleen het materiaal matcht
+    ("column", "concrete"),
+    ("load_bearing_wall", "concrete"), # binnenwand is geen betonwand
+    ("floor", "wood"),                 # vloerbalk is een balk, geen vloer
+    ("window", None),
+])
+def test_best_code_falls_through_without_element_match(index, element_type, material):
+    assert index.best_code(element_type, material) is None
@@ -0,0 +1,133 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from src.analyzers.cost_engine import CostEngine
+from src.analyzers.price_indexation import (
+    CategoryIndexation,
+    IndexSeries,
+    PriceIndexation,
+    ProjectPhase,
+    parse_period,
+)
+from src.database.price_index import STABUPriceIndex
+
+LABOR_RATES = {"metselaar": Decimal('55.00'), "algemeen_bouwarbeider": Decimal('42.00')}
+EQUIPMENT_RATES = {"hoogwerker": Decimal('185.00')}
+
+# Prijspeil 2024-01-01 = 100; metselwerk en arbeid stijgen 10% in 2025
+SERIES = {
+    "bouwkosten": [("2024MM01", 100.0), ("2025MM01", 105.0)],
+    "metselwerk": [("2024MM01", 100.0), ("2025MM01", 110.0)],
+    "arbeid": [("2024MM01", 100.0), ("2025MM01", 110.0)],
+}
+
+
+@pytest.fixture
+def indexation():
+    return PriceIndexation(series=SERIES, forecast_rates={"*": 0.0})
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2024MM03", date(2024, 3, 1)),
+    ("2024KW02", date(2024, 4, 1)),
+    ("2024JJ00", date(2024, 1, 1)),
+    ("2024-Q3", date(2024, 7, 1)),
+    ("2024-05", date(2024, 5, 1)),
+    ("2024", date(2024, 1, 1)),
+    ("2024-05-17", date(2024, 5, 17)),
+    (datetime(2024, 5, 17, 12, 30), date(2024, 5, 17)),
+])
+def test_parse_period(value, expected):
+    assert parse_period(value) == expected
+
+
+def test_series_steps_and_forecasts_after_last_point():
+    series = IndexSeries("test", [("2023MM01", 100.0), ("2024MM01", 110.0)])
+    
+    # Trend over de laatste twaalf maanden
+    assert series.forecast_rate == pytest.approx(0.1)
+    assert series.value_at("2022-06-01") == 100.0
+    assert series.value_at("2023-07-01") == 100.0
+    assert series.value_at("2024-01-01") == 110.0
+    assert series.value_at(date(2025, 1, 1)) == pytest.approx(110.0 * 1.1 ** (366 / 365.25))
+    
+    values = series.values_at(np.array([date(2023, 1, 1).toordinal(), date(2024, 1, 1).toordinal()]))
+    assert values.tolist() == [100.0, 110.0]
+
+
+def test_factor_and_series_resolution(indexation):
+    assert indexation.series_for("4.2", "metselwerk") == "metselwerk"
+    assert indexation.series_for("3.1", "betonwerk") == "bouwkosten"
+    assert indexation.factor("metselwerk", "2024-01-01", date(2025, 1, 1)) == Decimal('1.1')
+    assert indexation.factor("onbekend", "2024-01-01", "2025-01-01") == Decimal('1')
+    assert indexation.factor("metselwerk", None, "2025-01-01") == Decimal('1')
+
+
+def test_load_file_wide_csv_with_decimal_comma(tmp_path):
+    path = tmp_path / "cbs.csv"
+    path.write_text("Perioden;beton;hout\n2024MM01;100,0;100,0\n2025MM01;112,4;\n", encoding="utf-8")
+    
+    indexation = PriceIndexation()
+    
+    assert indexation.load_file(str(path)) == 2
+    assert len(indexation.series["beton"]) == 2
+    assert len(indexation.series["hout"]) == 1
+    assert indexation.factor("beton", "2024MM01", "2025MM01") == Decimal('1.124')
+
+
+def test_index_rates_rounds_to_cents(indexation):
+    rates = indexation.index_rates(LABOR_RATES, "labor", date(2025, 1, 1))
+    
+    assert rates == {"metselaar": Decimal('60.50'), "algemeen_bouwarbeider": Decimal('46.20')}
+    assert indexation.index_rates(LABOR_RATES, "labor", date(2024, 1, 1)) is LABOR_RATES
+
+
+def test_compute_accepts_date_as_price_date(indexation):
+    price_index = STABUPriceIndex()
+    engine = CostEngine(
+        price_index,
+        LABOR_RATES,
+        EQUIPMENT_RATES,
+        adjustments=[CategoryIndexation(indexation, price_index)],
+        indexation=indexation
+    )
+    elements = [{"element_type": "wand", "stabu_code": "4.2", "quantity": 10.0}]
+    
+    indexed = engine.compute(elements, {"price_date": date(2025, 1, 1)}).to_breakdown()
+    as_datetime = engine.compute(elements, {"price_date": datetime(2025, 1, 1)}).to_breakdown()
+    as_string = engine.compute(elements, {"price_date": "2025-01-01"}).to_breakdown()
+    
+    # Startwaarde 45.00 (context 1.1) op prijspeil 2024 → metselwerk +10%
+    assert indexed.material_costs[0].unit_price == Decimal('54.45')
+    assert indexed.labor_costs[0].item_code == "LABOR_METSELAAR"
+    assert indexed.labor_costs[0].unit_price == Decimal('60.50')
+    assert indexed.total_incl_vat == as_datetime.total_incl_vat == as_string.total_incl_vat
+
+
+def test_escalate_phases(indexation):
+    engine = CostEngine(STABUPriceIndex(), LABOR_RATES, EQUIPMENT_RATES)
+    costing = engine.compute([{"element_type": "wand", "stabu_code": "4.2", "quantity": 10.0}])
+    phases = [
+        ProjectPhase(name="ruwbouw", start=date(2024, 1, 1), end=date(2024, 6, 30), codes=["4"]),
+        ProjectPhase(name="afbouw", start=date(2025, 1, 1), end=date(2025, 6, 30)),
+    ]
+    
+    result = indexation.escalate(costing, phases, base_date=date(2024, 1, 1), categories={"4.2": "metselwerk"})
+    
+    # Alle metselwerk in de eerste fase, die valt binnen het prijspeil
+    assert [phase.name for phase in result.phases] == ["ruwbouw", "afbouw"]
+    assert result.phases[0].escalation == Decimal('0.00')
+    assert result.phases[1].base_amount == Decimal('0.00')
+    assert result.base_total == costing.to_breakdown().total_excl_vat
+    assert result.series["4.2"] == "metselwerk"
+    assert result.series["labor"] == "arbeid"
+
+
+def test_escalate_requires_phases(indexation):
+    costing = CostEngine(STABUPriceIndex(), LABOR_RATES, EQUIPMENT_RATES).compute([])
+    
+    with pytest.raises(ValueError):
+        indexation.escalate(costing, [])
@@ -0,0 +1,106 @@
+from datetime import date, datetime
+from decimal import Decimal, ROUND_HALF_UP
+
+import numpy as np
+import pytest
+
+from src.analyzers.cost_engine import CostEngine
+from src.analyzers.pricing_context import (
+    IndexationTable,
+    PriceAdjustment,
+    PricingContext,
+    RegionalIndex,
+    apply_rate,
+    get_pricing_context,
+)
+from src.database.price_index import STABUPriceIndex
+
+
+class CountingAdjustment(PriceAdjustment):
+    """Telt hoe vaak een factor per code wordt opgevraagd"""
+    
+    name = "counting"
+    context_keys = ("season",)
+    
+    def __init__(self):
+        self.calls = []
+    
+    def factor(self, stabu_code, context):
+        self.calls.append(stabu_code)
+        return Decimal('1.05') if context.get("season") == "winter" else Decimal('1')
+
+
+@pytest.mark.parametrize("cents, rate", [
+    (14500, Decimal('1.1')),
+    (4550, Decimal('1.15')),
+    (1, Decimal('0.5')),
+    (333, Decimal('1.234567891')),
+])
+def test_apply_rate_matches_decimal_half_up(cents, rate):
+    expected = (Decimal(cents) * rate).quantize(Decimal('1'), rounding=ROUND_HALF_UP)
+    
+    assert int(apply_rate([cents], rate)[0]) == int(expected)
+
+
+def test_apply_rate_without_int64_overflow():
+    cents = np.array([2 ** 60], dtype=np.int64)
+    
+    assert int(apply_rate(cents, Decimal('1.5'))[0]) == 3 * 2 ** 59
+
+
+def test_combined_context_factor():
+    pricing = get_pricing_context({"complexity": "high", "location": "oost", "project_size": "large"})
+    
+    assert pricing.factor == Decimal('1.15') * Decimal('0.9') * Decimal('0.95')
+    # Onbekende waarden tellen als 1; zonder locatie geldt de randstad
+    assert PricingContext({"complexity": "onbekend", "location": "onbekend"}).factor == Decimal('1')
+    assert PricingContext().factor == Decimal('1.1')
+
+
+def test_code_factors_are_memoised_per_context():
+    adjustment = CountingAdjustment()
+    pricing = PricingContext({"season": "winter"}, [adjustment])
+    
+    prices = pricing.apply(["3.1", "3.1", "4.2"], np.array([14500, 14500, 4500]))
+    pricing.apply(["3.1"], np.array([20000]))
+    
+    assert adjustment.calls == ["3.1", "4.2"]
+    np.testing.assert_array_equal(prices, apply_rate([14500, 14500, 4500], Decimal('1.1') * Decimal('1.05')))
+
+
+def test_regional_index_uses_most_specific_prefix():
+    index = RegionalIndex({"Utrecht": {"21": 1.1, "21.12": 1.2, "*": 1.05}})
+    
+    assert index.factor("21.12.10", {"region": "utrecht"}) == Decimal('1.2')
+    assert index.factor("21.11", {"region": "utrecht"}) == Decimal('1.1')
+    assert index.factor("30.10", {"region": "utrecht"}) == Decimal('1.05')
+    assert index.factor("21.12.10", {"region": "limburg"}) == Decimal('1')
+
+
+def test_indexation_table_relative_to_base_date():
+    table = IndexationTable(
+        [("2024-01-01", 100), ("2024-07-01", 104), (date(2025, 1, 1), 110)],
+        base_date="2024-01-01",
+        chapter="3"
+    )
+    
+    assert table.factor("3.1", {"price_date": datetime(2024, 9, 1)}) == Decimal('1.04')
+    assert table.factor("3.1", {"price_date": "2025-03-01"}) == Decimal('1.1')
+    assert table.factor("4.2", {"price_date": "2025-03-01"}) == Decimal('1')
+    assert table.factor("3.1", {}) == Decimal('1')
+    assert table.value_at("2023-06-01") is None
+
+
+def test_engine_shares_compiled_contexts_by_relevant_keys():
+    adjustment = CountingAdjustment()
+    engine = CostEngine(STABUPriceIndex(), {}, {}, adjustments=[adjustment], max_pricing_contexts=2)
+    
+    first = engine.pricing_context({"complexity": "high", "project_name": "A"})
+    # Velden die de prijs niet beïnvloeden geven dezelfde context
+    assert engine.pricing_context({"complexity": "high", "project_name": "B"}) is first
+    assert engine.pricing_context({"complexity": "high", "season": "winter"}) is not first
+    
+    # Begrensd: de oudste context valt eruit
+    engine.pricing_context({"complexity": "low"})
+    assert len(engine._pricing_contexts) == 2
+    assert engine.pricing_context({"complexity": "high"}) is not first
@@ -0,0 +1,95 @@
+import json
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from src.analyzers.cost_analyzer import CostAnalyzer
+from src.analyzers.productivity_norms import NormsEngine, NormsTable
+from src.database.price_index import STABUPriceIndex
+
+
+@pytest.fixture(autouse=True)
+def no_norms_file(monkeypatch):
+    monkeypatch.delenv("NORMS_FILE", raising=False)
+
+
+def test_most_specific_prefix_with_matching_unit():
+    table = NormsTable()
+    
+    hours = table.hours_per_unit[table.rows_for(["4.2", "4.1", "2.3", "7.1", "5.1", "11.4"], ["m2", "m2", "m3", "stuk", "m2", "m2"])]
+    
+    # 4.2 eigen norm, 4.1 hoofdstuk 4, hout in m2 past niet op de norm in m → terugval
+    np.testing.assert_allclose(hours, [0.7, 1.1, 1.8, 3.0, 0.5, 0.5])
+
+
+def test_estimate_hours_crews_and_equipment():
+    estimate = NormsEngine().estimate(["3.1", "4.2"], ["m3", "m2"], np.array([40.0, 100.0]), {"metselaar": 2})
+    
+    labor = {trade["trade"]: trade for trade in estimate["labor"]}
+    assert labor["betonvlechter"]["hours"] == 100.0
+    assert labor["betonvlechter"]["duration_days"] == 4   # 100 uur / (4 × 8)
+    assert labor["metselaar"] == {"trade": "metselaar", "hours": 70.0, "crew_size": 2, "duration_days": 5}
+    # Machinedagen naar boven afgerond op hele dagen
+    assert {need["equipment_type"]: need["days"] for need in estimate["equipment"]} == {"betonpomp": 1, "kraan_25t": 1}
+    np.testing.assert_allclose(estimate["hours_per_code"], [100.0, 70.0])
+
+
+def test_load_file_json_and_csv(tmp_path):
+    json_file = tmp_path / "normen.json"
+    json_file.write_text(json.dumps([
+        {"code": "21", "unit": "m2", "trade": "metselaar", "hours_per_unit": 0.9, "equipment": {"hoogwerker": 0.01}},
+    ]), encoding="utf-8")
+    csv_file = tmp_path / "normen.csv"
+    csv_file.write_text(
+        "code;unit;trade;hours_per_unit;equipment\n"
+        "21.12;m2;metselaar;0,8;\n"
+        "22;m3;betonvlechter;2.0;{\"betonpomp\": 0.025}\n",
+        encoding="utf-8"
+    )
+    
+    table = NormsTable()
+    table.load_file(str(json_file))
+    assert table.equipment_types == ["hoogwerker"]
+    assert table.hours_per_unit[table.resolve("21.12.10", "m2")] == 0.9
+    
+    table.load_file(str(csv_file))
+    assert table.equipment_types == ["betonpomp"]
+    assert table.hours_per_unit[table.resolve("22.10", "m3")] == 2.0
+    # Decimale komma uit een Nederlandse CSV
+    assert table.hours_per_unit[table.resolve("21.12.10", "m2")] == 0.8
+
+
+def test_norms_file_from_environment(tmp_path, monkeypatch):
+    norms_file = tmp_path / "normen.json"
+    norms_file.write_text(json.dumps([
+        {"code": "3", "unit": "m3", "trade": "betonvlechter", "hours_per_unit": 4.0},
+    ]), encoding="utf-8")
+    monkeypatch.setenv("NORMS_FILE", str(norms_file))
+    
+    assert len(NormsTable()) == 2  # terugval + één norm
+    # Expliciete normen gaan voor
+    assert len(NormsTable([{"code": "4", "unit": "m2", "trade": "metselaar", "hours_per_unit": 1.0}])) == 2
+    
+    table = NormsTable(path=str(norms_file))
+    assert table.hours_per_unit[table.resolve("3.1", "m3")] == 4.0
+
+
+def test_missing_norms_file_falls_back_to_defaults(tmp_path, monkeypatch):
+    monkeypatch.setenv("NORMS_FILE", str(tmp_path / "bestaat_niet.json"))
+    
+    table = NormsTable()
+    
+    assert table.hours_per_unit[table.resolve("4.2", "m2")] == 0.7
+
+
+def test_cost_analyzer_uses_given_norms():
+    norms = NormsEngine(NormsTable([{"code": "3", "unit": "m3", "trade": "betonvlechter", "hours_per_unit": 4.0}]))
+    analyzer = CostAnalyzer(None, price_index=STABUPriceIndex(), norms=norms)
+    
+    inputs = analyzer.cost_engine.prepare([{"element_type": "fundering", "stabu_code": "3.1", "quantity": 10.0}])
+    costing = analyzer.cost_engine.price(inputs, {})
+    
+    assert analyzer.cost_engine.norms is norms
+    assert costing.labor == [("betonvlechter", 40.0, 4800, 192000)]
+    assert analyzer.labor_rates["betonvlechter"] == Decimal('48.00')
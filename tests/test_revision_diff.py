@@ -0,0 +1,95 @@
+import cv2
+import numpy as np
+import pytest
+
+from src.models.element_store import ElementStore
+from src.utils.revision_diff import RevisionDiff, RevisionRecord, RevisionStore
+from src.utils.tiling import TiledDetector
+
+
+def _sheet(shift: tuple = (0, 0), extra_room: bool = False) -> np.ndarray:
+    """Blad van 2048 x 1536 met een raster van kamers, optioneel één extra kamer rechtsonder"""
+    image = np.full((1536, 2048), 255, dtype=np.uint8)
+    rng = np.random.default_rng(3)
+    for _ in range(60):
+        x, y = rng.integers(50, 1400), rng.integers(50, 1000)
+        w, h = rng.integers(80, 400), rng.integers(80, 300)
+        cv2.rectangle(image, (int(x), int(y)), (int(x + w), int(y + h)), 0, 3)
+    if extra_room:
+        cv2.rectangle(image, (1650, 1150), (1850, 1350), 0, 3)
+    matrix = np.float32([[1, 0, shift[0]], [0, 1, shift[1]]])
+    return cv2.warpAffine(image, matrix, (2048, 1536), borderValue=255)
+
+
+@pytest.fixture
+def diff():
+    return RevisionDiff(TiledDetector(tile_size=512, overlap=48))
+
+
+def _record(diff: RevisionDiff, image: np.ndarray, elements: ElementStore = None) -> RevisionRecord:
+    plan = diff.plan(image)
+    return RevisionRecord(plan.coarse, image.shape[:2], elements or ElementStore.empty(), {"title": "A-101"})
+
+
+def test_shifted_plot_without_changes_has_no_changed_tiles(diff):
+    record = _record(diff, _sheet())
+    
+    change = diff.compare(_sheet(shift=(6, -4)), record)
+    
+    assert change is not None
+    assert change.changed_tiles == []
+    assert change.shift == pytest.approx((6, -4), abs=1.5)
+    assert diff.is_incremental(change)
+
+
+def test_only_tiles_with_the_change_are_redetected(diff):
+    record = _record(diff, _sheet())
+    
+    change = diff.compare(_sheet(extra_room=True), record)
+    
+    cores = [tile.core for tile in change.changed_tiles]
+    assert cores and all(x0 >= 1536 and y0 >= 1024 for x0, y0, _, _ in cores)
+    assert change.changed_fraction < 0.1
+    assert diff.is_incremental(change)
+
+
+def test_different_sheet_size_is_not_compared(diff):
+    record = _record(diff, _sheet())
+    
+    assert diff.compare(np.full((1536, 1600), 255, dtype=np.uint8), record) is None
+
+
+def test_patch_replaces_elements_in_changed_tiles(diff):
+    previous = ElementStore.concat([
+        ElementStore.from_segments(np.array([[100, 1200, 1900, 1200]], dtype=float), element_type="wall"),
+        ElementStore.from_columns("room", np.array([[100, 100, 300, 300], [1700, 1100, 100, 100]]))
+    ])
+    record = _record(diff, _sheet(), previous)
+    change = diff.compare(_sheet(extra_room=True), record)
+    detected = ElementStore.concat([
+        ElementStore.from_segments(np.array([[1536, 1200, 1900, 1200]], dtype=float), element_type="wall"),
+        ElementStore.from_columns("room", np.array([[1650, 1150, 200, 200]]))
+    ])
+    
+    patched = diff.patch(previous, change, detected)
+    
+    rooms = patched.take(patched.type_mask("room"))
+    assert sorted(rooms.bbox[:, 0].tolist()) == pytest.approx([100, 1650], abs=2)
+    walls = patched.take(patched.type_mask("wall"))
+    assert len(walls) == 1
+    assert sorted([walls.points[0, 0], walls.points[0, 2]]) == pytest.approx([100, 1900], abs=2)
+    # Vorige revisie blijft ongewijzigd
+    assert len(previous) == 3
+
+
+def test_store_roundtrip(tmp_path, diff):
+    store = RevisionStore(str(tmp_path / "revisions"))
+    elements = ElementStore.from_columns("room", np.array([[10, 20, 30, 40]]), material="beton")
+    
+    store.put("p1|a-101|A1-landscape|1", _record(diff, _sheet(), elements))
+    record = store.get("p1|a-101|A1-landscape|1")
+    
+    assert record.image_shape == (1536, 2048)
+    assert record.metadata == {"title": "A-101"}
+    assert list(record.elements.to_records()) == list(elements.to_records())
+    assert store.get("p2|a-101|A1-landscape|1") is None
@@ -0,0 +1,74 @@
+import os
+
+import pytest
+
+from src.utils.scale_engine import CalibrationCache, ScaleEngine
+
+A1_LANDSCAPE = (4967, 3508)  # pixels op 150 dpi
+
+
+@pytest.fixture
+def engine(tmp_path):
+    return ScaleEngine(dpi=150, cache=CalibrationCache(str(tmp_path / "scale")))
+
+
+@pytest.mark.parametrize("first, second", [
+    ("A-101 rev A.pdf", "A-101 rev B.pdf"),
+    ("A-101_revC.pdf", "A-101.pdf"),
+    ("A-101-rev2.pdf", "A-101 revisie 3.pdf"),
+    ("plattegrond_v2.pdf", "plattegrond_v3.pdf"),
+    ("gevel versie 2.pdf", "gevel.pdf"),
+    ("A-101_20250101_120000.pdf", "A-101_revB_20250301_093000.pdf"),
+])
+def test_revisions_share_a_series(engine, first, second):
+    assert engine.series_key(first, 1, A1_LANDSCAPE, project_id="p1") == engine.series_key(second, 1, A1_LANDSCAPE, project_id="p1")
+
+
+@pytest.mark.parametrize("first, second", [
+    ("kelder1.pdf", "kelder2.pdf"),
+    ("vloer2.pdf", "vloer3.pdf"),
+    ("plattegrond_b.pdf", "plattegrond_c.pdf"),
+    ("gevel_a.pdf", "gevel_b.pdf"),
+    ("kelder.pdf", "kelder_review.pdf"),
+])
+def test_distinct_sheets_keep_their_own_series(engine, first, second):
+    assert engine.series_key(first, 1, A1_LANDSCAPE) != engine.series_key(second, 1, A1_LANDSCAPE)
+
+
+def test_series_key_includes_project_sheet_and_page(engine):
+    assert engine.series_key("A-101 rev B.pdf", 2, A1_LANDSCAPE, project_id="p1") == "p1|a-101|A1-landscape|2"
+    assert engine.series_key("A-101.pdf", 1, (1000, 800)) == "|a-101|170x140mm|1"
+
+
+def test_calibration_is_reused_within_the_project_only(engine):
+    first = engine.calibrate("A-101 rev A.pdf", 1, A1_LANDSCAPE, texts=["Schaal 1:100"], project_id="p1")
+    
+    assert first.scale == "1:100" and first.method == "title_block"
+    assert first.mm_per_pixel == pytest.approx(engine.from_scale(100))
+    
+    # Scan van de volgende revisie zonder tekst: kalibratie uit de cache
+    cached = engine.calibrate("A-101 rev B.pdf", 1, A1_LANDSCAPE, project_id="p1")
+    assert cached.method == "cache" and cached.scale == "1:100"
+    
+    assert engine.calibrate("A-101 rev B.pdf", 1, A1_LANDSCAPE, project_id="p2") is None
+    assert engine.calibrate("A-102.pdf", 1, A1_LANDSCAPE, project_id="p1") is None
+
+
+def test_calibrations_without_project_are_not_cached(engine):
+    engine.calibrate("A-101.pdf", 1, A1_LANDSCAPE, texts=["Schaal 1:50"])
+    
+    assert not os.path.exists(engine.cache.directory) or not os.listdir(engine.cache.directory)
+    assert engine.calibrate("A-101.pdf", 1, A1_LANDSCAPE) is None
+
+
+def test_one_cache_file_per_key(engine):
+    engine.calibrate("A-101.pdf", 1, A1_LANDSCAPE, texts=["Schaal 1:100"], project_id="p1")
+    engine.calibrate("A-102.pdf", 1, A1_LANDSCAPE, texts=["Schaal 1:50"], project_id="p1")
+    
+    files = os.listdir(engine.cache.directory)
+    assert len(files) == 2 and all(name.endswith(".json") for name in files)
+    assert CalibrationCache(engine.cache.directory).get("p1|a-102|A1-landscape|1").scale == "1:50"
+
+
+def test_declared_scales_prefer_labelled_values(engine):
+    assert engine.declared_scales(["1:20", "Schaal 1:100", "SCALE 1/50"])[:2] == [100, 50]
@@ -0,0 +1,97 @@
+from decimal import Decimal
+
+import pytest
+
+from src.analyzers.cost_engine import CostEngine
+from src.analyzers.scenarios import Scenario, ScenarioEngine, get_scenario_engine
+from src.database.price_index import STABUPriceIndex
+
+
+LABOR_RATES = {"metselaar": Decimal('55.00'), "betonvlechter": Decimal('48.00')}
+
+
+@pytest.fixture
+def engine():
+    return CostEngine(STABUPriceIndex(), LABOR_RATES, {})
+
+
+@pytest.fixture
+def inputs(engine):
+    return engine.prepare([
+        {"element_type": "fundering", "stabu_code": "3.1", "quantity": 12.0, "unit_quantities": {"m3": 12.0, "m": 40.0}},
+        {"element_type": "wand", "stabu_code": "4.2", "quantity": 80.0},
+    ])
+
+
+def _by_name(results):
+    return {result.name: result for result in results}
+
+
+def test_base_first_and_differences_relative_to_base(engine, inputs):
+    results = ScenarioEngine(engine).compare(inputs, [
+        Scenario(name="oost", context={"location": "oost"}),
+        Scenario(name="complex", context={"complexity": "high"}),
+    ], {"location": "randstad"})
+    
+    assert [result.name for result in results] == ["base", "oost", "complex"]
+    base, oost, complex_ = results
+    assert base.difference == Decimal('0')
+    assert oost.difference == oost.total_excl_vat - base.total_excl_vat
+    assert oost.difference < 0 < complex_.difference
+    assert complex_.difference_percentage == round(
+        float(complex_.difference / base.total_excl_vat * 100), 2
+    )
+
+
+def test_overhead_and_labor_rates_per_scenario(engine, inputs):
+    results = _by_name(ScenarioEngine(engine).compare(inputs, [
+        Scenario(name="lage opslag", overhead_rates={"OVERHEAD_PROFIT": Decimal('0.05')}),
+        Scenario(name="dure metselaar", labor_rates={"metselaar": Decimal('75.00')}),
+    ]))
+    
+    assert results["lage opslag"].subtotals["overhead"] < results["base"].subtotals["overhead"]
+    assert results["lage opslag"].subtotals["materials"] == results["base"].subtotals["materials"]
+    # 56 metselaarsuren voor 80 m2 binnenwand, € 20 per uur duurder
+    assert results["dure metselaar"].subtotals["labor"] - results["base"].subtotals["labor"] == Decimal('1120.00')
+
+
+def test_substitutions_are_cached_per_inputs(engine, inputs, monkeypatch):
+    calls = []
+    substitute = engine.substitute
+    
+    def counting_substitute(*args, **kwargs):
+        calls.append(args[1])
+        return substitute(*args, **kwargs)
+    
+    monkeypatch.setattr(engine, "substitute", counting_substitute)
+    scenarios = ScenarioEngine(engine)
+    variant = Scenario(name="gevelsteen", substitutions={"4.2": "4.1"})
+    
+    first = scenarios.run(inputs, variant)
+    second = scenarios.run(inputs, variant, {"complexity": "high"})
+    
+    assert calls == [{"4.2": "4.1"}]
+    assert first.inputs is second.inputs
+    assert first.inputs.codes == ["3.1", "4.1"]
+    assert first.unit_cents[1] > engine.price(inputs, {}).unit_cents[1]
+
+
+def test_substitution_to_other_unit_uses_element_quantities(engine, inputs):
+    results = _by_name(ScenarioEngine(engine).compare(inputs, [
+        Scenario(name="houten balken", substitutions={"3.1": "5.1"}, context={"location": "west"}),
+    ], include_breakdown=True))
+    
+    items = {item.item_code: item for item in results["houten balken"].breakdown.material_costs}
+    assert items["5.1"].unit == "m"
+    assert items["5.1"].quantity == 40.0
+
+
+def test_failing_scenario_is_left_out(engine, inputs):
+    results = get_scenario_engine(engine).compare(inputs, [
+        # 4.2 heeft geen hoeveelheid in m
+        Scenario(name="onmogelijk", substitutions={"4.2": "5.1"}),
+        Scenario(name="noord", context={"location": "noord"}),
+    ])
+    
+    assert [result.name for result in results] == ["base", "noord"]
+    assert results[0].breakdown is None
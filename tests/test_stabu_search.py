@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from src.database.stabu_search import STABUSearchIndex, stem, tokenize
+
+
+CATALOGUE = [
+    {"code": "21.12.10", "description": "Binnenwanden kalkzandsteen", "category": "metselwerk"},
+    {"code": "21.12.20", "description": "Gevelmetselwerk baksteen", "category": "metselwerk"},
+    {"code": "22.10", "description": "Betonvloer gestort", "category": "betonwerk"},
+    {"code": "30.11", "description": "Houten binnendeuren", "category": "kozijnen"},
+    {"code": "31.20", "description": "Dakpannen keramisch", "category": "dakwerk"},
+]
+
+
+@pytest.fixture(scope="module")
+def index():
+    search_index = STABUSearchIndex()
+    search_index.build(CATALOGUE)
+    return search_index
+
+
+def _codes(results):
+    return [result["code"] for result in results]
+
+
+def test_tokenize_drops_stopwords_and_stems_plurals():
+    # één wordt een (stopwoord)
+    assert tokenize("De binnenwanden van één woning") == ["binnenwand", "woning"]
+    assert stem("deuren") == "deur"
+    assert stem("dak") == "dak"
+
+
+def test_code_prefix_query(index):
+    assert _codes(index.search("21.12")) == ["21.12.10", "21.12.20"]
+    assert _codes(index.search("22")) == ["22.10"]
+
+
+def test_compound_words_match_their_head(index):
+    # wand → binnenwanden, deur → binnendeuren
+    assert _codes(index.search("wand", prefix=False))[0] == "21.12.10"
+    assert _codes(index.search("deur", prefix=False)) == ["30.11"]
+
+
+def test_english_synonyms(index):
+    assert _codes(index.search("roof", prefix=False)) == ["31.20"]
+    assert _codes(index.search("concrete floor", prefix=False))[0] == "22.10"
+
+
+def test_typo_matches_fuzzy(index):
+    assert _codes(index.search("kalkzandsteeen", prefix=False)) == ["21.12.10"]
+
+
+def test_last_word_as_prefix_for_typeahead(index):
+    typeahead = index.search("kera")
+    
+    assert _codes(typeahead) == ["31.20"]
+    # Als prefix telt het zwaarder dan als bepaling van een samenstelling
+    assert typeahead[0]["score"] > index.search("kera", prefix=False)[0]["score"]
+
+
+def test_category_filter_and_limit(index):
+    assert _codes(index.search("metselwerk", category="dakwerk")) == []
+    assert len(index.search("21", limit=1)) == 1
+
+
+def test_best_match_respects_eligible_mask_and_min_score(index):
+    eligible = np.array([entry["category"] != "metselwerk" for entry in CATALOGUE])
+    
+    assert index.best_match("wand")["code"] == "21.12.10"
+    assert index.best_match("wand", eligible=eligible) is None
+    assert index.best_match("wand", min_score=100.0) is None
+
+
+def test_empty_index_and_query():
+    empty = STABUSearchIndex()
+    
+    assert empty.search("wand") == []
+    assert empty.best_match("wand") is None
+    assert STABUSearchIndex().search("") == []
@@ -0,0 +1,182 @@
+import asyncio
+from decimal import Decimal
+
+import pytest
+
+from src.analyzers.cost_analyzer import CostAnalyzer
+from src.analyzers.cost_engine import CostEngine
+from src.database.price_index import STABUPriceIndex
+from src.utils.table_extractor import ExtractedTable, TableCell, parse_value
+
+
+def _roles(header):
+    table = ExtractedTable(bbox=(0, 0, 100, 100), rows=1, columns=len(header), header=header, has_header=True)
+    return table.column_roles()
+
+
+def _table(header, rows):
+    """ExtractedTable met kop en rijen tekst, cellen getypeerd zoals de extractor dat doet"""
+    cells = []
+    for row, texts in enumerate([header] + rows):
+        for column, text in enumerate(texts):
+            value, value_type = parse_value(text)
+            cells.append(TableCell(
+                row=row, column=column, bbox=(column * 10, row * 10, 10, 10),
+                text=text, value=value, value_type=value_type
+            ))
+    return ExtractedTable(
+        bbox=(0, 0, 100, 100), rows=len(rows) + 1, columns=len(header),
+        cells=cells, header=header, has_header=True
+    )
+
+
+@pytest.fixture
+def engine():
+    return CostEngine(STABUPriceIndex(), {}, {})
+
+
+def test_short_price_and_unit_headers():
+    roles = _roles(["Code", "Omschrijving", "Aantal", "Eenh.", "Prijs", "Totaal"])
+    
+    assert roles == {"code": 0, "description": 1, "quantity": 2, "unit": 3, "unit_price": 4, "total": 5}
+
+
+def test_total_price_column_is_not_a_unit_price():
+    roles = _roles(["Omschrijving", "Hvh", "Eenh", "Totaalprijs"])
+    
+    assert roles["total"] == 3
+    assert roles["unit"] == 2
+    assert "unit_price" not in roles
+
+
+def test_long_headers():
+    roles = _roles(["Omschrijving", "Hoeveelheid", "Eenheid", "Eenheidsprijs", "Bedrag"])
+    
+    assert roles == {"description": 0, "quantity": 1, "unit": 2, "unit_price": 3, "total": 4}
+
+
+def test_parse_value_dutch_notation():
+    assert parse_value("€ 1.234,56") == (1234.56, "currency")
+    assert parse_value("12,5 m2") == ({"value": 12.5, "unit": "m2"}, "quantity")
+    assert parse_value("21.12.10-a") == ("21.12.10-a", "code")
+    assert parse_value("1.250") == (1250.0, "number")
+
+
+def test_cost_elements_carry_unit_and_prices():
+    table = _table(
+        ["Code", "Omschrijving", "Aantal", "Eenh.", "Prijs", "Totaal"],
+        [
+            ["3.1", "Betonwerk fundering", "4", "m3", "160,00", "640,00"],
+            ["7.2", "Binnendeuren", "6", "stuks", "", "1.500,00"],
+            ["", "Subtotaal", "", "", "", "2.140,00"],
+        ]
+    )
+    
+    elements = table.to_cost_elements()
+    
+    # Subtotaalregel zonder hoeveelheid en code valt weg
+    assert len(elements) == 2
+    concrete, doors = elements
+    assert (concrete["stabu_code"], concrete["quantity"], concrete["unit"]) == ("3.1", 4.0, "m3")
+    assert (concrete["unit_price"], concrete["total_price"]) == (160.0, 640.0)
+    assert doors["unit"] == "stuk"
+    assert doors["unit_quantities"] == {"stuk": 6.0}
+    assert doors["unit_price"] is None
+
+
+def test_row_without_quantity_is_a_lump_sum_not_one_unit():
+    table = _table(
+        ["Code", "Omschrijving", "Totaal"],
+        [["3.1", "Stelpost betonreparatie", "2.500,00"]]
+    )
+    
+    element = table.to_cost_elements()[0]
+    
+    assert element["quantity"] is None
+    assert element["total_price"] == 2500.0
+
+
+def test_engine_prices_table_rows_at_their_own_price_and_unit(engine):
+    table = _table(
+        ["Code", "Omschrijving", "Aantal", "Eenh.", "Prijs", "Totaal"],
+        [
+            ["3.1", "Betonwerk fundering", "4", "m3", "160,00", "640,00"],
+            ["7.2", "Binnendeuren", "6", "stuks", "", "1.500,00"],
+            ["3.1", "Stelpost betonreparatie", "", "", "", "2.500,00"],
+        ]
+    )
+    
+    inputs = engine.prepare(table.to_cost_elements())
+    result = engine.price(inputs, {"complexity": "very_high", "location": "randstad"})
+    
+    assert inputs.codes == ["3.1", "7.2", "3.1"]
+    assert inputs.units == ["m3", "stuk", "post"]
+    assert inputs.table_priced.tolist() == [True, True, True]
+    # Tabelprijzen zijn all-in: geen contextfactoren en geen uren uit de normen
+    assert result.total_cents.tolist() == [64000, 150000, 250000]
+    assert result.labor == []
+    
+    items = result.to_breakdown().material_costs
+    assert {item.source for item in items} == {"tabel"}
+    assert items[1].unit_price == Decimal('250.00')
+
+
+def test_engine_rejects_unpriced_rows_in_another_unit(engine):
+    table = _table(
+        ["Code", "Omschrijving", "Aantal", "Eenh."],
+        [
+            ["3.1", "Betonwerk fundering", "4", "m3"],
+            ["3.1", "Prefab poeren", "3", "stuks"],
+        ]
+    )
+    
+    inputs = engine.prepare(table.to_cost_elements())
+    
+    # De poeren in stuks worden niet als 3 m3 beton gerekend
+    assert inputs.codes == ["3.1"]
+    assert inputs.code_quantities.tolist() == [4.0]
+    assert inputs.table_priced.tolist() == [False]
+    assert inputs.base_cents.tolist() == [14500]
+    assert [(row["unit"], row["expected_unit"]) for row in inputs.rejected] == [("stuk", "m3")]
+
+
+def test_substituted_table_row_is_priced_from_the_catalogue(engine):
+    table = _table(
+        ["Code", "Omschrijving", "Aantal", "Eenh.", "Prijs"],
+        [
+            ["4.2", "Scheidingswand", "10", "m2", "50,00"],
+            ["4.1", "Gevelmetselwerk", "20", "m2", "95,00"],
+        ]
+    )
+    inputs = engine.prepare(table.to_cost_elements())
+    
+    substituted = engine.substitute(inputs, {"4.2": "4.1"})
+    
+    assert substituted.codes == ["4.1", "4.1"]
+    assert substituted.table_priced.tolist() == [False, True]
+    assert substituted.base_cents.tolist() == [8500, 9500]
+
+
+class FakeTableExtractor:
+    def __init__(self, tables):
+        self.tables = tables
+        self.files = []
+    
+    async def extract_file(self, file_path):
+        self.files.append(file_path)
+        return self.tables
+
+
+def test_cost_analyzer_reads_tables_into_the_calculation():
+    table = _table(
+        ["Code", "Omschrijving", "Aantal", "Eenh.", "Prijs"],
+        [["3.1", "Betonwerk fundering", "4", "m3", "160,00"]]
+    )
+    extractor = FakeTableExtractor([table])
+    analyzer = CostAnalyzer(None, price_index=STABUPriceIndex(), table_extractor=extractor)
+    
+    inputs = asyncio.run(analyzer.prepare_inputs(context={}, table_files=["begroting.pdf"]))
+    
+    assert extractor.files == ["begroting.pdf"]
+    assert inputs.codes == ["3.1"]
+    assert inputs.base_cents.tolist() == [16000]
@@ -0,0 +1,62 @@
+import asyncio
+
+import numpy as np
+
+from src.models.element_store import ElementStore, SHAPE_SEGMENT
+from src.utils.tiling import TiledDetector
+
+
+def _blank(height: int, width: int) -> np.ndarray:
+    return np.full((height, width), 255, dtype=np.uint8)
+
+
+def test_plan_partitions_page_and_skips_empty_tiles():
+    image = _blank(1000, 1500)
+    image[100:110, 100:300] = 0
+    detector = TiledDetector(tile_size=512, overlap=32, coarse_max_side=300)
+    
+    plan = detector.plan(image)
+    
+    assert len(plan.tiles) == 2 * 3
+    covered = sum((t.core[2] - t.core[0]) * (t.core[3] - t.core[1]) for t in plan.tiles)
+    assert covered == 1000 * 1500
+    assert [t.core[:2] for t in plan.active_tiles] == [(0, 0)]
+    assert all(0 <= t.rect[0] <= t.core[0] and t.rect[2] <= 1500 for t in plan.tiles)
+
+
+def test_detect_stitches_segments_and_deduplicates_elements_at_seams():
+    image = _blank(600, 1200)
+    image[300, 50:1150] = 0            # wand over alle naden
+    image[240:260, 500:530] = 0        # element vlak bij de naad x=512
+    detector = TiledDetector(tile_size=512, overlap=64, coarse_max_side=600)
+    
+    async def detect(tile: np.ndarray):
+        # Rijen met veel inkt zijn wanden, de rest van de inkt is één element;
+        # het (verkleinde) overzichtsbeeld levert niets op
+        ink = tile == 0
+        if tile.shape[0] < 400 or not ink.any():
+            return {"lines": ElementStore.empty(), "boxes": ElementStore.empty()}
+        rows = np.flatnonzero(ink.sum(axis=1) > 40)
+        segments = [[np.flatnonzero(ink[r]).min(), r, np.flatnonzero(ink[r]).max(), r] for r in rows]
+        ink[rows] = False
+        ys, xs = np.nonzero(ink)
+        boxes = [[xs.min(), ys.min(), xs.max() - xs.min() + 1, ys.max() - ys.min() + 1]] if len(xs) else []
+        return {
+            "lines": ElementStore.from_segments(np.array(segments, dtype=float), element_type="wall"),
+            "boxes": ElementStore.from_columns("column", np.array(boxes, dtype=float))
+        }
+    
+    result = asyncio.run(detector.detect(image, lambda tile: tile, detect))
+    
+    walls = result["lines"]
+    assert len(walls) == 1 and walls.shape[0] == SHAPE_SEGMENT
+    assert sorted([walls.points[0, 0], walls.points[0, 2]]) == [50, 1149]
+    assert len(result["boxes"]) == 1
+    np.testing.assert_allclose(result["boxes"].bbox, [[500, 240, 30, 20]])
+
+
+def test_small_images_are_not_tiled():
+    detector = TiledDetector(min_image_side=4000)
+    
+    assert not detector.should_tile(_blank(3000, 3999))
+    assert detector.should_tile(_blank(3000, 4000))